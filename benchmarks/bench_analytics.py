@@ -0,0 +1,44 @@
+"""Benchmarks of the analytics kernels over a universe-wide price panel."""
+
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from benchmarks.fixtures import Scale, scaled_frames
+from benchmarks.registry import case
+from heisenbux import analytics, constants, panel
+
+
+def _universe_returns(scale: Scale) -> analytics.FloatArray:
+    """Return the daily returns of the whole synthetic universe."""
+    prices = panel.build_panel(scaled_frames(scale.tickers, scale.years))
+    return analytics.simple_returns(prices[constants.DataFrameColumns.CLOSE])
+
+
+@case("panel.build_panel")
+def build_panel(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Align every ticker's history on common trading days."""
+    frames = scaled_frames(scale.tickers, scale.years)
+    yield lambda: panel.build_panel(frames)
+
+
+@case("analytics.summarize")
+def summarize(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Compute every per-ticker metric."""
+    prices = panel.build_panel(scaled_frames(scale.tickers, scale.years))
+    yield lambda: analytics.summarize(prices, benchmark=prices.tickers[0])
+
+
+@case("analytics.covariance_matrix")
+def covariance_matrix(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Compute the covariance matrix of daily returns."""
+    returns = _universe_returns(scale)
+    yield lambda: analytics.covariance_matrix(returns)
+
+
+@case("analytics.rolling_volatility")
+def rolling_volatility(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Compute the rolling volatility of every ticker."""
+    returns = _universe_returns(scale)
+    yield lambda: analytics.rolling_volatility(
+        returns, constants.STREAMING_VOLATILITY_WINDOW
+    )
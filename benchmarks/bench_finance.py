@@ -0,0 +1,56 @@
+"""Benchmarks of get_ticker_data against a mocked provider."""
+
+import contextlib
+import tempfile
+from collections.abc import Callable, Iterator
+from typing import Any
+from unittest.mock import patch
+
+from benchmarks.fixtures import Scale, scaled_dataframe
+from benchmarks.registry import case
+from heisenbux import finance
+from tests import helpers
+
+_TICKER = "TEST"
+
+
+@contextlib.contextmanager
+def _mocked_provider(scale: Scale) -> Iterator[None]:
+    """Serve synthetic history from a mocked provider in a scratch directory."""
+    ticker = helpers.create_mock_ticker(scaled_dataframe(scale.years))
+    with (
+        tempfile.TemporaryDirectory() as tmp,
+        contextlib.chdir(tmp),
+        patch("yfinance.Ticker", return_value=ticker),
+    ):
+        finance.ticker_cache.clear()
+        yield
+        finance.ticker_cache.clear()
+
+
+@case("finance.get_ticker_data.download")
+def download(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Fetch from the provider and write the cache on every call."""
+    with _mocked_provider(scale):
+        yield lambda: finance.get_ticker_data(_TICKER, force_download=True)
+
+
+@case("finance.get_ticker_data.disk_hit")
+def disk_hit(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Read the cache file, bypassing the in-memory cache."""
+    with _mocked_provider(scale):
+        finance.get_ticker_data(_TICKER)
+
+        def load() -> Any:
+            finance.ticker_cache.clear()
+            return finance.get_ticker_data(_TICKER)
+
+        yield load
+
+
+@case("finance.get_ticker_data.memory_hit")
+def memory_hit(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Serve repeated calls from the in-memory cache."""
+    with _mocked_provider(scale):
+        finance.get_ticker_data(_TICKER)
+        yield lambda: finance.get_ticker_data(_TICKER)
@@ -0,0 +1,27 @@
+"""Benchmarks of plot rendering."""
+
+import tempfile
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from benchmarks.fixtures import Scale, scaled_dataframe
+from benchmarks.registry import case
+from heisenbux import plot
+
+_TICKER = "TEST"
+
+
+@case("plot.render_plot")
+def render_plot(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Render one ticker's full history to a PNG."""
+    df = scaled_dataframe(scale.years)
+    with tempfile.TemporaryDirectory() as tmp:
+        yield lambda: plot.render_plot(df, _TICKER, Path(tmp))
+
+
+@case("plot.fingerprint")
+def fingerprint(scale: Scale) -> Iterator[Callable[[], Any]]:
+    """Hash the plotted data to decide whether a plot is stale."""
+    df = scaled_dataframe(scale.years)
+    yield lambda: plot.plot_fingerprint(df, _TICKER)
@@ -0,0 +1,36 @@
+"""Benchmarks of reading and writing the price cache in each format."""
+
+import tempfile
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+from benchmarks.fixtures import Scale, scaled_dataframe
+from benchmarks.registry import case
+from heisenbux import constants, storage
+
+_FORMATS = (constants.FileExtensions.NPZ, constants.FileExtensions.CSV)
+
+
+def _register(extension: str) -> None:
+    """Register the read and write cases of one cache format."""
+    name = extension.removeprefix(".")
+
+    @case(f"storage.write.{name}")
+    def write(scale: Scale) -> Iterator[Callable[[], Any]]:
+        df = scaled_dataframe(scale.years)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / f"TEST{extension}"
+            yield lambda: storage.write_prices(df, path)
+
+    @case(f"storage.read.{name}")
+    def read(scale: Scale) -> Iterator[Callable[[], Any]]:
+        df = scaled_dataframe(scale.years)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / f"TEST{extension}"
+            storage.write_prices(df, path)
+            yield lambda: storage.read_prices(path)
+
+
+for _extension in _FORMATS:
+    _register(_extension)
@@ -0,0 +1,92 @@
+"""Synthetic price data for benchmarks.
+
+Frames have the same columns and base values as
+:func:`tests.fixtures.sample_data.create_sample_dataframe`, scaled up to
+decades of business days and thousands of tickers. Prices follow a seeded
+random walk, so runs are reproducible and analytics see realistic returns.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from heisenbux import constants
+from tests.fixtures import sample_data
+
+_TRADING_DAYS_PER_YEAR = constants.TRADING_DAYS_PER_YEAR
+_DAILY_VOLATILITY = 0.01
+_INTRADAY_RANGE = 0.005
+_TIMEZONE = "America/New_York"
+
+
+@dataclass(frozen=True)
+class Scale:
+    """Size of the synthetic data set.
+
+    Attributes:
+        tickers: Number of tickers in universe-wide benchmarks
+        years: Years of daily history per ticker
+        rounds: Timed repetitions of each benchmark
+    """
+
+    tickers: int
+    years: int
+    rounds: int
+
+
+SCALES = {
+    "quick": Scale(tickers=50, years=2, rounds=3),
+    "full": Scale(tickers=2000, years=20, rounds=5),
+}
+
+
+def scaled_dataframe(years: int, seed: int = 0) -> pd.DataFrame:
+    """Create daily price data shaped like the sample data over many years.
+
+    Args:
+        years: Years of business-day history
+        seed: Random seed of the price walk
+
+    Returns:
+        DataFrame with the sample data's columns, indexed by date
+    """
+    sample = sample_data.create_sample_dataframe()
+    first = sample.iloc[0]
+    days = years * _TRADING_DAYS_PER_YEAR
+    rng = np.random.default_rng(seed)
+    close = first[constants.DataFrameColumns.CLOSE] * np.exp(
+        np.cumsum(rng.normal(0.0, _DAILY_VOLATILITY, days))
+    )
+    spread = close * rng.uniform(0.0, _INTRADAY_RANGE, days)
+    index = pd.bdate_range(
+        end=pd.Timestamp.now().normalize(), periods=days, tz=_TIMEZONE
+    )
+    index.name = constants.DataFrameColumns.DATE
+    return pd.DataFrame(
+        {
+            constants.DataFrameColumns.OPEN: close + rng.uniform(-1, 1, days) * spread,
+            constants.DataFrameColumns.HIGH: close + spread,
+            constants.DataFrameColumns.LOW: close - spread,
+            constants.DataFrameColumns.CLOSE: close,
+            constants.DataFrameColumns.VOLUME: rng.integers(
+                int(first[constants.DataFrameColumns.VOLUME]) // 2,
+                int(first[constants.DataFrameColumns.VOLUME]) * 2,
+                days,
+            ),
+        },
+        index=index,
+    )[list(sample.columns)]
+
+
+def scaled_frames(tickers: int, years: int) -> dict[str, pd.DataFrame]:
+    """Create price data for a universe of synthetic tickers.
+
+    Args:
+        tickers: Number of tickers
+        years: Years of history per ticker
+
+    Returns:
+        Mapping of ticker symbol to its price data
+    """
+    return {f"T{i:05d}": scaled_dataframe(years, seed=i) for i in range(tickers)}
@@ -0,0 +1,35 @@
+"""Registry of benchmark cases.
+
+A case is a generator function taking a :class:`~benchmarks.fixtures.Scale`.
+It builds its inputs, yields the zero-argument callable to time and cleans
+up after the generator resumes, so only the yielded call is measured.
+"""
+
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from benchmarks.fixtures import Scale
+
+CaseFunction = Callable[[Scale], Iterator[Callable[[], Any]]]
+
+# Registered cases by name, in registration order
+CASES: dict[str, CaseFunction] = {}
+
+
+def case(name: str) -> Callable[[CaseFunction], CaseFunction]:
+    """Register a benchmark case under a name.
+
+    Args:
+        name: Dotted case name, grouped by area (e.g. 'storage.read.npz')
+
+    Returns:
+        Decorator registering the case function unchanged
+    """
+
+    def register(function: CaseFunction) -> CaseFunction:
+        if name in CASES:
+            raise ValueError(f"Duplicate benchmark case {name!r}")
+        CASES[name] = function
+        return function
+
+    return register
@@ -0,0 +1,156 @@
+"""Run the benchmark suite and compare the results against a baseline.
+
+Each case is timed ``rounds`` times after one warm-up call. Results are
+written as JSON, and with ``--baseline`` every case whose median time grew
+by more than ``--threshold`` is reported as a regression and the run exits
+non-zero.
+
+Usage:
+    poetry run python -m benchmarks.run [--scale quick|full] [-k PATTERN]
+        [--output results.json] [--baseline baseline.json] [--threshold 0.2]
+"""
+
+import argparse
+import contextlib
+import importlib
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.fixtures import SCALES, Scale
+from benchmarks.registry import CASES, CaseFunction
+
+CASE_MODULES = (
+    "benchmarks.bench_storage",
+    "benchmarks.bench_finance",
+    "benchmarks.bench_plot",
+    "benchmarks.bench_analytics",
+)
+DEFAULT_OUTPUT = Path("benchmarks/results/latest.json")
+DEFAULT_THRESHOLD = 0.2
+
+_RESULTS_KEY = "results"
+_MEDIAN_KEY = "median"
+
+
+def time_case(function: CaseFunction, scale: Scale) -> dict[str, Any]:
+    """Time one benchmark case.
+
+    Args:
+        function: Case function
+        scale: Size of the synthetic data
+
+    Returns:
+        Minimum, median and mean seconds per call and the number of rounds
+    """
+    with contextlib.contextmanager(function)(scale) as call:
+        call()
+        times = []
+        for _ in range(scale.rounds):
+            start = time.perf_counter()
+            call()
+            times.append(time.perf_counter() - start)
+    return {
+        "min": min(times),
+        _MEDIAN_KEY: statistics.median(times),
+        "mean": statistics.fmean(times),
+        "rounds": len(times),
+    }
+
+
+def run(scale_name: str, pattern: str = "") -> dict[str, Any]:
+    """Run every registered case whose name contains a pattern.
+
+    Args:
+        scale_name: Name of a scale in :data:`~benchmarks.fixtures.SCALES`
+        pattern: Substring of the case names to run; empty for all
+
+    Returns:
+        Run metadata and the timings of each case
+    """
+    for module in CASE_MODULES:
+        importlib.import_module(module)
+    scale = SCALES[scale_name]
+    results = {}
+    for name, function in CASES.items():
+        if pattern in name:
+            results[name] = time_case(function, scale)
+            print(f"{name:45} {results[name][_MEDIAN_KEY] * 1000:10.3f} ms")
+    return {
+        "meta": {
+            "scale": scale_name,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        _RESULTS_KEY: results,
+    }
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Find the cases that got slower than a baseline.
+
+    Cases missing from either run are ignored.
+
+    Args:
+        current: Results of this run
+        baseline: Results of the baseline run
+        threshold: Allowed relative growth of the median time (0.2 is 20%)
+
+    Returns:
+        One description per regressed case
+    """
+    regressions = []
+    for name, result in current[_RESULTS_KEY].items():
+        before = baseline[_RESULTS_KEY].get(name)
+        if before is None:
+            continue
+        ratio = result[_MEDIAN_KEY] / before[_MEDIAN_KEY]
+        if ratio > 1 + threshold:
+            regressions.append(
+                f"{name}: {before[_MEDIAN_KEY] * 1000:.3f} ms -> "
+                f"{result[_MEDIAN_KEY] * 1000:.3f} ms ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def main() -> int:
+    """Run the suite, save the results and check them against a baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=list(SCALES), default="quick")
+    parser.add_argument("-k", dest="pattern", default="", help="Case name filter")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    current = run(args.scale, args.pattern)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(current, indent=2, sort_keys=True))
+    print(f"Results saved to {args.output}")
+
+    if args.baseline is None:
+        return 0
+    if not args.baseline.exists():
+        print(
+            f"No baseline at {args.baseline}, skipping comparison "
+            "(save one with `make bench-baseline`)"
+        )
+        return 0
+    regressions = compare(
+        current, json.loads(args.baseline.read_text()), args.threshold
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+"""Raw prices with a corporate-actions table and lazily adjusted history.
+
+Provider data adjusted for splits and dividends changes retroactively with
+every new corporate action, so a cache of adjusted prices goes stale for its
+whole history. This store keeps what never changes apart:
+
+* raw (unadjusted) OHLCV bars in ``cache/raw/<TICKER>.npz``
+* the dividends, stock splits and capital gains of each ex-date in
+  ``cache/raw/<TICKER>.actions.npz``
+
+Adjusted prices are the raw prices times a cumulative adjustment factor per
+bar, computed with one reverse cumulative product over the bars. Factors
+are memoized per ticker and keyed by the contents of the actions table and
+the span of raw bars, so a new split or dividend only invalidates the
+derived factors; the raw bars are neither re-downloaded nor rewritten.
+
+Factors follow the provider's convention: a split of ratio ``r`` divides
+earlier prices by ``r`` and multiplies earlier volumes by ``r``, and a cash
+distribution ``d`` multiplies earlier prices by ``1 - d / close`` using the
+raw close of the bar before the ex-date.
+
+:func:`heisenbux.finance.get_ticker_data` downloads into this store and
+writes the adjusted history to the per-ticker cache, so ``--update`` fetches
+only the new bars even when they carry a new action.
+"""
+
+import hashlib
+import logging
+import threading
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, tzinfo
+from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from heisenbux import constants, directory_utils, storage
+
+Columns = constants.DataFrameColumns
+FloatArray = npt.NDArray[np.float64]
+
+ACTION_COLUMNS = [Columns.DIVIDENDS, Columns.STOCK_SPLITS, Columns.CAPITAL_GAINS]
+_ADJUSTED_PRICE_COLUMNS = [Columns.OPEN, Columns.HIGH, Columns.LOW, Columns.CLOSE]
+# Columns the provider scales by later splits, besides the volume
+_SPLIT_ADJUSTED_COLUMNS = [
+    *_ADJUSTED_PRICE_COLUMNS,
+    Columns.DIVIDENDS,
+    Columns.CAPITAL_GAINS,
+]
+
+
+@dataclass(frozen=True)
+class Factors:
+    """Cumulative adjustment factors of each raw bar.
+
+    Attributes:
+        key: Actions hash and raw bar span the factors were computed for
+        price: Factor applied to the raw prices of each bar
+        volume: Factor applied to the raw volume of each bar
+    """
+
+    key: tuple[str, int, int]
+    price: FloatArray
+    volume: FloatArray
+
+
+logger = logging.getLogger(__name__)
+
+# Memoized factors of each ticker; replaced when their key no longer matches
+_factors: dict[str, Factors] = {}
+_factors_lock = threading.Lock()
+
+
+def split_actions(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Separate provider data into price bars and corporate actions.
+
+    Args:
+        df: Provider data with price columns and optional action columns
+
+    Returns:
+        Tuple of (bars without action columns, actions on ex-dates with any
+        non-zero action)
+    """
+    present = [column for column in ACTION_COLUMNS if column in df.columns]
+    actions = df[present].reindex(columns=ACTION_COLUMNS).fillna(0.0)
+    actions = actions[(actions != 0).any(axis=1)]
+    return df.drop(columns=present), actions
+
+
+def adjustment_factors(
+    dates: pd.DatetimeIndex, close: FloatArray, actions: pd.DataFrame
+) -> tuple[FloatArray, FloatArray]:
+    """Compute the cumulative adjustment factors of raw bars.
+
+    Args:
+        dates: Dates of the raw bars, sorted
+        close: Raw closing prices of the bars
+        actions: Corporate actions indexed by ex-date
+
+    Returns:
+        Tuple of (price factors, volume factors), one per bar
+    """
+    price_step = np.ones(len(dates))
+    volume_step = np.ones(len(dates))
+    if len(actions) and len(dates):
+        bar_days = _days(dates)
+        rows = np.searchsorted(bar_days, _days(actions.index), side="left")
+        # Actions before the first bar or after the last affect no bar
+        inside = (rows > 0) & (rows < len(dates))
+        rows = rows[inside]
+        splits = actions[Columns.STOCK_SPLITS].to_numpy(dtype=np.float64)[inside]
+        cash = (
+            actions[Columns.DIVIDENDS].to_numpy(dtype=np.float64)
+            + actions[Columns.CAPITAL_GAINS].to_numpy(dtype=np.float64)
+        )[inside]
+        ratio = np.where(splits > 0, splits, 1.0)
+        previous_close = np.asarray(close, dtype=np.float64)[rows - 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cash_step = np.where(previous_close > 0, 1 - cash / previous_close, 1.0)
+        np.multiply.at(price_step, rows, cash_step / ratio)
+        np.multiply.at(volume_step, rows, ratio)
+
+    # The factor of a bar is the product of the steps of all later bars
+    return _later_product(price_step), _later_product(volume_step)
+
+
+def adjust(raw: pd.DataFrame, factors: Factors) -> pd.DataFrame:
+    """Apply adjustment factors to raw bars.
+
+    Args:
+        raw: Raw price bars
+        factors: Factors computed for these bars
+
+    Returns:
+        Copy of the bars with adjusted prices and volumes
+    """
+    return _scale(raw, factors.price, factors.volume, _ADJUSTED_PRICE_COLUMNS)
+
+
+def unsplit(df: pd.DataFrame) -> pd.DataFrame:
+    """Undo the split adjustment of provider bars.
+
+    With ``auto_adjust=False`` the provider still scales bars, dividends and
+    capital gains before each split (but not before dividends). Every split
+    that affects a fetched bar has its ex-date after that bar, hence inside
+    the fetched window, so the window's own split column is enough to
+    restore the traded values.
+
+    Args:
+        df: Split-adjusted provider data with a stock splits column
+
+    Returns:
+        Copy of the bars with the prices, volumes and cash distributions as
+        traded
+    """
+    if Columns.STOCK_SPLITS not in df.columns:
+        return df
+    splits = df[[Columns.STOCK_SPLITS]].reindex(columns=ACTION_COLUMNS).fillna(0.0)
+    splits = splits[splits[Columns.STOCK_SPLITS] != 0]
+    dates = pd.DatetimeIndex(df.index)
+    # Split factors do not depend on the closes
+    price, volume = adjustment_factors(dates, np.ones(len(dates)), splits)
+    return _scale(df, 1 / price, 1 / volume, _SPLIT_ADJUSTED_COLUMNS)
+
+
+def get_factors(ticker: str, raw: pd.DataFrame, actions: pd.DataFrame) -> Factors:
+    """Return the memoized adjustment factors of a ticker's raw bars.
+
+    Factors are recomputed only when the actions table or the span of raw
+    bars changed since they were last computed.
+
+    Args:
+        ticker: Stock ticker symbol
+        raw: Raw price bars
+        actions: Corporate actions table
+
+    Returns:
+        Factors of every raw bar
+    """
+    dates = pd.DatetimeIndex(raw.index)
+    last = int(dates[-1].value) if len(dates) else 0
+    key = (_actions_hash(actions), len(dates), last)
+    with _factors_lock:
+        cached = _factors.get(ticker.upper())
+    if cached is not None and cached.key == key:
+        return cached
+
+    price, volume = adjustment_factors(
+        dates, raw[Columns.CLOSE].to_numpy(np.float64), actions
+    )
+    factors = Factors(key, price, volume)
+    with _factors_lock:
+        _factors[ticker.upper()] = factors
+    return factors
+
+
+def invalidate(ticker: str | None = None) -> None:
+    """Drop memoized factors.
+
+    Args:
+        ticker: Ticker whose factors to drop, or None for all tickers
+    """
+    with _factors_lock:
+        if ticker is None:
+            _factors.clear()
+        else:
+            _factors.pop(ticker.upper(), None)
+
+
+def get_adjusted_data(
+    ticker: str, directory: Path | str = constants.Directories.RAW
+) -> pd.DataFrame:
+    """Return the adjusted price history of a ticker from the raw store.
+
+    Args:
+        ticker: Stock ticker symbol
+        directory: Raw store directory
+
+    Returns:
+        Adjusted bars, with the corporate actions as columns like provider
+        data
+
+    Raises:
+        FileNotFoundError: If the ticker has no raw bars
+    """
+    raw = read_raw(ticker, directory)
+    actions = read_actions(ticker, directory)
+    adjusted = adjust(raw, get_factors(ticker, raw, actions))
+    rows = np.searchsorted(_days(raw.index), _days(actions.index), side="left")
+    inside = rows < len(raw)
+    for column in ACTION_COLUMNS:
+        values = np.zeros(len(raw))
+        np.add.at(values, rows[inside], actions[column].to_numpy(np.float64)[inside])
+        adjusted[column] = values
+    return adjusted
+
+
+def read_raw(
+    ticker: str, directory: Path | str = constants.Directories.RAW
+) -> pd.DataFrame:
+    """Read a ticker's raw price bars.
+
+    Args:
+        ticker: Stock ticker symbol
+        directory: Raw store directory
+
+    Returns:
+        Raw bars indexed by date
+
+    Raises:
+        FileNotFoundError: If the ticker has no raw bars
+    """
+    return storage.read_prices(_raw_file(directory, ticker))
+
+
+def read_actions(
+    ticker: str, directory: Path | str = constants.Directories.RAW
+) -> pd.DataFrame:
+    """Read a ticker's corporate actions table.
+
+    Args:
+        ticker: Stock ticker symbol
+        directory: Raw store directory
+
+    Returns:
+        Actions indexed by ex-date; empty if none are recorded
+    """
+    path = _actions_file(directory, ticker)
+    if not path.exists():
+        return pd.DataFrame(columns=ACTION_COLUMNS, dtype=np.float64)
+    return storage.read_prices(path).reindex(columns=ACTION_COLUMNS).fillna(0.0)
+
+
+def write_raw(
+    df: pd.DataFrame, ticker: str, directory: Path | str = constants.Directories.RAW
+) -> None:
+    """Merge provider data into a ticker's raw bars and actions table.
+
+    Bars and actions already stored for the same dates are replaced.
+
+    Args:
+        df: Unadjusted provider data, with or without action columns
+        ticker: Stock ticker symbol
+        directory: Raw store directory
+    """
+    directory = directory_utils.ensure_directory_exists(directory)
+    bars, actions = split_actions(df)
+    raw_file = _raw_file(directory, ticker)
+    if raw_file.exists():
+        bars = _merge(storage.read_prices(raw_file), bars)
+    storage.write_prices(bars, raw_file)
+    add_actions(ticker, actions, directory)
+
+
+def add_actions(
+    ticker: str,
+    actions: pd.DataFrame,
+    directory: Path | str = constants.Directories.RAW,
+) -> pd.DataFrame:
+    """Record corporate actions of a ticker without touching its raw bars.
+
+    Args:
+        ticker: Stock ticker symbol
+        actions: Actions indexed by ex-date
+        directory: Raw store directory
+
+    Returns:
+        The merged actions table
+    """
+    stored = read_actions(ticker, directory)
+    merged = _merge(stored, actions.reindex(columns=ACTION_COLUMNS).fillna(0.0))
+    if _actions_hash(merged) != _actions_hash(stored):
+        directory = directory_utils.ensure_directory_exists(directory)
+        storage.write_prices(merged, _actions_file(directory, ticker))
+    return merged
+
+
+def has_raw(ticker: str, directory: Path | str = constants.Directories.RAW) -> bool:
+    """Check whether a ticker has raw bars in the store.
+
+    Args:
+        ticker: Stock ticker symbol
+        directory: Raw store directory
+
+    Returns:
+        True if the ticker's raw bars exist
+    """
+    return _raw_file(directory, ticker).exists()
+
+
+def download_raw(ticker: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """Download unadjusted bars and actions of a ticker.
+
+    The provider's bars are split-adjusted even without ``auto_adjust``, so
+    they are un-split with :func:`unsplit`.
+
+    Args:
+        ticker: Stock ticker symbol
+        start: First date to fetch
+        end: Date to fetch up to
+
+    Returns:
+        Bars as traded with their action columns; empty if the provider has
+        no data
+    """
+    logger.info("Fetching raw data for %s since %s...", ticker, start.date())
+    import yfinance as yf
+
+    df = yf.Ticker(ticker).history(
+        start=start, end=end, auto_adjust=False, actions=True
+    )
+    return unsplit(df.drop(columns=[Columns.ADJ_CLOSE], errors="ignore"))
+
+
+def update_start(
+    ticker: str, directory: Path | str = constants.Directories.RAW
+) -> datetime | None:
+    """Return where an incremental download of a ticker's raw bars starts.
+
+    Args:
+        ticker: Stock ticker symbol
+        directory: Raw store directory
+
+    Returns:
+        A few days before the last stored bar, or None if none is stored
+    """
+    raw_file = _raw_file(directory, ticker)
+    if not raw_file.exists():
+        return None
+    last = pd.Timestamp(storage.read_prices(raw_file).index.max())
+    return datetime.combine(last.date(), datetime.min.time()) - timedelta(
+        days=constants.INCREMENTAL_OVERLAP_DAYS
+    )
+
+
+def fetch_raw(
+    ticker: str,
+    days: int = constants.DEFAULT_DAYS_LOOKBACK,
+    update: bool = False,
+    directory: Path | str = constants.Directories.RAW,
+) -> pd.DataFrame:
+    """Download unadjusted bars and actions into the raw store.
+
+    With ``update``, only the bars since the last stored date are fetched;
+    any new split or dividend in them is added to the actions table and
+    earlier bars are adjusted on read.
+
+    Args:
+        ticker: Stock ticker symbol
+        days: Days of history to fetch when not updating
+        update: If True, fetch only the bars missing from the store
+        directory: Raw store directory
+
+    Returns:
+        Adjusted price history after the download
+
+    Raises:
+        ValueError: If no data is found for the ticker
+    """
+    end = datetime.now()
+    start = end - timedelta(days=days)
+    if update:
+        start = update_start(ticker, directory) or start
+
+    df = download_raw(ticker, start, end)
+    if df.empty and not has_raw(ticker, directory):
+        raise ValueError(f"No data found for ticker {ticker}")
+    if not df.empty:
+        write_raw(df, ticker, directory)
+    return get_adjusted_data(ticker, directory)
+
+
+def _scale(
+    df: pd.DataFrame, price: FloatArray, volume: FloatArray, columns: Sequence[str]
+) -> pd.DataFrame:
+    """Multiply price-like columns and the volume of bars by per-bar factors.
+
+    Args:
+        df: Price bars
+        price: Factor of each bar for ``columns``
+        volume: Factor of each bar for the volume
+        columns: Columns scaled by ``price``; missing ones are skipped
+
+    Returns:
+        Scaled copy of the bars
+    """
+    scaled = df.copy()
+    for column in columns:
+        if column in scaled.columns:
+            scaled[column] = scaled[column].to_numpy(np.float64) * price
+    if Columns.VOLUME in scaled.columns:
+        scaled[Columns.VOLUME] = np.round(
+            scaled[Columns.VOLUME].to_numpy(np.float64) * volume
+        ).astype(np.int64)
+    return scaled
+
+
+def _merge(stored: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+    """Merge rows by date, preferring fresh rows."""
+    if stored.empty:
+        return fresh.sort_index()
+    if fresh.empty:
+        return stored
+    tz = fresh.index.tz if isinstance(fresh.index, pd.DatetimeIndex) else None
+    combined = pd.concat(
+        [
+            stored.set_axis(_to_timezone(stored.index, tz)),
+            fresh.set_axis(_to_timezone(fresh.index, tz)),
+        ]
+    )
+    combined = combined[~combined.index.duplicated(keep="last")].sort_index()
+    combined.index.name = Columns.DATE
+    return combined
+
+
+def _to_timezone(index: pd.Index, tz: tzinfo | None) -> pd.DatetimeIndex:
+    """Convert an index of dates to a DatetimeIndex in a timezone."""
+    dates = pd.DatetimeIndex(pd.to_datetime(index, utc=True))
+    return dates.tz_localize(None) if tz is None else dates.tz_convert(tz)
+
+
+def _later_product(step: FloatArray) -> FloatArray:
+    """Return, for each position, the product of all later steps."""
+    if not len(step):
+        return step
+    suffix = np.cumprod(step[::-1])[::-1]
+    result: FloatArray = np.append(suffix[1:], 1.0)
+    return result
+
+
+def _days(index: pd.Index) -> npt.NDArray[np.datetime64]:
+    """Return the local calendar day of each date in an index."""
+    dates = pd.DatetimeIndex(index)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return dates.to_numpy(dtype="datetime64[D]")
+
+
+def _actions_hash(actions: pd.DataFrame) -> str:
+    """Return a content hash of an actions table."""
+    digest = hashlib.sha256(_days(actions.index).astype(np.int64).tobytes())
+    values = actions.reindex(columns=ACTION_COLUMNS).to_numpy(dtype=np.float64)
+    digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def _raw_file(directory: Path | str, ticker: str) -> Path:
+    """Return the path of a ticker's raw bars."""
+    return directory_utils.build_file_path(directory, ticker, constants.CACHE_FORMAT)
+
+
+def _actions_file(directory: Path | str, ticker: str) -> Path:
+    """Return the path of a ticker's actions table."""
+    return directory_utils.build_file_path(
+        directory, ticker, f"{constants.ACTIONS_SUFFIX}{constants.CACHE_FORMAT}"
+    )
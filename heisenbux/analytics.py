@@ -0,0 +1,352 @@
+"""Vectorized portfolio analytics over aligned price panels.
+
+Every function works on whole (days, tickers) arrays at once, such as the
+columns of a :class:`~heisenbux.panel.PricePanel`, with no Python loop over
+tickers or days. NaN marks a day on which a ticker has no data; statistics
+skip those observations, and pairwise statistics use the days on which both
+series have data.
+"""
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from heisenbux import constants, panel
+
+FloatArray = npt.NDArray[np.float64]
+
+
+def simple_returns(prices: FloatArray) -> FloatArray:
+    """Return the period-over-period simple returns of prices.
+
+    Args:
+        prices: Array of shape (days, tickers) or (days,)
+
+    Returns:
+        Array with one row fewer than ``prices``
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns: FloatArray = prices[1:] / prices[:-1] - 1
+    return returns
+
+
+def log_returns(prices: FloatArray) -> FloatArray:
+    """Return the period-over-period log returns of prices.
+
+    Args:
+        prices: Array of shape (days, tickers) or (days,)
+
+    Returns:
+        Array with one row fewer than ``prices``
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns: FloatArray = np.diff(np.log(prices), axis=0)
+    return returns
+
+
+def annualized_return(
+    returns: FloatArray, periods_per_year: int = constants.TRADING_DAYS_PER_YEAR
+) -> FloatArray:
+    """Return the compound annual growth rate implied by periodic returns.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+        periods_per_year: Number of return periods in a year
+
+    Returns:
+        Annualized return of each ticker
+    """
+    growth = np.log1p(returns)
+    count = np.sum(~np.isnan(growth), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result: FloatArray = np.expm1(
+            np.nansum(growth, axis=0) * periods_per_year / count
+        )
+    return result
+
+
+def volatility(
+    returns: FloatArray, periods_per_year: int = constants.TRADING_DAYS_PER_YEAR
+) -> FloatArray:
+    """Return the annualized standard deviation of periodic returns.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+        periods_per_year: Number of return periods in a year
+
+    Returns:
+        Annualized volatility of each ticker
+    """
+    result: FloatArray = _nan_std(returns) * np.sqrt(periods_per_year)
+    return result
+
+
+def rolling_volatility(
+    returns: FloatArray,
+    window: int,
+    periods_per_year: int = constants.TRADING_DAYS_PER_YEAR,
+) -> FloatArray:
+    """Return the annualized volatility over a trailing window of periods.
+
+    Uses running sums, so the cost does not depend on the window length.
+    Windows that contain a missing return are NaN.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+        window: Number of periods in each window
+        periods_per_year: Number of return periods in a year
+
+    Returns:
+        Array shaped like ``returns``; the first ``window - 1`` rows are NaN
+
+    Raises:
+        ValueError: If the window is shorter than two periods
+    """
+    if window < 2:  # noqa: PLR2004
+        raise ValueError(f"Window must be at least 2 periods, got {window}")
+
+    returns = np.asarray(returns, dtype=np.float64)
+    valid = ~np.isnan(returns)
+    # Centering each series first keeps the sum-of-squares formula accurate
+    centered = np.where(valid, returns - _nan_mean(returns), 0.0)
+
+    def window_sums(values: FloatArray) -> FloatArray:
+        totals = np.cumsum(values, axis=0)
+        sums = np.full_like(totals, np.nan)
+        sums[window - 1 :] = totals[window - 1 :]
+        sums[window:] -= totals[:-window]
+        return sums
+
+    count = window_sums(valid.astype(np.float64))
+    total = window_sums(centered)
+    squares = window_sums(centered**2)
+
+    with np.errstate(invalid="ignore"):
+        variance = (squares - total**2 / window) / (window - 1)
+    variance = np.where(count == window, np.maximum(variance, 0.0), np.nan)
+    result: FloatArray = np.sqrt(variance * periods_per_year)
+    return result
+
+
+def drawdowns(prices: FloatArray) -> FloatArray:
+    """Return the fractional decline of prices from their running peak.
+
+    Args:
+        prices: Array of shape (days, tickers) or (days,)
+
+    Returns:
+        Array shaped like ``prices`` holding values <= 0, NaN where a price
+        is missing
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    peaks = np.fmax.accumulate(prices, axis=0)
+    result: FloatArray = prices / peaks - 1
+    return result
+
+
+def max_drawdown(prices: FloatArray) -> FloatArray:
+    """Return the largest peak-to-trough decline of each ticker.
+
+    Args:
+        prices: Array of shape (days, tickers)
+
+    Returns:
+        Maximum drawdown of each ticker as a value <= 0
+    """
+    depths = drawdowns(prices)
+    result: FloatArray = np.fmin.reduce(depths, axis=0)
+    return result
+
+
+def sharpe_ratio(
+    returns: FloatArray,
+    risk_free_rate: float = 0.0,
+    periods_per_year: int = constants.TRADING_DAYS_PER_YEAR,
+) -> FloatArray:
+    """Return the annualized Sharpe ratio of periodic returns.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+        risk_free_rate: Annual risk-free rate
+        periods_per_year: Number of return periods in a year
+
+    Returns:
+        Sharpe ratio of each ticker
+    """
+    excess = returns - risk_free_rate / periods_per_year
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result: FloatArray = (
+            _nan_mean(excess) / _nan_std(excess) * np.sqrt(periods_per_year)
+        )
+    return result
+
+
+def sortino_ratio(
+    returns: FloatArray,
+    risk_free_rate: float = 0.0,
+    periods_per_year: int = constants.TRADING_DAYS_PER_YEAR,
+) -> FloatArray:
+    """Return the annualized Sortino ratio of periodic returns.
+
+    Like the Sharpe ratio, but only returns below the risk-free rate count
+    as risk.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+        risk_free_rate: Annual risk-free rate
+        periods_per_year: Number of return periods in a year
+
+    Returns:
+        Sortino ratio of each ticker
+    """
+    excess = returns - risk_free_rate / periods_per_year
+    downside = np.sqrt(_nan_mean(np.minimum(excess, 0.0) ** 2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result: FloatArray = _nan_mean(excess) / downside * np.sqrt(periods_per_year)
+    return result
+
+
+def beta(returns: FloatArray, market_returns: FloatArray) -> FloatArray:
+    """Return the beta of each ticker against a market index.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+        market_returns: Simple returns of the index, of shape (periods,)
+
+    Returns:
+        Beta of each ticker, using the periods on which both have data
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    market = np.broadcast_to(
+        np.asarray(market_returns, dtype=np.float64)[:, np.newaxis], returns.shape
+    )
+    both = ~np.isnan(returns) & ~np.isnan(market)
+    count = both.sum(axis=0)
+    x = np.where(both, returns, 0.0)
+    m = np.where(both, market, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = np.where(both, x - x.sum(axis=0) / count, 0.0)
+        m = np.where(both, m - m.sum(axis=0) / count, 0.0)
+        result: FloatArray = (x * m).sum(axis=0) / (m * m).sum(axis=0)
+    return result
+
+
+def covariance_matrix(
+    returns: FloatArray, periods_per_year: int = constants.TRADING_DAYS_PER_YEAR
+) -> FloatArray:
+    """Return the annualized covariance matrix of periodic returns.
+
+    Without missing data this is a single matrix product. Otherwise each
+    pair of tickers uses the periods on which both have data.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+        periods_per_year: Number of return periods in a year
+
+    Returns:
+        Array of shape (tickers, tickers)
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    centered = returns - _nan_mean(returns)
+    valid = ~np.isnan(centered)
+
+    if valid.all():
+        covariance = centered.T @ centered / (len(centered) - 1)
+    else:
+        x, mask = np.where(valid, centered, 0.0), valid.astype(np.float64)
+        pairs = mask.T @ mask
+        sums = x.T @ mask
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = (x.T @ x - sums * sums.T / pairs) / (pairs - 1)
+
+    result: FloatArray = covariance * periods_per_year
+    return result
+
+
+def correlation_matrix(returns: FloatArray) -> FloatArray:
+    """Return the correlation matrix of periodic returns.
+
+    Each pair of tickers uses the periods on which both have data.
+
+    Args:
+        returns: Simple returns of shape (periods, tickers)
+
+    Returns:
+        Array of shape (tickers, tickers) with ones on the diagonal
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    centered = returns - _nan_mean(returns)
+    valid = ~np.isnan(centered)
+
+    if valid.all():
+        covariance = centered.T @ centered
+        scale = np.sqrt(np.diag(covariance))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(scale, scale)
+    else:
+        x, mask = np.where(valid, centered, 0.0), valid.astype(np.float64)
+        pairs = mask.T @ mask
+        sums = x.T @ mask
+        squares = (x * x).T @ mask
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = x.T @ x - sums * sums.T / pairs
+            variance = squares - sums**2 / pairs
+            correlation = covariance / np.sqrt(variance * variance.T)
+
+    result: FloatArray = np.clip(correlation, -1.0, 1.0)
+    np.fill_diagonal(result, 1.0)
+    return result
+
+
+def summarize(
+    prices: panel.PricePanel,
+    benchmark: str = constants.BENCHMARK_TICKER,
+    risk_free_rate: float = 0.0,
+) -> pd.DataFrame:
+    """Compute the per-ticker metrics of a price panel.
+
+    Args:
+        prices: Panel of the tickers to summarize. If it includes the
+            benchmark ticker, beta is computed against it.
+        benchmark: Ticker of the market index for beta
+        risk_free_rate: Annual risk-free rate
+
+    Returns:
+        DataFrame indexed by ticker with one column per metric
+    """
+    close = prices[constants.DataFrameColumns.CLOSE]
+    returns = simple_returns(close)
+
+    metrics = {
+        constants.Metrics.ANNUAL_RETURN: annualized_return(returns),
+        constants.Metrics.VOLATILITY: volatility(returns),
+        constants.Metrics.SHARPE_RATIO: sharpe_ratio(returns, risk_free_rate),
+        constants.Metrics.SORTINO_RATIO: sortino_ratio(returns, risk_free_rate),
+        constants.Metrics.MAX_DRAWDOWN: max_drawdown(close),
+    }
+    if benchmark.upper() in prices.tickers:
+        market = returns[:, prices.tickers.index(benchmark.upper())]
+        metrics[constants.Metrics.BETA] = beta(returns, market)
+
+    return pd.DataFrame(metrics, index=pd.Index(prices.tickers, name="Ticker"))
+
+
+def _nan_mean(values: FloatArray) -> FloatArray:
+    """Return the mean of each column, ignoring NaN, without warnings."""
+    count = np.sum(~np.isnan(values), axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result: FloatArray = np.nansum(values, axis=0) / count
+    return result
+
+
+def _nan_std(values: FloatArray) -> FloatArray:
+    """Return the sample standard deviation of each column, ignoring NaN."""
+    count = np.sum(~np.isnan(values), axis=0)
+    deviations = np.nan_to_num(values - _nan_mean(values))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance = np.sum(deviations**2, axis=0) / (count - 1)
+    result: FloatArray = np.sqrt(np.where(count > 1, variance, np.nan))
+    return result
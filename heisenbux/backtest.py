@@ -0,0 +1,281 @@
+"""Event-driven backtests of rebalancing strategies over aligned price arrays.
+
+Price data is aligned into NumPy arrays once by :func:`prepare_market_data`.
+A backtest then steps through the trading days, marking positions to market
+at each close and rebalancing at the next open when a rebalance event fires
+(on a fixed schedule, or when weights drift too far from their targets).
+The daily loop only works on preallocated arrays. Parameter grids run in
+worker processes that receive the market data once.
+"""
+
+import itertools
+import os
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from heisenbux import analytics, constants, panel
+
+FloatArray = npt.NDArray[np.float64]
+
+# Market data of worker processes, set once when the worker starts
+_WORKER_STATE: dict[str, "MarketData"] = {}
+_MARKET_KEY = "market"
+
+
+@dataclass(frozen=True)
+class MarketData:
+    """Aligned prices the backtests run over.
+
+    Attributes:
+        tickers: Ticker symbols, one per array column
+        dates: Trading days as ``datetime64[D]``
+        open: Opening prices of shape (days, tickers)
+        close: Closing prices of shape (days, tickers)
+    """
+
+    tickers: list[str]
+    dates: npt.NDArray[np.datetime64]
+    open: FloatArray
+    close: FloatArray
+
+
+@dataclass(frozen=True)
+class BacktestParameters:
+    """Settings of one rebalancing strategy backtest.
+
+    Attributes:
+        weights: Target weight of each ticker, in market data order
+        rebalance_every: Trading days between scheduled rebalances, or 0 for
+            none
+        drift_threshold: Largest allowed deviation of any weight from its
+            target before rebalancing, or 0 to rebalance only on schedule
+        cost_bps: Proportional transaction cost in basis points of the value
+            traded
+        fixed_cost: Transaction cost per ticker traded
+        initial_cash: Cash invested on the first day
+    """
+
+    weights: tuple[float, ...]
+    rebalance_every: int = constants.BACKTEST_REBALANCE_DAYS
+    drift_threshold: float = 0.0
+    cost_bps: float = constants.BACKTEST_COST_BPS
+    fixed_cost: float = 0.0
+    initial_cash: float = constants.BACKTEST_INITIAL_CASH
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    """Outcome of one backtest.
+
+    Attributes:
+        parameters: Settings of the backtest
+        values: Portfolio value at each close
+        rebalances: Number of rebalances, including the initial purchase
+        costs: Total transaction costs paid
+        turnover: Total value traded divided by the initial cash
+    """
+
+    parameters: BacktestParameters
+    values: FloatArray
+    rebalances: int
+    costs: float
+    turnover: float
+
+    @property
+    def total_return(self) -> float:
+        """Return over the whole backtest, net of costs."""
+        return float(self.values[-1] / self.parameters.initial_cash - 1)
+
+    @property
+    def annual_return(self) -> float:
+        """Compound annual growth rate."""
+        returns = analytics.simple_returns(self.values)[:, np.newaxis]
+        return float(analytics.annualized_return(returns)[0])
+
+    @property
+    def max_drawdown(self) -> float:
+        """Largest peak-to-trough decline of the portfolio value."""
+        return float(analytics.max_drawdown(self.values[:, np.newaxis])[0])
+
+
+def prepare_market_data(prices: panel.PricePanel) -> MarketData:
+    """Align price data for backtesting.
+
+    Missing closes are carried forward from the previous day, and missing
+    opens fall back to the close. The data starts on the first day on which
+    every ticker has a close.
+
+    Args:
+        prices: Panel of the tickers to trade
+
+    Returns:
+        MarketData ready for :func:`run_backtest`
+
+    Raises:
+        ValueError: If no day has a close for every ticker
+    """
+    close = _forward_fill(np.asarray(prices[constants.DataFrameColumns.CLOSE]))
+    complete = np.flatnonzero(~np.isnan(close).any(axis=1))
+    if not len(complete):
+        raise ValueError("No trading day has prices for every ticker")
+    start = complete[0]
+
+    opens = np.asarray(prices[constants.DataFrameColumns.OPEN])
+    opens = np.where(np.isnan(opens) | (opens <= 0), close, opens)
+    return MarketData(
+        tickers=list(prices.tickers),
+        dates=prices.dates[start:],
+        open=np.ascontiguousarray(opens[start:]),
+        close=np.ascontiguousarray(close[start:]),
+    )
+
+
+def run_backtest(market: MarketData, parameters: BacktestParameters) -> BacktestResult:
+    """Backtest a rebalancing strategy.
+
+    The cash is invested at the first open. Rebalance events are checked
+    after each close and executed at the next open, so no decision uses
+    prices it could not have seen. Costs are paid from cash.
+
+    Args:
+        market: Aligned prices
+        parameters: Strategy settings
+
+    Returns:
+        BacktestResult with the daily portfolio values
+
+    Raises:
+        ValueError: If the weights do not match the tickers
+    """
+    targets = np.asarray(parameters.weights, dtype=np.float64)
+    days, size = market.close.shape
+    if targets.shape != (size,):
+        raise ValueError(f"Got {len(targets)} weights for {size} tickers")
+
+    rate = parameters.cost_bps / 10_000
+    shares = np.zeros(size)
+    target_shares = np.empty(size)
+    trade = np.empty(size)
+    positions = np.empty(size)
+    values = np.empty(days)
+    cash = parameters.initial_cash
+    costs = traded = 0.0
+    rebalances = since_rebalance = 0
+    pending = True
+
+    for day in range(days):
+        if pending:
+            prices = market.open[day]
+            total = cash + np.dot(shares, prices)
+            np.multiply(targets, total, out=target_shares)
+            np.divide(target_shares, prices, out=target_shares)
+            np.subtract(target_shares, shares, out=trade)
+            np.abs(trade, out=trade)
+            value_traded = float(np.dot(trade, prices))
+            cost = value_traded * rate + parameters.fixed_cost * np.count_nonzero(trade)
+            shares, target_shares = target_shares, shares
+            cash = total - float(np.dot(shares, prices)) - cost
+            costs += cost
+            traded += value_traded
+            rebalances += 1
+            since_rebalance = 0
+            pending = False
+
+        np.multiply(shares, market.close[day], out=positions)
+        value = cash + positions.sum()
+        values[day] = value
+        since_rebalance += 1
+
+        if parameters.rebalance_every and since_rebalance >= parameters.rebalance_every:
+            pending = True
+        elif parameters.drift_threshold > 0:
+            np.divide(positions, value, out=positions)
+            np.subtract(positions, targets, out=positions)
+            np.abs(positions, out=positions)
+            pending = bool(positions.max() > parameters.drift_threshold)
+
+    return BacktestResult(
+        parameters=parameters,
+        values=values,
+        rebalances=rebalances,
+        costs=costs,
+        turnover=traded / parameters.initial_cash,
+    )
+
+
+def parameter_grid(**options: Sequence[Any]) -> list[BacktestParameters]:
+    """Build every combination of backtest settings.
+
+    Args:
+        **options: Candidate values of :class:`BacktestParameters` fields,
+            e.g. ``weights=[(0.6, 0.4), (0.8, 0.2)], rebalance_every=[21, 63]``.
+            Fields not given keep their defaults.
+
+    Returns:
+        Parameters of each combination
+
+    Raises:
+        ValueError: If an option is not a backtest setting
+    """
+    names = {field.name for field in fields(BacktestParameters)}
+    unknown = set(options) - names
+    if unknown:
+        raise ValueError(f"Unknown backtest settings: {', '.join(sorted(unknown))}")
+    keys = list(options)
+    return [
+        BacktestParameters(**dict(zip(keys, values, strict=True)))
+        for values in itertools.product(*options.values())
+    ]
+
+
+def run_grid(
+    market: MarketData,
+    grid: list[BacktestParameters],
+    max_workers: int | None = None,
+) -> list[BacktestResult]:
+    """Run many backtests over the same market data in parallel.
+
+    Each worker process receives the market data once, when it starts, and
+    then only the parameters of the backtests it runs.
+
+    Args:
+        market: Aligned prices
+        grid: Settings of each backtest
+        max_workers: Maximum number of worker processes, or None for one per
+            CPU. With a single worker, backtests run in this process.
+
+    Returns:
+        BacktestResult for each entry of ``grid``, in order
+    """
+    workers = min(max_workers or os.cpu_count() or 1, len(grid))
+    if workers <= 1:
+        return [run_backtest(market, parameters) for parameters in grid]
+
+    chunksize = max(1, len(grid) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(market,)
+    ) as pool:
+        return list(pool.map(_run_in_worker, grid, chunksize=chunksize))
+
+
+def _init_worker(market: MarketData) -> None:
+    """Keep the market data of a worker process for all of its backtests."""
+    _WORKER_STATE[_MARKET_KEY] = market
+
+
+def _run_in_worker(parameters: BacktestParameters) -> BacktestResult:
+    """Run a backtest over the worker's market data."""
+    return run_backtest(_WORKER_STATE[_MARKET_KEY], parameters)
+
+
+def _forward_fill(values: FloatArray) -> FloatArray:
+    """Carry the last non-NaN value of each column forward."""
+    rows = np.where(np.isnan(values), 0, np.arange(len(values))[:, np.newaxis])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    filled: FloatArray = values[rows, np.arange(values.shape[1])]
+    return filled
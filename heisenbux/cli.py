@@ -1,11 +1,129 @@
-"""Command line interface for Heisenbux."""
+"""Command line interface for Heisenbux.
+
+``heisenbux TICKER`` fetches and plots a single ticker. The batch
+subcommands ``fetch``, ``plot`` and ``analyze`` take many tickers and/or a
+watchlist file. Each runs in one process, so price data is loaded once and
+shared through the in-memory ticker cache, and downloads and plots run in
+parallel. They finish with a per-ticker summary and a timing table.
+
+``heisenbux serve`` keeps that state resident in a local query server, and
+``heisenbux query`` is its thin client.
+
+The CLI runs thousands of times from cron and scripts, so this module only
+imports click at load time. pandas, yfinance and matplotlib are imported by
+the code paths that need them; ``--help``, usage errors and runs without
+plotting never load matplotlib.
+"""
+
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TypeVar
 
 import click
 
-from heisenbux import constants, finance, plot
+from heisenbux import constants
+
+if TYPE_CHECKING:
+    import cProfile
+
+    import pandas as pd
+
+    from heisenbux import plot
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_TICKER_COLUMN = "Ticker"
+_STAGE_COLUMN = "Stage"
+_SECONDS_COLUMN = "Seconds"
+_TOTAL_STAGE = "total"
+
+
+class DefaultCommandGroup(click.Group):
+    """Command group that runs a default command when none is named.
+
+    If the first argument that is not an option is not a subcommand, the
+    arguments go to the default command, so ``heisenbux AAPL`` is
+    ``heisenbux ticker AAPL``. Leading options of the group itself, such as
+    ``--profile``, stay with the group.
+    """
+
+    def __init__(self, *args: Any, default_command: str, **kwargs: Any) -> None:
+        """Create the group.
+
+        Args:
+            *args: Positional arguments of :class:`click.Group`
+            default_command: Name of the command to run by default
+            **kwargs: Keyword arguments of :class:`click.Group`
+        """
+        super().__init__(*args, **kwargs)
+        self.default_command = default_command
+
+    def parse_args(self, ctx: click.Context, args: list[str]) -> list[str]:
+        """Route arguments without a subcommand to the default command."""
+        takes_value = {
+            name: not param.is_flag
+            for param in self.params
+            if isinstance(param, click.Option)
+            for name in param.opts
+        }
+        position = 0
+        while position < len(args) and args[position] in takes_value:
+            position += 2 if takes_value[args[position]] else 1
+        rest = args[position:]
+
+        first = next((arg for arg in rest if not arg.startswith("-")), None)
+        wants_help = any(arg in ctx.help_option_names for arg in rest)
+        if first not in self.commands and not (first is None and wants_help):
+            args = [*args[:position], self.default_command, *rest]
+        return super().parse_args(ctx, args)
 
 
-@click.command()
+@click.group(
+    cls=DefaultCommandGroup,
+    default_command=constants.CLICommands.TICKER,
+)
+@click.option(
+    constants.CLIOptions.PROFILE,
+    is_flag=True,
+    default=False,
+    help="Print per-stage timings and cProfile stats to stderr",
+)
+@click.option(
+    constants.CLIOptions.PROFILE_FORMAT,
+    type=click.Choice([str(fmt) for fmt in constants.ProfileFormats]),
+    default=constants.ProfileFormats.JSON.value,
+    help="Format of the per-stage timings (default: json)",
+)
+@click.option(
+    constants.CLIOptions.VERBOSE,
+    is_flag=True,
+    default=False,
+    help="Log the cache and download steps of every ticker to stderr",
+)
+@click.pass_context
+def main(ctx: click.Context, profile: bool, profile_format: str, verbose: bool) -> None:
+    """Fetch, plot and analyze stock price data.
+
+    Run "heisenbux TICKER" for one ticker, or a subcommand for many.
+    """
+    if verbose:
+        logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if not profile:
+        return
+    import cProfile
+
+    from heisenbux import instrument
+
+    instrument.enable()
+    profiler = cProfile.Profile()
+    ctx.call_on_close(lambda: _echo_profile(profiler, profile_format))
+    profiler.enable()
+
+
+@main.command(constants.CLICommands.TICKER)
 @click.argument("ticker")
 @click.option(
     f"{constants.CLIOptions.SHOW_PLOT}/{constants.CLIOptions.NO_SHOW_PLOT}",
@@ -17,20 +135,407 @@ from heisenbux import constants, finance, plot
     default=False,
     help="Force download new data even if cached (default: False)",
 )
-def main(ticker: str, show_plot: bool, force_download: bool) -> None:
-    """Fetch daily price data for a stock ticker and save it to a CSV file.
+@click.option(
+    f"{constants.CLIOptions.UPDATE}/{constants.CLIOptions.NO_UPDATE}",
+    default=False,
+    help="Fetch only the bars missing from cached data (default: False)",
+)
+@click.option(
+    f"{constants.CLIOptions.EXPORT_CSV}/{constants.CLIOptions.NO_EXPORT_CSV}",
+    default=False,
+    help="Also export the data to a CSV file in the cache (default: False)",
+)
+@click.option(
+    f"{constants.CLIOptions.FORCE_PLOT}/{constants.CLIOptions.NO_FORCE_PLOT}",
+    default=False,
+    help="Re-render the plot even if its data is unchanged (default: False)",
+)
+def ticker_command(  # noqa: PLR0913
+    ticker: str,
+    show_plot: bool,
+    force_download: bool,
+    update: bool,
+    export_csv: bool,
+    force_plot: bool,
+) -> None:
+    """Fetch daily price data for a stock ticker and save it to the cache.
 
     Args:
         ticker: The stock ticker symbol (e.g., AAPL, GOOGL)
     """
+    from heisenbux import finance
+
     try:
-        df = finance.get_ticker_data(ticker, force_download)
+        df = finance.get_ticker_data(ticker, force_download, update=update)
     except ValueError as e:
         click.echo(f"Error: {e}", err=True)
         raise click.Abort() from e
 
+    if export_csv:
+        from heisenbux import storage
+
+        csv_file = storage.export_csv(df, ticker)
+        click.echo(f"Data exported to {csv_file}")
+
     if show_plot:
-        plot.save_plot(df, ticker)
+        from heisenbux import plot
+
+        plot.save_plot(df, ticker, force=force_plot)
+
+
+def _batch_arguments(command: F) -> F:
+    """Add the ticker arguments and watchlist option of batch commands."""
+    command = click.option(
+        constants.CLIOptions.WATCHLIST,
+        type=click.Path(exists=True, dir_okay=False),
+        help="File of tickers, one per line; '#' starts a comment",
+    )(command)
+    return click.argument("tickers", nargs=-1)(command)
+
+
+@main.command(constants.CLICommands.FETCH)
+@_batch_arguments
+@click.option(
+    f"{constants.CLIOptions.FORCE_DOWNLOAD}/{constants.CLIOptions.NO_FORCE_DOWNLOAD}",
+    default=False,
+    help="Force download new data even if cached (default: False)",
+)
+@click.option(
+    f"{constants.CLIOptions.UPDATE}/{constants.CLIOptions.NO_UPDATE}",
+    default=False,
+    help="Fetch only the bars missing from cached data (default: False)",
+)
+def fetch(
+    tickers: tuple[str, ...],
+    watchlist: str | None,
+    force_download: bool,
+    update: bool,
+) -> None:
+    """Fetch price data for many tickers into the cache."""
+    symbols = collect_tickers(tickers, watchlist)
+    timings: dict[str, float] = {}
+    seconds: dict[str, float] = {}
+    with _timed(timings, constants.CLICommands.FETCH):
+        frames = _load_frames(symbols, force_download, update, seconds)
+
+    summary = _data_summary(symbols, frames)
+    summary[_SECONDS_COLUMN] = [seconds.get(ticker, float("nan")) for ticker in symbols]
+    _echo_table(summary)
+    _echo_timings(timings)
+
+
+@main.command(constants.CLICommands.PLOT)
+@_batch_arguments
+@click.option(
+    f"{constants.CLIOptions.FORCE_PLOT}/{constants.CLIOptions.NO_FORCE_PLOT}",
+    default=False,
+    help="Re-render plots even if their data is unchanged (default: False)",
+)
+@click.option(
+    constants.CLIOptions.WORKERS,
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of plotting processes (default: one per CPU)",
+)
+def plot_command(
+    tickers: tuple[str, ...],
+    watchlist: str | None,
+    force_plot: bool,
+    workers: int | None,
+) -> None:
+    """Render price plots for many tickers in parallel."""
+    from heisenbux import plot
+
+    symbols = collect_tickers(tickers, watchlist)
+    timings: dict[str, float] = {}
+    with _timed(timings, constants.CLICommands.FETCH):
+        frames = _load_frames(symbols)
+    with _timed(timings, constants.CLICommands.PLOT):
+        results = plot.render_plots(frames, max_workers=workers, force=force_plot)
+
+    summary = _data_summary(symbols, frames)
+    rendered = {result.ticker: result for result in results}
+    summary["Plot"] = [
+        str(rendered[ticker].path) if ticker in rendered else "" for ticker in symbols
+    ]
+    summary[_SECONDS_COLUMN] = [
+        rendered[ticker].seconds if ticker in rendered else float("nan")
+        for ticker in symbols
+    ]
+    summary["Status"] = [_plot_status(rendered.get(ticker)) for ticker in symbols]
+    _echo_table(summary)
+    _echo_timings(timings)
+
+
+@main.command(constants.CLICommands.ANALYZE)
+@_batch_arguments
+@click.option(
+    constants.CLIOptions.BENCHMARK,
+    default=None,
+    help=f"Ticker to compute beta against (e.g. {constants.BENCHMARK_TICKER})",
+)
+@click.option(
+    constants.CLIOptions.RISK_FREE_RATE,
+    type=float,
+    default=0.0,
+    help="Annual risk-free rate for Sharpe and Sortino ratios (default: 0)",
+)
+def analyze(
+    tickers: tuple[str, ...],
+    watchlist: str | None,
+    benchmark: str | None,
+    risk_free_rate: float,
+) -> None:
+    """Compute return and risk metrics for many tickers."""
+    from heisenbux import analytics, panel
+
+    symbols = collect_tickers(tickers, watchlist)
+    if benchmark and benchmark.upper() not in symbols:
+        symbols.append(benchmark.upper())
+    timings: dict[str, float] = {}
+    with _timed(timings, constants.CLICommands.FETCH):
+        frames = _load_frames(symbols)
+    if not frames:
+        raise click.ClickException("No price data for any of the tickers")
+    with _timed(timings, constants.CLICommands.ANALYZE):
+        metrics = analytics.summarize(
+            panel.build_panel(frames),
+            benchmark=benchmark or constants.BENCHMARK_TICKER,
+            risk_free_rate=risk_free_rate,
+        )
+
+    _echo_table(metrics)
+    _echo_timings(timings)
+
+
+def _server_options(command: F) -> F:
+    """Add the host and port options of the query server commands."""
+    command = click.option(
+        constants.CLIOptions.PORT,
+        type=int,
+        default=constants.SERVER_PORT,
+        help=f"Query server port (default: {constants.SERVER_PORT})",
+    )(command)
+    return click.option(
+        constants.CLIOptions.HOST,
+        default=constants.SERVER_HOST,
+        help=f"Query server address (default: {constants.SERVER_HOST})",
+    )(command)
+
+
+@main.command(constants.CLICommands.SERVE)
+@_server_options
+@click.option(
+    constants.CLIOptions.PORTFOLIO,
+    type=click.Path(dir_okay=False),
+    default=constants.PORTFOLIO_FILE,
+    help=f"Portfolio configuration (default: {constants.PORTFOLIO_FILE})",
+)
+def serve(host: str, port: int, portfolio: str) -> None:
+    """Keep price data resident and answer queries on localhost."""
+    from heisenbux import server
+
+    httpd = server.make_server(server.QueryService(portfolio), host, port)
+    click.echo(f"Serving queries on http://{host}:{port}")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+@main.command(constants.CLICommands.QUERY)
+@click.argument("method")
+@click.argument("tickers", nargs=-1)
+@click.option(
+    constants.CLIOptions.PARAMS,
+    default=None,
+    help="Query parameters as a JSON object",
+)
+@_server_options
+def query_command(
+    method: str, tickers: tuple[str, ...], params: str | None, host: str, port: int
+) -> None:
+    """Send a query to a running server and print the JSON answer.
+
+    METHOD is one of the server's query methods, or "-" to read a batch of
+    queries as a JSON list from standard input.
+    """
+    import json
+
+    from heisenbux import server
+
+    try:
+        if method == "-":
+            requests = json.loads(click.get_text_stream("stdin").read())
+        else:
+            arguments = json.loads(params) if params else {}
+            if tickers:
+                arguments["tickers"] = list(tickers)
+            requests = [{"method": method, "params": arguments}]
+    except ValueError as e:
+        raise click.UsageError(f"Invalid JSON: {e}") from e
+
+    try:
+        results = server.query(requests, host, port)
+    except OSError as e:
+        raise click.ClickException(f"No query server at {host}:{port}: {e}") from e
+    answer = results if method == "-" else results[0]
+    click.echo(json.dumps(answer, indent=2))
+    if any(server.is_error(result) for result in results):
+        raise SystemExit(constants.EXIT_ERROR)
+
+
+def read_watchlist(path: Path) -> list[str]:
+    """Read ticker symbols from a watchlist file.
+
+    Tickers may be separated by whitespace or commas; text after '#' on a
+    line is ignored.
+
+    Args:
+        path: Watchlist file
+
+    Returns:
+        Ticker symbols in file order
+    """
+    symbols = []
+    for line in path.read_text().splitlines():
+        content = line.split(constants.WATCHLIST_COMMENT, 1)[0]
+        symbols.extend(content.replace(",", " ").split())
+    return symbols
+
+
+def collect_tickers(tickers: tuple[str, ...], watchlist: str | None) -> list[str]:
+    """Combine command-line tickers and a watchlist into unique symbols.
+
+    Args:
+        tickers: Tickers given as arguments
+        watchlist: Watchlist file, or None
+
+    Returns:
+        Upper-case ticker symbols in the order first given
+
+    Raises:
+        click.UsageError: If no tickers were given
+    """
+    symbols = list(tickers) + (read_watchlist(Path(watchlist)) if watchlist else [])
+    unique = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+    if not unique:
+        raise click.UsageError("Give at least one ticker or a watchlist")
+    return unique
+
+
+def _load_frames(
+    symbols: list[str],
+    force_download: bool = False,
+    update: bool = False,
+    seconds: dict[str, float] | None = None,
+) -> "dict[str, pd.DataFrame]":
+    """Load price data for many tickers, in parallel where it downloads.
+
+    If ``seconds`` is given, it receives the time spent on each ticker.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from heisenbux import finance
+
+    if seconds is None:
+        seconds = {}
+    if not update:
+        return finance.get_many_tickers_data(
+            symbols, force_download=force_download, timings=seconds
+        )
+
+    def load(ticker: str) -> "pd.DataFrame | None":
+        start = time.perf_counter()
+        try:
+            return finance.get_ticker_data(ticker, force_download, update=True)
+        except ValueError as e:
+            click.echo(f"Error: {e}", err=True)
+            return None
+        finally:
+            seconds[ticker] = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=constants.DOWNLOAD_MAX_WORKERS) as pool:
+        loaded = dict(zip(symbols, pool.map(load, symbols), strict=True))
+    return {ticker: df for ticker, df in loaded.items() if df is not None}
+
+
+def _data_summary(
+    symbols: list[str], frames: "dict[str, pd.DataFrame]"
+) -> "pd.DataFrame":
+    """Summarize the price data loaded for each ticker."""
+    import pandas as pd
+
+    rows = []
+    for ticker in symbols:
+        df = frames.get(ticker)
+        if df is None or df.empty:
+            rows.append((0, "", "", float("nan")))
+            continue
+        rows.append(
+            (
+                len(df),
+                str(df.index[0].date()),
+                str(df.index[-1].date()),
+                float(df[constants.DataFrameColumns.CLOSE].iloc[-1]),
+            )
+        )
+    return pd.DataFrame(
+        rows,
+        columns=["Rows", "First", "Last", "Close"],
+        index=pd.Index(symbols, name=_TICKER_COLUMN),
+    )
+
+
+def _plot_status(result: "plot.RenderResult | None") -> str:
+    """Describe what happened to a ticker's plot."""
+    if result is None:
+        return "no data"
+    return "unchanged" if result.skipped else "rendered"
+
+
+@contextmanager
+def _timed(timings: dict[str, float], stage: str) -> Iterator[None]:
+    """Record the wall-clock time of a stage."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = time.perf_counter() - start
+
+
+def _echo_table(df: "pd.DataFrame") -> None:
+    """Print a table with compact float formatting."""
+    click.echo(df.to_string(float_format="{:.4f}".format))
+
+
+def _echo_profile(profiler: "cProfile.Profile", profile_format: str) -> None:
+    """Stop profiling and print the stage timings and cProfile stats to stderr."""
+    from heisenbux import instrument
+
+    profiler.disable()
+    if profile_format == constants.ProfileFormats.PROMETHEUS:
+        click.echo(instrument.to_prometheus(), err=True, nl=False)
+    else:
+        click.echo(instrument.to_json(), err=True)
+    click.echo(instrument.format_profile(profiler), err=True)
+    instrument.disable()
+    instrument.reset()
+
+
+def _echo_timings(timings: dict[str, float]) -> None:
+    """Print the time spent in each stage and in total."""
+    import pandas as pd
+
+    stages = {**timings, _TOTAL_STAGE: sum(timings.values())}
+    table = pd.DataFrame(
+        {_SECONDS_COLUMN: list(stages.values())},
+        index=pd.Index(list(stages), name=_STAGE_COLUMN),
+    )
+    click.echo()
+    click.echo(table.to_string(float_format="{:.3f}".format))
 
 
 if __name__ == "__main__":
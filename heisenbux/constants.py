@@ -1,5 +1,6 @@
 """Constants used throughout the heisenbux package."""
 
+from datetime import time
 from enum import StrEnum
 
 
@@ -8,12 +9,18 @@ class Directories(StrEnum):
 
     CACHE = "cache"
     GRAPHS = "graphs"
+    PANEL = "cache/panel"
+    PORTFOLIO_CACHE = "cache/portfolio"
+    INTRADAY = "cache/intraday"
+    RAW = "cache/raw"
 
 
 class FileExtensions(StrEnum):
     """File extensions used in the application."""
 
     CSV = ".csv"
+    NPY = ".npy"
+    NPZ = ".npz"
     PNG = ".png"
 
 
@@ -26,20 +33,293 @@ class DataFrameColumns(StrEnum):
     LOW = "Low"
     VOLUME = "Volume"
     DATE = "Date"
+    DIVIDENDS = "Dividends"
+    STOCK_SPLITS = "Stock Splits"
+    CAPITAL_GAINS = "Capital Gains"
+    ADJ_CLOSE = "Adj Close"
+
+
+class BarIntervals(StrEnum):
+    """Price bar intervals, as named by the data provider."""
+
+    MINUTE = "1m"
+    FIVE_MINUTES = "5m"
+    FIFTEEN_MINUTES = "15m"
+    THIRTY_MINUTES = "30m"
+    HOUR = "1h"
+    DAY = "1d"
 
 
 class CLIOptions(StrEnum):
     """Command-line interface options."""
 
     NO_SHOW_PLOT = "--no-show-plot"
+    NO_EXPORT_CSV = "--no-export-csv"
     NO_FORCE_DOWNLOAD = "--no-force-download"
+    NO_FORCE_PLOT = "--no-force-plot"
+    NO_UPDATE = "--no-update"
     SHOW_PLOT = "--show-plot"
+    EXPORT_CSV = "--export-csv"
     FORCE_DOWNLOAD = "--force-download"
+    FORCE_PLOT = "--force-plot"
+    UPDATE = "--update"
+    WATCHLIST = "--watchlist"
+    WORKERS = "--workers"
+    BENCHMARK = "--benchmark"
+    RISK_FREE_RATE = "--risk-free-rate"
+    HOST = "--host"
+    PORT = "--port"
+    PORTFOLIO = "--portfolio"
+    PARAMS = "--params"
+    PROFILE = "--profile"
+    PROFILE_FORMAT = "--profile-format"
+    VERBOSE = "--verbose"
+
+
+class CLICommands(StrEnum):
+    """Names of command-line subcommands."""
+
+    TICKER = "ticker"
+    FETCH = "fetch"
+    PLOT = "plot"
+    ANALYZE = "analyze"
+    SERVE = "serve"
+    QUERY = "query"
+
+
+class Stages(StrEnum):
+    """Instrumented stages of fetching, caching and plotting."""
+
+    CACHE_LOOKUP = "cache_lookup"
+    NETWORK_FETCH = "network_fetch"
+    PARSE = "parse"
+    MERGE = "merge"
+    CACHE_WRITE = "cache_write"
+    RENDER = "render"
+    SAVEFIG = "savefig"
+
+
+class Counters(StrEnum):
+    """Instrumented event counters."""
+
+    MEMORY_CACHE_HITS = "memory_cache_hits"
+    DISK_CACHE_HITS = "disk_cache_hits"
+    CACHE_MISSES = "cache_misses"
+    PLOTS_SKIPPED = "plots_skipped"
+
+
+class ProfileFormats(StrEnum):
+    """Output formats of the recorded stage timings."""
+
+    JSON = "json"
+    PROMETHEUS = "prometheus"
+
+
+class QueryMethods(StrEnum):
+    """Methods answered by the query server."""
+
+    PRICES = "prices"
+    METRICS = "metrics"
+    PORTFOLIO_VALUE = "portfolio_value"
+    REBALANCE = "rebalance"
+    RELOAD = "reload"
+
+
+class Metrics(StrEnum):
+    """Names of per-ticker portfolio metrics."""
+
+    ANNUAL_RETURN = "Annual Return"
+    VOLATILITY = "Volatility"
+    SHARPE_RATIO = "Sharpe Ratio"
+    SORTINO_RATIO = "Sortino Ratio"
+    MAX_DRAWDOWN = "Max Drawdown"
+    BETA = "Beta"
+
+
+class CovarianceEstimators(StrEnum):
+    """Covariance estimators for portfolio optimization."""
+
+    SAMPLE = "sample"
+    LEDOIT_WOLF = "ledoit-wolf"
+
+
+class SimulationModels(StrEnum):
+    """Return models for Monte Carlo simulation."""
+
+    CHOLESKY = "cholesky"
+    BOOTSTRAP = "bootstrap"
+
+
+class PortfolioKeys(StrEnum):
+    """Keys of the portfolio configuration file."""
+
+    PORTFOLIO = "portfolio"
+    NAME = "name"
+    CURRENCY = "currency"
+    ACCOUNTS = "accounts"
+    TYPE = "type"
+    HOLDINGS = "holdings"
+    TICKER = "ticker"
+    SHARES = "shares"
+    COST_BASIS = "cost_basis"
+    PURCHASE_DATE = "purchase_date"
+    TRANSACTIONS = "transactions"
+    DATE = "date"
+    ACCOUNT = "account"
+    PRICE = "price"
+    FEES = "fees"
+    REBALANCING_PREFERENCES = "rebalancing_preferences"
+    TARGET_ALLOCATION = "target_allocation"
+    RISK_TOLERANCE = "risk_tolerance"
+    REBALANCE_THRESHOLD = "rebalance_threshold"
+
+
+class TransactionTypes(StrEnum):
+    """Types of portfolio transactions."""
+
+    BUY = "buy"
+    SELL = "sell"
+    REINVEST = "reinvest"
+
+
+class AccountTypes(StrEnum):
+    """Tax treatment of portfolio accounts."""
+
+    TAXABLE = "taxable"
+    TRADITIONAL_IRA = "traditional_ira"
+    ROTH_IRA = "roth_ira"
+
+
+class LotMethods(StrEnum):
+    """Orders in which sales consume open tax lots."""
+
+    FIFO = "fifo"
+    HIFO = "hifo"
 
 
 # Default values
 DEFAULT_DAYS_LOOKBACK = 365
 
+# Days of already cached bars to re-fetch on an incremental update, so that
+# recent bars revised by the provider are refreshed
+INCREMENTAL_OVERLAP_DAYS = 5
+
+# Cache storage format and the version of its column schema
+CACHE_FORMAT = FileExtensions.NPZ
+CACHE_SCHEMA_VERSION = 1
+
+# Cross-process locks of per-ticker cache files, kept under the cache directory
+LOCKS_DIRECTORY = ".locks"
+LOCK_SUFFIX = ".lock"
+CACHE_LOCK_TIMEOUT_SECONDS = 300.0
+CACHE_LOCK_POLL_SECONDS = 0.05
+
+# Index of the per-ticker cache files, kept in the cache directory
+MANIFEST_FILE = "manifest.sqlite3"
+MANIFEST_SCHEMA_VERSION = 1
+MANIFEST_TIMEOUT_SECONDS = 30.0
+
+# In-process cache of ticker data
+MEMORY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+MEMORY_CACHE_MARKET_TTL_SECONDS = 60
+
+# US equity market trading hours
+MARKET_TIMEZONE = "America/New_York"
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+SATURDAY = 5
+
+# Async provider access limits
+PROVIDER_HOST = "query2.finance.yahoo.com"
+PROVIDER_MAX_CONCURRENCY = 4
+PROVIDER_RATE_PER_SECOND = 2.0
+PROVIDER_BURST = 5
+PROVIDER_TIMEOUT_SECONDS = 30.0
+PROVIDER_MAX_ATTEMPTS = 4
+PROVIDER_BACKOFF_BASE_SECONDS = 0.5
+PROVIDER_BACKOFF_MAX_SECONDS = 30.0
+
+# Intraday bars, stored at the base interval and resampled on read
+INTRADAY_BASE_INTERVAL = BarIntervals.MINUTE
+INTRADAY_DEFAULT_DAYS = 7
+# Longest span in days the provider serves per request at an interval
+INTRADAY_REQUEST_DAYS = {BarIntervals.MINUTE: 7}
+INTERVAL_SECONDS = {
+    BarIntervals.MINUTE: 60,
+    BarIntervals.FIVE_MINUTES: 5 * 60,
+    BarIntervals.FIFTEEN_MINUTES: 15 * 60,
+    BarIntervals.THIRTY_MINUTES: 30 * 60,
+    BarIntervals.HOUR: 60 * 60,
+    BarIntervals.DAY: 24 * 60 * 60,
+}
+
+# Corporate actions kept next to the raw (unadjusted) bars of a ticker
+ACTIONS_SUFFIX = ".actions"
+
+# Files of the consolidated price panel store: the index of each version,
+# the pointer to the current version and the lock held by writers
+PANEL_INDEX_FILE = "index.json"
+PANEL_POINTER_FILE = "current"
+PANEL_LOCK_FILE = ".lock"
+
+# Batched downloads
+DOWNLOAD_BATCH_SIZE = 100
+DOWNLOAD_MAX_WORKERS = 8
+
+# Portfolio analytics
+TRADING_DAYS_PER_YEAR = 252
+BENCHMARK_TICKER = "^GSPC"
+
+# Efficient frontier optimization
+FRONTIER_POINTS = 100
+OPTIMIZER_TOLERANCE = 1e-9
+OPTIMIZER_MAX_ITERATIONS = 10_000
+
+# Monte Carlo simulation
+SIMULATION_PATHS = 1_000_000
+SIMULATION_CHUNK_PATHS = 50_000
+SIMULATION_BINS = 2048
+SIMULATION_QUANTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+# Portfolio configuration and its parsed cache
+PORTFOLIO_FILE = "portfolio.yaml"
+PORTFOLIO_CACHE_VERSION = 1
+DEFAULT_CURRENCY = "USD"
+
+# Transaction ledger
+LEDGER_FILE = "ledger.sqlite3"
+LEDGER_SCHEMA_VERSION = 1
+LEDGER_SHARE_TOLERANCE = 1e-9
+
+# Tax-aware rebalancing
+WASH_SALE_DAYS = 30
+LONG_TERM_HOLDING_DAYS = 365
+SHORT_TERM_TAX_RATE = 0.35
+LONG_TERM_TAX_RATE = 0.15
+WEIGHT_SUM_TOLERANCE = 1e-6
+
+# Backtesting
+BACKTEST_INITIAL_CASH = 10_000.0
+BACKTEST_REBALANCE_DAYS = 21
+BACKTEST_COST_BPS = 5.0
+
+# Incremental metrics kept next to the price cache
+STREAMING_MOVING_AVERAGE_WINDOW = 50
+STREAMING_VOLATILITY_WINDOW = 21
+STREAMING_EWMA_SPAN = 20
+STREAMING_STATE_VERSION = 2
+METRICS_STATE_SUFFIX = ".metrics.json"
+
+# Local query server
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8765
+SERVER_QUERY_PATH = "/query"
+SERVER_TIMEOUT_SECONDS = 30.0
+
+# Instrumentation output
+METRICS_PREFIX = "heisenbux"
+PROFILE_STATS_LIMIT = 25
+
 # Plot configuration
 FIGURE_SIZE = (12, 6)
 X_AXIS_ROTATION = 45
@@ -47,6 +327,7 @@ CLOSING_PRICE_LABEL = "Closing Price"
 PRICE_USD_LABEL = "Price (USD)"
 CLOSING_PRICES_TITLE_SUFFIX = " Closing Prices (Last Year)"
 PLOT_SUFFIX = "_plot.png"
+PLOT_MANIFEST_FILE = "plot_manifest.json"
 
 # Derived constants
 ALL_PRICE_COLUMNS = [
@@ -59,6 +340,7 @@ ALL_PRICE_COLUMNS = [
 
 # CLI commands and options
 POETRY_RUN_HEISENBUX = ["poetry", "run", "heisenbux"]
+WATCHLIST_COMMENT = "#"
 
 # Exit codes
 EXIT_ERROR = 1
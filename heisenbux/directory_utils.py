@@ -1,5 +1,9 @@
 """Utility functions for heisenbux package."""
 
+import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
 
@@ -30,3 +34,50 @@ def build_file_path(directory: Path | str, ticker: str, suffix: str) -> Path:
     """
     dir_path = Path(directory) if isinstance(directory, str) else directory
     return dir_path / f"{ticker.upper()}{suffix}"
+
+
+@contextmanager
+def atomic_path(target: Path) -> Iterator[Path]:
+    """Yield a temporary sibling path that atomically replaces the target.
+
+    The caller writes the complete file to the yielded path. On success it is
+    flushed to disk and renamed over ``target`` in a single step, so readers
+    never observe a partially written file, even after a crash. On error the
+    temporary file is removed and ``target`` is left untouched.
+
+    Args:
+        target: Final path of the file being written
+
+    Yields:
+        Temporary path in the same directory as ``target``
+    """
+    tmp_path = target.with_name(
+        f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+    )
+    try:
+        yield tmp_path
+        _fsync(tmp_path)
+        os.replace(tmp_path, target)
+        _fsync_directory(target.parent)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _fsync(path: Path) -> None:
+    """Flush the contents of a written file to disk."""
+    fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(directory: Path) -> None:
+    """Flush a rename in a directory to disk where the platform allows it."""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
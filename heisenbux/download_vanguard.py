@@ -1,53 +1,23 @@
 """Script to download data for popular Vanguard funds."""
 
-import sys
-
-import click
-
-from heisenbux import cli, constants
-
-
-def _run_heisenbux_for_ticker(
-    ticker: str, show_plot: bool = True, force_download: bool = False
-) -> None:
-    """Run heisenbux for a specific ticker.
-
-    Args:
-        ticker: Stock ticker symbol
-        show_plot: Whether to show the plot
-        force_download: Whether to force download
-    """
-    # Save original argv
-    original_argv = sys.argv
-    try:
-        # Set up argv for click
-        args = [sys.argv[0], ticker]
-        if not show_plot:
-            args.append(constants.CLIOptions.NO_SHOW_PLOT)
-        if force_download:
-            args.append(constants.CLIOptions.FORCE_DOWNLOAD)
-
-        sys.argv = args
-        cli.main(standalone_mode=False)
-    except (SystemExit, click.Abort):
-        pass  # Click raises SystemExit on success or Abort on error
-    finally:
-        # Restore original argv
-        sys.argv = original_argv
+from heisenbux import finance, plot
 
 
 def download_funds(funds: list[str]) -> None:
-    """Download data for a list of Vanguard funds."""
-    for fund in funds:
-        print(f"\nDownloading data for {fund}...")
-        _run_heisenbux_for_ticker(fund, show_plot=False, force_download=False)
+    """Download data for a list of Vanguard funds in batched requests."""
+    print(f"\nDownloading data for {', '.join(funds)}...")
+    finance.get_many_tickers_data(funds, force_download=False)
 
 
 def generate_plots(funds: list[str]) -> None:
-    """Generate plots for a list of Vanguard funds."""
-    for fund in funds:
-        print(f"\nGenerating plot for {fund}...")
-        _run_heisenbux_for_ticker(fund, show_plot=True, force_download=False)
+    """Generate plots for a list of Vanguard funds in parallel."""
+    print(f"\nGenerating plots for {', '.join(funds)}...")
+    frames = finance.get_many_tickers_data(funds, force_download=False)
+    for result in plot.render_plots(frames):
+        if result.skipped:
+            print(f"Plot up to date: {result.path}")
+        else:
+            print(f"Plot saved to {result.path} in {result.seconds:.2f}s")
 
 
 if __name__ == "__main__":
@@ -1,19 +1,45 @@
 """Wrapper around yfinance with caching support"""
 
-from datetime import datetime, timedelta
+import logging
+import time
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from pathlib import Path
 
 import pandas as pd
-import yfinance as yf
 
-from heisenbux import constants, directory_utils
+from heisenbux import (
+    adjustments,
+    constants,
+    directory_utils,
+    instrument,
+    locks,
+    manifest,
+    memory_cache,
+    panel,
+    providers,
+    storage,
+)
 
+logger = logging.getLogger(__name__)
 
-def get_ticker_data(ticker: str, force_download: bool = False) -> pd.DataFrame:
+# Process-wide cache of loaded ticker data, keyed by ticker and date range
+ticker_cache = memory_cache.TickerDataCache()
+
+
+def get_ticker_data(
+    ticker: str, force_download: bool = False, update: bool = False
+) -> pd.DataFrame:
     """Fetch ticker data from yfinance with caching support.
 
+    Data already loaded by this process is served from :data:`ticker_cache`
+    until it goes stale, without touching the disk or network.
+
     Args:
         ticker: Stock ticker symbol (e.g., 'AAPL', 'GOOGL')
         force_download: If True, download fresh data even if cached data exists
+        update: If True, top up cached data with only the bars missing since
+            the last cached date instead of re-downloading the full history
 
     Returns:
         DataFrame with stock data
@@ -22,32 +48,463 @@ def get_ticker_data(ticker: str, force_download: bool = False) -> pd.DataFrame:
         ValueError: If no data found for the ticker
         Exception: If there's an error fetching data
     """
+    start_date, end_date = _default_date_range()
+    key = _memory_cache_key(ticker, start_date, end_date)
+    if not force_download and not update:
+        with instrument.timer(constants.Stages.CACHE_LOOKUP):
+            cached = ticker_cache.get(key)
+        if cached is not None:
+            instrument.count(constants.Counters.MEMORY_CACHE_HITS)
+            return cached
+
     # Create output directories if they don't exist
     cache_dir = directory_utils.ensure_directory_exists(constants.Directories.CACHE)
 
     # Check for cached data
-    cache_file = directory_utils.build_file_path(
-        cache_dir, ticker, constants.FileExtensions.CSV
+    with instrument.timer(constants.Stages.CACHE_LOOKUP):
+        cache_file = _find_cache_file(cache_dir, ticker)
+
+    # Only one process at a time downloads a ticker; others wait for the lock
+    # and read what it wrote. Plain cache hits need no lock.
+    writes = cache_file is None or force_download or update
+    lock = locks.ticker_lock(cache_dir, ticker) if writes else nullcontext(False)
+    with lock as refreshed:
+        if refreshed:
+            force_download = update = False
+        if writes:
+            cache_file = _find_cache_file(cache_dir, ticker)
+        df = _load_or_download(
+            ticker, cache_dir, cache_file, start_date, end_date, force_download, update
+        )
+
+    ticker_cache.put(key, df)
+    return df
+
+
+def get_many_tickers_data(
+    tickers: list[str],
+    force_download: bool = False,
+    batch_size: int = constants.DOWNLOAD_BATCH_SIZE,
+    max_workers: int = constants.DOWNLOAD_MAX_WORKERS,
+    timings: dict[str, float] | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Fetch data for many tickers, downloading cache misses in batches.
+
+    Tickers in :data:`ticker_cache` are served from memory and other cached
+    tickers are read from disk. The remaining tickers are grouped into
+    multi-symbol provider requests of up to ``batch_size`` symbols, each
+    fetched by a pool of at most ``max_workers`` threads. Tickers for which
+    the provider returns no data are reported and left out of the result.
+
+    Args:
+        tickers: Stock ticker symbols
+        force_download: If True, download fresh data even if cached data exists
+        batch_size: Maximum number of symbols per provider request
+        max_workers: Maximum number of concurrent downloads within a batch
+        timings: If given, receives the seconds spent on each ticker; every
+            ticker of a batch is charged the whole batch request
+
+    Returns:
+        Mapping of ticker to its DataFrame, in the order of ``tickers``
+    """
+    if timings is None:
+        timings = {}
+    cache_dir = directory_utils.ensure_directory_exists(constants.Directories.CACHE)
+    start_date, end_date = _default_date_range()
+    frames, misses = _load_cached_tickers(
+        tickers, cache_dir, start_date, end_date, force_download, timings
     )
 
-    if cache_file.exists() and not force_download:
-        print(f"Using cached data from {cache_file}")
-        df = pd.read_csv(cache_file, index_col=0, parse_dates=True)
-    else:
-        # Calculate date range
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=constants.DEFAULT_DAYS_LOOKBACK)
+    if misses:
+        logger.info("Fetching data for %d tickers...", len(misses))
+    for i in range(0, len(misses), batch_size):
+        batch = misses[i : i + batch_size]
+        start = time.perf_counter()
+        with instrument.timer(constants.Stages.NETWORK_FETCH):
+            downloaded = _download_batch(batch, start_date, end_date, max_workers)
+        request_seconds = time.perf_counter() - start
+        for ticker in batch:
+            start = time.perf_counter()
+            df = downloaded.get(ticker)
+            if df is None or df.empty:
+                logger.warning("No data found for ticker %s", ticker)
+            else:
+                frames[ticker] = _store_downloaded(
+                    df, cache_dir, ticker, start_date, end_date
+                )
+            timings[ticker] = request_seconds + time.perf_counter() - start
+
+    return {ticker: frames[ticker] for ticker in tickers if ticker in frames}
+
+
+async def get_many_tickers_data_async(
+    tickers: list[str],
+    force_download: bool = False,
+    provider: providers.AsyncProvider | None = None,
+) -> dict[str, pd.DataFrame]:
+    """Fetch data for many tickers, downloading cache misses concurrently.
+
+    Like :func:`get_many_tickers_data`, but cache misses are fetched one
+    ticker per request through an :class:`~heisenbux.providers.AsyncProvider`,
+    which bounds concurrency and request rate and retries transient failures.
+    Tickers that still fail are reported and left out of the result.
+
+    Args:
+        tickers: Stock ticker symbols
+        force_download: If True, download fresh data even if cached data exists
+        provider: Provider client to fetch with, or None for a new yfinance one
+
+    Returns:
+        Mapping of ticker to its DataFrame, in the order of ``tickers``
+    """
+    cache_dir = directory_utils.ensure_directory_exists(constants.Directories.CACHE)
+    start_date, end_date = _default_date_range()
+    frames, misses = _load_cached_tickers(
+        tickers, cache_dir, start_date, end_date, force_download, {}
+    )
+
+    if misses:
+        logger.info("Fetching data for %d tickers...", len(misses))
+        provider = provider or providers.AsyncProvider()
+        with instrument.timer(constants.Stages.NETWORK_FETCH):
+            result = await provider.history_many(misses, start_date, end_date)
+        for ticker, error in result.errors.items():
+            logger.warning("Failed to fetch %s: %s", ticker, error)
+        for ticker, df in result.frames.items():
+            frames[ticker] = _store_downloaded(
+                df, cache_dir, ticker, start_date, end_date
+            )
+
+    return {ticker: frames[ticker] for ticker in tickers if ticker in frames}
 
-        # Fetch data
-        print(f"Fetching data for {ticker}...")
-        stock = yf.Ticker(ticker)
-        df = stock.history(start=start_date, end=end_date)
 
-        if df.empty:
+def _load_or_download(  # noqa: PLR0913
+    ticker: str,
+    cache_dir: Path,
+    cache_file: Path | None,
+    start_date: datetime,
+    end_date: datetime,
+    force_download: bool,
+    update: bool,
+) -> pd.DataFrame:
+    """Read a ticker's cache file, topping it up or downloading it if needed.
+
+    Args:
+        ticker: Stock ticker symbol
+        cache_dir: Cache directory
+        cache_file: Existing cache file of the ticker, or None
+        start_date: Start of the lookback window
+        end_date: End of the lookback window
+        force_download: If True, download even if the ticker is cached
+        update: If True, top up the cached data with the missing bars
+
+    Returns:
+        DataFrame with stock data
+
+    Raises:
+        ValueError: If no data found for the ticker
+    """
+    if cache_file is not None and not force_download:
+        instrument.count(constants.Counters.DISK_CACHE_HITS)
+        logger.info("Using cached data from %s", cache_file)
+        with instrument.timer(constants.Stages.PARSE):
+            df = storage.read_prices(cache_file)
+        if update:
+            df = _update_cached_data(ticker, df, cache_file)
+    else:
+        instrument.count(constants.Counters.CACHE_MISSES)
+        # Fetch raw bars, so later updates never re-download this history
+        logger.info("Fetching data for %s...", ticker)
+        with instrument.timer(constants.Stages.NETWORK_FETCH):
+            fresh = adjustments.download_raw(ticker, start_date, end_date)
+
+        if fresh.empty:
             raise ValueError(f"No data found for ticker {ticker}")
+        adjustments.write_raw(fresh, ticker)
+        df = adjustments.get_adjusted_data(ticker)
+
+        # Save to cache directory
+        cache_file = _write_cache(df, cache_dir, ticker)
+        logger.info("Data saved to %s", cache_file)
+
+    return df
+
+
+def _load_cached_tickers(  # noqa: PLR0913
+    tickers: list[str],
+    cache_dir: Path,
+    start_date: datetime,
+    end_date: datetime,
+    force_download: bool,
+    timings: dict[str, float],
+) -> tuple[dict[str, pd.DataFrame], list[str]]:
+    """Load the cached tickers and list the ones that must be downloaded.
+
+    Args:
+        tickers: Stock ticker symbols
+        cache_dir: Cache directory
+        start_date: Start of the lookback window
+        end_date: End of the lookback window
+        force_download: If True, treat every ticker as a cache miss
+        timings: Receives the seconds spent loading each cached ticker
+
+    Returns:
+        Tuple of (DataFrame of each cached ticker, tickers to download)
+    """
+    frames: dict[str, pd.DataFrame] = {}
+    misses: list[str] = []
+    for ticker in dict.fromkeys(tickers):
+        if force_download:
+            misses.append(ticker)
+            continue
+        start = time.perf_counter()
+        key = _memory_cache_key(ticker, start_date, end_date)
+        with instrument.timer(constants.Stages.CACHE_LOOKUP):
+            cached = ticker_cache.get(key)
+        if cached is not None:
+            instrument.count(constants.Counters.MEMORY_CACHE_HITS)
+            frames[ticker] = cached
+            timings[ticker] = time.perf_counter() - start
+            continue
+        with instrument.timer(constants.Stages.CACHE_LOOKUP):
+            cache_file = _find_cache_file(cache_dir, ticker)
+        if cache_file is not None:
+            instrument.count(constants.Counters.DISK_CACHE_HITS)
+            with instrument.timer(constants.Stages.PARSE):
+                frames[ticker] = storage.read_prices(cache_file)
+            ticker_cache.put(key, frames[ticker])
+            timings[ticker] = time.perf_counter() - start
+        else:
+            instrument.count(constants.Counters.CACHE_MISSES)
+            misses.append(ticker)
+    return frames, misses
+
+
+def _store_downloaded(
+    df: pd.DataFrame,
+    cache_dir: Path,
+    ticker: str,
+    start_date: datetime,
+    end_date: datetime,
+) -> pd.DataFrame:
+    """Save downloaded data to the disk and memory caches.
+
+    The write holds the ticker's cross-process lock, so it never interleaves
+    with another process refreshing the same ticker.
+
+    Args:
+        df: Downloaded price data
+        cache_dir: Cache directory
+        ticker: Stock ticker symbol
+        start_date: Start of the lookback window
+        end_date: End of the lookback window
+
+    Returns:
+        The saved DataFrame
+    """
+    with locks.ticker_lock(cache_dir, ticker):
+        _write_cache(df, cache_dir, ticker)
+    ticker_cache.put(_memory_cache_key(ticker, start_date, end_date), df)
+    return df
+
+
+def load_panel(
+    tickers: list[str],
+    start: date | str | None = None,
+    end: date | str | None = None,
+) -> panel.PricePanel:
+    """Load aligned prices for many tickers from the consolidated store.
+
+    The returned arrays are read-only views into memory-mapped files, so no
+    per-ticker file is opened. If the store does not cover every requested
+    ticker, or the cache manifest records a write to one of its tickers since
+    the store was built, it is rebuilt first with :func:`update_panel`.
 
-        # Save to CSV in cache directory
-        df.to_csv(cache_file)
-        print(f"Data saved to {cache_file}")
+    Args:
+        tickers: Stock ticker symbols
+        start: First trading day to include, or None for the earliest
+        end: Last trading day to include, or None for the latest
+
+    Returns:
+        PricePanel of shape (trading days, tickers) per price column
+
+    Raises:
+        KeyError: If no data could be found for some of the tickers
+    """
+    requested = {ticker.upper() for ticker in tickers}
+    try:
+        store = panel.open_panel(Path(constants.Directories.PANEL))
+    except FileNotFoundError:
+        store = update_panel(sorted(requested))
+    if not requested <= set(store.tickers) or _panel_is_stale(store):
+        store = update_panel(sorted(requested | set(store.tickers)))
+    return store.select(tickers, start, end)
+
+
+def _panel_is_stale(store: panel.PricePanel) -> bool:
+    """Check whether a ticker of a stored panel was written after the build.
+
+    Args:
+        store: Panel opened from the consolidated store
+
+    Returns:
+        True if the panel predates a cache write of one of its tickers
+    """
+    if store.built_at is None:
+        return True
+    with manifest.Manifest(constants.Directories.CACHE) as index:
+        return bool(index.refreshed_since(store.built_at, store.tickers))
+
+
+def update_panel(tickers: list[str]) -> panel.PricePanel:
+    """Rebuild the consolidated price store from the per-ticker caches.
+
+    Call this after refreshing the per-ticker caches so that
+    :func:`load_panel` sees the new bars.
+
+    Args:
+        tickers: Stock ticker symbols to include in the store
+
+    Returns:
+        Memory-mapped PricePanel of the rebuilt store
+    """
+    directory = Path(constants.Directories.PANEL)
+    directory_utils.ensure_directory_exists(directory.parent)
+    panel.write_panel(panel.build_panel(get_many_tickers_data(tickers)), directory)
+    return panel.open_panel(directory)
+
+
+def _download_batch(
+    tickers: list[str], start_date: datetime, end_date: datetime, max_workers: int
+) -> dict[str, pd.DataFrame]:
+    """Download history for several tickers in one provider request.
+
+    Args:
+        tickers: Stock ticker symbols
+        start_date: First date to fetch
+        end_date: Date to fetch up to
+        max_workers: Maximum number of concurrent downloads
+
+    Returns:
+        Mapping of ticker to its DataFrame, empty for unknown tickers
+    """
+    import yfinance as yf
+
+    data = yf.download(
+        tickers,
+        start=start_date,
+        end=end_date,
+        actions=True,
+        threads=max_workers,
+        ignore_tz=False,
+        group_by="ticker",
+        progress=False,
+    )
+    if data is None or data.empty:
+        return {}
+    if not isinstance(data.columns, pd.MultiIndex):
+        return {tickers[0]: data}
+
+    available = set(data.columns.get_level_values(0))
+    frames: dict[str, pd.DataFrame] = {}
+    for ticker in tickers:
+        if ticker in available:
+            df = data[ticker].dropna(how="all")
+            df.columns.name = None
+            frames[ticker] = df
+    return frames
+
+
+def _default_date_range() -> tuple[datetime, datetime]:
+    """Return the start and end of the default lookback window.
 
+    Returns:
+        Tuple of (start_date, end_date)
+    """
+    end_date = datetime.now()
+    return end_date - timedelta(days=constants.DEFAULT_DAYS_LOOKBACK), end_date
+
+
+def _memory_cache_key(
+    ticker: str, start_date: datetime, end_date: datetime
+) -> tuple[str, date, date]:
+    """Return the in-memory cache key of a ticker over a date range."""
+    return ticker.upper(), start_date.date(), end_date.date()
+
+
+def _update_cached_data(
+    ticker: str, cached: pd.DataFrame, cache_file: Path
+) -> pd.DataFrame:
+    """Fetch the bars missing from cached data and rewrite the cache.
+
+    Bars are fetched unadjusted into the raw store of
+    :mod:`~heisenbux.adjustments`, starting a few days before its last bar.
+    A new dividend or split in them only changes the adjustment factors, so
+    the cache is rewritten from the raw store without downloading the
+    earlier bars again. A ticker without raw bars yet (cached by an older
+    version or by a batch download) has its cached range downloaded once.
+
+    Args:
+        ticker: Stock ticker symbol
+        cached: DataFrame read from the cache file
+        cache_file: Path of the cache file to rewrite
+
+    Returns:
+        Adjusted DataFrame, or ``cached`` unchanged if nothing new was fetched
+    """
+    start_date = adjustments.update_start(ticker)
+    if start_date is None:
+        first_date = pd.Timestamp(cached.index.min())
+        start_date = datetime.combine(first_date.date(), datetime.min.time())
+
+    with instrument.timer(constants.Stages.NETWORK_FETCH):
+        fresh = adjustments.download_raw(ticker, start_date, datetime.now())
+
+    if fresh.empty:
+        logger.info("No new data for %s", ticker)
+        return cached
+
+    with instrument.timer(constants.Stages.MERGE):
+        adjustments.write_raw(fresh, ticker)
+        df = adjustments.get_adjusted_data(ticker)
+    _write_cache(df, cache_file.parent, ticker)
+    logger.info("Added %d new rows to %s", len(df) - len(cached), cache_file)
     return df
+
+
+def _find_cache_file(cache_dir: Path, ticker: str) -> Path | None:
+    """Locate a ticker's cache file, indexing a migrated legacy CSV.
+
+    Args:
+        cache_dir: Cache directory
+        ticker: Stock ticker symbol
+
+    Returns:
+        Path of the cache file, or None if the ticker is not cached
+    """
+    return storage.find_cache_file(
+        cache_dir, ticker, lambda df, path: _write_cache(df, path.parent, ticker)
+    )
+
+
+def _write_cache(df: pd.DataFrame, cache_dir: Path, ticker: str) -> Path:
+    """Atomically write price data to the ticker's cache file.
+
+    The ticker's entry in the cache manifest is updated after the write.
+
+    Args:
+        df: Price data to save
+        cache_dir: Cache directory
+        ticker: Stock ticker symbol
+
+    Returns:
+        Path of the written cache file
+    """
+    cache_file = directory_utils.build_file_path(
+        cache_dir, ticker, constants.CACHE_FORMAT
+    )
+    with instrument.timer(constants.Stages.CACHE_WRITE):
+        storage.write_prices(df, cache_file)
+        with manifest.Manifest(cache_dir) as index:
+            index.record(ticker, df)
+    return cache_file
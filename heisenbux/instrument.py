@@ -0,0 +1,214 @@
+"""Timers and counters around the hot paths of fetching, caching and plotting.
+
+Library code wraps each stage in :func:`timer` and bumps :func:`count` for
+events such as cache hits. Recording is off by default, and a disabled timer
+takes no clock readings and no lock, so normal runs pay next to nothing.
+:func:`enable` turns recording on for the process, for example from the
+CLI's ``--profile`` flag; :func:`snapshot` then returns per-stage totals
+that :func:`to_json` and :func:`to_prometheus` render for logs and scrapers.
+
+Stages nest: the time of an inner stage is also counted in its outer stage.
+Worker processes keep their own recorders, so stages run in process pools
+are only seen through the stages that wrap the pool.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from heisenbux import constants
+
+_STAGES_KEY = "stages"
+_COUNTERS_KEY = "counters"
+
+
+@dataclass
+class StageStats:
+    """Accumulated timings of one stage.
+
+    Attributes:
+        calls: Number of completed calls
+        total_seconds: Wall-clock seconds summed over all calls
+        max_seconds: Longest single call
+    """
+
+    calls: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class Recorder:
+    """Thread-safe store of stage timings and event counters."""
+
+    def __init__(self) -> None:
+        """Create an empty, disabled recorder."""
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._stages: dict[str, StageStats] = {}
+        self._counters: dict[str, int] = {}
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as one call of a stage.
+
+        Args:
+            stage: Stage name
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(stage, time.perf_counter() - start)
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        """Add to an event counter.
+
+        Args:
+            counter: Counter name
+            amount: Amount to add
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a copy of all stage timings and counters."""
+        with self._lock:
+            return {
+                _STAGES_KEY: {
+                    stage: asdict(stats) for stage, stats in self._stages.items()
+                },
+                _COUNTERS_KEY: dict(self._counters),
+            }
+
+    def reset(self) -> None:
+        """Drop all recorded timings and counters."""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+    def _record(self, stage: str, seconds: float) -> None:
+        """Add one call of a stage."""
+        with self._lock:
+            stats = self._stages.setdefault(stage, StageStats())
+            stats.calls += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+
+
+# Process-wide recorder used by the module-level helpers
+recorder = Recorder()
+
+
+def enable() -> None:
+    """Start recording timings and counters in this process."""
+    recorder.enabled = True
+
+
+def disable() -> None:
+    """Stop recording; already recorded values are kept."""
+    recorder.enabled = False
+
+
+def timer(stage: str) -> AbstractContextManager[None]:
+    """Time the enclosed block as one call of a stage of the process recorder.
+
+    Args:
+        stage: Stage name, usually a :class:`~heisenbux.constants.Stages`
+
+    Returns:
+        Context manager timing the block
+    """
+    return recorder.timer(stage)
+
+
+def count(counter: str, amount: int = 1) -> None:
+    """Add to an event counter of the process recorder.
+
+    Args:
+        counter: Counter name, usually a :class:`~heisenbux.constants.Counters`
+        amount: Amount to add
+    """
+    recorder.count(counter, amount)
+
+
+def snapshot() -> dict[str, Any]:
+    """Return the stage timings and counters of the process recorder."""
+    return recorder.snapshot()
+
+
+def reset() -> None:
+    """Drop everything recorded by the process recorder."""
+    recorder.reset()
+
+
+def to_json(data: dict[str, Any] | None = None) -> str:
+    """Render recorded timings and counters as JSON.
+
+    Args:
+        data: Snapshot to render, or None for the current one
+
+    Returns:
+        JSON text
+    """
+    return json.dumps(data or snapshot(), indent=2, sort_keys=True)
+
+
+def to_prometheus(data: dict[str, Any] | None = None) -> str:
+    """Render recorded timings and counters in the Prometheus text format.
+
+    Stages become call count, total seconds and longest call series with a
+    ``stage`` label; counters become one counter per event.
+
+    Args:
+        data: Snapshot to render, or None for the current one
+
+    Returns:
+        Text in the Prometheus exposition format
+    """
+    data = data or snapshot()
+    prefix = constants.METRICS_PREFIX
+    lines = [
+        f"# TYPE {prefix}_stage_calls_total counter",
+        f"# TYPE {prefix}_stage_seconds_total counter",
+        f"# TYPE {prefix}_stage_max_seconds gauge",
+    ]
+    for stage, stats in sorted(data[_STAGES_KEY].items()):
+        label = f'{{stage="{stage}"}}'
+        lines.append(f"{prefix}_stage_calls_total{label} {stats['calls']}")
+        lines.append(f"{prefix}_stage_seconds_total{label} {stats['total_seconds']}")
+        lines.append(f"{prefix}_stage_max_seconds{label} {stats['max_seconds']}")
+    for counter, value in sorted(data[_COUNTERS_KEY].items()):
+        lines.append(f"# TYPE {prefix}_{counter}_total counter")
+        lines.append(f"{prefix}_{counter}_total {value}")
+    return "\n".join(lines) + "\n"
+
+
+def format_profile(
+    profiler: cProfile.Profile, limit: int = constants.PROFILE_STATS_LIMIT
+) -> str:
+    """Format the statistics of a stopped profiler.
+
+    Args:
+        profiler: Profiler that has been disabled
+        limit: Number of functions to list, by cumulative time
+
+    Returns:
+        Statistics table sorted by cumulative time
+    """
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats(
+        pstats.SortKey.CUMULATIVE
+    ).print_stats(limit)
+    return out.getvalue()
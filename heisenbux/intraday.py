@@ -0,0 +1,419 @@
+"""Intraday price bars in a compact, day-partitioned store.
+
+Intraday history is hundreds of times larger than daily history, so it is
+not kept in the per-ticker daily cache. Bars are stored at one base
+interval (1 minute by default) under ``cache/intraday/<TICKER>/<interval>/``
+with one uncompressed ``.npz`` file per trading day, holding int64 epoch
+nanosecond timestamps (UTC), float32 prices and int64 volumes. Reading a
+date range opens only the files of those days.
+
+Coarser intervals are not downloaded separately: :func:`resample` builds
+them from the base bars with a few vectorized reductions. Buckets start at
+the market open, so hourly bars cover 9:30-10:30, 10:30-11:30 and so on,
+and daily bars cover the whole session.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from heisenbux import constants, directory_utils
+
+logger = logging.getLogger(__name__)
+
+Columns = constants.DataFrameColumns
+IntArray = npt.NDArray[np.int64]
+Float32Array = npt.NDArray[np.float32]
+
+_TIMESTAMP_KEY = "timestamp"
+_EMPTY_TIMES: IntArray = np.array([], dtype=np.int64)
+_EMPTY_PRICES: Float32Array = np.array([], dtype=np.float32)
+_PRICE_COLUMNS = (Columns.OPEN, Columns.HIGH, Columns.LOW, Columns.CLOSE)
+_NANOSECONDS_PER_SECOND = 1_000_000_000
+_MARKET_OPEN_NS = (
+    constants.MARKET_OPEN.hour * 3600 + constants.MARKET_OPEN.minute * 60
+) * _NANOSECONDS_PER_SECOND
+
+
+@dataclass(frozen=True)
+class Bars:
+    """Price bars of one ticker as parallel arrays, sorted by time.
+
+    Attributes:
+        timestamp: Start of each bar in nanoseconds since the epoch (UTC)
+        open: Opening price of each bar
+        high: Highest price of each bar
+        low: Lowest price of each bar
+        close: Closing price of each bar
+        volume: Shares traded in each bar
+    """
+
+    timestamp: IntArray
+    open: Float32Array
+    high: Float32Array
+    low: Float32Array
+    close: Float32Array
+    volume: IntArray
+
+    def __len__(self) -> int:
+        """Return the number of bars."""
+        return len(self.timestamp)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the bars as a DataFrame indexed by market-time timestamps."""
+        index = pd.DatetimeIndex(
+            self.timestamp.view("datetime64[ns]"), tz="UTC", name=Columns.DATE
+        ).tz_convert(constants.MARKET_TIMEZONE)
+        return pd.DataFrame(
+            {
+                Columns.OPEN: self.open.astype(np.float64),
+                Columns.HIGH: self.high.astype(np.float64),
+                Columns.LOW: self.low.astype(np.float64),
+                Columns.CLOSE: self.close.astype(np.float64),
+                Columns.VOLUME: self.volume,
+            },
+            index=index,
+        )
+
+
+_EMPTY = Bars(
+    _EMPTY_TIMES,
+    _EMPTY_PRICES,
+    _EMPTY_PRICES,
+    _EMPTY_PRICES,
+    _EMPTY_PRICES,
+    _EMPTY_TIMES,
+)
+
+
+def interval_nanoseconds(interval: str) -> int:
+    """Return the length of a bar interval.
+
+    Args:
+        interval: Bar interval (e.g. '5m', '1h', '1d')
+
+    Returns:
+        Interval length in nanoseconds; a day is one 24-hour bucket
+
+    Raises:
+        ValueError: If the interval is not supported
+    """
+    try:
+        seconds = constants.INTERVAL_SECONDS[constants.BarIntervals(interval)]
+    except ValueError as e:
+        raise ValueError(f"Unsupported bar interval {interval!r}") from e
+    return seconds * _NANOSECONDS_PER_SECOND
+
+
+def from_frame(df: pd.DataFrame) -> Bars:
+    """Convert provider price data to compact bars.
+
+    Args:
+        df: Price data indexed by timezone-aware or UTC timestamps
+
+    Returns:
+        Bars sorted by time
+    """
+    index = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True))
+    timestamp = index.tz_convert(None).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    order = np.argsort(timestamp, kind="stable")
+    return Bars(
+        timestamp=timestamp[order],
+        **{
+            column.lower(): df[column].to_numpy(dtype=np.float32)[order]
+            for column in _PRICE_COLUMNS
+        },
+        volume=df[Columns.VOLUME].fillna(0).to_numpy(dtype=np.int64)[order],
+    )
+
+
+def concat(parts: list[Bars]) -> Bars:
+    """Join bars, keeping the last of any bars with the same timestamp.
+
+    Args:
+        parts: Bars in increasing order of priority
+
+    Returns:
+        Bars sorted by time, without duplicate timestamps
+    """
+    if not parts:
+        return _EMPTY
+    timestamp = np.concatenate([part.timestamp for part in parts])
+    # Reverse, so np.unique picks the last occurrence of each timestamp
+    reverse = slice(None, None, -1)
+    _, first = np.unique(timestamp[reverse], return_index=True)
+    keep = len(timestamp) - 1 - first
+
+    def join(name: str) -> Any:
+        return np.concatenate([getattr(part, name) for part in parts])[keep]
+
+    return Bars(
+        timestamp=timestamp[keep],
+        open=join("open"),
+        high=join("high"),
+        low=join("low"),
+        close=join("close"),
+        volume=join("volume"),
+    )
+
+
+def resample(bars: Bars, interval: str) -> Bars:
+    """Aggregate bars into a coarser interval.
+
+    Buckets are aligned to the market open in market time. Each output bar
+    takes the first open, highest high, lowest low, last close and total
+    volume of the bars in its bucket, and starts at the bucket start.
+
+    Args:
+        bars: Bars at a finer interval, sorted by time
+        interval: Target bar interval
+
+    Returns:
+        One bar per non-empty bucket
+    """
+    if not len(bars):
+        return bars
+    width = interval_nanoseconds(interval)
+    wall = _market_wall_clock(bars.timestamp)
+    bucket = (wall - _MARKET_OPEN_NS) // width
+    starts = np.flatnonzero(np.diff(bucket, prepend=bucket[0] - 1))
+    ends = np.append(starts[1:], len(bucket)) - 1
+    bucket_start = bucket[starts] * width + _MARKET_OPEN_NS
+    return Bars(
+        timestamp=bars.timestamp[starts] - (wall[starts] - bucket_start),
+        open=bars.open[starts],
+        high=np.maximum.reduceat(bars.high, starts),
+        low=np.minimum.reduceat(bars.low, starts),
+        close=bars.close[ends],
+        volume=np.add.reduceat(bars.volume, starts),
+    )
+
+
+def write_bars(
+    bars: Bars,
+    ticker: str,
+    interval: str = constants.INTRADAY_BASE_INTERVAL,
+    root: Path | str = constants.Directories.INTRADAY,
+) -> list[Path]:
+    """Save bars into the day partitions of a ticker, merging existing days.
+
+    Bars already stored for the same timestamps are replaced.
+
+    Args:
+        bars: Bars to save
+        ticker: Stock ticker symbol
+        interval: Interval of the bars
+        root: Root directory of the intraday store
+
+    Returns:
+        Paths of the partitions written
+    """
+    directory = directory_utils.ensure_directory_exists(
+        _partition_directory(root, ticker, interval)
+    )
+    days = _market_days(bars.timestamp)
+    boundaries = np.flatnonzero(np.diff(days, prepend=days[:1] - 1))
+    written = []
+    for start, end in zip(
+        boundaries, np.append(boundaries[1:], len(days)), strict=True
+    ):
+        part = _slice(bars, slice(start, end))
+        path = directory / _partition_name(days[start])
+        if path.exists():
+            part = concat([_read_partition(path), part])
+        _write_partition(part, path)
+        written.append(path)
+    return written
+
+
+def read_bars(
+    ticker: str,
+    interval: str = constants.INTRADAY_BASE_INTERVAL,
+    start: date | str | None = None,
+    end: date | str | None = None,
+    root: Path | str = constants.Directories.INTRADAY,
+) -> Bars:
+    """Load the bars of a ticker over an inclusive range of trading days.
+
+    Args:
+        ticker: Stock ticker symbol
+        interval: Stored interval to read
+        start: First trading day, or None for the earliest stored
+        end: Last trading day, or None for the latest stored
+        root: Root directory of the intraday store
+
+    Returns:
+        Bars sorted by time; empty if no day in the range is stored
+    """
+    paths = stored_days(ticker, interval, root)
+    first = "" if start is None else _partition_name(_to_day(start))
+    last = "~" if end is None else _partition_name(_to_day(end))
+    parts = [_read_partition(path) for path in paths if first <= path.name <= last]
+    return concat(parts)
+
+
+def stored_days(
+    ticker: str,
+    interval: str = constants.INTRADAY_BASE_INTERVAL,
+    root: Path | str = constants.Directories.INTRADAY,
+) -> list[Path]:
+    """List the day partitions stored for a ticker, oldest first.
+
+    Args:
+        ticker: Stock ticker symbol
+        interval: Stored interval
+        root: Root directory of the intraday store
+
+    Returns:
+        Partition paths sorted by day
+    """
+    directory = _partition_directory(root, ticker, interval)
+    return sorted(directory.glob(f"*{constants.FileExtensions.NPZ}"))
+
+
+def get_intraday_data(
+    ticker: str,
+    interval: str = constants.INTRADAY_BASE_INTERVAL,
+    days: int = constants.INTRADAY_DEFAULT_DAYS,
+    update: bool = False,
+    base_interval: str = constants.INTRADAY_BASE_INTERVAL,
+) -> pd.DataFrame:
+    """Fetch intraday bars at any interval, downloading only the base interval.
+
+    Bars are downloaded at ``base_interval`` when the store has none for
+    the lookback window, or with ``update``, from the last stored day on.
+    Other intervals are resampled from the stored base bars.
+
+    Args:
+        ticker: Stock ticker symbol
+        interval: Interval of the returned bars; a multiple of the base
+        days: Calendar days of history to return
+        update: If True, download the bars since the last stored day
+        base_interval: Interval that is downloaded and stored
+
+    Returns:
+        DataFrame of bars indexed by their start time in market time
+
+    Raises:
+        ValueError: If the interval is not a multiple of the base interval,
+            or no data is found for the ticker
+    """
+    if interval_nanoseconds(interval) % interval_nanoseconds(base_interval):
+        raise ValueError(f"{interval} bars cannot be built from {base_interval} bars")
+
+    end = date.today()
+    start = end - timedelta(days=days)
+    stored = read_bars(ticker, base_interval, start, end)
+    if update or not len(stored):
+        fetch_from = start
+        if len(stored):
+            fetch_from = _market_days(stored.timestamp[-1:])[0].item()
+        _download(ticker, base_interval, fetch_from, end)
+        stored = read_bars(ticker, base_interval, start, end)
+    if not len(stored):
+        raise ValueError(f"No intraday data found for ticker {ticker}")
+
+    if interval == base_interval:
+        return stored.to_frame()
+    return resample(stored, interval).to_frame()
+
+
+def _download(ticker: str, interval: str, start: date, end: date) -> None:
+    """Download bars from the provider into the store.
+
+    The range is split into requests no longer than the provider serves at
+    the interval (7 days of 1 minute bars).
+    """
+    logger.info("Fetching %s bars for %s since %s...", interval, ticker, start)
+    import yfinance as yf
+
+    stock = yf.Ticker(ticker)
+    stop = end + timedelta(days=1)
+    limit = constants.INTRADAY_REQUEST_DAYS.get(constants.BarIntervals(interval))
+    step = timedelta(days=limit) if limit else stop - start
+    found = False
+    while start < stop:
+        until = min(start + step, stop)
+        df = stock.history(
+            interval=interval,
+            start=datetime.combine(start, datetime.min.time()),
+            end=datetime.combine(until, datetime.min.time()),
+        )
+        if not df.empty:
+            write_bars(from_frame(df), ticker, interval)
+            found = True
+        start = until
+    if not found:
+        logger.info("No new intraday data for %s", ticker)
+
+
+def _market_wall_clock(timestamp: IntArray) -> IntArray:
+    """Return epoch timestamps as nanoseconds of market-time wall clock."""
+    index = pd.DatetimeIndex(timestamp.view("datetime64[ns]"), tz="UTC")
+    wall = index.tz_convert(constants.MARKET_TIMEZONE).tz_localize(None)
+    return wall.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _market_days(timestamp: IntArray) -> npt.NDArray[np.datetime64]:
+    """Return the market-time trading day of each epoch timestamp."""
+    return _market_wall_clock(timestamp).view("datetime64[ns]").astype("datetime64[D]")
+
+
+def _to_day(day: date | str) -> np.datetime64:
+    """Convert a date or date string to ``datetime64[D]``."""
+    return np.datetime64(pd.Timestamp(day).date(), "D")
+
+
+def _partition_directory(root: Path | str, ticker: str, interval: str) -> Path:
+    """Return the directory holding a ticker's partitions at one interval."""
+    return Path(root) / ticker.upper() / interval
+
+
+def _partition_name(day: np.datetime64) -> str:
+    """Return the file name of a day's partition."""
+    return f"{day}{constants.FileExtensions.NPZ}"
+
+
+def _slice(bars: Bars, rows: slice) -> Bars:
+    """Return a range of bars."""
+    return Bars(
+        timestamp=bars.timestamp[rows],
+        open=bars.open[rows],
+        high=bars.high[rows],
+        low=bars.low[rows],
+        close=bars.close[rows],
+        volume=bars.volume[rows],
+    )
+
+
+def _read_partition(path: Path) -> Bars:
+    """Read one day partition."""
+    with np.load(path, allow_pickle=False) as archive:
+        return Bars(
+            timestamp=archive[_TIMESTAMP_KEY],
+            **{column.lower(): archive[column] for column in _PRICE_COLUMNS},
+            volume=archive[Columns.VOLUME],
+        )
+
+
+def _write_partition(bars: Bars, path: Path) -> None:
+    """Atomically write one day partition."""
+    with directory_utils.atomic_path(path) as tmp_path, tmp_path.open("wb") as f:
+        np.savez(
+            f,
+            allow_pickle=False,
+            **{
+                _TIMESTAMP_KEY: bars.timestamp.astype(np.int64),
+                Columns.VOLUME: bars.volume.astype(np.int64),
+            },
+            **{
+                column: getattr(bars, column.lower()).astype(np.float32)
+                for column in _PRICE_COLUMNS
+            },
+        )
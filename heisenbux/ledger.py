@@ -0,0 +1,512 @@
+"""Append-only transaction ledger with incrementally maintained tax lots.
+
+Transactions are stored in a local SQLite database. Appending a transaction
+also updates the derived tables, so queries never replay the history:
+
+- ``lots``: one row per purchase (or reinvested dividend), with the shares
+  still open and the cost per share including fees
+- ``closures``: which lots each sale consumed, and when
+- ``positions``: the running shares and cost basis of each account and
+  ticker after every day it traded
+
+"Positions as of a date" reads the latest ``positions`` row of each account
+and ticker, and "lots eligible for tax-loss harvesting" reads open lots
+whose cost per share is above the current price, both through indexes.
+
+Transactions of an account and ticker must be appended in date order, since
+an earlier trade would change the lots every later sale consumed.
+"""
+
+import sqlite3
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from types import TracebackType
+
+import pandas as pd
+
+from heisenbux import constants, directory_utils
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    account TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    type TEXT NOT NULL,
+    shares REAL NOT NULL,
+    price REAL NOT NULL,
+    fees REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_by_account
+    ON transactions (account, ticker, date);
+CREATE INDEX IF NOT EXISTS transactions_by_ticker ON transactions (ticker, date);
+CREATE INDEX IF NOT EXISTS transactions_by_date ON transactions (date);
+
+CREATE TABLE IF NOT EXISTS lots (
+    id INTEGER PRIMARY KEY,
+    transaction_id INTEGER NOT NULL REFERENCES transactions (id),
+    account TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    open_date TEXT NOT NULL,
+    shares REAL NOT NULL,
+    remaining REAL NOT NULL,
+    cost_per_share REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS open_lots_by_account
+    ON lots (account, ticker, open_date) WHERE remaining > 0;
+CREATE INDEX IF NOT EXISTS lots_by_date ON lots (open_date);
+CREATE INDEX IF NOT EXISTS open_lots_by_cost
+    ON lots (ticker, cost_per_share) WHERE remaining > 0;
+
+CREATE TABLE IF NOT EXISTS closures (
+    transaction_id INTEGER NOT NULL REFERENCES transactions (id),
+    lot_id INTEGER NOT NULL REFERENCES lots (id),
+    date TEXT NOT NULL,
+    shares REAL NOT NULL,
+    proceeds REAL NOT NULL,
+    cost REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS closures_by_lot ON closures (lot_id, date);
+CREATE INDEX IF NOT EXISTS closures_by_date ON closures (date);
+
+CREATE TABLE IF NOT EXISTS positions (
+    account TEXT NOT NULL,
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    shares REAL NOT NULL,
+    cost_basis REAL NOT NULL,
+    PRIMARY KEY (account, ticker, date)
+) WITHOUT ROWID;
+"""
+
+_OPENING_TYPES = frozenset(
+    {constants.TransactionTypes.BUY, constants.TransactionTypes.REINVEST}
+)
+# Open lots of an account and ticker, in the order sales consume them
+_RELIEF_QUERIES = {
+    constants.LotMethods.FIFO: (
+        "SELECT id, remaining, cost_per_share FROM lots "
+        "WHERE account = ? AND ticker = ? AND remaining > 0 "
+        "ORDER BY open_date, id"
+    ),
+    constants.LotMethods.HIFO: (
+        "SELECT id, remaining, cost_per_share FROM lots "
+        "WHERE account = ? AND ticker = ? AND remaining > 0 "
+        "ORDER BY cost_per_share DESC, open_date, id"
+    ),
+}
+_LOT_COLUMNS = [
+    "lot",
+    "account",
+    "ticker",
+    "open_date",
+    "shares",
+    "remaining",
+    "cost_per_share",
+]
+
+
+@dataclass(frozen=True)
+class Transaction:
+    """A single trade.
+
+    Attributes:
+        date: Trade date
+        account: Account name
+        ticker: Ticker symbol
+        type: Buy, sell, or reinvested dividend
+        shares: Number of shares traded, always positive
+        price: Price per share
+        fees: Fees paid; added to the cost of purchases and subtracted from
+            the proceeds of sales
+    """
+
+    date: date
+    account: str
+    ticker: str
+    type: constants.TransactionTypes
+    shares: float
+    price: float
+    fees: float = 0.0
+
+
+class Ledger:
+    """SQLite-backed transaction ledger.
+
+    Use as a context manager, or call :meth:`close` when done.
+    """
+
+    def __init__(
+        self,
+        path: Path | str | None = None,
+        method: constants.LotMethods = constants.LotMethods.FIFO,
+    ) -> None:
+        """Open (or create) a ledger.
+
+        Args:
+            path: Database file, or None for the ledger in the cache directory
+            method: Order in which sales consume open lots
+        """
+        if path is None:
+            cache_dir = directory_utils.ensure_directory_exists(
+                constants.Directories.CACHE
+            )
+            path = cache_dir / constants.LEDGER_FILE
+        self.method = method
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, constants.LEDGER_SCHEMA_VERSION):
+            self.connection.close()
+            raise ValueError(f"Unsupported ledger schema version {version}")
+        with self.connection:
+            self.connection.executescript(_SCHEMA)
+            self.connection.execute(
+                f"PRAGMA user_version = {constants.LEDGER_SCHEMA_VERSION:d}"
+            )
+
+    def __enter__(self) -> "Ledger":
+        """Return the ledger."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the ledger."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def append(self, transactions: Iterable[Transaction]) -> int:
+        """Record transactions and update lots and positions.
+
+        The batch is sorted by date and recorded atomically: if any
+        transaction is rejected, none of the batch is kept.
+
+        Args:
+            transactions: Transactions to record
+
+        Returns:
+            Number of transactions recorded
+
+        Raises:
+            ValueError: If a transaction is invalid, sells more shares than
+                the account holds, or is dated before a transaction already
+                recorded for the same account and ticker
+        """
+        batch = sorted(transactions, key=lambda transaction: transaction.date)
+        positions: dict[tuple[str, str], tuple[str, float, float]] = {}
+        # Position after each transaction; later rows of a day replace earlier
+        # ones, leaving the end-of-day position
+        snapshots = []
+        with self.connection:
+            for transaction in batch:
+                key = (transaction.account, transaction.ticker.upper())
+                if key not in positions:
+                    positions[key] = self._latest_position(*key)
+                positions[key] = self._record(transaction, positions[key])
+                snapshots.append((*key, *positions[key]))
+            self.connection.executemany(
+                "INSERT INTO positions VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (account, ticker, date) DO UPDATE "
+                "SET shares = excluded.shares, cost_basis = excluded.cost_basis",
+                snapshots,
+            )
+        return len(batch)
+
+    def positions(
+        self, as_of: date | str | None = None, account: str | None = None
+    ) -> pd.DataFrame:
+        """Return the open positions at the end of a day.
+
+        Args:
+            as_of: Day to report, or None for the latest positions
+            account: Only report this account, or None for all accounts
+
+        Returns:
+            DataFrame with account, ticker, shares and cost_basis columns
+        """
+        day = _day(as_of) if as_of is not None else "9999-12-31"
+        # SQLite takes the other columns from the row holding MAX(date)
+        rows = self.connection.execute(
+            "SELECT account, ticker, shares, cost_basis, MAX(date) FROM positions "
+            "WHERE date <= ? AND (? IS NULL OR account = ?) "
+            "GROUP BY account, ticker",
+            (day, account, account),
+        ).fetchall()
+        columns = ["account", "ticker", "shares", "cost_basis"]
+        df = pd.DataFrame([row[:4] for row in rows], columns=columns)
+        return df[df["shares"] > constants.LEDGER_SHARE_TOLERANCE].reset_index(
+            drop=True
+        )
+
+    def open_lots(
+        self,
+        as_of: date | str | None = None,
+        account: str | None = None,
+        ticker: str | None = None,
+    ) -> pd.DataFrame:
+        """Return the lots with shares still open at the end of a day.
+
+        Args:
+            as_of: Day to report, or None for the lots open now
+            account: Only report this account, or None for all accounts
+            ticker: Only report this ticker, or None for all tickers
+
+        Returns:
+            DataFrame with lot, account, ticker, open_date, shares, remaining
+            and cost_per_share columns
+        """
+        symbol = ticker.upper() if ticker is not None else None
+        if as_of is None:
+            rows = self.connection.execute(
+                "SELECT id, account, ticker, open_date, shares, remaining, "
+                "cost_per_share FROM lots WHERE remaining > 0 "
+                "AND (? IS NULL OR account = ?) AND (? IS NULL OR ticker = ?) "
+                "ORDER BY open_date, id",
+                (account, account, symbol, symbol),
+            ).fetchall()
+        else:
+            day = _day(as_of)
+            rows = self.connection.execute(
+                "SELECT id, account, ticker, open_date, shares, shares - COALESCE("
+                "(SELECT SUM(shares) FROM closures "
+                "WHERE lot_id = lots.id AND date <= ?), 0) AS open, "
+                "cost_per_share FROM lots WHERE open_date <= ? "
+                "AND (? IS NULL OR account = ?) AND (? IS NULL OR ticker = ?) "
+                "AND open > ? ORDER BY open_date, id",
+                (
+                    day,
+                    day,
+                    account,
+                    account,
+                    symbol,
+                    symbol,
+                    constants.LEDGER_SHARE_TOLERANCE,
+                ),
+            ).fetchall()
+        return pd.DataFrame(rows, columns=_LOT_COLUMNS)
+
+    def harvest_candidates(
+        self,
+        prices: Mapping[str, float],
+        min_loss: float = 0.0,
+        accounts: Iterable[str] | None = None,
+    ) -> pd.DataFrame:
+        """Return open lots whose unrealized loss makes them worth harvesting.
+
+        Args:
+            prices: Current price of each ticker; other tickers are skipped
+            min_loss: Smallest loss per lot worth reporting
+            accounts: Only consider these (e.g. taxable) accounts, or None for
+                all accounts
+
+        Returns:
+            Open lots as from :meth:`open_lots`, with price and loss columns,
+            largest loss first
+        """
+        allowed = set(accounts) if accounts is not None else None
+        rows: list[tuple[object, ...]] = []
+        for ticker, price in prices.items():
+            rows.extend(
+                (*lot, price)
+                for lot in self.connection.execute(
+                    "SELECT id, account, ticker, open_date, shares, remaining, "
+                    "cost_per_share FROM lots "
+                    "WHERE ticker = ? AND cost_per_share > ? AND remaining > 0",
+                    (ticker.upper(), price),
+                )
+                if allowed is None or lot[1] in allowed
+            )
+        df = pd.DataFrame(rows, columns=[*_LOT_COLUMNS, "price"])
+        df["loss"] = (df["cost_per_share"] - df["price"]) * df["remaining"]
+        df = df[df["loss"] >= min_loss]
+        return df.sort_values("loss", ascending=False, ignore_index=True)
+
+    def realized_gains(
+        self, start: date | str | None = None, end: date | str | None = None
+    ) -> pd.DataFrame:
+        """Return the gain or loss realized by each sale.
+
+        Args:
+            start: First day to include, or None for the earliest
+            end: Last day to include, or None for the latest
+
+        Returns:
+            DataFrame with date, account, ticker, shares, proceeds, cost and
+            gain columns, one row per sale in date order
+        """
+        first = _day(start) if start is not None else ""
+        last = _day(end) if end is not None else "9999-12-31"
+        query = (
+            "SELECT closures.date, account, ticker, SUM(closures.shares) AS shares, "
+            "SUM(proceeds) AS proceeds, SUM(cost) AS cost "
+            "FROM closures JOIN transactions ON transactions.id = transaction_id "
+            "WHERE closures.date BETWEEN ? AND ? "
+            "GROUP BY transaction_id ORDER BY closures.date, transaction_id"
+        )
+        df = pd.read_sql_query(query, self.connection, params=(first, last))
+        df["gain"] = df["proceeds"] - df["cost"]
+        return df
+
+    def transactions(
+        self,
+        account: str | None = None,
+        ticker: str | None = None,
+        start: date | str | None = None,
+        end: date | str | None = None,
+    ) -> pd.DataFrame:
+        """Return recorded transactions in date order.
+
+        Args:
+            account: Only return this account, or None for all accounts
+            ticker: Only return this ticker, or None for all tickers
+            start: First day to include, or None for the earliest
+            end: Last day to include, or None for the latest
+
+        Returns:
+            DataFrame with one row per transaction
+        """
+        filters = []
+        params: list[str] = []
+        if account is not None:
+            filters.append("account = ?")
+            params.append(account)
+        if ticker is not None:
+            filters.append("ticker = ?")
+            params.append(ticker.upper())
+        if start is not None:
+            filters.append("date >= ?")
+            params.append(_day(start))
+        if end is not None:
+            filters.append("date <= ?")
+            params.append(_day(end))
+        where = f"WHERE {' AND '.join(filters)} " if filters else ""
+        query = (
+            "SELECT date, account, ticker, type, shares, price, fees "
+            f"FROM transactions {where}ORDER BY date, id"
+        )
+        return pd.read_sql_query(query, self.connection, params=tuple(params))
+
+    def _latest_position(self, account: str, ticker: str) -> tuple[str, float, float]:
+        """Return the date, shares and cost basis of the latest position."""
+        row = self.connection.execute(
+            "SELECT date, shares, cost_basis FROM positions "
+            "WHERE account = ? AND ticker = ? ORDER BY date DESC LIMIT 1",
+            (account, ticker),
+        ).fetchone()
+        return (row[0], row[1], row[2]) if row else ("", 0.0, 0.0)
+
+    def _record(
+        self, transaction: Transaction, position: tuple[str, float, float]
+    ) -> tuple[str, float, float]:
+        """Insert a transaction and its lot changes; return the new position."""
+        kind = constants.TransactionTypes(transaction.type)
+        day = _day(transaction.date)
+        ticker = transaction.ticker.upper()
+        last_day, shares, cost_basis = position
+        if transaction.shares <= 0 or transaction.price < 0 or transaction.fees < 0:
+            raise ValueError(f"Invalid quantities in {transaction}")
+        if day < last_day:
+            raise ValueError(
+                f"{transaction} is dated before the latest recorded transaction "
+                f"of {ticker} in {transaction.account} ({last_day})"
+            )
+
+        cursor = self.connection.execute(
+            "INSERT INTO transactions "
+            "(date, account, ticker, type, shares, price, fees) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                day,
+                transaction.account,
+                ticker,
+                str(kind),
+                transaction.shares,
+                transaction.price,
+                transaction.fees,
+            ),
+        )
+        transaction_id = cursor.lastrowid
+
+        if kind in _OPENING_TYPES:
+            cost = transaction.shares * transaction.price + transaction.fees
+            self.connection.execute(
+                "INSERT INTO lots (transaction_id, account, ticker, open_date, "
+                "shares, remaining, cost_per_share) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    transaction_id,
+                    transaction.account,
+                    ticker,
+                    day,
+                    transaction.shares,
+                    transaction.shares,
+                    cost / transaction.shares,
+                ),
+            )
+            return day, shares + transaction.shares, cost_basis + cost
+
+        if transaction.shares > shares + constants.LEDGER_SHARE_TOLERANCE:
+            raise ValueError(
+                f"{transaction} sells more than the {shares:g} shares held"
+            )
+        relieved = self._close_lots(transaction, transaction_id, day)
+        return day, max(shares - transaction.shares, 0.0), cost_basis - relieved
+
+    def _close_lots(
+        self, transaction: Transaction, transaction_id: int | None, day: str
+    ) -> float:
+        """Consume open lots for a sale; return the cost basis relieved."""
+        lots = self.connection.execute(
+            _RELIEF_QUERIES[self.method],
+            (transaction.account, transaction.ticker.upper()),
+        ).fetchall()
+
+        net_price = transaction.price - transaction.fees / transaction.shares
+        to_sell = transaction.shares
+        relieved = 0.0
+        closures = []
+        updates = []
+        for lot_id, remaining, cost_per_share in lots:
+            if to_sell <= constants.LEDGER_SHARE_TOLERANCE:
+                break
+            sold = min(remaining, to_sell)
+            left = remaining - sold
+            if left <= constants.LEDGER_SHARE_TOLERANCE:
+                left = 0.0
+            to_sell -= sold
+            relieved += sold * cost_per_share
+            updates.append((left, lot_id))
+            closures.append(
+                (
+                    transaction_id,
+                    lot_id,
+                    day,
+                    sold,
+                    sold * net_price,
+                    sold * cost_per_share,
+                )
+            )
+
+        self.connection.executemany(
+            "UPDATE lots SET remaining = ? WHERE id = ?", updates
+        )
+        self.connection.executemany(
+            "INSERT INTO closures VALUES (?, ?, ?, ?, ?, ?)", closures
+        )
+        return relieved
+
+
+def _day(value: date | str) -> str:
+    """Format a day as ISO text, which SQLite compares in date order."""
+    if isinstance(value, date):
+        return value.isoformat()[:10]
+    return date.fromisoformat(str(value)[:10]).isoformat()
@@ -0,0 +1,134 @@
+"""Cross-process locks that make cache refreshes single-flight.
+
+Several processes (cron jobs, parallel workers) may refresh the same ticker
+at once. Each ticker has a lock file in the cache directory; a process takes
+the lock before downloading and writing the ticker's cache file. A process
+that had to wait for the lock is told whether the cache file was rewritten
+in the meantime, so it can read that result instead of downloading again.
+
+Locks are advisory OS file locks (``flock`` on POSIX, ``msvcrt.locking`` on
+Windows), so they are released automatically if the holding process dies.
+Readers never need the lock: cache files are replaced atomically.
+"""
+
+import sys
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO
+
+from heisenbux import constants, directory_utils
+
+
+@contextmanager
+def ticker_lock(
+    cache_dir: Path | str,
+    ticker: str,
+    timeout: float = constants.CACHE_LOCK_TIMEOUT_SECONDS,
+) -> Iterator[bool]:
+    """Hold the cross-process lock of a ticker's cache file.
+
+    Args:
+        cache_dir: Cache directory
+        ticker: Stock ticker symbol
+        timeout: Seconds to wait for another process to release the lock
+
+    Yields:
+        True if this process waited for the lock and the ticker's cache file
+        was written by another process meanwhile, False otherwise
+
+    Raises:
+        TimeoutError: If the lock is not acquired within ``timeout`` seconds
+    """
+    lock_dir = directory_utils.ensure_directory_exists(
+        Path(cache_dir) / constants.LOCKS_DIRECTORY
+    )
+    lock_file = directory_utils.build_file_path(lock_dir, ticker, constants.LOCK_SUFFIX)
+    cache_file = directory_utils.build_file_path(
+        cache_dir, ticker, constants.CACHE_FORMAT
+    )
+    with lock_file.open("a+b") as f:
+        if _try_lock(f):
+            waited = False
+        else:
+            before = _signature(cache_file)
+            _wait_for_lock(f, lock_file, timeout)
+            waited = _signature(cache_file) not in (before, None)
+        try:
+            yield waited
+        finally:
+            _unlock(f)
+
+
+@contextmanager
+def file_lock(
+    lock_file: Path, timeout: float = constants.CACHE_LOCK_TIMEOUT_SECONDS
+) -> Iterator[None]:
+    """Hold an exclusive cross-process lock on a lock file.
+
+    Args:
+        lock_file: Lock file, created if missing
+        timeout: Seconds to wait for another process to release the lock
+
+    Raises:
+        TimeoutError: If the lock is not acquired within ``timeout`` seconds
+    """
+    with lock_file.open("a+b") as f:
+        if not _try_lock(f):
+            _wait_for_lock(f, lock_file, timeout)
+        try:
+            yield
+        finally:
+            _unlock(f)
+
+
+def _wait_for_lock(f: IO[bytes], lock_file: Path, timeout: float) -> None:
+    """Poll a lock until it is acquired or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while not _try_lock(f):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Timed out waiting for lock {lock_file}")
+        time.sleep(constants.CACHE_LOCK_POLL_SECONDS)
+
+
+def _signature(path: Path) -> tuple[int, int] | None:
+    """Return the modification time and size of a file, or None if missing."""
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(f: IO[bytes]) -> bool:
+        """Take an exclusive lock on an open file without blocking."""
+        f.seek(0)
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(f: IO[bytes]) -> None:
+        """Release a lock taken by :func:`_try_lock`."""
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(f: IO[bytes]) -> bool:
+        """Take an exclusive lock on an open file without blocking."""
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+        return True
+
+    def _unlock(f: IO[bytes]) -> None:
+        """Release a lock taken by :func:`_try_lock`."""
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,242 @@
+"""Index of the per-ticker price cache.
+
+Every write of a ticker's cache file also records, in one SQLite
+transaction, the ticker's date range, row count, refresh time, cache schema
+version and a hash of the file contents. Questions about the whole cache,
+such as which tickers are stale, are then a single indexed query instead of
+a stat or read of every cache file.
+
+The cache file is renamed into place before its entry is recorded, so after
+a crash between the two steps the entry can only lag behind the file; the
+content hash tells the two apart, and :meth:`Manifest.rebuild` re-indexes
+existing files.
+"""
+
+import hashlib
+import sqlite3
+from datetime import date, datetime
+from pathlib import Path
+from types import TracebackType
+
+import pandas as pd
+
+from heisenbux import constants, directory_utils, storage
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    ticker TEXT PRIMARY KEY,
+    first_date TEXT NOT NULL,
+    last_date TEXT NOT NULL,
+    rows INTEGER NOT NULL,
+    refreshed_at TEXT NOT NULL,
+    schema_version INTEGER NOT NULL,
+    content_hash TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_by_refresh ON entries (refreshed_at);
+"""
+
+_ENTRY_COLUMNS = [
+    "ticker",
+    "first_date",
+    "last_date",
+    "rows",
+    "refreshed_at",
+    "schema_version",
+    "content_hash",
+]
+
+# Refresh times are compared as text, so every row uses the same format
+_TIMESPEC = "microseconds"
+
+
+class Manifest:
+    """SQLite-backed index of the per-ticker cache files.
+
+    Use as a context manager, or call :meth:`close` when done.
+    """
+
+    def __init__(self, cache_dir: Path | str = constants.Directories.CACHE) -> None:
+        """Open (or create) the manifest of a cache directory.
+
+        Args:
+            cache_dir: Cache directory the manifest indexes
+        """
+        self.cache_dir = directory_utils.ensure_directory_exists(cache_dir)
+        self.connection = sqlite3.connect(
+            self.cache_dir / constants.MANIFEST_FILE,
+            timeout=constants.MANIFEST_TIMEOUT_SECONDS,
+        )
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, constants.MANIFEST_SCHEMA_VERSION):
+            self.connection.close()
+            raise ValueError(f"Unsupported manifest schema version {version}")
+        if version == 0:
+            with self.connection:
+                self.connection.executescript(_SCHEMA)
+                self.connection.execute(
+                    f"PRAGMA user_version = {constants.MANIFEST_SCHEMA_VERSION:d}"
+                )
+
+    def __enter__(self) -> "Manifest":
+        """Return the manifest."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the manifest."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self.connection.close()
+
+    def record(
+        self, ticker: str, df: pd.DataFrame, refreshed_at: datetime | None = None
+    ) -> None:
+        """Record the cache file just written for a ticker.
+
+        Args:
+            ticker: Stock ticker symbol
+            df: Price data written to the ticker's cache file
+            refreshed_at: Time of the refresh, or None for now
+        """
+        self.record_many([(ticker, df)], refreshed_at)
+
+    def record_many(
+        self,
+        written: list[tuple[str, pd.DataFrame]],
+        refreshed_at: datetime | None = None,
+    ) -> None:
+        """Record several cache files in one transaction.
+
+        Args:
+            written: Pairs of ticker and the price data written for it
+            refreshed_at: Time of the refresh, or None for now
+        """
+        refreshed = (refreshed_at or datetime.now()).isoformat(timespec=_TIMESPEC)
+        rows = [self._entry(ticker, df, refreshed) for ticker, df in written]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def remove(self, ticker: str) -> None:
+        """Forget a ticker whose cache file was deleted.
+
+        Args:
+            ticker: Stock ticker symbol
+        """
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM entries WHERE ticker = ?", (ticker.upper(),)
+            )
+
+    def entries(self) -> pd.DataFrame:
+        """Return the entries of all cached tickers.
+
+        Returns:
+            DataFrame indexed by ticker with the date range, row count,
+            refresh time, schema version and content hash of each cache file
+        """
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(_ENTRY_COLUMNS)} FROM entries ORDER BY ticker"
+        )
+        return pd.DataFrame(cursor.fetchall(), columns=_ENTRY_COLUMNS).set_index(
+            "ticker"
+        )
+
+    def stale(self, before: date | datetime | None = None) -> list[str]:
+        """List the tickers that need a refresh.
+
+        Args:
+            before: Tickers last refreshed before this time are stale; None
+                for the start of today
+
+        Returns:
+            Sorted tickers refreshed before ``before`` or written with an
+            older cache schema
+        """
+        if before is None:
+            before = date.today()
+        if isinstance(before, datetime):
+            cutoff = before.isoformat(timespec=_TIMESPEC)
+        else:
+            cutoff = before.isoformat()
+        cursor = self.connection.execute(
+            "SELECT ticker FROM entries "
+            "WHERE refreshed_at < ? OR schema_version != ? ORDER BY ticker",
+            (cutoff, constants.CACHE_SCHEMA_VERSION),
+        )
+        return [ticker for (ticker,) in cursor]
+
+    def refreshed_since(self, since: str, tickers: list[str]) -> list[str]:
+        """List the tickers whose cache file was written after a time.
+
+        Args:
+            since: ISO time, e.g. when a store derived from the cache was built
+            tickers: Tickers to check
+
+        Returns:
+            Sorted tickers among ``tickers`` refreshed after ``since``
+        """
+        cursor = self.connection.execute(
+            "SELECT ticker FROM entries WHERE refreshed_at > ? ORDER BY ticker",
+            (since,),
+        )
+        wanted = {ticker.upper() for ticker in tickers}
+        return [ticker for (ticker,) in cursor if ticker in wanted]
+
+    def rebuild(self) -> int:
+        """Re-index every cache file in the cache directory.
+
+        Entries of tickers without a cache file are dropped. Each file's
+        modification time is used as its refresh time.
+
+        Returns:
+            Number of cache files indexed
+        """
+        pattern = f"*{constants.CACHE_FORMAT}"
+        files = sorted(self.cache_dir.glob(pattern))
+        rows = [
+            self._entry(
+                path.stem,
+                storage.read_prices(path),
+                datetime.fromtimestamp(path.stat().st_mtime).isoformat(
+                    timespec=_TIMESPEC
+                ),
+            )
+            for path in files
+        ]
+        with self.connection:
+            self.connection.execute("DELETE FROM entries")
+            self.connection.executemany(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def _entry(
+        self, ticker: str, df: pd.DataFrame, refreshed_at: str
+    ) -> tuple[str, str, str, int, str, int, str]:
+        """Build the entry of a ticker's cache file."""
+        # Legacy CSV caches have an object index with mixed UTC offsets
+        # across DST; order by instant, but report each date as recorded
+        instants = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True))
+        first = pd.Timestamp(df.index[int(instants.argmin())])
+        last = pd.Timestamp(df.index[int(instants.argmax())])
+        cache_file = directory_utils.build_file_path(
+            self.cache_dir, ticker, constants.CACHE_FORMAT
+        )
+        return (
+            ticker.upper(),
+            first.date().isoformat(),
+            last.date().isoformat(),
+            len(df),
+            refreshed_at,
+            constants.CACHE_SCHEMA_VERSION,
+            hashlib.sha256(cache_file.read_bytes()).hexdigest(),
+        )
@@ -0,0 +1,184 @@
+"""In-process LRU cache for ticker data with a market-hours-aware TTL."""
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from heisenbux import constants
+
+_MARKET_TZ = ZoneInfo(constants.MARKET_TIMEZONE)
+
+
+@dataclass
+class CacheStats:
+    """Counters describing cache effectiveness.
+
+    Attributes:
+        hits: Lookups answered from the cache
+        misses: Lookups that found no fresh entry
+        evictions: Entries dropped to stay within the byte budget
+        expirations: Entries dropped because their TTL had passed
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+
+@dataclass
+class _Entry:
+    """A cached DataFrame with its size and expiry time."""
+
+    df: pd.DataFrame
+    size: int
+    expires_at: float
+
+
+class TickerDataCache:
+    """Bounded, thread-safe LRU cache of DataFrames with per-entry expiry.
+
+    The least recently used entries are evicted once the total estimated
+    size of the cached DataFrames exceeds ``max_bytes``. Cached DataFrames
+    are returned as-is, so callers must not modify them in place.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = constants.MEMORY_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_bytes: Maximum total size of cached DataFrames
+            clock: Monotonic clock in seconds, used for expiry
+        """
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._size = 0
+        self._stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> CacheStats:
+        """Snapshot of the hit, miss, eviction and expiration counters."""
+        with self._lock:
+            return replace(self._stats)
+
+    @property
+    def size(self) -> int:
+        """Total estimated size in bytes of the cached DataFrames."""
+        return self._size
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> pd.DataFrame | None:
+        """Return the fresh DataFrame cached under a key.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached DataFrame, or None if absent or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= self._clock():
+                self._remove(key)
+                self._stats.expirations += 1
+                entry = None
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry.df
+
+    def put(
+        self, key: Hashable, df: pd.DataFrame, ttl_seconds: float | None = None
+    ) -> None:
+        """Cache a DataFrame, evicting least recently used entries if needed.
+
+        DataFrames larger than the whole byte budget are not cached.
+
+        Args:
+            key: Cache key
+            df: DataFrame to cache
+            ttl_seconds: Seconds the entry stays fresh, or None to use
+                :func:`freshness_ttl`
+        """
+        if ttl_seconds is None:
+            ttl_seconds = freshness_ttl(datetime.now(_MARKET_TZ))
+        size = int(df.memory_usage(index=True, deep=True).sum())
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            while self._size + size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._stats.evictions += 1
+            self._entries[key] = _Entry(df, size, self._clock() + ttl_seconds)
+            self._size += size
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self._stats = CacheStats()
+
+    def _remove(self, key: Hashable) -> None:
+        """Drop an entry. The caller must hold the lock."""
+        self._size -= self._entries.pop(key).size
+
+
+def freshness_ttl(now: datetime) -> float:
+    """Return how long ticker data fetched at a given time stays fresh.
+
+    While the market is open, prices move and data goes stale after
+    ``MEMORY_CACHE_MARKET_TTL_SECONDS``. Outside trading hours nothing changes
+    until the next session opens. Exchange holidays are treated as trading
+    days, which only makes the TTL shorter than necessary.
+
+    Args:
+        now: Current time (timezone-aware)
+
+    Returns:
+        TTL in seconds
+    """
+    local = now.astimezone(_MARKET_TZ)
+    open_time = local.replace(
+        hour=constants.MARKET_OPEN.hour,
+        minute=constants.MARKET_OPEN.minute,
+        second=0,
+        microsecond=0,
+    )
+    close_time = local.replace(
+        hour=constants.MARKET_CLOSE.hour,
+        minute=constants.MARKET_CLOSE.minute,
+        second=0,
+        microsecond=0,
+    )
+    is_weekday = local.weekday() < constants.SATURDAY
+
+    if is_weekday and open_time <= local < close_time:
+        return float(constants.MEMORY_CACHE_MARKET_TTL_SECONDS)
+
+    next_open = open_time
+    if next_open <= local:
+        next_open += timedelta(days=1)
+    while next_open.weekday() >= constants.SATURDAY:
+        next_open += timedelta(days=1)
+    return next_open.timestamp() - local.timestamp()
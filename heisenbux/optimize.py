@@ -0,0 +1,318 @@
+"""Long-only (or box-constrained) mean-variance efficient frontier.
+
+Each frontier point solves
+
+    minimize  1/2 w' S w - t m' w   subject to  sum(w) = 1, lower <= w <= upper
+
+for a risk tolerance ``t``, where ``S`` is the covariance matrix and ``m`` the
+expected returns, using accelerated projected gradient descent with an exact
+projection onto the constraint set. The frontier is traced by sweeping ``t``
+from zero (minimum variance) upwards, starting each solve from the previous
+point's weights. The largest eigenvalue of ``S``, which fixes the step size,
+is computed once per optimizer and reused for every solve.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from heisenbux import analytics, constants, panel
+
+FloatArray = npt.NDArray[np.float64]
+
+# Risk tolerances swept, relative to the natural scale of the problem
+_MIN_TOLERANCE_SCALE = 1e-3
+_MAX_TOLERANCE_SCALE = 1e2
+
+
+@dataclass(frozen=True)
+class Frontier:
+    """Portfolios along the efficient frontier, from least to most risky.
+
+    Attributes:
+        weights: Array of shape (points, assets)
+        expected_returns: Expected return of each portfolio
+        volatilities: Volatility of each portfolio
+        risk_tolerances: Risk tolerance ``t`` each portfolio was solved for
+        iterations: Gradient iterations spent on each portfolio
+    """
+
+    weights: FloatArray
+    expected_returns: FloatArray
+    volatilities: FloatArray
+    risk_tolerances: FloatArray
+    iterations: npt.NDArray[np.int64]
+
+
+class FrontierOptimizer:
+    """Mean-variance optimizer for one set of expected returns and covariance.
+
+    The covariance spectrum is analyzed once on construction, so tracing
+    several frontiers (e.g. under different weight bounds) reuses it.
+    """
+
+    def __init__(
+        self,
+        expected_returns: FloatArray,
+        covariance: FloatArray,
+        tolerance: float = constants.OPTIMIZER_TOLERANCE,
+        max_iterations: int = constants.OPTIMIZER_MAX_ITERATIONS,
+    ) -> None:
+        """Create an optimizer.
+
+        Args:
+            expected_returns: Expected return of each asset
+            covariance: Covariance matrix of the asset returns
+            tolerance: Largest weight change at which a solve has converged
+            max_iterations: Iteration limit per solve
+
+        Raises:
+            ValueError: If the inputs have inconsistent shapes or missing data
+        """
+        self.expected_returns = np.asarray(expected_returns, dtype=np.float64)
+        self.covariance = np.asarray(covariance, dtype=np.float64)
+        size = len(self.expected_returns)
+        if self.covariance.shape != (size, size):
+            raise ValueError(
+                f"Covariance shape {self.covariance.shape} does not match "
+                f"{size} expected returns"
+            )
+        if not (
+            np.isfinite(self.expected_returns).all()
+            and np.isfinite(self.covariance).all()
+        ):
+            raise ValueError("Expected returns and covariance must be finite")
+
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.lipschitz = max(float(np.linalg.eigvalsh(self.covariance)[-1]), 1e-300)
+
+    def solve(
+        self,
+        risk_tolerance: float,
+        lower: float | FloatArray = 0.0,
+        upper: float | FloatArray = 1.0,
+        initial: FloatArray | None = None,
+    ) -> tuple[FloatArray, int]:
+        """Find the optimal weights for one risk tolerance.
+
+        Args:
+            risk_tolerance: Weight ``t`` on expected return against variance
+            lower: Lower bound of each weight
+            upper: Upper bound of each weight
+            initial: Starting weights, or None for the projection of equal
+                weights
+
+        Returns:
+            Optimal weights and the number of iterations used
+
+        Raises:
+            ValueError: If no weights satisfy the bounds
+        """
+        low, high = self._bounds(lower, upper)
+        size = len(self.expected_returns)
+        start = np.full(size, 1 / size) if initial is None else initial
+        weights = project_capped_simplex(start, low, high)
+
+        linear = risk_tolerance * self.expected_returns
+        step = 1 / self.lipschitz
+        momentum = weights
+        theta = 1.0
+        for iteration in range(1, self.max_iterations + 1):
+            gradient = self.covariance @ momentum - linear
+            updated = project_capped_simplex(momentum - step * gradient, low, high)
+            change = updated - weights
+            if np.abs(change).max() <= self.tolerance:
+                return updated, iteration
+
+            if np.dot(momentum - updated, change) > 0:
+                # Adaptive restart: drop the momentum once it stops helping
+                theta = 1.0
+                momentum = updated
+            else:
+                next_theta = (1 + np.sqrt(1 + 4 * theta**2)) / 2
+                momentum = updated + (theta - 1) / next_theta * change
+                theta = next_theta
+            weights = updated
+
+        return weights, self.max_iterations
+
+    def frontier(
+        self,
+        points: int = constants.FRONTIER_POINTS,
+        lower: float | FloatArray = 0.0,
+        upper: float | FloatArray = 1.0,
+        initial: FloatArray | None = None,
+    ) -> Frontier:
+        """Trace the efficient frontier.
+
+        The first point is the minimum-variance portfolio. The rest use risk
+        tolerances spaced geometrically up to where the frontier reaches the
+        highest-return portfolio. Each solve starts from the previous weights.
+
+        Args:
+            points: Number of portfolios on the frontier
+            lower: Lower bound of each weight
+            upper: Upper bound of each weight
+            initial: Starting weights for the first solve, e.g. the minimum
+                variance weights of a previous frontier
+
+        Returns:
+            Frontier of optimal portfolios
+        """
+        spread = float(np.ptp(self.expected_returns)) or 1.0
+        scale = self.lipschitz / spread
+        tolerances = np.concatenate(
+            [
+                [0.0],
+                np.geomspace(
+                    scale * _MIN_TOLERANCE_SCALE,
+                    scale * _MAX_TOLERANCE_SCALE,
+                    points - 1,
+                ),
+            ]
+        )[:points]
+
+        weights = np.empty((len(tolerances), len(self.expected_returns)))
+        iterations = np.empty(len(tolerances), dtype=np.int64)
+        previous = initial
+        for i, tolerance in enumerate(tolerances):
+            previous, iterations[i] = self.solve(tolerance, lower, upper, previous)
+            weights[i] = previous
+
+        variances = np.einsum("pi,ij,pj->p", weights, self.covariance, weights)
+        return Frontier(
+            weights=weights,
+            expected_returns=weights @ self.expected_returns,
+            volatilities=np.sqrt(np.maximum(variances, 0.0)),
+            risk_tolerances=tolerances,
+            iterations=iterations,
+        )
+
+    def _bounds(
+        self, lower: float | FloatArray, upper: float | FloatArray
+    ) -> tuple[FloatArray, FloatArray]:
+        """Broadcast weight bounds to arrays and check they are feasible."""
+        shape = self.expected_returns.shape
+        low = np.broadcast_to(np.asarray(lower, dtype=np.float64), shape)
+        high = np.broadcast_to(np.asarray(upper, dtype=np.float64), shape)
+        if (low > high).any() or low.sum() > 1 or high.sum() < 1:
+            raise ValueError("No fully invested portfolio satisfies the weight bounds")
+        return low, high
+
+
+def project_capped_simplex(
+    values: FloatArray, lower: FloatArray, upper: FloatArray
+) -> FloatArray:
+    """Return the closest point to ``values`` that sums to one within bounds.
+
+    The projection is ``clip(values - tau, lower, upper)`` for the shift
+    ``tau`` that makes it sum to one. The sum is piecewise linear in ``tau``
+    with breakpoints where a weight reaches a bound, so sorting the
+    breakpoints finds ``tau`` exactly in O(n log n).
+
+    Args:
+        values: Point to project
+        lower: Lower bound of each weight; ``sum(lower) <= 1``
+        upper: Upper bound of each weight; ``sum(upper) >= 1``
+
+    Returns:
+        Projected weights
+    """
+    size = len(values)
+    breakpoints = np.concatenate([values - upper, values - lower])
+    # Passing values - upper frees a weight, passing values - lower pins it
+    steps = np.concatenate([np.ones(size), -np.ones(size)])
+    order = np.argsort(breakpoints, kind="stable")
+    breakpoints = breakpoints[order]
+    free = np.cumsum(steps[order])
+
+    # Sum of the clipped weights at each breakpoint, from sum(upper) downwards
+    totals = upper.sum() - np.concatenate(
+        [[0.0], np.cumsum(free[:-1] * np.diff(breakpoints))]
+    )
+    k = int(np.searchsorted(-totals, -1.0))
+    if k == 0:
+        return upper.copy()
+    if k == len(totals):
+        return lower.copy()
+    tau = breakpoints[k - 1] + (totals[k - 1] - 1) / free[k - 1]
+    projected: FloatArray = np.clip(values - tau, lower, upper)
+    return projected
+
+
+def ledoit_wolf(returns: FloatArray) -> tuple[FloatArray, float]:
+    """Estimate a covariance matrix with Ledoit-Wolf shrinkage.
+
+    Shrinks the sample covariance towards a scaled identity with the
+    intensity that minimizes expected squared error (Ledoit & Wolf, 2004).
+    Missing returns are treated as equal to the asset's mean return.
+
+    Args:
+        returns: Periodic returns of shape (periods, assets)
+
+    Returns:
+        Shrunk covariance of the periodic returns and the shrinkage intensity
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    centered = np.nan_to_num(returns - np.nanmean(returns, axis=0))
+    periods, assets = centered.shape
+
+    sample = centered.T @ centered / periods
+    target = np.trace(sample) / assets
+    distance = np.sum(sample**2) - 2 * target * np.trace(sample) + target**2 * assets
+    norms = np.sum(centered**2, axis=1)
+    spread = (np.sum(norms**2) / periods - np.sum(sample**2)) / periods
+
+    shrinkage = min(spread, distance) / distance if distance > 0 else 0.0
+    covariance: FloatArray = (1 - shrinkage) * sample
+    covariance[np.diag_indices(assets)] += shrinkage * target
+    return covariance, float(shrinkage)
+
+
+def estimate_inputs(
+    returns: FloatArray,
+    estimator: constants.CovarianceEstimators = constants.CovarianceEstimators.SAMPLE,
+    periods_per_year: int = constants.TRADING_DAYS_PER_YEAR,
+) -> tuple[FloatArray, FloatArray]:
+    """Estimate annualized expected returns and covariance from history.
+
+    Args:
+        returns: Periodic returns of shape (periods, assets)
+        estimator: Covariance estimator to use
+        periods_per_year: Number of return periods in a year
+
+    Returns:
+        Expected returns and covariance matrix, both annualized
+    """
+    expected = np.nanmean(returns, axis=0) * periods_per_year
+    if estimator == constants.CovarianceEstimators.LEDOIT_WOLF:
+        covariance = ledoit_wolf(returns)[0] * periods_per_year
+    else:
+        covariance = analytics.covariance_matrix(returns, periods_per_year)
+    return expected, covariance
+
+
+def efficient_frontier(
+    prices: panel.PricePanel,
+    points: int = constants.FRONTIER_POINTS,
+    estimator: constants.CovarianceEstimators = constants.CovarianceEstimators.SAMPLE,
+    lower: float | FloatArray = 0.0,
+    upper: float | FloatArray = 1.0,
+) -> Frontier:
+    """Trace the efficient frontier of the tickers in a price panel.
+
+    Args:
+        prices: Panel of the candidate assets
+        points: Number of portfolios on the frontier
+        estimator: Covariance estimator to use
+        lower: Lower bound of each weight
+        upper: Upper bound of each weight
+
+    Returns:
+        Frontier with weights in the order of ``prices.tickers``
+    """
+    returns = analytics.simple_returns(prices[constants.DataFrameColumns.CLOSE])
+    expected, covariance = estimate_inputs(returns, estimator)
+    return FrontierOptimizer(expected, covariance).frontier(points, lower, upper)
@@ -0,0 +1,251 @@
+"""Consolidated, memory-mapped price store for the whole ticker universe.
+
+A store version is a directory holding one ``.npy`` array per price column,
+shaped (trading days, tickers), plus the trading days and an index file
+mapping each ticker to its column. Arrays are opened with ``mmap_mode="r"``,
+so loading a panel reads no price data up front and only touches the pages a
+caller actually uses. Days on which a ticker has no bar hold NaN.
+
+The store directory holds its versions and a pointer file naming the current
+one. Writers build a new version under a lock and replace the pointer
+atomically, so readers always find a complete store. The version before the
+current one is kept for readers that resolved the pointer just before it
+moved.
+"""
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Literal
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from heisenbux import constants, directory_utils, locks
+
+_TICKERS_KEY = "tickers"
+_COLUMNS_KEY = "columns"
+_BUILT_AT_KEY = "built_at"
+_VERSION_PREFIX = "v"
+
+
+@dataclass(frozen=True)
+class PricePanel:
+    """Aligned price arrays for many tickers.
+
+    Attributes:
+        tickers: Ticker symbols, one per array column
+        dates: Trading days as ``datetime64[D]``, one per array row
+        data: Mapping of price column name to a (days, tickers) float64 array
+        built_at: ISO time the stored panel was written, or None if it was
+            not read from a store
+    """
+
+    tickers: list[str]
+    dates: npt.NDArray[np.datetime64]
+    data: dict[str, npt.NDArray[np.float64]]
+    built_at: str | None = None
+
+    def __getitem__(self, column: str) -> npt.NDArray[np.float64]:
+        """Return the (days, tickers) array of a price column."""
+        return self.data[column]
+
+    def select(
+        self,
+        tickers: list[str] | None = None,
+        start: date | str | None = None,
+        end: date | str | None = None,
+    ) -> "PricePanel":
+        """Return the sub-panel for some tickers over an inclusive date range.
+
+        Date ranges are always zero-copy slices. Tickers are a zero-copy
+        slice when they are adjacent and in store order, and a copy otherwise.
+
+        Args:
+            tickers: Tickers to keep, or None for all of them
+            start: First trading day to keep, or None for the earliest
+            end: Last trading day to keep, or None for the latest
+
+        Returns:
+            PricePanel over the selection
+
+        Raises:
+            KeyError: If a ticker is not in the panel
+        """
+        first = 0 if start is None else self._day_position(start, "left")
+        last = len(self.dates) if end is None else self._day_position(end, "right")
+        rows = slice(first, last)
+
+        columns: slice | list[int] = slice(None)
+        selected = self.tickers
+        if tickers is not None:
+            positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+            missing = [ticker for ticker in tickers if ticker.upper() not in positions]
+            if missing:
+                raise KeyError(f"Tickers not in panel: {', '.join(missing)}")
+            indices = [positions[ticker.upper()] for ticker in tickers]
+            selected = [self.tickers[i] for i in indices]
+            if indices and indices == list(range(indices[0], indices[-1] + 1)):
+                columns = slice(indices[0], indices[-1] + 1)
+            else:
+                columns = indices
+
+        return PricePanel(
+            tickers=selected,
+            dates=self.dates[rows],
+            data={name: array[rows, columns] for name, array in self.data.items()},
+            built_at=self.built_at,
+        )
+
+    def to_frame(self, column: str) -> pd.DataFrame:
+        """Return a price column as a DataFrame of days by tickers.
+
+        Args:
+            column: Price column name (e.g. 'Close')
+
+        Returns:
+            DataFrame indexed by trading day with one column per ticker
+        """
+        index = pd.DatetimeIndex(self.dates, name=constants.DataFrameColumns.DATE)
+        return pd.DataFrame(self.data[column], index=index, columns=self.tickers)
+
+    def _day_position(self, day: date | str, side: Literal["left", "right"]) -> int:
+        """Return the insertion position of a day in the panel dates."""
+        day64 = np.datetime64(pd.Timestamp(day).date(), "D")
+        return int(np.searchsorted(self.dates, day64, side=side))
+
+
+def build_panel(frames: dict[str, pd.DataFrame]) -> PricePanel:
+    """Align per-ticker price data on the union of their trading days.
+
+    Bars are matched by their exchange-local calendar day, so data cached in
+    different timezones still lines up.
+
+    Args:
+        frames: Mapping of ticker to its price DataFrame
+
+    Returns:
+        In-memory PricePanel with one column per ticker, in sorted order
+    """
+    tickers = sorted(frames, key=str.upper)
+    days = {ticker: _trading_days(frames[ticker].index) for ticker in tickers}
+    dates = np.unique(np.concatenate(list(days.values())))
+
+    data: dict[str, npt.NDArray[np.float64]] = {
+        column: np.full((len(dates), len(tickers)), np.nan)
+        for column in constants.ALL_PRICE_COLUMNS
+    }
+    for i, ticker in enumerate(tickers):
+        rows = np.searchsorted(dates, days[ticker])
+        df = frames[ticker]
+        for column, array in data.items():
+            if column in df.columns:
+                array[rows, i] = df[column].to_numpy(dtype=np.float64)
+
+    return PricePanel(
+        tickers=[ticker.upper() for ticker in tickers], dates=dates, data=data
+    )
+
+
+def write_panel(panel: PricePanel, directory: Path) -> None:
+    """Write a panel to a store directory, replacing any existing store.
+
+    The new version is written next to the current one and the pointer is
+    swapped to it in one rename, under a cross-process lock. Readers that
+    already mapped the old arrays keep a consistent view of them.
+
+    Args:
+        panel: Panel to store
+        directory: Store directory
+    """
+    directory_utils.ensure_directory_exists(directory)
+    with locks.file_lock(directory / constants.PANEL_LOCK_FILE):
+        version = f"{_VERSION_PREFIX}{time.time_ns()}-{os.getpid()}"
+        staging = directory / version
+        staging.mkdir()
+        np.save(_array_file(staging, constants.DataFrameColumns.DATE), panel.dates)
+        for column, array in panel.data.items():
+            np.save(_array_file(staging, column), np.ascontiguousarray(array))
+        index = {
+            _TICKERS_KEY: panel.tickers,
+            _COLUMNS_KEY: list(panel.data),
+            _BUILT_AT_KEY: datetime.now().isoformat(timespec="microseconds"),
+        }
+        (staging / constants.PANEL_INDEX_FILE).write_text(json.dumps(index))
+
+        previous = _current_version(directory)
+        with directory_utils.atomic_path(
+            directory / constants.PANEL_POINTER_FILE
+        ) as tmp_path:
+            tmp_path.write_text(version)
+        _remove_old_versions(directory, keep={version, previous})
+
+
+def open_panel(directory: Path) -> PricePanel:
+    """Memory-map the panel stored in a directory.
+
+    Args:
+        directory: Store directory
+
+    Returns:
+        PricePanel backed by read-only memory maps
+
+    Raises:
+        FileNotFoundError: If the directory holds no store
+    """
+    version = _current_version(directory)
+    # Stores written before versioning keep their files in the directory
+    store = directory / version if version else directory
+    index = json.loads((store / constants.PANEL_INDEX_FILE).read_text())
+    dates = np.load(_array_file(store, constants.DataFrameColumns.DATE))
+    data = {
+        column: np.load(_array_file(store, column), mmap_mode="r")
+        for column in index[_COLUMNS_KEY]
+    }
+    return PricePanel(
+        tickers=index[_TICKERS_KEY],
+        dates=dates,
+        data=data,
+        built_at=index.get(_BUILT_AT_KEY),
+    )
+
+
+def _current_version(directory: Path) -> str | None:
+    """Return the name of the current store version, or None if unset."""
+    try:
+        return (directory / constants.PANEL_POINTER_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+
+
+def _remove_old_versions(directory: Path, keep: set[str | None]) -> None:
+    """Delete store versions not in ``keep`` and files of unversioned stores."""
+    for path in directory.iterdir():
+        if path.is_dir() and path.name.startswith(_VERSION_PREFIX):
+            if path.name not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+        elif path.suffix == constants.FileExtensions.NPY or (
+            path.name == constants.PANEL_INDEX_FILE
+        ):
+            path.unlink(missing_ok=True)
+
+
+def _trading_days(index: pd.Index) -> npt.NDArray[np.datetime64]:
+    """Return the exchange-local calendar day of each bar in a date index."""
+    if isinstance(index, pd.DatetimeIndex):
+        dates = index
+    else:
+        dates = pd.DatetimeIndex(pd.to_datetime(index, utc=True))
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    return dates.normalize().to_numpy(dtype="datetime64[D]")
+
+
+def _array_file(directory: Path, column: str) -> Path:
+    """Return the path of the array file holding a column."""
+    return directory / f"{column}{constants.FileExtensions.NPY}"
@@ -1,43 +1,266 @@
 """Functions to assist with plotting"""
 
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import matplotlib
 import pandas as pd
 from matplotlib import pyplot
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from heisenbux import constants, directory_utils, instrument
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RenderResult:
+    """Manifest entry for one rendered plot.
+
+    Attributes:
+        ticker: Stock ticker symbol
+        path: Path of the saved plot image
+        seconds: Wall-clock time spent rendering and saving the plot
+        skipped: True if the existing plot was up to date and not re-rendered
+    """
+
+    ticker: str
+    path: Path
+    seconds: float
+    skipped: bool = False
+
 
-from heisenbux import constants, directory_utils
+def plot_fingerprint(df: pd.DataFrame, ticker: str) -> str:
+    """Return a content hash of everything that determines a plot image.
+
+    Covers the plotted dates and closing prices, the plot settings and the
+    matplotlib version, so the hash changes whenever the image would.
+
+    Args:
+        df: DataFrame containing stock data with 'Close' column
+        ticker: Stock ticker symbol for labeling
+
+    Returns:
+        Hex digest of the fingerprint
+    """
+    series = df[constants.DataFrameColumns.CLOSE]
+    settings = (
+        ticker.upper(),
+        constants.FIGURE_SIZE,
+        constants.X_AXIS_ROTATION,
+        constants.CLOSING_PRICE_LABEL,
+        constants.PRICE_USD_LABEL,
+        constants.CLOSING_PRICES_TITLE_SUFFIX,
+        matplotlib.__version__,
+    )
+    digest = hashlib.sha256(repr(settings).encode())
+    digest.update(pd.util.hash_pandas_object(series, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
 
 
-def save_plot(df: pd.DataFrame, ticker: str) -> None:
+def save_plot(df: pd.DataFrame, ticker: str, force: bool = False) -> None:
     """Create and save a price plot for the given ticker data.
 
+    Rendering and saving are skipped if the saved plot was made from the same
+    data and settings, as recorded in the graphs directory's plot manifest;
+    the saved image is then displayed instead.
+
     Args:
         df: DataFrame containing stock data with 'Close' column
         ticker: Stock ticker symbol for labeling
+        force: If True, render the plot even if it is up to date
     """
     graphs_dir = directory_utils.ensure_directory_exists(constants.Directories.GRAPHS)
+    plot_file = directory_utils.build_file_path(
+        graphs_dir, ticker, constants.PLOT_SUFFIX
+    )
+    manifest = _load_manifest(graphs_dir)
+    fingerprint = plot_fingerprint(df, ticker)
+    if not force and _is_up_to_date(plot_file, fingerprint, manifest):
+        instrument.count(constants.Counters.PLOTS_SKIPPED)
+        logger.info("Plot unchanged, skipping %s", plot_file)
+        _show_saved(plot_file)
+        return
 
     # Create and display the plot
-    pyplot.figure(figsize=constants.FIGURE_SIZE)
-    pyplot.plot(
-        df.index,
-        df[constants.DataFrameColumns.CLOSE],
-        label=constants.CLOSING_PRICE_LABEL,
-    )
-    pyplot.title(f"{ticker.upper()}{constants.CLOSING_PRICES_TITLE_SUFFIX}")
-    pyplot.xlabel(constants.DataFrameColumns.DATE)
-    pyplot.ylabel(constants.PRICE_USD_LABEL)
-    pyplot.grid(True)
-    pyplot.legend()
+    with instrument.timer(constants.Stages.RENDER):
+        pyplot.figure(figsize=constants.FIGURE_SIZE)
+        pyplot.plot(
+            df.index,
+            df[constants.DataFrameColumns.CLOSE],
+            label=constants.CLOSING_PRICE_LABEL,
+        )
+        pyplot.title(f"{ticker.upper()}{constants.CLOSING_PRICES_TITLE_SUFFIX}")
+        pyplot.xlabel(constants.DataFrameColumns.DATE)
+        pyplot.ylabel(constants.PRICE_USD_LABEL)
+        pyplot.grid(True)
+        pyplot.legend()
 
-    # Rotate x-axis labels for better readability
-    pyplot.xticks(rotation=constants.X_AXIS_ROTATION)
-    pyplot.tight_layout()
+        # Rotate x-axis labels for better readability
+        pyplot.xticks(rotation=constants.X_AXIS_ROTATION)
+        pyplot.tight_layout()
 
     # Save the plot to graphs directory
+    with instrument.timer(constants.Stages.SAVEFIG):
+        pyplot.savefig(plot_file)
+    manifest[plot_file.name] = fingerprint
+    _save_manifest(graphs_dir, manifest)
+    logger.info("Plot saved to %s", plot_file)
+
+    # Show the plot, then release it so repeated calls don't accumulate figures
+    pyplot.show()
+    pyplot.close()
+
+
+def render_plot(df: pd.DataFrame, ticker: str, graphs_dir: Path) -> RenderResult:
+    """Render a price plot to a file without any pyplot or GUI state.
+
+    Draws the same chart as :func:`save_plot` on a standalone Agg figure,
+    which is safe to use from worker processes and is freed on return.
+
+    Args:
+        df: DataFrame containing stock data with 'Close' column
+        ticker: Stock ticker symbol for labeling
+        graphs_dir: Directory to save the plot in
+
+    Returns:
+        RenderResult for the saved plot
+    """
+    start = time.perf_counter()
+
+    with instrument.timer(constants.Stages.RENDER):
+        fig = Figure(figsize=constants.FIGURE_SIZE)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(
+            df.index,
+            df[constants.DataFrameColumns.CLOSE],
+            label=constants.CLOSING_PRICE_LABEL,
+        )
+        ax.set_title(f"{ticker.upper()}{constants.CLOSING_PRICES_TITLE_SUFFIX}")
+        ax.set_xlabel(constants.DataFrameColumns.DATE)
+        ax.set_ylabel(constants.PRICE_USD_LABEL)
+        ax.grid(True)
+        ax.legend()
+        ax.tick_params(axis="x", labelrotation=constants.X_AXIS_ROTATION)
+        fig.tight_layout()
+
     plot_file = directory_utils.build_file_path(
         graphs_dir, ticker, constants.PLOT_SUFFIX
     )
-    pyplot.savefig(plot_file)
-    print(f"Plot saved to {plot_file}")
+    with instrument.timer(constants.Stages.SAVEFIG):
+        fig.savefig(plot_file)
+    fig.clear()
+
+    return RenderResult(ticker, plot_file, time.perf_counter() - start)
+
+
+def render_plots(
+    frames: dict[str, pd.DataFrame],
+    max_workers: int | None = None,
+    force: bool = False,
+) -> list[RenderResult]:
+    """Render price plots for many tickers in parallel worker processes.
+
+    Plots whose data and settings are unchanged since they were last saved
+    are skipped. The plot manifest is read and updated once, in this process.
+
+    Args:
+        frames: Mapping of ticker to its price data
+        max_workers: Maximum number of worker processes, or None for one per
+            CPU. With a single worker, plots are rendered in this process.
+        force: If True, render every plot even if it is up to date
+
+    Returns:
+        RenderResult for each ticker, in the order of ``frames``
+    """
+    graphs_dir = directory_utils.ensure_directory_exists(constants.Directories.GRAPHS)
+    manifest = _load_manifest(graphs_dir)
+
+    results: dict[str, RenderResult] = {}
+    fingerprints: dict[str, str] = {}
+    for ticker, df in frames.items():
+        plot_file = directory_utils.build_file_path(
+            graphs_dir, ticker, constants.PLOT_SUFFIX
+        )
+        fingerprint = plot_fingerprint(df, ticker)
+        if not force and _is_up_to_date(plot_file, fingerprint, manifest):
+            instrument.count(constants.Counters.PLOTS_SKIPPED)
+            results[ticker] = RenderResult(ticker, plot_file, 0.0, skipped=True)
+        else:
+            fingerprints[ticker] = fingerprint
+
+    stale = {ticker: frames[ticker] for ticker in fingerprints}
+    workers = min(max_workers or os.cpu_count() or 1, len(stale))
+    if workers <= 1:
+        rendered = [render_plot(df, ticker, graphs_dir) for ticker, df in stale.items()]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(render_plot, df, ticker, graphs_dir)
+                for ticker, df in stale.items()
+            ]
+            rendered = [future.result() for future in futures]
+
+    for result in rendered:
+        results[result.ticker] = result
+        manifest[result.path.name] = fingerprints[result.ticker]
+    if rendered:
+        _save_manifest(graphs_dir, manifest)
+
+    return [results[ticker] for ticker in frames]
+
 
-    # Show the plot
+def _show_saved(plot_file: Path) -> None:
+    """Display a saved plot image without rendering the chart again.
+
+    Args:
+        plot_file: Path of the saved plot image
+    """
+    fig = pyplot.figure(figsize=constants.FIGURE_SIZE)
+    ax = fig.add_axes((0, 0, 1, 1))
+    ax.imshow(pyplot.imread(plot_file))
+    ax.axis("off")
     pyplot.show()
+    pyplot.close(fig)
+
+
+def _is_up_to_date(plot_file: Path, fingerprint: str, manifest: dict[str, str]) -> bool:
+    """Return whether a saved plot was rendered from the given fingerprint."""
+    return manifest.get(plot_file.name) == fingerprint and plot_file.exists()
+
+
+def _load_manifest(graphs_dir: Path) -> dict[str, str]:
+    """Load the mapping of plot file name to fingerprint.
+
+    Args:
+        graphs_dir: Graphs directory
+
+    Returns:
+        Manifest contents, empty if there is no readable manifest
+    """
+    manifest_file = graphs_dir / constants.PLOT_MANIFEST_FILE
+    try:
+        manifest: dict[str, str] = json.loads(manifest_file.read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    return manifest
+
+
+def _save_manifest(graphs_dir: Path, manifest: dict[str, str]) -> None:
+    """Atomically write the mapping of plot file name to fingerprint.
+
+    Args:
+        graphs_dir: Graphs directory
+        manifest: Manifest contents
+    """
+    manifest_file = graphs_dir / constants.PLOT_MANIFEST_FILE
+    with directory_utils.atomic_path(manifest_file) as tmp_path:
+        tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
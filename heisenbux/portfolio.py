@@ -0,0 +1,388 @@
+"""Portfolio model with array-backed holdings and vectorized valuation.
+
+The portfolio configuration (``portfolio.yaml``) is parsed into flat arrays
+with one entry per lot: a ticker id, an account id, the number of shares,
+the cost basis and the purchase date. Names live in small lookup lists, so
+valuing every lot of every account is a single gather and a ``bincount``.
+
+Parsing YAML is slow for large portfolios, so the parsed arrays are cached
+as a NumPy archive in ``cache/portfolio``, keyed on the configuration
+file's path, size and modification time. Later loads of an unchanged file
+read the archive instead of the YAML.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import yaml
+
+from heisenbux import constants, directory_utils, finance, panel
+
+FloatArray = npt.NDArray[np.float64]
+IdArray = npt.NDArray[np.int32]
+
+Keys = constants.PortfolioKeys
+
+_META_KEY = "meta"
+_CACHE_KEY = "cache_key"
+_LOT_ARRAYS = ("lot_ticker", "lot_account", "shares", "cost_basis", "purchase_date")
+_TRANSACTION_ARRAYS = ("date", "account", "kind", "ticker", "shares", "price", "fees")
+_TRANSACTION_PREFIX = "transaction_"
+_TRANSACTION_TYPES = list(constants.TransactionTypes)
+
+
+@dataclass(frozen=True)
+class Transactions:
+    """Transaction log as parallel arrays, one entry per transaction.
+
+    Attributes:
+        date: Trade dates as ``datetime64[D]``
+        account: Account id of each transaction
+        kind: Index into ``constants.TransactionTypes`` of each transaction
+        ticker: Ticker id of each transaction
+        shares: Number of shares traded
+        price: Price per share
+        fees: Fees paid
+    """
+
+    date: npt.NDArray[np.datetime64]
+    account: IdArray
+    kind: npt.NDArray[np.int8]
+    ticker: IdArray
+    shares: FloatArray
+    price: FloatArray
+    fees: FloatArray
+
+
+@dataclass(frozen=True)
+class Portfolio:
+    """Holdings of all accounts as parallel lot arrays.
+
+    Attributes:
+        name: Portfolio name
+        currency: Currency of all values
+        accounts: Account names; account ids index this list
+        account_types: Account type of each account (e.g. 'roth_ira')
+        tickers: Ticker symbols; ticker ids index this list
+        lot_ticker: Ticker id of each lot
+        lot_account: Account id of each lot
+        shares: Number of shares of each lot
+        cost_basis: Total cost basis of each lot
+        purchase_date: Purchase date of each lot as ``datetime64[D]``
+        transactions: Transaction log
+        preferences: Rebalancing preferences as written in the configuration
+    """
+
+    name: str
+    currency: str
+    accounts: list[str]
+    account_types: list[str]
+    tickers: list[str]
+    lot_ticker: IdArray
+    lot_account: IdArray
+    shares: FloatArray
+    cost_basis: FloatArray
+    purchase_date: npt.NDArray[np.datetime64]
+    transactions: Transactions
+    preferences: dict[str, Any] = field(default_factory=dict)
+
+    def account_mask(self, account: str) -> npt.NDArray[np.bool_]:
+        """Return which lots belong to an account.
+
+        Args:
+            account: Account name
+
+        Returns:
+            Boolean array with one entry per lot
+
+        Raises:
+            KeyError: If there is no such account
+        """
+        if account not in self.accounts:
+            raise KeyError(f"No account named {account!r}")
+        mask: npt.NDArray[np.bool_] = self.lot_account == self.accounts.index(account)
+        return mask
+
+    def value(self, closes: FloatArray) -> "Valuation":
+        """Value every lot at given prices.
+
+        Args:
+            closes: Price of each ticker, in ``tickers`` order; NaN marks a
+                missing price and propagates to the totals it affects
+
+        Returns:
+            Valuation of the lots, accounts, tickers and whole portfolio
+        """
+        lot_values = self.shares * np.asarray(closes, dtype=np.float64)[self.lot_ticker]
+        return Valuation(
+            portfolio=self,
+            lot_values=lot_values,
+            account_values=_sum_by(self.lot_account, lot_values, len(self.accounts)),
+            ticker_values=_sum_by(self.lot_ticker, lot_values, len(self.tickers)),
+        )
+
+
+@dataclass(frozen=True)
+class Valuation:
+    """Market value of a portfolio.
+
+    Attributes:
+        portfolio: Portfolio that was valued
+        lot_values: Market value of each lot
+        account_values: Market value of each account
+        ticker_values: Market value held in each ticker across accounts
+    """
+
+    portfolio: Portfolio
+    lot_values: FloatArray
+    account_values: FloatArray
+    ticker_values: FloatArray
+
+    @property
+    def total(self) -> float:
+        """Market value of the whole portfolio."""
+        return float(self.account_values.sum())
+
+    @property
+    def unrealized_gains(self) -> FloatArray:
+        """Market value minus cost basis of each lot."""
+        gains: FloatArray = self.lot_values - self.portfolio.cost_basis
+        return gains
+
+    def by_account(self) -> pd.Series:
+        """Return the market value of each account, indexed by name."""
+        return pd.Series(self.account_values, index=self.portfolio.accounts)
+
+    def by_ticker(self) -> pd.Series:
+        """Return the market value held in each ticker, indexed by symbol."""
+        return pd.Series(self.ticker_values, index=self.portfolio.tickers)
+
+
+def load_portfolio(path: Path | str = constants.PORTFOLIO_FILE) -> Portfolio:
+    """Load a portfolio configuration, using the parsed cache when current.
+
+    Args:
+        path: Path of the YAML configuration
+
+    Returns:
+        Parsed portfolio
+
+    Raises:
+        FileNotFoundError: If the configuration does not exist
+        ValueError: If the configuration is malformed
+    """
+    config_file = Path(path).resolve()
+    stat = config_file.stat()
+    key = [str(config_file), stat.st_mtime_ns, stat.st_size]
+
+    cache_dir = directory_utils.ensure_directory_exists(
+        constants.Directories.PORTFOLIO_CACHE
+    )
+    digest = hashlib.sha256(str(config_file).encode()).hexdigest()[:16]
+    cache_file = cache_dir / f"{digest}{constants.FileExtensions.NPZ}"
+
+    cached = _read_cache(cache_file, key)
+    if cached is not None:
+        return cached
+
+    portfolio = parse_portfolio(config_file.read_text())
+    _write_cache(portfolio, cache_file, key)
+    return portfolio
+
+
+def parse_portfolio(text: str) -> Portfolio:
+    """Parse the text of a portfolio configuration.
+
+    Args:
+        text: YAML configuration
+
+    Returns:
+        Parsed portfolio
+
+    Raises:
+        ValueError: If the configuration is malformed
+    """
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    config = yaml.load(text, Loader=loader)  # nosec B506
+    if not isinstance(config, dict):
+        raise ValueError("Portfolio configuration must be a mapping")
+
+    try:
+        return _build_portfolio(config)
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Malformed portfolio configuration: {e}") from e
+
+
+def value_portfolio(portfolio: Portfolio) -> Valuation:
+    """Value a portfolio at the latest cached closing prices.
+
+    Args:
+        portfolio: Portfolio to value
+
+    Returns:
+        Valuation at the latest close of each ticker
+    """
+    prices = finance.load_panel(portfolio.tickers)
+    return portfolio.value(latest_closes(prices))
+
+
+def latest_closes(prices: panel.PricePanel) -> FloatArray:
+    """Return the last available closing price of each ticker in a panel.
+
+    Args:
+        prices: Price panel
+
+    Returns:
+        Last non-NaN close of each ticker, or NaN for tickers without any
+    """
+    close = np.asarray(prices[constants.DataFrameColumns.CLOSE])
+    if not len(close):
+        return np.full(len(prices.tickers), np.nan)
+    valid = ~np.isnan(close)
+    last = len(close) - 1 - np.argmax(valid[::-1], axis=0)
+    result: FloatArray = np.where(
+        valid.any(axis=0), close[last, np.arange(close.shape[1])], np.nan
+    )
+    return result
+
+
+def _build_portfolio(config: dict[str, Any]) -> Portfolio:
+    """Flatten a parsed configuration into lot arrays."""
+    header = config.get(Keys.PORTFOLIO) or {}
+    accounts = config.get(Keys.ACCOUNTS) or []
+    account_names = [str(account[Keys.NAME]) for account in accounts]
+    account_ids = {name: i for i, name in enumerate(account_names)}
+    ticker_ids: dict[str, int] = {}
+
+    def ticker_id(symbol: Any) -> int:
+        return ticker_ids.setdefault(str(symbol).upper(), len(ticker_ids))
+
+    lots = [
+        (
+            ticker_id(holding[Keys.TICKER]),
+            account_id,
+            float(holding[Keys.SHARES]),
+            float(holding.get(Keys.COST_BASIS) or 0.0),
+            _to_day(holding.get(Keys.PURCHASE_DATE)),
+        )
+        for account_id, account in enumerate(accounts)
+        for holding in account.get(Keys.HOLDINGS) or []
+    ]
+
+    rows = []
+    for entry in config.get(Keys.TRANSACTIONS) or []:
+        account = str(entry[Keys.ACCOUNT])
+        if account not in account_ids:
+            raise ValueError(f"Transaction refers to unknown account {account!r}")
+        kind = constants.TransactionTypes(str(entry[Keys.TYPE]).lower())
+        rows.append(
+            (
+                _to_day(entry[Keys.DATE]),
+                account_ids[account],
+                _TRANSACTION_TYPES.index(kind),
+                ticker_id(entry[Keys.TICKER]),
+                float(entry[Keys.SHARES]),
+                float(entry[Keys.PRICE]),
+                float(entry.get(Keys.FEES) or 0.0),
+            )
+        )
+
+    lot_columns = list(zip(*lots, strict=True)) or [()] * len(_LOT_ARRAYS)
+    row_columns = list(zip(*rows, strict=True)) or [()] * len(_TRANSACTION_ARRAYS)
+    return Portfolio(
+        name=str(header.get(Keys.NAME, "")),
+        currency=str(header.get(Keys.CURRENCY, constants.DEFAULT_CURRENCY)),
+        accounts=account_names,
+        account_types=[str(account.get(Keys.TYPE, "")) for account in accounts],
+        tickers=list(ticker_ids),
+        lot_ticker=np.array(lot_columns[0], dtype=np.int32),
+        lot_account=np.array(lot_columns[1], dtype=np.int32),
+        shares=np.array(lot_columns[2], dtype=np.float64),
+        cost_basis=np.array(lot_columns[3], dtype=np.float64),
+        purchase_date=np.array(lot_columns[4], dtype="datetime64[D]"),
+        transactions=Transactions(
+            date=np.array(row_columns[0], dtype="datetime64[D]"),
+            account=np.array(row_columns[1], dtype=np.int32),
+            kind=np.array(row_columns[2], dtype=np.int8),
+            ticker=np.array(row_columns[3], dtype=np.int32),
+            shares=np.array(row_columns[4], dtype=np.float64),
+            price=np.array(row_columns[5], dtype=np.float64),
+            fees=np.array(row_columns[6], dtype=np.float64),
+        ),
+        preferences=dict(config.get(Keys.REBALANCING_PREFERENCES) or {}),
+    )
+
+
+def _sum_by(ids: IdArray, values: FloatArray, size: int) -> FloatArray:
+    """Sum values per id, for ids from zero to ``size - 1``."""
+    sums: FloatArray = np.bincount(ids, weights=values, minlength=size).astype(
+        np.float64, copy=False
+    )
+    return sums
+
+
+def _to_day(value: Any) -> np.datetime64:
+    """Convert a YAML date (or missing date) to ``datetime64[D]``."""
+    if value is None:
+        return np.datetime64("NaT", "D")
+    if isinstance(value, date):
+        return np.datetime64(value.isoformat()[:10], "D")
+    return np.datetime64(str(value), "D")
+
+
+def _read_cache(cache_file: Path, key: list[Any]) -> Portfolio | None:
+    """Load a parsed portfolio if the cache was built from the same file."""
+    try:
+        with np.load(cache_file, allow_pickle=False) as archive:
+            meta = json.loads(str(archive[_META_KEY]))
+            if meta.get(_CACHE_KEY) != [*key, constants.PORTFOLIO_CACHE_VERSION]:
+                return None
+            lots = {name: archive[name] for name in _LOT_ARRAYS}
+            transactions = {
+                name: archive[f"{_TRANSACTION_PREFIX}{name}"]
+                for name in _TRANSACTION_ARRAYS
+            }
+    except (FileNotFoundError, KeyError, ValueError, OSError):
+        return None
+
+    return Portfolio(
+        name=meta[Keys.NAME],
+        currency=meta[Keys.CURRENCY],
+        accounts=meta[Keys.ACCOUNTS],
+        account_types=meta[Keys.TYPE],
+        tickers=meta[Keys.TICKER],
+        transactions=Transactions(**transactions),
+        preferences=meta[Keys.REBALANCING_PREFERENCES],
+        **lots,
+    )
+
+
+def _write_cache(portfolio: Portfolio, cache_file: Path, key: list[Any]) -> None:
+    """Atomically save a parsed portfolio with the key of its source file."""
+    meta = {
+        _CACHE_KEY: [*key, constants.PORTFOLIO_CACHE_VERSION],
+        Keys.NAME: portfolio.name,
+        Keys.CURRENCY: portfolio.currency,
+        Keys.ACCOUNTS: portfolio.accounts,
+        Keys.TYPE: portfolio.account_types,
+        Keys.TICKER: portfolio.tickers,
+        Keys.REBALANCING_PREFERENCES: portfolio.preferences,
+    }
+    arrays = {name: getattr(portfolio, name) for name in _LOT_ARRAYS}
+    arrays.update(
+        {
+            f"{_TRANSACTION_PREFIX}{name}": getattr(portfolio.transactions, name)
+            for name in _TRANSACTION_ARRAYS
+        }
+    )
+    with directory_utils.atomic_path(cache_file) as tmp_path, tmp_path.open("wb") as f:
+        np.savez(
+            f, allow_pickle=False, **{_META_KEY: np.array(json.dumps(meta))}, **arrays
+        )
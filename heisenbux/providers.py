@@ -0,0 +1,296 @@
+"""Asynchronous fetch layer for price data providers.
+
+Blocking provider calls run in worker threads under asyncio, with:
+
+- a concurrency limit on requests in flight to the provider host,
+- a token bucket capping the request rate,
+- a timeout per attempt and jittered exponential backoff between attempts;
+  an abandoned attempt keeps its concurrency slot until its worker thread
+  returns, since the thread cannot be cancelled,
+- request coalescing, so concurrent callers asking for the same data share a
+  single in-flight request.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+import pandas as pd
+
+from heisenbux import constants
+
+logger = logging.getLogger(__name__)
+
+FetchFunction = Callable[[str, datetime, datetime], pd.DataFrame]
+SleepFunction = Callable[[float], Awaitable[None]]
+
+
+class ProviderThrottledError(Exception):
+    """Raised when the provider rejects a request for exceeding its rate limit."""
+
+
+def yfinance_history(ticker: str, start: datetime, end: datetime) -> pd.DataFrame:
+    """Fetch daily history for a ticker from yfinance.
+
+    Args:
+        ticker: Stock ticker symbol
+        start: First date to fetch
+        end: Date to fetch up to
+
+    Returns:
+        DataFrame with stock data
+
+    Raises:
+        ProviderThrottledError: If yfinance reports rate limiting
+    """
+    import yfinance as yf
+    from yfinance.exceptions import YFRateLimitError
+
+    try:
+        df: pd.DataFrame = yf.Ticker(ticker).history(start=start, end=end)
+    except YFRateLimitError as e:
+        raise ProviderThrottledError(str(e)) from e
+    return df
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Timeout and backoff settings for provider requests.
+
+    Attributes:
+        max_attempts: Attempts per request, including the first one
+        timeout: Seconds before a single attempt is abandoned
+        base_delay: Backoff ceiling in seconds after the first failure
+        max_delay: Upper bound in seconds for the backoff ceiling
+        retry_on: Exception types that are retried; ``OSError`` covers
+            timeouts and the connection errors of requests and curl_cffi,
+            which do not derive from the builtin ``ConnectionError``
+    """
+
+    max_attempts: int = constants.PROVIDER_MAX_ATTEMPTS
+    timeout: float = constants.PROVIDER_TIMEOUT_SECONDS
+    base_delay: float = constants.PROVIDER_BACKOFF_BASE_SECONDS
+    max_delay: float = constants.PROVIDER_BACKOFF_MAX_SECONDS
+    retry_on: tuple[type[BaseException], ...] = (OSError, ProviderThrottledError)
+
+    def backoff(self, attempt: int, rng: random.Random) -> float:
+        """Return the delay before retrying after a failed attempt.
+
+        Uses "full jitter": a uniform draw between zero and an exponentially
+        growing ceiling, which spreads out retries from many callers.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first)
+            rng: Random number generator for the jitter
+
+        Returns:
+            Delay in seconds
+        """
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return rng.uniform(0, ceiling)
+
+
+class TokenBucket:
+    """Token-bucket rate limiter for asyncio tasks.
+
+    Tokens accrue at ``rate`` per second up to ``capacity``. Each request
+    takes one token, waiting until one is available.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: SleepFunction = asyncio.sleep,
+    ) -> None:
+        """Create a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum number of tokens, i.e. the allowed burst
+            clock: Monotonic clock in seconds
+            sleep: Coroutine function used to wait for tokens
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait for a token and take it."""
+        async with self._lock:
+            while True:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await self._sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of fetching many tickers.
+
+    Attributes:
+        frames: DataFrame of each ticker fetched successfully
+        errors: Final exception of each ticker that failed
+    """
+
+    frames: dict[str, pd.DataFrame] = field(default_factory=dict)
+    errors: dict[str, BaseException] = field(default_factory=dict)
+
+
+class AsyncProvider:
+    """Rate-limited, retrying, coalescing async client for one provider host.
+
+    Limits apply per instance, so share one instance for all requests to a
+    host. An instance must only be used from a single event loop.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        fetch: FetchFunction = yfinance_history,
+        host: str = constants.PROVIDER_HOST,
+        max_concurrency: int = constants.PROVIDER_MAX_CONCURRENCY,
+        rate_limiter: TokenBucket | None = None,
+        retry: RetryPolicy | None = None,
+        sleep: SleepFunction = asyncio.sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        """Create a provider client.
+
+        Args:
+            fetch: Blocking function fetching history for one ticker
+            host: Provider host name, used in error messages
+            max_concurrency: Maximum number of requests in flight at once
+            rate_limiter: Token bucket shared by all requests, or None for
+                the default provider rate
+            retry: Timeout and backoff settings, or None for the defaults
+            sleep: Coroutine function used to wait between attempts
+            rng: Random number generator for backoff jitter
+        """
+        self.host = host
+        self._fetch = fetch
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = rate_limiter or TokenBucket(
+            constants.PROVIDER_RATE_PER_SECOND, constants.PROVIDER_BURST
+        )
+        self._retry = retry or RetryPolicy()
+        self._sleep = sleep
+        self._rng = rng or random.Random()  # nosec B311
+        self._in_flight: dict[tuple[str, date, date], asyncio.Task[pd.DataFrame]] = {}
+
+    async def history(
+        self, ticker: str, start: datetime, end: datetime
+    ) -> pd.DataFrame:
+        """Fetch history for a ticker, sharing identical in-flight requests.
+
+        Args:
+            ticker: Stock ticker symbol
+            start: First date to fetch
+            end: Date to fetch up to
+
+        Returns:
+            DataFrame with stock data
+
+        Raises:
+            ValueError: If no data found for the ticker
+            Exception: The last error once all retries are exhausted
+        """
+        # Daily bars only depend on the dates, and callers compute ``end``
+        # from the current time, so key on the dates like the memory cache
+        key = (ticker.upper(), start.date(), end.date())
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_with_retry(ticker, start, end))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def history_many(
+        self, tickers: list[str], start: datetime, end: datetime
+    ) -> BatchResult:
+        """Fetch history for many tickers concurrently.
+
+        Args:
+            tickers: Stock ticker symbols
+            start: First date to fetch
+            end: Date to fetch up to
+
+        Returns:
+            BatchResult with the frames and errors of each ticker
+        """
+        unique = list(dict.fromkeys(tickers))
+        outcomes = await asyncio.gather(
+            *(self.history(ticker, start, end) for ticker in unique),
+            return_exceptions=True,
+        )
+        result = BatchResult()
+        for ticker, outcome in zip(unique, outcomes, strict=True):
+            if isinstance(outcome, BaseException):
+                result.errors[ticker] = outcome
+            else:
+                result.frames[ticker] = outcome
+        return result
+
+    async def _fetch_with_retry(
+        self, ticker: str, start: datetime, end: datetime
+    ) -> pd.DataFrame:
+        """Fetch history, retrying transient failures with backoff."""
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._rate_limiter.acquire()
+            try:
+                df = await self._attempt(ticker, start, end)
+            except self._retry.retry_on as e:
+                if attempt >= self._retry.max_attempts:
+                    raise
+                delay = self._retry.backoff(attempt, self._rng)
+                logger.warning(
+                    "Retrying %s from %s in %.1fs after %s",
+                    ticker,
+                    self.host,
+                    delay,
+                    type(e).__name__,
+                )
+                await self._sleep(delay)
+                continue
+
+            if df.empty:
+                raise ValueError(f"No data found for ticker {ticker}")
+            return df
+
+    async def _attempt(
+        self, ticker: str, start: datetime, end: datetime
+    ) -> pd.DataFrame:
+        """Run one fetch in a worker thread under the concurrency limit.
+
+        A timeout only stops waiting for the worker; the thread keeps its
+        concurrency slot until the fetch actually returns.
+        """
+        await self._semaphore.acquire()
+        worker = asyncio.ensure_future(
+            asyncio.to_thread(self._fetch, ticker, start, end)
+        )
+        worker.add_done_callback(self._release_slot)
+        return await asyncio.wait_for(asyncio.shield(worker), self._retry.timeout)
+
+    def _release_slot(self, worker: asyncio.Future[pd.DataFrame]) -> None:
+        """Free the concurrency slot of a finished worker thread."""
+        self._semaphore.release()
+        if not worker.cancelled():
+            # Mark the outcome of abandoned attempts as retrieved
+            worker.exception()
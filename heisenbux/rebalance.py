@@ -0,0 +1,403 @@
+"""Tax-aware rebalancing over the lot arrays of a portfolio.
+
+A :class:`Rebalancer` prepares everything that does not depend on prices
+once: lot groupings, holding periods, which accounts are taxable and which
+lots or tickers are caught by the wash-sale rule. :meth:`Rebalancer.plan`
+then computes trades for a set of prices with a handful of array
+operations, cheap enough to run on every price update.
+
+Sales are filled ticker by ticker from the lots with the lowest tax cost
+per dollar sold: harvestable losses first, then tax-advantaged accounts,
+then long-term and finally short-term gains. The cash each sale frees stays
+in its account and buys the underweight tickers in proportion to their
+shortfall, so no ticker is bought and sold in the same plan.
+
+Wash sales are checked against a :class:`WashSaleIndex` of past purchases
+and loss sales. Losses on tickers bought within the window count as
+disallowed, and tickers sold at a loss within the window are not bought
+back; the cash meant for them is reported as deferred.
+"""
+
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from heisenbux import constants, ledger, portfolio
+
+FloatArray = npt.NDArray[np.float64]
+BoolArray = npt.NDArray[np.bool_]
+
+# Ticker ids are packed above the day number into one sortable event key
+_DAY_BITS = 32
+
+
+class WashSaleIndex:
+    """Sorted purchase and loss-sale dates of each ticker.
+
+    Events are stored as sorted integer keys combining a ticker id and the
+    day, so checking any number of tickers for events inside a window is
+    two ``searchsorted`` calls.
+    """
+
+    def __init__(
+        self,
+        purchases: tuple[Sequence[str], npt.ArrayLike],
+        losses: tuple[Sequence[str], npt.ArrayLike],
+    ) -> None:
+        """Build an index.
+
+        Args:
+            purchases: Tickers and dates of purchases (including reinvested
+                dividends)
+            losses: Tickers and dates of sales that realized a loss
+        """
+        symbols = sorted({ticker.upper() for ticker in [*purchases[0], *losses[0]]})
+        self._ids = {ticker: i for i, ticker in enumerate(symbols)}
+        self._purchases = self._keys(*purchases)
+        self._losses = self._keys(*losses)
+
+    @classmethod
+    def from_ledger(
+        cls, book: ledger.Ledger, since: date | str | None = None
+    ) -> "WashSaleIndex":
+        """Index the purchases and loss sales recorded in a ledger.
+
+        Args:
+            book: Transaction ledger
+            since: Ignore events before this day, or None to index everything
+
+        Returns:
+            WashSaleIndex of the ledger's events
+        """
+        trades = book.transactions(start=since)
+        opening = [constants.TransactionTypes.BUY, constants.TransactionTypes.REINVEST]
+        bought = trades[trades["type"].isin(opening)]
+        sales = book.realized_gains(start=since)
+        lost = sales[sales["gain"] < 0]
+        return cls(
+            (list(bought["ticker"]), bought["date"].to_numpy(dtype="datetime64[D]")),
+            (list(lost["ticker"]), lost["date"].to_numpy(dtype="datetime64[D]")),
+        )
+
+    def recent_purchases(
+        self, tickers: Sequence[str], day: np.datetime64, window: int
+    ) -> BoolArray:
+        """Return which tickers were bought within a window of days.
+
+        Args:
+            tickers: Ticker symbols to check
+            day: Last day of the window
+            window: Number of days the window reaches back
+
+        Returns:
+            Boolean array with one entry per ticker
+        """
+        return self._any_between(self._purchases, tickers, day, window)
+
+    def recent_losses(
+        self, tickers: Sequence[str], day: np.datetime64, window: int
+    ) -> BoolArray:
+        """Return which tickers were sold at a loss within a window of days.
+
+        Args:
+            tickers: Ticker symbols to check
+            day: Last day of the window
+            window: Number of days the window reaches back
+
+        Returns:
+            Boolean array with one entry per ticker
+        """
+        return self._any_between(self._losses, tickers, day, window)
+
+    def _ids_of(self, tickers: Sequence[str]) -> npt.NDArray[np.int64]:
+        """Return the id of each ticker, or -1 for tickers without events."""
+        return np.array(
+            [self._ids.get(ticker.upper(), -1) for ticker in tickers], dtype=np.int64
+        )
+
+    def _keys(
+        self, tickers: Sequence[str], dates: npt.ArrayLike
+    ) -> npt.NDArray[np.int64]:
+        """Pack tickers and their event days into sorted keys."""
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        keys: npt.NDArray[np.int64] = np.sort(
+            (self._ids_of(tickers) << _DAY_BITS) + days
+        )
+        return keys
+
+    def _any_between(
+        self,
+        keys: npt.NDArray[np.int64],
+        tickers: Sequence[str],
+        day: np.datetime64,
+        window: int,
+    ) -> BoolArray:
+        """Return which tickers have an event in ``[day - window, day]``."""
+        last = int(np.asarray(day, dtype="datetime64[D]").astype(np.int64))
+        ids = self._ids_of(tickers)
+        base = ids << _DAY_BITS
+        found: BoolArray = (ids >= 0) & (
+            np.searchsorted(keys, base + last, side="right")
+            > np.searchsorted(keys, base + last - window, side="left")
+        )
+        return found
+
+
+@dataclass(frozen=True)
+class RebalancePlan:
+    """Trades that bring a portfolio to its target weights.
+
+    Attributes:
+        holdings: Portfolio the plan was computed for
+        tickers: Ticker symbols; columns of the per-ticker arrays
+        accounts: Account names; rows of the per-account arrays
+        prices: Price of each ticker the plan was computed for
+        sell_shares: Shares sold from each lot of the portfolio
+        buy_value: Value bought of shape (accounts, tickers)
+        deferred: Value per ticker not bought because it would be a wash sale
+        realized_gains: Gain (negative for a loss) realized on each lot
+        disallowed: Lots whose loss would be disallowed by the wash-sale rule
+        estimated_tax: Tax owed (negative for a saving) on the realized gains
+    """
+
+    holdings: portfolio.Portfolio
+    tickers: list[str]
+    accounts: list[str]
+    prices: FloatArray
+    sell_shares: FloatArray
+    buy_value: FloatArray
+    deferred: FloatArray
+    realized_gains: FloatArray
+    disallowed: BoolArray
+    estimated_tax: float
+
+    @property
+    def buy_shares(self) -> FloatArray:
+        """Shares bought of shape (accounts, tickers)."""
+        shares: FloatArray = self.buy_value / self.prices
+        return shares
+
+    @property
+    def turnover(self) -> float:
+        """Total value bought."""
+        return float(self.buy_value.sum())
+
+    def trades(self) -> pd.DataFrame:
+        """Summarize the plan as one trade per account, ticker and side.
+
+        Returns:
+            DataFrame with account, ticker, action, shares and value columns
+        """
+        size = len(self.accounts) * len(self.tickers)
+        cells = self.holdings.lot_account * len(self.tickers) + self.holdings.lot_ticker
+        sold = np.bincount(cells, weights=self.sell_shares, minlength=size)
+        sold = sold.reshape(len(self.accounts), len(self.tickers))
+        rows = []
+        for action, shares in (
+            (constants.TransactionTypes.SELL, sold),
+            (constants.TransactionTypes.BUY, self.buy_shares),
+        ):
+            for account, ticker in zip(*np.nonzero(shares > 0), strict=True):
+                rows.append(
+                    (
+                        self.accounts[account],
+                        self.tickers[ticker],
+                        str(action),
+                        float(shares[account, ticker]),
+                        float(shares[account, ticker] * self.prices[ticker]),
+                    )
+                )
+        return pd.DataFrame(
+            rows, columns=["account", "ticker", "action", "shares", "value"]
+        )
+
+
+class Rebalancer:
+    """Rebalancing engine for one portfolio and set of target weights."""
+
+    def __init__(  # noqa: PLR0913
+        self,
+        lots: portfolio.Portfolio,
+        targets: Mapping[str, float],
+        wash_sales: WashSaleIndex | None = None,
+        today: date | str | None = None,
+        threshold: float | None = None,
+        short_term_rate: float = constants.SHORT_TERM_TAX_RATE,
+        long_term_rate: float = constants.LONG_TERM_TAX_RATE,
+    ) -> None:
+        """Prepare a portfolio for rebalancing.
+
+        Args:
+            lots: Portfolio to rebalance
+            targets: Target weight of each ticker; held tickers without a
+                target are sold
+            wash_sales: Past purchases and loss sales, or None to use the
+                purchase dates of the portfolio's lots, where a lot's loss is
+                disallowed only if another lot of its ticker was bought
+                within the window
+            today: Trade date, or None for today
+            threshold: Only trade tickers whose weight is further than this
+                from its target, or None for the portfolio's rebalancing
+                preference (zero if it has none)
+            short_term_rate: Tax rate on gains held up to a year
+            long_term_rate: Tax rate on gains held longer
+
+        Raises:
+            ValueError: If the target weights do not sum to one
+        """
+        total = sum(targets.values())
+        if abs(total - 1) > constants.WEIGHT_SUM_TOLERANCE:
+            raise ValueError(f"Target weights sum to {total:g}, not 1")
+
+        self.lots = lots
+        held = list(lots.tickers)
+        self.tickers = held + sorted({ticker.upper() for ticker in targets} - set(held))
+        ids = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self.targets = np.zeros(len(self.tickers))
+        for ticker, weight in targets.items():
+            self.targets[ids[ticker.upper()]] = weight
+        if threshold is None:
+            threshold = float(
+                lots.preferences.get(constants.PortfolioKeys.REBALANCE_THRESHOLD, 0.0)
+            )
+        self.threshold = threshold
+
+        day = np.datetime64(today or date.today(), "D")
+        window = constants.WASH_SALE_DAYS
+        # A loss on a ticker bought within the window is disallowed, and a
+        # ticker sold at a loss within the window must not be bought back
+        if wash_sales is None:
+            # A lot's own purchase does not wash its loss; only another lot
+            # of the same ticker bought within the window does
+            age = (day - lots.purchase_date).astype(np.int64)
+            recent = ~np.isnat(lots.purchase_date) & (np.abs(age) <= window)
+            bought = np.bincount(
+                lots.lot_ticker, weights=recent, minlength=len(self.tickers)
+            )
+            self.disallow_loss: BoolArray = bought[lots.lot_ticker] - recent > 0
+            self.block_buy = np.zeros(len(self.tickers), dtype=np.bool_)
+        else:
+            self.disallow_loss = wash_sales.recent_purchases(self.tickers, day, window)[
+                lots.lot_ticker
+            ]
+            self.block_buy = wash_sales.recent_losses(self.tickers, day, window)
+
+        taxable_accounts = np.array(
+            [kind == constants.AccountTypes.TAXABLE for kind in lots.account_types],
+            dtype=np.bool_,
+        )
+        self.taxable = taxable_accounts[lots.lot_account]
+        long_term = (day - lots.purchase_date).astype(
+            np.int64
+        ) > constants.LONG_TERM_HOLDING_DAYS
+        # Lots without a purchase date are taxed as short-term gains
+        long_term &= ~np.isnat(lots.purchase_date)
+        self.tax_rates = np.where(
+            self.taxable, np.where(long_term, long_term_rate, short_term_rate), 0.0
+        )
+        self.cost_per_share = np.divide(
+            lots.cost_basis,
+            lots.shares,
+            out=np.zeros_like(lots.cost_basis),
+            where=lots.shares > 0,
+        )
+        # Start of each ticker's lots once lots are sorted by ticker
+        sorted_tickers = np.sort(lots.lot_ticker)
+        self.group_starts = np.searchsorted(
+            sorted_tickers, np.arange(len(self.tickers))
+        )
+        self.held = np.bincount(lots.lot_ticker, minlength=len(self.tickers)) > 0
+
+    def plan(self, prices: Mapping[str, float] | FloatArray) -> RebalancePlan:
+        """Compute the trades that restore the target weights.
+
+        Args:
+            prices: Current price of each ticker, either by symbol or as an
+                array in ``tickers`` order
+
+        Returns:
+            RebalancePlan of the sales and purchases
+
+        Raises:
+            ValueError: If a held or targeted ticker has no valid price, or
+                the portfolio has no value
+        """
+        if isinstance(prices, Mapping):
+            symbols = {ticker.upper(): price for ticker, price in prices.items()}
+            prices = np.array([symbols.get(t, np.nan) for t in self.tickers])
+        prices = np.asarray(prices, dtype=np.float64)
+        needed = self.held | (self.targets > 0)
+        invalid = needed & ~(prices > 0)
+        if invalid.any():
+            missing = [t for t, bad in zip(self.tickers, invalid, strict=True) if bad]
+            raise ValueError(f"No valid price for {', '.join(missing)}")
+
+        lots = self.lots
+        lot_prices = prices[lots.lot_ticker]
+        lot_values = lots.shares * lot_prices
+        holdings = np.bincount(
+            lots.lot_ticker, weights=lot_values, minlength=len(self.tickers)
+        )
+        total = float(holdings.sum())
+        if total <= 0:
+            raise ValueError("Portfolio has no value to rebalance")
+
+        targets = self.targets * total
+        drift = np.abs(holdings / total - self.targets) > self.threshold
+        surplus = np.where(drift, np.maximum(holdings - targets, 0.0), 0.0)
+        deficit = np.where(drift, np.maximum(targets - holdings, 0.0), 0.0)
+
+        # Tax cost per dollar sold; losses the wash-sale rule would disallow
+        # bring no saving
+        gain_per_share = lot_prices - self.cost_per_share
+        disallowed = self.taxable & (gain_per_share < 0) & self.disallow_loss
+        tax_cost = np.where(disallowed, 0.0, self.tax_rates * gain_per_share)
+        tax_cost /= np.where(lot_prices > 0, lot_prices, 1.0)
+
+        # Fill each ticker's surplus from its cheapest lots to sell
+        order = np.lexsort((tax_cost, lots.lot_ticker))
+        ordered_values = lot_values[order]
+        running = np.cumsum(ordered_values)
+        before_group = np.concatenate([[0.0], running])[self.group_starts]
+        tickers = lots.lot_ticker[order]
+        sold_before = running - ordered_values - before_group[tickers]
+        sold_value = np.empty_like(lot_values)
+        sold_value[order] = np.clip(surplus[tickers] - sold_before, 0.0, ordered_values)
+        sell_shares = np.divide(
+            sold_value,
+            lot_prices,
+            out=np.zeros_like(sold_value),
+            where=lot_prices > 0,
+        )
+        realized = sell_shares * gain_per_share
+        disallowed &= sell_shares > 0
+        tax = float(np.sum(np.where(disallowed, 0.0, realized * self.tax_rates)))
+
+        # Cash freed in each account buys the shortfalls pro rata
+        cash = np.bincount(
+            lots.lot_account, weights=sold_value, minlength=len(lots.accounts)
+        )
+        scale = max(float(deficit.sum()), float(cash.sum()))
+        bought = np.where(self.block_buy, 0.0, deficit)
+        funded = float(cash.sum()) / scale if scale > 0 else 0.0
+        buy_value = np.outer(cash, bought).astype(np.float64)
+        if scale > 0:
+            buy_value /= scale
+        deferred = np.where(self.block_buy, deficit * funded, 0.0)
+
+        return RebalancePlan(
+            holdings=lots,
+            tickers=self.tickers,
+            accounts=list(lots.accounts),
+            prices=prices,
+            sell_shares=sell_shares,
+            buy_value=buy_value,
+            deferred=deferred,
+            realized_gains=realized,
+            disallowed=disallowed,
+            estimated_tax=tax,
+        )
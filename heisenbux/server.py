@@ -0,0 +1,374 @@
+"""Long-running query server that keeps price data and analytics resident.
+
+``heisenbux serve`` loads the price store, portfolio and in-memory ticker
+cache once and answers queries over HTTP on localhost, so dashboards and
+scripts skip interpreter startup and disk parsing on every call.
+
+Every request is a POST of a JSON batch to ``/query``::
+
+    {"requests": [{"method": "prices", "params": {"tickers": ["VTI"]}}, ...]}
+
+and the response holds one entry per request, in order, each either
+``{"result": ...}`` or ``{"error": "..."}``, so one bad query does not fail
+the batch. :func:`query` is the matching client.
+"""
+
+import json
+import math
+import threading
+import urllib.request
+from collections.abc import Callable, Mapping, Sequence
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from heisenbux import analytics, constants, finance, panel, portfolio, rebalance
+
+FloatArray = npt.NDArray[np.float64]
+Methods = constants.QueryMethods
+
+_REQUESTS_KEY = "requests"
+_RESULTS_KEY = "results"
+_METHOD_KEY = "method"
+_PARAMS_KEY = "params"
+_RESULT_KEY = "result"
+_ERROR_KEY = "error"
+_JSON_CONTENT_TYPE = "application/json"
+
+
+class QueryService:
+    """Resident state of the query server and the queries it answers.
+
+    The price panel, the parsed portfolio and computed metrics are kept
+    between queries. :meth:`reload` drops them, for example after the
+    nightly cache refresh.
+    """
+
+    def __init__(self, portfolio_path: Path | str = constants.PORTFOLIO_FILE) -> None:
+        """Create a service.
+
+        Args:
+            portfolio_path: Portfolio configuration used by the portfolio
+                value and rebalance queries
+        """
+        self.portfolio_path = Path(portfolio_path)
+        self._lock = threading.RLock()
+        self._panel: panel.PricePanel | None = None
+        self._portfolio: portfolio.Portfolio | None = None
+        self._metrics: dict[tuple[Any, ...], dict[str, Any]] = {}
+        self._handlers: dict[str, Callable[..., Any]] = {
+            Methods.PRICES: self.prices,
+            Methods.METRICS: self.metrics,
+            Methods.PORTFOLIO_VALUE: self.portfolio_value,
+            Methods.REBALANCE: self.rebalance,
+            Methods.RELOAD: self.reload,
+        }
+
+    def handle_batch(
+        self, requests: Sequence[Mapping[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """Answer a batch of queries.
+
+        Args:
+            requests: Queries, each with a ``method`` and optional ``params``
+
+        Returns:
+            One ``{"result": ...}`` or ``{"error": ...}`` entry per query
+        """
+        responses = []
+        for request in requests:
+            try:
+                result = self.handle(
+                    str(request[_METHOD_KEY]), request.get(_PARAMS_KEY) or {}
+                )
+            except Exception as e:
+                # Any failure, e.g. a download or lock timeout, is reported
+                # for its own query instead of dropping the connection
+                responses.append({_ERROR_KEY: f"{type(e).__name__}: {e}"})
+            else:
+                responses.append({_RESULT_KEY: _jsonable(result)})
+        return responses
+
+    def handle(self, method: str, params: Mapping[str, Any]) -> Any:
+        """Answer one query.
+
+        Args:
+            method: Query method name
+            params: Keyword arguments of the method
+
+        Returns:
+            Result of the query
+
+        Raises:
+            ValueError: If there is no such method
+        """
+        handler = self._handlers.get(method)
+        if handler is None:
+            raise ValueError(f"Unknown method {method!r}")
+        return handler(**params)
+
+    def prices(
+        self,
+        tickers: list[str],
+        start: str | None = None,
+        end: str | None = None,
+        column: str = constants.DataFrameColumns.CLOSE,
+    ) -> dict[str, Any]:
+        """Return a price column for some tickers over a date range.
+
+        Args:
+            tickers: Stock ticker symbols
+            start: First trading day, or None for the earliest
+            end: Last trading day, or None for the latest
+            column: Price column name
+
+        Returns:
+            Trading days and the price series of each ticker
+        """
+        selected = self._prices(tickers).select(tickers, start, end)
+        values = selected[column]
+        return {
+            "dates": [str(day) for day in selected.dates],
+            column: {ticker: values[:, i] for i, ticker in enumerate(selected.tickers)},
+        }
+
+    def metrics(
+        self,
+        tickers: list[str],
+        benchmark: str = constants.BENCHMARK_TICKER,
+        risk_free_rate: float = 0.0,
+    ) -> dict[str, Any]:
+        """Return the return and risk metrics of some tickers.
+
+        Results are memoized until the next :meth:`reload`.
+
+        Args:
+            tickers: Stock ticker symbols
+            benchmark: Ticker to compute beta against
+            risk_free_rate: Annual risk-free rate
+
+        Returns:
+            Mapping of ticker to its metrics
+        """
+        key = (tuple(ticker.upper() for ticker in tickers), benchmark, risk_free_rate)
+        with self._lock:
+            cached = self._metrics.get(key)
+        if cached is not None:
+            return cached
+
+        symbols = list(dict.fromkeys([*key[0], benchmark.upper()]))
+        summary = analytics.summarize(
+            self._prices(symbols).select(symbols),
+            benchmark=benchmark,
+            risk_free_rate=risk_free_rate,
+        )
+        rows = summary.loc[list(key[0])].to_dict(orient="index")
+        result = {str(ticker): metrics for ticker, metrics in rows.items()}
+        with self._lock:
+            self._metrics[key] = result
+        return result
+
+    def portfolio_value(self) -> dict[str, Any]:
+        """Return the market value of the portfolio at the latest closes."""
+        holdings = self._load_portfolio()
+        valuation = holdings.value(self._latest_closes(holdings.tickers))
+        return {
+            "total": valuation.total,
+            "by_account": valuation.by_account().to_dict(),
+            "by_ticker": valuation.by_ticker().to_dict(),
+        }
+
+    def rebalance(
+        self,
+        targets: dict[str, float],
+        today: str | None = None,
+        threshold: float | None = None,
+    ) -> dict[str, Any]:
+        """Suggest the trades that restore the given target weights.
+
+        The target allocation in the portfolio's rebalancing preferences is
+        keyed by asset class rather than ticker, so targets must be given.
+
+        Args:
+            targets: Target weight of each ticker
+            today: Trade date, or None for today
+            threshold: Minimum weight drift to trade, or None for the
+                portfolio's preference
+
+        Returns:
+            Trades, turnover, estimated tax and value deferred by the
+                wash-sale rule
+
+        Raises:
+            ValueError: If no target weights are given
+        """
+        if not targets:
+            raise ValueError("No target weights given")
+        holdings = self._load_portfolio()
+
+        rebalancer = rebalance.Rebalancer(
+            holdings, targets, today=today, threshold=threshold
+        )
+        plan = rebalancer.plan(self._latest_closes(rebalancer.tickers))
+        return {
+            "trades": plan.trades().to_dict(orient="records"),
+            "turnover": plan.turnover,
+            "estimated_tax": plan.estimated_tax,
+            "deferred": dict(zip(plan.tickers, plan.deferred, strict=True)),
+        }
+
+    def reload(self) -> dict[str, Any]:
+        """Drop all resident data and rebuild the price store from the caches.
+
+        Later queries see the bars in the per-ticker caches as of this call.
+        """
+        with self._lock:
+            known = sorted(self._panel.tickers) if self._panel is not None else []
+            self._panel = None
+            self._portfolio = None
+            self._metrics.clear()
+        finance.ticker_cache.clear()
+        if known:
+            store = finance.update_panel(known)
+            with self._lock:
+                if self._panel is None:
+                    self._panel = store
+        return {"reloaded": True}
+
+    def _prices(self, tickers: list[str]) -> panel.PricePanel:
+        """Return the resident panel, loading it if it lacks some tickers.
+
+        The load may download data, so it runs without holding the lock and
+        other queries keep being answered meanwhile.
+        """
+        requested = {ticker.upper() for ticker in tickers}
+        with self._lock:
+            store = self._panel
+        if store is not None and requested <= set(store.tickers):
+            return store
+
+        known = set(store.tickers) if store is not None else set()
+        loaded = finance.load_panel(sorted(requested | known))
+        with self._lock:
+            resident = self._panel
+            if resident is None or set(resident.tickers) <= set(loaded.tickers):
+                self._panel = loaded
+        return loaded
+
+    def _latest_closes(self, tickers: list[str]) -> FloatArray:
+        """Return the latest close of each ticker, in the given order."""
+        return portfolio.latest_closes(self._prices(tickers).select(tickers))
+
+    def _load_portfolio(self) -> portfolio.Portfolio:
+        """Return the resident portfolio, loading it on first use."""
+        with self._lock:
+            if self._portfolio is None:
+                self._portfolio = portfolio.load_portfolio(self.portfolio_path)
+            return self._portfolio
+
+
+def make_server(
+    service: QueryService,
+    host: str = constants.SERVER_HOST,
+    port: int = constants.SERVER_PORT,
+) -> ThreadingHTTPServer:
+    """Create an HTTP server answering queries with a service.
+
+    Args:
+        service: Service holding the resident state
+        host: Address to listen on
+        port: Port to listen on, or 0 for any free port
+
+    Returns:
+        Server ready for ``serve_forever``
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        """Request handler bound to the service."""
+
+        def do_POST(self) -> None:  # noqa: N802
+            """Answer a batch of queries."""
+            if self.path != constants.SERVER_QUERY_PATH:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = json.loads(self.rfile.read(length))
+                requests = body[_REQUESTS_KEY]
+                if not isinstance(requests, list) or not all(
+                    isinstance(request, dict) for request in requests
+                ):
+                    raise TypeError(f"{_REQUESTS_KEY} must be a list of objects")
+            except (ValueError, KeyError, TypeError) as e:
+                self.send_error(HTTPStatus.BAD_REQUEST, str(e))
+                return
+            self._send_json({_RESULTS_KEY: service.handle_batch(requests)})
+
+        def log_message(self, format: str, *args: Any) -> None:
+            """Keep request logging off the hot path."""
+
+        def _send_json(self, payload: dict[str, Any]) -> None:
+            """Write a JSON response."""
+            data = json.dumps(payload, allow_nan=False).encode()
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", _JSON_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def query(
+    requests: Sequence[Mapping[str, Any]],
+    host: str = constants.SERVER_HOST,
+    port: int = constants.SERVER_PORT,
+    timeout: float = constants.SERVER_TIMEOUT_SECONDS,
+) -> list[dict[str, Any]]:
+    """Send a batch of queries to a running server.
+
+    Args:
+        requests: Queries, each with a ``method`` and optional ``params``
+        host: Server address
+        port: Server port
+        timeout: Seconds to wait for the answer
+
+    Returns:
+        One ``{"result": ...}`` or ``{"error": ...}`` entry per query
+
+    Raises:
+        OSError: If the server cannot be reached
+    """
+    request = urllib.request.Request(
+        f"http://{host}:{port}{constants.SERVER_QUERY_PATH}",
+        data=json.dumps({_REQUESTS_KEY: list(requests)}).encode(),
+        headers={"Content-Type": _JSON_CONTENT_TYPE},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:  # nosec B310
+        results: list[dict[str, Any]] = json.load(response)[_RESULTS_KEY]
+    return results
+
+
+def is_error(response: Mapping[str, Any]) -> bool:
+    """Return whether a query response reports an error."""
+    return _ERROR_KEY in response
+
+
+def _jsonable(value: Any) -> Any:
+    """Convert a result to plain JSON types, with None for NaN."""
+    if isinstance(value, Mapping):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, np.ndarray):
+        return _jsonable(value.tolist())
+    if isinstance(value, list | tuple):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        return _jsonable(value.item())
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
@@ -0,0 +1,304 @@
+"""Monte Carlo simulation of portfolio value in bounded memory.
+
+Paths are simulated in chunks, one period at a time, so a chunk only ever
+holds the current holdings of its paths. Each chunk reduces its paths to a
+histogram of log wealth per period, and the histograms of all chunks are
+summed, so percentiles over millions of paths come from arrays of shape
+(periods, bins) rather than from the full path tensor.
+
+Chunks run in worker processes. Each chunk draws from its own random stream
+spawned from one seed, so results do not depend on the number of workers.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import numpy.typing as npt
+
+from heisenbux import constants
+
+FloatArray = npt.NDArray[np.float64]
+
+# Margin of each period's histogram range, in standard deviations of the
+# log return over that many periods
+_RANGE_DEVIATIONS = 8.0
+# Smallest wealth binned, so paths that lose everything land in the first bin
+_MIN_WEALTH = 1e-300
+
+
+@dataclass(frozen=True)
+class SimulationResult:
+    """Distribution of simulated portfolio value over time.
+
+    Attributes:
+        quantiles: Percentiles reported, between 0 and 100
+        percentiles: Array of shape (quantiles, periods + 1) of portfolio
+            value; column 0 is the initial value
+        mean: Mean portfolio value at each period, including period 0
+        paths: Number of simulated paths
+    """
+
+    quantiles: tuple[float, ...]
+    percentiles: FloatArray
+    mean: FloatArray
+    paths: int
+
+
+@dataclass(frozen=True)
+class _ChunkModel:
+    """Everything a worker needs to simulate a chunk of paths."""
+
+    model: constants.SimulationModels
+    weights: FloatArray
+    log_mean: FloatArray
+    cholesky: FloatArray
+    history: FloatArray
+    periods: int
+    rebalance: bool
+    lowest: FloatArray
+    bin_width: FloatArray
+    bins: int
+
+
+def simulate(  # noqa: PLR0913
+    weights: FloatArray,
+    returns: FloatArray,
+    periods: int,
+    paths: int = constants.SIMULATION_PATHS,
+    model: constants.SimulationModels = constants.SimulationModels.CHOLESKY,
+    quantiles: tuple[float, ...] = constants.SIMULATION_QUANTILES,
+    rebalance: bool = True,
+    initial_value: float = 1.0,
+    seed: int | None = None,
+    chunk_size: int = constants.SIMULATION_CHUNK_PATHS,
+    bins: int = constants.SIMULATION_BINS,
+    max_workers: int | None = None,
+) -> SimulationResult:
+    """Simulate the value of a portfolio over many random paths.
+
+    Args:
+        weights: Portfolio weight of each asset, summing to one
+        returns: Historical simple returns of shape (history, assets), one row
+            per simulated period (see :func:`compound_returns`). Rows with
+            missing data are dropped.
+        periods: Number of periods to simulate
+        paths: Number of paths
+        model: Draw correlated log-normal returns matching the mean and
+            covariance of the history (Cholesky), or resample whole rows of
+            the history (bootstrap)
+        quantiles: Percentiles to report, between 0 and 100
+        rebalance: If True, reset the holdings to ``weights`` every period;
+            otherwise let them drift (buy and hold)
+        initial_value: Portfolio value at the start
+        seed: Seed for reproducible results, or None for fresh entropy
+        chunk_size: Paths simulated together by one task
+        bins: Histogram bins per period; more bins give finer percentiles.
+            Values far outside the expected range fall into the end bins.
+        max_workers: Maximum number of worker processes, or None for one per
+            CPU. With a single worker, chunks run in this process.
+
+    Returns:
+        SimulationResult with the requested percentiles
+
+    Raises:
+        ValueError: If the weights do not match the returns or no complete
+            history rows remain
+    """
+    chunk_model = _build_chunk_model(weights, returns, periods, model, rebalance, bins)
+
+    sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    counts = np.zeros((periods, bins), dtype=np.int64)
+    totals = np.zeros(periods)
+
+    workers = min(max_workers or os.cpu_count() or 1, len(sizes))
+    if workers <= 1:
+        outcomes = map(_simulate_chunk, [chunk_model] * len(sizes), seeds, sizes)
+        for chunk_counts, chunk_totals in outcomes:
+            counts += chunk_counts
+            totals += chunk_totals
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunk_models = [chunk_model] * len(sizes)
+            for chunk_counts, chunk_totals in pool.map(
+                _simulate_chunk, chunk_models, seeds, sizes
+            ):
+                counts += chunk_counts
+                totals += chunk_totals
+
+    levels = np.asarray(quantiles, dtype=np.float64)
+    log_values = _histogram_percentiles(
+        counts, chunk_model.lowest, chunk_model.bin_width, levels / 100 * paths
+    )
+    percentiles = np.hstack([np.ones((len(levels), 1)), np.exp(log_values)])
+    mean = np.concatenate([[1.0], totals / paths])
+    return SimulationResult(
+        quantiles=tuple(quantiles),
+        percentiles=percentiles * initial_value,
+        mean=mean * initial_value,
+        paths=paths,
+    )
+
+
+def compound_returns(returns: FloatArray, periods: int) -> FloatArray:
+    """Compound returns over consecutive non-overlapping blocks.
+
+    For example, compounding daily returns over blocks of 21 gives roughly
+    monthly returns, which makes multi-decade simulations far cheaper.
+
+    Args:
+        returns: Simple returns of shape (history, assets)
+        periods: Number of rows per block; leftover rows at the start are
+            dropped so the most recent data is kept
+
+    Returns:
+        Compounded returns of shape (history // periods, assets)
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    blocks = len(returns) // periods
+    recent = returns[len(returns) - blocks * periods :]
+    grouped = recent.reshape(blocks, periods, *returns.shape[1:])
+    compounded: FloatArray = np.prod(1 + grouped, axis=1) - 1
+    return compounded
+
+
+def _build_chunk_model(  # noqa: PLR0913
+    weights: FloatArray,
+    returns: FloatArray,
+    periods: int,
+    model: constants.SimulationModels,
+    rebalance: bool,
+    bins: int,
+) -> _ChunkModel:
+    """Estimate the return model and the histogram range of each period."""
+    weights = np.asarray(weights, dtype=np.float64)
+    history = np.asarray(returns, dtype=np.float64)
+    if history.ndim != 2 or history.shape[1] != len(weights):  # noqa: PLR2004
+        raise ValueError(
+            f"Returns of shape {history.shape} do not match {len(weights)} weights"
+        )
+    history = history[~np.isnan(history).any(axis=1)]
+    if not len(history):
+        raise ValueError("No complete rows of return history to simulate from")
+
+    log_returns = np.log1p(history)
+    log_mean = log_returns.mean(axis=0)
+    if len(history) > 1:
+        covariance = np.atleast_2d(np.cov(log_returns, rowvar=False))
+    else:
+        covariance = np.zeros((len(weights), len(weights)))
+    # Jitter keeps the factorization defined for (near) singular covariance
+    jitter = np.eye(len(weights)) * 1e-12 * max(np.trace(covariance), 1e-12)
+    cholesky = np.linalg.cholesky(covariance + jitter)
+
+    # Log wealth drifts like the rebalanced portfolio or, when holdings drift,
+    # at most like its best asset and at least like its worst one
+    portfolio = np.log(np.maximum(1 + history @ weights, _MIN_WEALTH))
+    drifts = np.append(log_returns.mean(axis=0), portfolio.mean())
+    spread = max(float(np.append(log_returns.std(axis=0), portfolio.std()).max()), 1e-6)
+    steps = np.arange(1, periods + 1)
+    margin = _RANGE_DEVIATIONS * spread * np.sqrt(steps)
+    lowest = drifts.min() * steps - margin
+    highest = drifts.max() * steps + margin
+
+    return _ChunkModel(
+        model=model,
+        weights=weights,
+        log_mean=log_mean,
+        cholesky=cholesky,
+        history=history,
+        periods=periods,
+        rebalance=rebalance,
+        lowest=lowest,
+        bin_width=(highest - lowest) / bins,
+        bins=bins,
+    )
+
+
+def _simulate_chunk(
+    chunk: _ChunkModel, seed: np.random.SeedSequence, paths: int
+) -> tuple[npt.NDArray[np.int64], FloatArray]:
+    """Simulate paths and reduce them to per-period histograms.
+
+    Args:
+        chunk: Return model and histogram layout
+        seed: Seed of this chunk's random stream
+        paths: Number of paths in the chunk
+
+    Returns:
+        Histogram counts of log wealth of shape (periods, bins) and the total
+        wealth of the paths at each period
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((chunk.periods, chunk.bins), dtype=np.int64)
+    totals = np.zeros(chunk.periods)
+    assets = len(chunk.weights)
+    # Random draws are single precision, which halves their cost; wealth
+    # accumulates in double precision
+    cholesky = chunk.cholesky.T.astype(np.float32)
+    log_mean = chunk.log_mean.astype(np.float32)
+    asset_growth = 1 + chunk.history
+    portfolio_growth = asset_growth @ chunk.weights
+
+    # A rebalanced portfolio only needs its total value; a drifting one needs
+    # the value held in each asset
+    wealth = np.ones(paths)
+    holdings = None if chunk.rebalance else np.tile(chunk.weights, (paths, 1))
+
+    for period in range(chunk.periods):
+        if chunk.model == constants.SimulationModels.BOOTSTRAP:
+            rows = rng.integers(0, len(chunk.history), paths)
+            if holdings is None:
+                wealth *= portfolio_growth[rows]
+            else:
+                holdings *= asset_growth[rows]
+        else:
+            draws = rng.standard_normal((paths, assets), dtype=np.float32)
+            growth = np.exp(draws @ cholesky + log_mean)
+            if holdings is None:
+                wealth *= growth @ chunk.weights
+            else:
+                holdings *= growth
+        if holdings is not None:
+            wealth = holdings.sum(axis=1)
+
+        positions = (
+            np.log(np.maximum(wealth, _MIN_WEALTH)) - chunk.lowest[period]
+        ) / chunk.bin_width[period]
+        bins = np.clip(positions, 0, chunk.bins - 1).astype(np.int64)
+        counts[period] = np.bincount(bins, minlength=chunk.bins)
+        totals[period] = wealth.sum()
+
+    return counts, totals
+
+
+def _histogram_percentiles(
+    counts: npt.NDArray[np.int64],
+    lowest: FloatArray,
+    bin_width: FloatArray,
+    ranks: FloatArray,
+) -> FloatArray:
+    """Interpolate values at given ranks from per-period histograms.
+
+    Args:
+        counts: Histogram counts of shape (periods, bins)
+        lowest: Lower edge of the first bin of each period
+        bin_width: Bin width of each period
+        ranks: Number of paths at or below each requested value
+
+    Returns:
+        Array of shape (ranks, periods)
+    """
+    cumulative = np.cumsum(counts, axis=1)
+    result = np.empty((len(ranks), len(counts)))
+    for i, rank in enumerate(ranks):
+        index = np.minimum((cumulative < rank).sum(axis=1), counts.shape[1] - 1)
+        rows = np.arange(len(counts))
+        below = np.where(index > 0, cumulative[rows, np.maximum(index - 1, 0)], 0)
+        inside = counts[rows, index]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            fraction = np.where(inside > 0, (rank - below) / inside, 0.5)
+        result[i] = lowest + (index + np.clip(fraction, 0.0, 1.0)) * bin_width
+    return result
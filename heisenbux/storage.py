@@ -0,0 +1,201 @@
+"""Typed binary storage for cached price data.
+
+Price data is cached as one uncompressed NumPy ``.npz`` archive per ticker,
+holding one array per column with a fixed dtype. Dates are stored as int64
+nanoseconds since the epoch (UTC) together with the name of the original
+timezone, so loading a file involves no text parsing at all.
+
+Readers and writers are looked up by file extension, which keeps CSV
+available for exports and for migrating caches written by older versions.
+"""
+
+import logging
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from heisenbux import constants, directory_utils
+
+# Column dtypes of the binary cache format
+SCHEMA: dict[str, type[np.generic]] = {
+    constants.DataFrameColumns.OPEN: np.float64,
+    constants.DataFrameColumns.HIGH: np.float64,
+    constants.DataFrameColumns.LOW: np.float64,
+    constants.DataFrameColumns.CLOSE: np.float64,
+    constants.DataFrameColumns.VOLUME: np.int64,
+    constants.DataFrameColumns.DIVIDENDS: np.float64,
+    constants.DataFrameColumns.STOCK_SPLITS: np.float64,
+    constants.DataFrameColumns.CAPITAL_GAINS: np.float64,
+}
+
+# Columns whose missing values mean "none" and are stored as zero; missing
+# prices stay NaN so they never read as a price of zero
+_ZERO_FILLED_COLUMNS = frozenset(
+    {
+        constants.DataFrameColumns.VOLUME,
+        constants.DataFrameColumns.DIVIDENDS,
+        constants.DataFrameColumns.STOCK_SPLITS,
+        constants.DataFrameColumns.CAPITAL_GAINS,
+    }
+)
+
+logger = logging.getLogger(__name__)
+
+_TIMEZONE_KEY = "timezone"
+_SCHEMA_VERSION_KEY = "schema_version"
+
+
+def find_cache_file(
+    cache_dir: Path,
+    ticker: str,
+    write: Callable[[pd.DataFrame, Path], object] | None = None,
+) -> Path | None:
+    """Locate the cache file for a ticker, migrating a legacy CSV if needed.
+
+    Args:
+        cache_dir: Cache directory
+        ticker: Stock ticker symbol
+        write: Function writing migrated data to the cache file, or None
+            for :func:`write_prices`
+
+    Returns:
+        Path of the cache file, or None if the ticker is not cached
+    """
+    cache_file = directory_utils.build_file_path(
+        cache_dir, ticker, constants.CACHE_FORMAT
+    )
+    if cache_file.exists():
+        return cache_file
+
+    legacy_file = directory_utils.build_file_path(
+        cache_dir, ticker, constants.FileExtensions.CSV
+    )
+    if cache_file != legacy_file and legacy_file.exists():
+        (write or write_prices)(read_prices(legacy_file), cache_file)
+        logger.info("Migrated %s to %s", legacy_file, cache_file)
+        return cache_file
+
+    return None
+
+
+def read_prices(path: Path) -> pd.DataFrame:
+    """Read cached price data in the format given by the file extension.
+
+    Args:
+        path: Cache file path
+
+    Returns:
+        DataFrame with price data indexed by date
+    """
+    return _READERS[path.suffix](path)
+
+
+def write_prices(df: pd.DataFrame, path: Path) -> None:
+    """Atomically write price data in the format given by the file extension.
+
+    Args:
+        df: Price data indexed by date
+        path: Cache file path
+    """
+    with directory_utils.atomic_path(path) as tmp_path:
+        _WRITERS[path.suffix](df, tmp_path)
+
+
+def export_csv(df: pd.DataFrame, ticker: str) -> Path:
+    """Export price data to a CSV file in the cache directory.
+
+    Args:
+        df: Price data indexed by date
+        ticker: Stock ticker symbol
+
+    Returns:
+        Path of the written CSV file
+    """
+    cache_dir = directory_utils.ensure_directory_exists(constants.Directories.CACHE)
+    csv_file = directory_utils.build_file_path(
+        cache_dir, ticker, constants.FileExtensions.CSV
+    )
+    write_prices(df, csv_file)
+    return csv_file
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    """Read price data from a CSV file."""
+    return pd.read_csv(path, index_col=0, parse_dates=True)
+
+
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    """Write price data to a CSV file."""
+    df.to_csv(path)
+
+
+def _read_npz(path: Path) -> pd.DataFrame:
+    """Read price data from a typed NumPy archive."""
+    with np.load(path, allow_pickle=False) as archive:
+        dates = pd.DatetimeIndex(
+            archive[constants.DataFrameColumns.DATE].view("datetime64[ns]"), tz="UTC"
+        )
+        timezone = str(archive[_TIMEZONE_KEY])
+        columns = {column: archive[column] for column in SCHEMA if column in archive}
+
+    index = dates.tz_convert(timezone) if timezone else dates.tz_localize(None)
+    index.name = constants.DataFrameColumns.DATE
+    return pd.DataFrame(columns, index=index)
+
+
+def _write_npz(df: pd.DataFrame, path: Path) -> None:
+    """Write the schema columns of price data to a typed NumPy archive."""
+    dates = pd.DatetimeIndex(pd.to_datetime(df.index, utc=True)).tz_convert(None)
+    columns = {
+        column: (
+            df[column].fillna(0) if column in _ZERO_FILLED_COLUMNS else df[column]
+        ).to_numpy(dtype=dtype)
+        for column, dtype in SCHEMA.items()
+        if column in df.columns
+    }
+    with path.open("wb") as f:
+        np.savez(
+            f,
+            allow_pickle=False,
+            **{
+                constants.DataFrameColumns.DATE: dates.to_numpy(
+                    dtype="datetime64[ns]"
+                ).view(np.int64),
+                _TIMEZONE_KEY: np.array(_timezone_name(df.index)),
+                _SCHEMA_VERSION_KEY: np.array(constants.CACHE_SCHEMA_VERSION),
+            },
+            **columns,
+        )
+
+
+def _timezone_name(index: pd.Index) -> str:
+    """Return the name of the timezone of a date index.
+
+    Args:
+        index: Date index
+
+    Returns:
+        IANA timezone name, "UTC" for fixed offsets or mixed-offset dates
+        parsed from text, or an empty string for timezone-naive dates
+    """
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is None:
+            return ""
+        name = getattr(index.tz, "key", None) or getattr(index.tz, "zone", None)
+        return str(name) if name else "UTC"
+    if len(index) and pd.Timestamp(index[0]).tzinfo is not None:
+        return "UTC"
+    return ""
+
+
+_READERS: dict[str, Callable[[Path], pd.DataFrame]] = {
+    constants.FileExtensions.CSV: _read_csv,
+    constants.FileExtensions.NPZ: _read_npz,
+}
+
+_WRITERS: dict[str, Callable[[pd.DataFrame, Path], None]] = {
+    constants.FileExtensions.CSV: _write_csv,
+    constants.FileExtensions.NPZ: _write_npz,
+}
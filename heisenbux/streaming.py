@@ -0,0 +1,402 @@
+"""Incremental metrics that update in O(1) per new price bar.
+
+Rather than recomputing rolling statistics over the full history whenever
+new bars arrive, :class:`StreamingMetrics` keeps running accumulators
+(Welford moments, ring buffers with running moments, an EWMA and the
+running peak) and folds in only the bars it has not seen yet. Its state is
+saved as JSON next to the ticker's price cache, so a refresh only processes
+the bars that the refresh added. If the history already folded in has
+changed, for example after prices are re-adjusted, the state is rebuilt.
+"""
+
+import copy
+import json
+import math
+from pathlib import Path
+from typing import Any, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from heisenbux import constants, directory_utils
+
+_VERSION_KEY = "version"
+
+_Accumulator = TypeVar("_Accumulator")
+
+
+class RunningMoments:
+    """Count, mean and variance of a stream, using Welford's algorithm."""
+
+    __slots__ = ("count", "m2", "mean")
+
+    def __init__(self) -> None:
+        """Create empty accumulators."""
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Fold a value into the moments."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, or NaN with fewer than two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+
+class RollingWindow:
+    """Mean and variance of the last ``size`` values of a stream.
+
+    Values are kept in a ring buffer. Adding a value to a full window swaps
+    it for the oldest one and adjusts the running mean and sum of squared
+    deviations, so each update costs O(1) whatever the window size.
+    """
+
+    __slots__ = ("count", "m2", "mean", "position", "size", "values")
+
+    def __init__(self, size: int) -> None:
+        """Create an empty window.
+
+        Args:
+            size: Number of values in a full window
+
+        Raises:
+            ValueError: If the size is less than one
+        """
+        if size < 1:
+            raise ValueError(f"Window size must be positive, got {size}")
+        self.size = size
+        self.values = [0.0] * size
+        self.position = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value: float) -> None:
+        """Push a value, dropping the oldest one once the window is full."""
+        old = self.values[self.position]
+        self.values[self.position] = value
+        self.position = (self.position + 1) % self.size
+
+        if self.count < self.size:
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+        else:
+            old_mean = self.mean
+            delta = value - old
+            self.mean += delta / self.size
+            self.m2 = max(0.0, self.m2 + delta * (value - self.mean + old - old_mean))
+
+    @property
+    def full(self) -> bool:
+        """Whether the window holds ``size`` values."""
+        return self.count == self.size
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the window, or NaN with fewer than two values."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+
+class Ewma:
+    """Exponentially weighted moving average, seeded with the first value."""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, span: int) -> None:
+        """Create an empty average.
+
+        Args:
+            span: Decay expressed as a span, giving ``alpha = 2 / (span + 1)``
+        """
+        self.alpha = 2 / (span + 1)
+        self.value = math.nan
+
+    def add(self, value: float) -> None:
+        """Fold a value into the average."""
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+
+
+class Drawdown:
+    """Running peak with the current and deepest decline from it."""
+
+    __slots__ = ("current", "maximum", "peak")
+
+    def __init__(self) -> None:
+        """Create an empty tracker."""
+        self.peak = math.nan
+        self.current = 0.0
+        self.maximum = 0.0
+
+    def add(self, price: float) -> None:
+        """Fold a price into the drawdown."""
+        if math.isnan(self.peak) or price > self.peak:
+            self.peak = price
+        self.current = price / self.peak - 1
+        self.maximum = min(self.maximum, self.current)
+
+
+class StreamingMetrics:
+    """Rolling metrics of one ticker's closing prices, updated bar by bar.
+
+    Tracks a simple moving average of the close, the annualized volatility
+    of daily returns over a rolling window and over the full history, an
+    EWMA of the close, and the current and maximum drawdown.
+    """
+
+    __slots__ = (
+        "drawdown",
+        "ewma",
+        "first_date",
+        "last_close",
+        "last_date",
+        "moving_average_window",
+        "returns",
+        "volatility_window",
+    )
+
+    def __init__(
+        self,
+        moving_average_window: int = constants.STREAMING_MOVING_AVERAGE_WINDOW,
+        volatility_window: int = constants.STREAMING_VOLATILITY_WINDOW,
+        ewma_span: int = constants.STREAMING_EWMA_SPAN,
+    ) -> None:
+        """Create metrics that have seen no bars.
+
+        Args:
+            moving_average_window: Bars in the moving average of the close
+            volatility_window: Daily returns in the rolling volatility
+            ewma_span: Span of the EWMA of the close
+        """
+        self.first_date: int | None = None
+        self.last_date: int | None = None
+        self.last_close = math.nan
+        self.returns = RunningMoments()
+        self.moving_average_window = RollingWindow(moving_average_window)
+        self.volatility_window = RollingWindow(volatility_window)
+        self.ewma = Ewma(ewma_span)
+        self.drawdown = Drawdown()
+
+    @property
+    def moving_average(self) -> float:
+        """Moving average of the close, or NaN until the window is full."""
+        window = self.moving_average_window
+        return window.mean if window.full else math.nan
+
+    @property
+    def volatility(self) -> float:
+        """Annualized volatility over the rolling window, NaN until full."""
+        window = self.volatility_window
+        if not window.full:
+            return math.nan
+        return math.sqrt(window.variance * constants.TRADING_DAYS_PER_YEAR)
+
+    @property
+    def total_volatility(self) -> float:
+        """Annualized volatility of every daily return seen."""
+        return math.sqrt(self.returns.variance * constants.TRADING_DAYS_PER_YEAR)
+
+    def update(self, when: pd.Timestamp, close: float) -> bool:
+        """Fold in one bar if it is newer than every bar seen so far.
+
+        Args:
+            when: Bar date
+            close: Closing price
+
+        Returns:
+            True if the bar was new and applied; bars without a close are
+            skipped
+        """
+        date = _to_nanoseconds(pd.DatetimeIndex([when]))[0]
+        if self.last_date is not None and date <= self.last_date:
+            return False
+        if math.isnan(close):
+            return False
+        self._add(int(date), close)
+        return True
+
+    def update_frame(self, df: pd.DataFrame) -> int:
+        """Fold in the bars of price data that are newer than any seen.
+
+        The first new bar is found with a binary search, so passing the full
+        cached history only does per-bar work for the new bars.
+
+        Args:
+            df: DataFrame in the ``finance.get_ticker_data`` schema
+
+        Returns:
+            Number of bars applied
+        """
+        dates = _to_nanoseconds(df.index)
+        closes = df[constants.DataFrameColumns.CLOSE].to_numpy(dtype=np.float64)
+        start = 0
+        if self.last_date is not None:
+            start = int(np.searchsorted(dates, self.last_date, side="right"))
+
+        applied = 0
+        for date, close in zip(dates[start:], closes[start:], strict=True):
+            if not math.isnan(close):
+                self._add(int(date), float(close))
+                applied += 1
+        return applied
+
+    def matches(self, df: pd.DataFrame) -> bool:
+        """Whether price data starts with the history already folded in.
+
+        The first bar and the close of the last bar seen act as a fingerprint
+        of that history, so re-adjusted or replaced prices do not match.
+
+        Args:
+            df: DataFrame in the ``finance.get_ticker_data`` schema
+
+        Returns:
+            True if no bars have been seen or the fingerprint matches
+        """
+        if self.last_date is None:
+            return True
+        dates = _to_nanoseconds(df.index)
+        closes = df[constants.DataFrameColumns.CLOSE].to_numpy(dtype=np.float64)
+        seen = np.flatnonzero(~np.isnan(closes))
+        position = int(np.searchsorted(dates, self.last_date))
+        return (
+            len(seen) > 0
+            and int(dates[seen[0]]) == self.first_date
+            and position < len(dates)
+            and int(dates[position]) == self.last_date
+            and math.isclose(closes[position], self.last_close)
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the state as JSON-serializable data."""
+        state: dict[str, Any] = {_VERSION_KEY: constants.STREAMING_STATE_VERSION}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            state[name] = _slots_dict(value) if hasattr(value, "__slots__") else value
+        return state
+
+    @classmethod
+    def from_dict(cls, state: dict[str, Any]) -> "StreamingMetrics":
+        """Restore metrics from the data returned by :meth:`to_dict`.
+
+        Args:
+            state: Saved state
+
+        Returns:
+            Restored metrics
+
+        Raises:
+            ValueError: If the state was saved by an incompatible version
+        """
+        version = state.get(_VERSION_KEY)
+        if version != constants.STREAMING_STATE_VERSION:
+            raise ValueError(f"Unsupported metrics state version {version}")
+
+        metrics = cls.__new__(cls)
+        metrics.first_date = state["first_date"]
+        metrics.last_date = state["last_date"]
+        metrics.last_close = state["last_close"]
+        metrics.returns = _from_slots_dict(RunningMoments, state["returns"])
+        metrics.moving_average_window = _from_slots_dict(
+            RollingWindow, state["moving_average_window"]
+        )
+        metrics.volatility_window = _from_slots_dict(
+            RollingWindow, state["volatility_window"]
+        )
+        metrics.ewma = _from_slots_dict(Ewma, state["ewma"])
+        metrics.drawdown = _from_slots_dict(Drawdown, state["drawdown"])
+        return metrics
+
+    def _add(self, date: int, close: float) -> None:
+        """Apply a bar known to be newer than the last one."""
+        if not math.isnan(self.last_close):
+            daily_return = close / self.last_close - 1
+            self.returns.add(daily_return)
+            self.volatility_window.add(daily_return)
+        self.moving_average_window.add(close)
+        self.ewma.add(close)
+        self.drawdown.add(close)
+        if self.first_date is None:
+            self.first_date = date
+        self.last_close = close
+        self.last_date = date
+
+
+def load_metrics(path: Path) -> StreamingMetrics | None:
+    """Load saved metrics state.
+
+    Args:
+        path: State file path
+
+    Returns:
+        Restored metrics, or None if there is no usable state
+    """
+    try:
+        return StreamingMetrics.from_dict(json.loads(path.read_text()))
+    except (FileNotFoundError, json.JSONDecodeError, KeyError, ValueError):
+        return None
+
+
+def save_metrics(metrics: StreamingMetrics, path: Path) -> None:
+    """Atomically save metrics state.
+
+    Args:
+        metrics: Metrics to save
+        path: State file path
+    """
+    with directory_utils.atomic_path(path) as tmp_path:
+        tmp_path.write_text(json.dumps(metrics.to_dict()))
+
+
+def update_metrics(ticker: str, df: pd.DataFrame) -> StreamingMetrics:
+    """Bring a ticker's saved metrics up to date with its price data.
+
+    The state lives next to the ticker's price cache. Only bars newer than
+    the last one folded in are processed. If the saved state is missing,
+    unreadable or no longer matches the start of the price data, the metrics
+    are rebuilt from the full history.
+
+    Args:
+        ticker: Stock ticker symbol
+        df: Price data in the ``finance.get_ticker_data`` schema
+
+    Returns:
+        Up-to-date metrics
+    """
+    cache_dir = directory_utils.ensure_directory_exists(constants.Directories.CACHE)
+    path = directory_utils.build_file_path(
+        cache_dir, ticker, constants.METRICS_STATE_SUFFIX
+    )
+    saved = load_metrics(path)
+    metrics = saved if saved is not None and saved.matches(df) else StreamingMetrics()
+    if metrics.update_frame(df) or metrics is not saved:
+        save_metrics(metrics, path)
+    return metrics
+
+
+def _to_nanoseconds(index: pd.Index) -> np.ndarray[Any, np.dtype[np.int64]]:
+    """Return the dates of an index as int64 nanoseconds since the epoch (UTC)."""
+    dates = pd.DatetimeIndex(pd.to_datetime(index, utc=True)).tz_convert(None)
+    return dates.to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+
+def _slots_dict(value: Any) -> dict[str, Any]:
+    """Return copies of the slot values of an accumulator."""
+    return {name: copy.copy(getattr(value, name)) for name in value.__slots__}
+
+
+def _from_slots_dict(cls: type[_Accumulator], state: dict[str, Any]) -> _Accumulator:
+    """Create an accumulator from its slot values, bypassing ``__init__``."""
+    value = cls.__new__(cls)
+    for name in cls.__slots__:  # type: ignore[attr-defined]
+        setattr(value, name, copy.copy(state[name]))
+    return value
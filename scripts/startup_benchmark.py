@@ -0,0 +1,100 @@
+"""Measure how long the heisenbux CLI takes to start.
+
+Runs ``python -X importtime`` on ``heisenbux.cli`` several times and reports
+the median cumulative import time, the slowest modules, and the wall-clock
+time of ``heisenbux --help``. With ``--max-ms`` it exits non-zero when the
+median import time is over budget, so it can guard startup cost in CI.
+
+Usage:
+    poetry run python scripts/startup_benchmark.py [--runs N] [--max-ms MS]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess  # nosec B404
+import sys
+import time
+
+CLI_MODULE = "heisenbux.cli"
+HELP_SNIPPET = "from heisenbux.cli import main; main(['--help'])"
+HEAVY_MODULES = ("pandas", "numpy", "yfinance", "matplotlib")
+TOP_MODULES = 10
+
+
+def parse_importtime(stderr: str) -> dict[str, int]:
+    """Parse ``-X importtime`` output into cumulative microseconds per module.
+
+    Args:
+        stderr: Standard error of a ``python -X importtime`` run
+
+    Returns:
+        Mapping of module name to cumulative import time in microseconds
+    """
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure_imports() -> dict[str, int]:
+    """Import the CLI module in a fresh interpreter and time every import."""
+    result = subprocess.run(  # nosec B603
+        [sys.executable, "-X", "importtime", "-c", f"import {CLI_MODULE}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(result.stderr)
+
+
+def measure_help() -> float:
+    """Return the wall-clock seconds of ``heisenbux --help``."""
+    start = time.perf_counter()
+    subprocess.run(  # nosec B603
+        [sys.executable, "-c", HELP_SNIPPET],
+        capture_output=True,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> int:
+    """Run the benchmark and print a JSON report."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--runs", type=int, default=5, help="Runs to take the median of"
+    )
+    parser.add_argument(
+        "--max-ms", type=float, default=None, help="Fail if import time exceeds this"
+    )
+    args = parser.parse_args()
+
+    runs = [measure_imports() for _ in range(args.runs)]
+    import_ms = statistics.median(run[CLI_MODULE] for run in runs) / 1000
+    help_ms = statistics.median(measure_help() for _ in range(args.runs)) * 1000
+    slowest = sorted(runs[-1].items(), key=lambda item: item[1], reverse=True)
+    report = {
+        "import_ms": round(import_ms, 2),
+        "help_ms": round(help_ms, 2),
+        "heavy_modules_loaded": [m for m in HEAVY_MODULES if m in runs[-1]],
+        "slowest_imports_ms": {
+            name: round(us / 1000, 2) for name, us in slowest[:TOP_MODULES]
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+    if args.max_ms is not None and import_ms > args.max_ms:
+        print(
+            f"Import time {import_ms:.1f} ms exceeds budget of {args.max_ms} ms",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,8 @@ from pathlib import Path
 import matplotlib.pyplot as plt
 import pytest
 
+from heisenbux import finance
+
 # Add the project root to the Python path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
@@ -17,6 +19,12 @@ def reset_matplotlib() -> None:
     plt.close("all")
 
 
+@pytest.fixture(autouse=True)
+def reset_ticker_cache() -> None:
+    """Clear the in-memory ticker data cache between tests."""
+    finance.ticker_cache.clear()
+
+
 @pytest.fixture
 def disable_network_calls(monkeypatch: pytest.MonkeyPatch) -> None:
     """Disable network calls for unit tests."""
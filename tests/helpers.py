@@ -24,6 +24,31 @@ def create_mock_ticker(dataframe_response: pd.DataFrame | None = None) -> Mock:
     return mock_ticker
 
 
+def create_mock_download(frames: dict[str, pd.DataFrame]) -> Mock:
+    """Create a mock yfinance download function backed by local frames.
+
+    The mock returns a frame with (ticker, column) MultiIndex columns, like
+    ``yfinance.download(..., group_by="ticker")``. Requested tickers missing
+    from ``frames`` get all-NaN columns, as the real provider does.
+
+    Args:
+        frames: DataFrame to serve for each known ticker
+
+    Returns:
+        Mock download function that records each batched call
+    """
+
+    def download(tickers: list[str], **kwargs: object) -> pd.DataFrame:
+        template = next(iter(frames.values()))
+        parts = {
+            ticker: frames.get(ticker, template.iloc[:0].reindex(template.index))
+            for ticker in tickers
+        }
+        return pd.concat(parts, axis=1)
+
+    return Mock(side_effect=download)
+
+
 def assert_valid_dataframe(
     df: pd.DataFrame, expected_columns: list[str], min_rows: int = 1
 ) -> None:
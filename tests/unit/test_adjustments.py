@@ -0,0 +1,203 @@
+"""Unit tests for adjustments module."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heisenbux import adjustments, constants
+
+Columns = constants.DataFrameColumns
+
+_TICKER = "TEST"
+_BARS = 6
+
+
+def _raw_frame(start: str = "2024-03-04", periods: int = _BARS) -> pd.DataFrame:
+    """Create unadjusted daily bars with a constant close of 100."""
+    index = pd.date_range(start, periods=periods, freq="B", name=Columns.DATE)
+    close = np.full(periods, 100.0)
+    return pd.DataFrame(
+        {
+            Columns.OPEN: close,
+            Columns.HIGH: close + 1,
+            Columns.LOW: close - 1,
+            Columns.CLOSE: close,
+            Columns.VOLUME: np.full(periods, 1000),
+        },
+        index=index,
+    )
+
+
+def _actions(by_date: dict[str, tuple[float, float]]) -> pd.DataFrame:
+    """Create an actions table from (dividend, split) pairs keyed by date."""
+    return pd.DataFrame(
+        {
+            Columns.DIVIDENDS: [dividend for dividend, _ in by_date.values()],
+            Columns.STOCK_SPLITS: [split for _, split in by_date.values()],
+            Columns.CAPITAL_GAINS: 0.0,
+        },
+        index=pd.DatetimeIndex(list(by_date), name=Columns.DATE),
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_factors() -> Iterator[None]:
+    """Start every test without memoized factors."""
+    adjustments.invalidate()
+    yield
+    adjustments.invalidate()
+
+
+class TestAdjustmentFactors:
+    """Test cases for computing cumulative adjustment factors."""
+
+    def test_split_scales_earlier_bars(self) -> None:
+        """Test that a split divides earlier prices and multiplies volumes."""
+        raw = _raw_frame()
+        price, volume = adjustments.adjustment_factors(
+            pd.DatetimeIndex(raw.index),
+            raw[Columns.CLOSE].to_numpy(),
+            _actions({"2024-03-06": (0.0, 2.0)}),
+        )
+
+        np.testing.assert_allclose(price, [0.5, 0.5, 1, 1, 1, 1])
+        np.testing.assert_allclose(volume, [2, 2, 1, 1, 1, 1])
+
+    def test_dividends_compound_with_splits(self) -> None:
+        """Test that dividends use the previous close and multiply together."""
+        raw = _raw_frame()
+        price, _ = adjustments.adjustment_factors(
+            pd.DatetimeIndex(raw.index),
+            raw[Columns.CLOSE].to_numpy(),
+            _actions({"2024-03-05": (1.0, 0.0), "2024-03-08": (0.0, 4.0)}),
+        )
+
+        np.testing.assert_allclose(price, [0.99 / 4, 0.25, 0.25, 0.25, 1, 1])
+
+    def test_actions_outside_bars_are_ignored(self) -> None:
+        """Test that actions before the first or after the last bar are no-ops."""
+        raw = _raw_frame()
+        price, volume = adjustments.adjustment_factors(
+            pd.DatetimeIndex(raw.index),
+            raw[Columns.CLOSE].to_numpy(),
+            _actions({"2024-03-04": (0.0, 3.0), "2024-04-01": (0.0, 2.0)}),
+        )
+
+        np.testing.assert_allclose(price, np.ones(_BARS))
+        np.testing.assert_allclose(volume, np.ones(_BARS))
+
+
+class TestStore:
+    """Test cases for the raw bar store and lazy adjustment."""
+
+    def test_round_trips_raw_bars_and_actions(self, tmp_path: Path) -> None:
+        """Test that provider data is split into bars and non-zero actions."""
+        df = _raw_frame()
+        df[Columns.DIVIDENDS] = [0, 0, 1.0, 0, 0, 0]
+        df[Columns.STOCK_SPLITS] = 0.0
+
+        adjustments.write_raw(df, _TICKER, tmp_path)
+
+        raw = adjustments.read_raw(_TICKER, tmp_path)
+        actions = adjustments.read_actions(_TICKER, tmp_path)
+        assert Columns.DIVIDENDS not in raw.columns
+        assert len(raw) == _BARS
+        assert list(actions.index) == [df.index[2]]
+
+    def test_new_split_readjusts_without_rewriting_bars(self, tmp_path: Path) -> None:
+        """Test that a late split changes adjusted prices, not the raw store."""
+        adjustments.write_raw(_raw_frame(), _TICKER, tmp_path)
+        raw_file = tmp_path / f"{_TICKER}{constants.CACHE_FORMAT}"
+        before = raw_file.read_bytes()
+        unadjusted = adjustments.get_adjusted_data(_TICKER, tmp_path)
+
+        adjustments.add_actions(_TICKER, _actions({"2024-03-08": (0.0, 2.0)}), tmp_path)
+        adjusted = adjustments.get_adjusted_data(_TICKER, tmp_path)
+
+        assert raw_file.read_bytes() == before
+        np.testing.assert_allclose(unadjusted[Columns.CLOSE], 100.0)
+        np.testing.assert_allclose(adjusted[Columns.CLOSE], [50, 50, 50, 50, 100, 100])
+        assert adjusted[Columns.VOLUME].iloc[0] == 2000  # noqa: PLR2004
+        assert adjusted[Columns.STOCK_SPLITS].iloc[4] == 2.0  # noqa: PLR2004
+
+    def test_factors_are_memoized_until_inputs_change(self, tmp_path: Path) -> None:
+        """Test that factors are reused until the actions or bars change."""
+        adjustments.write_raw(_raw_frame(), _TICKER, tmp_path)
+        raw = adjustments.read_raw(_TICKER, tmp_path)
+        actions = adjustments.read_actions(_TICKER, tmp_path)
+
+        first = adjustments.get_factors(_TICKER, raw, actions)
+        second = adjustments.get_factors(_TICKER, raw, actions)
+        changed = adjustments.get_factors(
+            _TICKER, raw, _actions({"2024-03-06": (0.5, 0.0)})
+        )
+
+        assert first is second
+        assert changed is not first
+
+
+class TestFetchRaw:
+    """Test cases for downloading into the raw store."""
+
+    def test_update_fetches_only_new_bars(self, tmp_path: Path) -> None:
+        """Test that an update requests bars since the last stored date."""
+        adjustments.write_raw(_raw_frame(), _TICKER, tmp_path)
+        # Bars before the split come split-adjusted from the provider
+        fresh = _raw_frame("2024-03-12", periods=2)
+        fresh.iloc[0, :4] /= 2
+        fresh[Columns.ADJ_CLOSE] = fresh[Columns.CLOSE]
+        fresh[Columns.STOCK_SPLITS] = [0.0, 2.0]
+        history = Mock(return_value=fresh)
+
+        with patch("yfinance.Ticker") as ticker:
+            ticker.return_value.history = history
+            adjusted = adjustments.fetch_raw(_TICKER, update=True, directory=tmp_path)
+
+        start = history.call_args.kwargs["start"]
+        assert pd.Timestamp(start) >= pd.Timestamp("2024-03-11") - pd.Timedelta(
+            days=constants.INCREMENTAL_OVERLAP_DAYS
+        )
+        assert history.call_args.kwargs["auto_adjust"] is False
+        assert len(adjusted) == _BARS + 2
+        assert Columns.ADJ_CLOSE not in adjusted.columns
+        np.testing.assert_allclose(adjusted[Columns.CLOSE].iloc[:-1], 50.0)
+
+    def test_split_inside_window_is_applied_once(self, tmp_path: Path) -> None:
+        """Test that split-adjusted provider bars are stored as traded."""
+        fresh = _raw_frame()
+        fresh.iloc[:3, :4] /= 4
+        fresh[Columns.VOLUME] = [4000, 4000, 4000, 1000, 1000, 1000]
+        fresh[Columns.STOCK_SPLITS] = [0.0, 0.0, 0.0, 4.0, 0.0, 0.0]
+
+        with patch("yfinance.Ticker") as ticker:
+            ticker.return_value.history.return_value = fresh
+            adjusted = adjustments.fetch_raw(_TICKER, directory=tmp_path)
+
+        raw = adjustments.read_raw(_TICKER, tmp_path)
+        np.testing.assert_allclose(raw[Columns.CLOSE], 100.0)
+        np.testing.assert_array_equal(raw[Columns.VOLUME], 1000)
+        np.testing.assert_allclose(adjusted[Columns.CLOSE], fresh[Columns.CLOSE])
+        np.testing.assert_array_equal(adjusted[Columns.VOLUME], fresh[Columns.VOLUME])
+
+    def test_dividend_before_split_is_stored_as_paid(self, tmp_path: Path) -> None:
+        """Test that split-adjusted dividends are restored to the cash paid."""
+        fresh = _raw_frame()
+        fresh.iloc[:3, :4] /= 2
+        fresh[Columns.VOLUME] = [2000, 2000, 2000, 1000, 1000, 1000]
+        # A dividend of 1.0 per share, reported after the later 2:1 split
+        fresh[Columns.DIVIDENDS] = [0.0, 0.5, 0.0, 0.0, 0.0, 0.0]
+        fresh[Columns.STOCK_SPLITS] = [0.0, 0.0, 0.0, 2.0, 0.0, 0.0]
+
+        with patch("yfinance.Ticker") as ticker:
+            ticker.return_value.history.return_value = fresh
+            adjusted = adjustments.fetch_raw(_TICKER, directory=tmp_path)
+
+        actions = adjustments.read_actions(_TICKER, tmp_path)
+        assert actions[Columns.DIVIDENDS].iloc[0] == 1.0
+        np.testing.assert_allclose(
+            adjusted[Columns.CLOSE], [49.5, 50, 50, 100, 100, 100]
+        )
@@ -0,0 +1,144 @@
+"""Unit tests for analytics module."""
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pytest
+
+from heisenbux import analytics, constants, panel
+from tests.fixtures import sample_data
+
+_DAYS = 300
+_TICKERS = 4
+_WINDOW = 20
+
+
+def _prices(seed: int = 0) -> npt.NDArray[np.float64]:
+    """Build random-walk prices with a gap and a late listing."""
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, size=(_DAYS, _TICKERS))
+    prices = (100 * np.cumprod(1 + returns, axis=0)).astype(np.float64)
+    prices[:50, 1] = np.nan  # listed later
+    prices[120, 2] = np.nan  # missing bar
+    return prices
+
+
+class TestReturnsAndRisk:
+    """Test cases for per-ticker metrics against pandas equivalents."""
+
+    def test_simple_returns_match_pct_change(self) -> None:
+        """Test that simple returns match pandas pct_change."""
+        prices = _prices()
+
+        result = analytics.simple_returns(prices)
+
+        expected = pd.DataFrame(prices).pct_change(fill_method=None).iloc[1:]
+        np.testing.assert_allclose(result, expected.to_numpy())
+
+    def test_volatility_and_sharpe_skip_missing_data(self) -> None:
+        """Test volatility and Sharpe ratio against pandas, which skips NaN."""
+        returns = analytics.simple_returns(_prices())
+        frame = pd.DataFrame(returns)
+        annual = np.sqrt(constants.TRADING_DAYS_PER_YEAR)
+
+        np.testing.assert_allclose(
+            analytics.volatility(returns), frame.std().to_numpy() * annual
+        )
+        np.testing.assert_allclose(
+            analytics.sharpe_ratio(returns),
+            (frame.mean() / frame.std()).to_numpy() * annual,
+        )
+
+    def test_sortino_ratio_uses_downside_deviation(self) -> None:
+        """Test that only negative returns count towards Sortino risk."""
+        returns = np.array([[0.02], [-0.01], [0.03], [-0.02]])
+
+        result = analytics.sortino_ratio(returns, periods_per_year=1)
+
+        downside = np.sqrt((0.01**2 + 0.02**2) / 4)
+        np.testing.assert_allclose(result, [returns.mean() / downside])
+
+    def test_rolling_volatility_matches_pandas(self) -> None:
+        """Test rolling volatility against pandas rolling std."""
+        returns = analytics.simple_returns(_prices())
+
+        result = analytics.rolling_volatility(returns, _WINDOW)
+
+        expected = pd.DataFrame(returns).rolling(_WINDOW).std() * np.sqrt(
+            constants.TRADING_DAYS_PER_YEAR
+        )
+        np.testing.assert_allclose(result, expected.to_numpy(), atol=1e-12)
+
+    def test_rolling_volatility_rejects_short_window(self) -> None:
+        """Test that a window without spread is rejected."""
+        with pytest.raises(ValueError, match="at least 2"):
+            analytics.rolling_volatility(np.zeros((5, 1)), 1)
+
+    def test_drawdowns(self) -> None:
+        """Test drawdowns from the running peak, including a missing price."""
+        prices = np.array([[100.0], [120.0], [np.nan], [90.0], [130.0]])
+
+        result = analytics.drawdowns(prices)
+
+        np.testing.assert_allclose(
+            result[:, 0], [0.0, 0.0, np.nan, -0.25, 0.0], equal_nan=True
+        )
+        np.testing.assert_allclose(analytics.max_drawdown(prices), [-0.25])
+
+    def test_beta_of_scaled_market_returns(self) -> None:
+        """Test that beta recovers the scale of returns driven by the market."""
+        rng = np.random.default_rng(1)
+        market = rng.normal(0, 0.01, size=_DAYS)
+        returns = np.column_stack([market * 2, market * -0.5, market])
+        returns[:10, 0] = np.nan
+
+        result = analytics.beta(returns, market)
+
+        np.testing.assert_allclose(result, [2.0, -0.5, 1.0])
+
+
+class TestCovariance:
+    """Test cases for covariance and correlation matrices."""
+
+    @pytest.mark.parametrize("with_gaps", [False, True])
+    def test_covariance_matches_pairwise_pandas(self, with_gaps: bool) -> None:
+        """Test the covariance matrix against pandas pairwise covariance."""
+        returns = analytics.simple_returns(_prices())
+        if not with_gaps:
+            returns = returns[60:119]
+        frame = pd.DataFrame(returns)
+
+        covariance = analytics.covariance_matrix(returns, periods_per_year=1)
+        correlation = analytics.correlation_matrix(returns)
+
+        np.testing.assert_allclose(covariance, frame.cov().to_numpy(), atol=1e-14)
+        np.testing.assert_allclose(correlation, frame.corr().to_numpy(), atol=1e-12)
+
+
+class TestSummarize:
+    """Test cases for summarizing a price panel."""
+
+    def test_summarize_includes_beta_against_benchmark(self) -> None:
+        """Test that summarize reports every metric for every ticker."""
+        frames = {
+            ticker: sample_data.create_sample_dataframe()
+            for ticker in [*sample_data.VANGUARD_TEST_FUNDS, constants.BENCHMARK_TICKER]
+        }
+        prices = panel.build_panel(frames)
+
+        result = analytics.summarize(prices)
+
+        assert list(result.index) == prices.tickers
+        assert list(result.columns) == list(constants.Metrics)
+        np.testing.assert_allclose(result[constants.Metrics.BETA], 1.0)
+        np.testing.assert_allclose(result[constants.Metrics.MAX_DRAWDOWN], 0.0)
+
+    def test_summarize_without_benchmark_omits_beta(self) -> None:
+        """Test that beta is left out when the panel lacks the benchmark."""
+        prices = panel.build_panel(
+            {ticker: sample_data.create_sample_dataframe() for ticker in ["VTI"]}
+        )
+
+        result = analytics.summarize(prices)
+
+        assert constants.Metrics.BETA not in result.columns
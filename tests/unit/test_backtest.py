@@ -0,0 +1,162 @@
+"""Unit tests for backtest module."""
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pytest
+
+from heisenbux import backtest, constants, panel
+from tests.fixtures import sample_data
+
+_DAYS = 30
+_CASH = 1_000.0
+
+
+def _market(
+    close: npt.NDArray[np.float64], opens: npt.NDArray[np.float64] | None = None
+) -> backtest.MarketData:
+    """Wrap price arrays as market data."""
+    dates = np.arange(len(close)).astype("datetime64[D]")
+    tickers = [f"T{i}" for i in range(close.shape[1])]
+    return backtest.MarketData(tickers, dates, close if opens is None else opens, close)
+
+
+def _diverging_prices() -> npt.NDArray[np.float64]:
+    """Build one rising and one flat price series."""
+    rising = 100 * 1.01 ** np.arange(_DAYS)
+    return np.column_stack([rising, np.full(_DAYS, 50.0)])
+
+
+class TestRunBacktest:
+    """Test cases for single backtests."""
+
+    def test_buy_and_hold_without_costs(self) -> None:
+        """Test that a never-rebalanced portfolio holds its first purchase."""
+        close = _diverging_prices()
+        parameters = backtest.BacktestParameters(
+            weights=(0.5, 0.5), rebalance_every=0, cost_bps=0, initial_cash=_CASH
+        )
+
+        result = backtest.run_backtest(_market(close), parameters)
+
+        shares = 0.5 * _CASH / close[0]
+        np.testing.assert_allclose(result.values, close @ shares)
+        assert result.rebalances == 1
+        assert result.turnover == pytest.approx(1.0)
+        assert result.total_return == pytest.approx(result.values[-1] / _CASH - 1)
+
+    def test_scheduled_rebalances_execute_at_next_open(self) -> None:
+        """Test the rebalance count of a fixed schedule."""
+        every = 5
+        parameters = backtest.BacktestParameters(
+            weights=(0.5, 0.5), rebalance_every=every, cost_bps=0
+        )
+
+        result = backtest.run_backtest(_market(_diverging_prices()), parameters)
+
+        assert result.rebalances == -(-_DAYS // every)
+
+    def test_costs_reduce_value(self) -> None:
+        """Test that transaction costs are charged on every trade."""
+        close = _diverging_prices()
+        free, costly = (
+            backtest.run_backtest(
+                _market(close),
+                backtest.BacktestParameters(
+                    weights=(0.5, 0.5),
+                    rebalance_every=1,
+                    cost_bps=cost,
+                    fixed_cost=fixed,
+                    initial_cash=_CASH,
+                ),
+            )
+            for cost, fixed in ((0.0, 0.0), (10.0, 1.0))
+        )
+
+        assert free.costs == 0
+        initial_cost = _CASH * 10 / 10_000 + 2 * 1.0
+        assert costly.costs > initial_cost
+        assert costly.values[0] == pytest.approx(free.values[0] - initial_cost)
+        assert (costly.values < free.values).all()
+
+    def test_drift_threshold_triggers_rebalance(self) -> None:
+        """Test that rebalancing follows the drift of the weights."""
+        close = _diverging_prices()
+        loose, tight = (
+            backtest.run_backtest(
+                _market(close),
+                backtest.BacktestParameters(
+                    weights=(0.5, 0.5), rebalance_every=0, drift_threshold=threshold
+                ),
+            )
+            for threshold in (0.5, 0.01)
+        )
+
+        assert loose.rebalances == 1
+        assert tight.rebalances > 1
+
+    def test_weights_must_match_tickers(self) -> None:
+        """Test that the weights must cover every ticker."""
+        parameters = backtest.BacktestParameters(weights=(1.0,))
+
+        with pytest.raises(ValueError, match="weights"):
+            backtest.run_backtest(_market(_diverging_prices()), parameters)
+
+
+class TestGrid:
+    """Test cases for parameter grids."""
+
+    def test_parameter_grid_builds_every_combination(self) -> None:
+        """Test the cross product of the given settings."""
+        weights = [(0.5, 0.5), (0.8, 0.2)]
+        schedules = [5, 10, 20]
+
+        grid = backtest.parameter_grid(weights=weights, rebalance_every=schedules)
+
+        assert len(grid) == len(weights) * len(schedules)
+        assert grid[-1] == backtest.BacktestParameters(
+            weights=(0.8, 0.2), rebalance_every=20
+        )
+
+    def test_parameter_grid_rejects_unknown_settings(self) -> None:
+        """Test that misspelled settings are reported."""
+        with pytest.raises(ValueError, match="rebalance_evry"):
+            backtest.parameter_grid(rebalance_evry=[5])
+
+    def test_parallel_grid_matches_serial_runs(self) -> None:
+        """Test that worker processes produce the same results in order."""
+        market = _market(_diverging_prices())
+        grid = backtest.parameter_grid(
+            weights=[(0.5, 0.5), (0.7, 0.3)], rebalance_every=[0, 3], cost_bps=[0, 5]
+        )
+
+        parallel = backtest.run_grid(market, grid, max_workers=2)
+
+        assert [result.parameters for result in parallel] == grid
+        for result, parameters in zip(parallel, grid, strict=True):
+            expected = backtest.run_backtest(market, parameters)
+            np.testing.assert_array_equal(result.values, expected.values)
+
+
+class TestPrepareMarketData:
+    """Test cases for aligning panel prices."""
+
+    def test_starts_when_every_ticker_has_prices(self) -> None:
+        """Test trimming to common history and filling gaps."""
+        frames = {
+            ticker: sample_data.create_sample_dataframe()
+            for ticker in sample_data.VANGUARD_TEST_FUNDS
+        }
+        frames["BND"] = frames["BND"].iloc[2:]
+        gap = frames["VTI"].index[5]
+        frames["VTI"] = frames["VTI"].drop(index=pd.DatetimeIndex([gap]))
+        prices = panel.build_panel(frames)
+
+        market = backtest.prepare_market_data(prices)
+
+        assert len(market.dates) == len(prices.dates) - 2
+        assert not np.isnan(market.close).any()
+        vti = market.tickers.index("VTI")
+        close = prices[constants.DataFrameColumns.CLOSE][2:, vti]
+        np.testing.assert_allclose(market.close[3, vti], close[2])
+        np.testing.assert_allclose(market.open[3, vti], close[2])
@@ -0,0 +1,72 @@
+"""Unit tests for the benchmark runner."""
+
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from benchmarks import fixtures, run
+from heisenbux import constants
+
+
+def _results(**medians: float) -> dict[str, Any]:
+    """Build run results with the given median seconds per case."""
+    return {"results": {name: {"median": value} for name, value in medians.items()}}
+
+
+class TestRunner:
+    """Test cases for timing and comparing benchmark runs."""
+
+    def test_compare_flags_slower_cases_only(self) -> None:
+        """Test that only growth beyond the threshold is a regression."""
+        baseline = _results(fast=1.0, steady=1.0, gone=1.0)
+        current = _results(fast=1.5, steady=1.1, new=9.0)
+
+        regressions = run.compare(current, baseline, threshold=0.2)
+
+        assert len(regressions) == 1
+        assert regressions[0].startswith("fast:")
+
+    def test_main_skips_missing_baseline(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a missing baseline file is reported, not a crash."""
+        monkeypatch.setattr(run, "run", lambda scale, pattern: _results(case=1.0))
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "run",
+                "--output",
+                str(tmp_path / "latest.json"),
+                "--baseline",
+                str(tmp_path / "baseline.json"),
+            ],
+        )
+
+        assert run.main() == 0
+        assert (tmp_path / "latest.json").exists()
+
+    def test_time_case_times_only_the_yielded_call(self) -> None:
+        """Test that setup runs once and the call runs warm-up plus rounds."""
+        calls: list[str] = []
+
+        def case(scale: fixtures.Scale) -> Iterator[Callable[[], Any]]:
+            calls.append("setup")
+            yield lambda: calls.append("call")
+            calls.append("teardown")
+
+        result = run.time_case(case, fixtures.Scale(tickers=1, years=1, rounds=3))
+
+        assert calls == ["setup"] + ["call"] * 4 + ["teardown"]
+        assert result["rounds"] == 3  # noqa: PLR2004
+
+    def test_scaled_dataframe_matches_sample_columns(self) -> None:
+        """Test that synthetic data has the sample layout at full length."""
+        df = fixtures.scaled_dataframe(years=2)
+
+        assert len(df) == 2 * constants.TRADING_DAYS_PER_YEAR
+        high, low = constants.DataFrameColumns.HIGH, constants.DataFrameColumns.LOW
+        assert (df[high] >= df[low]).all()
@@ -1,12 +1,16 @@
 """Unit tests for CLI module."""
 
-from unittest.mock import Mock, patch
+import logging
+import subprocess  # nosec B404
+import sys
+from pathlib import Path
+from unittest.mock import ANY, Mock, patch
 
 import pandas as pd
 import pytest
 from click.testing import CliRunner
 
-from heisenbux import cli, constants
+from heisenbux import cli, constants, plot
 from tests import constants as test_constants
 from tests.fixtures import sample_data
 
@@ -40,8 +44,12 @@ class TestCLI:
 
         assert result.exit_code == 0
 
-        mock_get_ticker.assert_called_once_with(sample_data.SAMPLE_TICKER, False)
-        mock_plot.assert_called_once_with(mock_data, sample_data.SAMPLE_TICKER)
+        mock_get_ticker.assert_called_once_with(
+            sample_data.SAMPLE_TICKER, False, update=False
+        )
+        mock_plot.assert_called_once_with(
+            mock_data, sample_data.SAMPLE_TICKER, force=False
+        )
 
     @patch("heisenbux.plot.save_plot")
     @patch("heisenbux.finance.get_ticker_data")
@@ -77,7 +85,68 @@ class TestCLI:
         )
 
         assert result.exit_code == 0
-        mock_get_ticker.assert_called_once_with(sample_data.SAMPLE_TICKER, True)
+        mock_get_ticker.assert_called_once_with(
+            sample_data.SAMPLE_TICKER, True, update=False
+        )
+
+    @patch("heisenbux.plot.save_plot")
+    @patch("heisenbux.finance.get_ticker_data")
+    def test_cli_update_option(
+        self,
+        mock_get_ticker: Mock,
+        mock_plot: Mock,
+        runner: CliRunner,
+        mock_data: pd.DataFrame,
+    ) -> None:
+        """Test that --update option requests an incremental cache update."""
+        mock_get_ticker.return_value = mock_data
+
+        result = runner.invoke(cli.main, [sample_data.SAMPLE_TICKER, "--update"])
+
+        assert result.exit_code == 0
+        mock_get_ticker.assert_called_once_with(
+            sample_data.SAMPLE_TICKER, False, update=True
+        )
+
+    @patch("heisenbux.storage.export_csv")
+    @patch("heisenbux.plot.save_plot")
+    @patch("heisenbux.finance.get_ticker_data")
+    def test_cli_export_csv_option(  # noqa: PLR0913
+        self,
+        mock_get_ticker: Mock,
+        mock_plot: Mock,
+        mock_export: Mock,
+        runner: CliRunner,
+        mock_data: pd.DataFrame,
+    ) -> None:
+        """Test that --export-csv option exports the data to CSV."""
+        mock_get_ticker.return_value = mock_data
+
+        result = runner.invoke(
+            cli.main, [sample_data.SAMPLE_TICKER, "--export-csv", "--no-show-plot"]
+        )
+
+        assert result.exit_code == 0
+        mock_export.assert_called_once_with(mock_data, sample_data.SAMPLE_TICKER)
+
+    @patch("heisenbux.plot.save_plot")
+    @patch("heisenbux.finance.get_ticker_data")
+    def test_cli_force_plot_option(
+        self,
+        mock_get_ticker: Mock,
+        mock_plot: Mock,
+        runner: CliRunner,
+        mock_data: pd.DataFrame,
+    ) -> None:
+        """Test that --force-plot option re-renders an unchanged plot."""
+        mock_get_ticker.return_value = mock_data
+
+        result = runner.invoke(cli.main, [sample_data.SAMPLE_TICKER, "--force-plot"])
+
+        assert result.exit_code == 0
+        mock_plot.assert_called_once_with(
+            mock_data, sample_data.SAMPLE_TICKER, force=True
+        )
 
     @patch("heisenbux.finance.get_ticker_data")
     def test_cli_handles_download_failure(
@@ -118,8 +187,227 @@ class TestCLI:
 
         assert result.exit_code == 0
         mock_get_ticker.assert_called_once_with(
-            test_constants.TestTickers.AAPL_LOWER, False
+            test_constants.TestTickers.AAPL_LOWER, False, update=False
         )
         mock_plot.assert_called_once_with(
-            mock_data, test_constants.TestTickers.AAPL_LOWER
+            mock_data, test_constants.TestTickers.AAPL_LOWER, force=False
+        )
+
+
+class TestBatchCommands:
+    """Test cases for the batch subcommands."""
+
+    @pytest.fixture
+    def runner(self) -> CliRunner:
+        """Create a Click test runner."""
+        return CliRunner()
+
+    @pytest.fixture
+    def frames(self) -> dict[str, pd.DataFrame]:
+        """Get sample data for several funds."""
+        return {
+            fund: sample_data.create_sample_dataframe()
+            for fund in sample_data.VANGUARD_TEST_FUNDS
+        }
+
+    def test_read_watchlist(self, tmp_path: Path) -> None:
+        """Test that watchlists allow commas, blank lines and comments."""
+        watchlist = tmp_path / "watchlist.txt"
+        watchlist.write_text("# Funds\nVTI, vxus\n\nBND  # bonds\n")
+
+        assert cli.read_watchlist(watchlist) == ["VTI", "vxus", "BND"]
+
+    @patch("heisenbux.finance.get_many_tickers_data")
+    def test_fetch_combines_arguments_and_watchlist(
+        self,
+        mock_get_many: Mock,
+        runner: CliRunner,
+        frames: dict[str, pd.DataFrame],
+        tmp_path: Path,
+    ) -> None:
+        """Test that fetch loads every ticker once in one batched call."""
+
+        def load(
+            symbols: list[str], force_download: bool, timings: dict[str, float]
+        ) -> dict[str, pd.DataFrame]:
+            timings.update(dict.fromkeys(symbols, 0.125))
+            return frames
+
+        mock_get_many.side_effect = load
+        watchlist = tmp_path / "watchlist.txt"
+        watchlist.write_text("\n".join(sample_data.VANGUARD_TEST_FUNDS[1:]))
+        first = sample_data.VANGUARD_TEST_FUNDS[0]
+
+        result = runner.invoke(
+            cli.main,
+            [constants.CLICommands.FETCH, first.lower(), "--watchlist", str(watchlist)],
+        )
+
+        assert result.exit_code == 0, result.output
+        mock_get_many.assert_called_once_with(
+            sample_data.VANGUARD_TEST_FUNDS, force_download=False, timings=ANY
+        )
+        for fund in sample_data.VANGUARD_TEST_FUNDS:
+            assert fund in result.output
+        assert "Seconds" in result.output
+        assert result.output.count("0.1250") == len(sample_data.VANGUARD_TEST_FUNDS)
+        assert "total" in result.output
+
+    @patch("heisenbux.finance.get_ticker_data")
+    def test_fetch_update_reports_failures(
+        self,
+        mock_get_ticker: Mock,
+        runner: CliRunner,
+        frames: dict[str, pd.DataFrame],
+    ) -> None:
+        """Test that fetch --update tops up each ticker and reports errors."""
+        good, bad = sample_data.VANGUARD_TEST_FUNDS[:2]
+
+        def load(ticker: str, force: bool, update: bool) -> pd.DataFrame:
+            if ticker == bad:
+                raise ValueError(f"No data found for ticker {bad}")
+            return frames[ticker]
+
+        mock_get_ticker.side_effect = load
+
+        result = runner.invoke(
+            cli.main, [constants.CLICommands.FETCH, good, bad, "--update"]
+        )
+
+        assert result.exit_code == 0
+        assert f"No data found for ticker {bad}" in result.output
+        mock_get_ticker.assert_any_call(good, False, update=True)
+
+    @patch("heisenbux.plot.render_plots")
+    @patch("heisenbux.finance.get_many_tickers_data")
+    def test_plot_renders_in_parallel(
+        self,
+        mock_get_many: Mock,
+        mock_render: Mock,
+        runner: CliRunner,
+        frames: dict[str, pd.DataFrame],
+    ) -> None:
+        """Test that plot renders all tickers with one pool."""
+        mock_get_many.return_value = frames
+        mock_render.return_value = [
+            plot.RenderResult(fund, Path(f"graphs/{fund}_plot.png"), 0.5)
+            for fund in frames
+        ]
+
+        result = runner.invoke(
+            cli.main,
+            [constants.CLICommands.PLOT, *frames, "--workers", "2", "--force-plot"],
+        )
+
+        assert result.exit_code == 0, result.output
+        mock_render.assert_called_once_with(frames, max_workers=2, force=True)
+        assert "rendered" in result.output
+
+    @patch("heisenbux.finance.get_many_tickers_data")
+    def test_analyze_prints_metrics(
+        self,
+        mock_get_many: Mock,
+        runner: CliRunner,
+        frames: dict[str, pd.DataFrame],
+    ) -> None:
+        """Test that analyze summarizes every ticker."""
+        mock_get_many.return_value = frames
+
+        result = runner.invoke(cli.main, [constants.CLICommands.ANALYZE, *frames])
+
+        assert result.exit_code == 0, result.output
+        assert constants.Metrics.SHARPE_RATIO in result.output
+        assert constants.CLICommands.ANALYZE in result.output
+
+    def test_batch_command_requires_tickers(self, runner: CliRunner) -> None:
+        """Test that batch commands need tickers or a watchlist."""
+        result = runner.invoke(cli.main, [constants.CLICommands.FETCH])
+
+        assert result.exit_code == constants.EXIT_USAGE_ERROR
+        assert "at least one ticker" in result.output
+
+    def test_group_help_lists_commands(self, runner: CliRunner) -> None:
+        """Test that --help describes the group instead of a ticker."""
+        result = runner.invoke(cli.main, ["--help"])
+
+        assert result.exit_code == 0
+        for command in constants.CLICommands:
+            assert command in result.output
+
+    @patch("heisenbux.finance.get_ticker_data")
+    def test_profile_prints_stage_timings(
+        self, mock_get_ticker: Mock, runner: CliRunner
+    ) -> None:
+        """Test that --profile before a bare ticker reports timings and stats."""
+        mock_get_ticker.return_value = sample_data.create_sample_dataframe()
+
+        result = runner.invoke(
+            cli.main,
+            [
+                constants.CLIOptions.PROFILE,
+                constants.CLIOptions.PROFILE_FORMAT,
+                constants.ProfileFormats.PROMETHEUS.value,
+                sample_data.SAMPLE_TICKER,
+                constants.CLIOptions.NO_SHOW_PLOT,
+            ],
+        )
+
+        assert result.exit_code == 0, result.output
+        mock_get_ticker.assert_called_once()
+        assert f"# TYPE {constants.METRICS_PREFIX}_stage_calls_total" in result.output
+        assert "function calls" in result.output
+
+    @patch("logging.basicConfig")
+    @patch("heisenbux.finance.get_ticker_data")
+    def test_verbose_logs_ticker_steps(
+        self, mock_get_ticker: Mock, mock_logging: Mock, runner: CliRunner
+    ) -> None:
+        """Test that --verbose turns on logging of the per-ticker steps."""
+        mock_get_ticker.return_value = sample_data.create_sample_dataframe()
+
+        quiet = runner.invoke(
+            cli.main, [sample_data.SAMPLE_TICKER, constants.CLIOptions.NO_SHOW_PLOT]
+        )
+        mock_logging.assert_not_called()
+        verbose = runner.invoke(
+            cli.main,
+            [
+                constants.CLIOptions.VERBOSE,
+                sample_data.SAMPLE_TICKER,
+                constants.CLIOptions.NO_SHOW_PLOT,
+            ],
+        )
+
+        assert quiet.exit_code == 0, quiet.output
+        assert verbose.exit_code == 0, verbose.output
+        assert mock_logging.call_args.kwargs["level"] == logging.INFO
+
+
+class TestStartup:
+    """Test cases for CLI startup cost."""
+
+    @staticmethod
+    def _loaded_modules(code: str) -> set[str]:
+        """Run code in a fresh interpreter and return the heavy modules loaded."""
+        probe = (
+            f"import sys\n{code}\n"
+            "print(' '.join(m for m in ('pandas', 'yfinance', 'matplotlib') "
+            "if m in sys.modules))"
+        )
+        result = subprocess.run(  # nosec B603
+            [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+        )
+        return set(result.stdout.split())
+
+    def test_import_loads_no_heavy_modules(self) -> None:
+        """Test that importing the CLI defers pandas, yfinance and matplotlib."""
+        assert self._loaded_modules("import heisenbux.cli") == set()
+
+    def test_help_loads_no_heavy_modules(self) -> None:
+        """Test that --help runs without loading heavy modules."""
+        code = (
+            "from click.testing import CliRunner\n"
+            "from heisenbux import cli\n"
+            "CliRunner().invoke(cli.main, ['--help'])"
         )
+        assert self._loaded_modules(code) == set()
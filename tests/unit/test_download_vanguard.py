@@ -1,71 +1,80 @@
 """Unit tests for download_vanguard module."""
 
+from pathlib import Path
 from unittest.mock import Mock, patch
 
-import click
-
-from heisenbux import download_vanguard
+from heisenbux import download_vanguard, plot
 from tests.fixtures import sample_data
 
 
 class TestDownloadVanguardFunds:
     """Test cases for download_vanguard functions."""
 
-    @patch("heisenbux.download_vanguard._run_heisenbux_for_ticker")
-    def test_download_funds(self, mock_run: Mock) -> None:
-        """Test that download_funds calls the heisenbux function for each fund."""
+    @patch("heisenbux.finance.get_many_tickers_data")
+    def test_download_funds(self, mock_get_many: Mock) -> None:
+        """Test that download_funds fetches all funds in one batched call."""
         download_vanguard.download_funds(sample_data.VANGUARD_TEST_FUNDS)
 
-        # Check that the function was called for each fund
-        assert mock_run.call_count == len(sample_data.VANGUARD_TEST_FUNDS)
+        mock_get_many.assert_called_once_with(
+            sample_data.VANGUARD_TEST_FUNDS, force_download=False
+        )
 
-        # Check the calls were made with correct arguments
-        for fund in sample_data.VANGUARD_TEST_FUNDS:
-            mock_run.assert_any_call(fund, show_plot=False, force_download=False)
+    @patch("heisenbux.plot.render_plots")
+    @patch("heisenbux.finance.get_many_tickers_data")
+    def test_generate_plots(self, mock_get_many: Mock, mock_render: Mock) -> None:
+        """Test that generate_plots batch-renders plots for all funds."""
+        frames = {
+            fund: sample_data.create_sample_dataframe()
+            for fund in sample_data.VANGUARD_TEST_FUNDS
+        }
+        mock_get_many.return_value = frames
 
-    @patch("heisenbux.download_vanguard._run_heisenbux_for_ticker")
-    def test_generate_plots(self, mock_run: Mock) -> None:
-        """Test that generate_plots calls the heisenbux function for each fund."""
         download_vanguard.generate_plots(sample_data.VANGUARD_TEST_FUNDS)
 
-        # Check that the function was called for each fund
-        assert mock_run.call_count == len(sample_data.VANGUARD_TEST_FUNDS)
-
-        # Check the calls were made with correct arguments
-        for fund in sample_data.VANGUARD_TEST_FUNDS:
-            mock_run.assert_any_call(fund, show_plot=True, force_download=False)
+        mock_get_many.assert_called_once_with(
+            sample_data.VANGUARD_TEST_FUNDS, force_download=False
+        )
+        mock_render.assert_called_once_with(frames)
 
-    @patch("heisenbux.download_vanguard._run_heisenbux_for_ticker")
+    @patch("heisenbux.finance.get_many_tickers_data")
     @patch("builtins.print")
     def test_download_funds_prints_progress(
-        self, mock_print: Mock, mock_run: Mock
+        self, mock_print: Mock, mock_get_many: Mock
     ) -> None:
         """Test that download_funds prints progress messages."""
         download_vanguard.download_funds(["VTI"])
 
         # Check that progress message was printed
-        mock_print.assert_called_with("\nDownloading data for VTI...")
+        mock_print.assert_called_once_with("\nDownloading data for VTI...")
 
-    @patch("heisenbux.download_vanguard._run_heisenbux_for_ticker")
+    @patch("heisenbux.plot.render_plots")
+    @patch("heisenbux.finance.get_many_tickers_data")
     @patch("builtins.print")
     def test_generate_plots_prints_progress(
-        self, mock_print: Mock, mock_run: Mock
+        self, mock_print: Mock, mock_get_many: Mock, mock_render: Mock
     ) -> None:
         """Test that generate_plots prints progress messages."""
+        mock_render.return_value = [
+            plot.RenderResult("VTI", Path("graphs/VTI_plot.png"), 0.25)
+        ]
+
         download_vanguard.generate_plots(["VTI"])
 
-        # Check that progress message was printed
-        mock_print.assert_called_with("\nGenerating plot for VTI...")
+        # Check that progress messages were printed
+        mock_print.assert_any_call("\nGenerating plots for VTI...")
+        mock_print.assert_called_with("Plot saved to graphs/VTI_plot.png in 0.25s")
 
-    @patch("heisenbux.cli.main")
-    def test_run_heisenbux_for_ticker_failure(self, mock_main: Mock) -> None:
-        """Test that CLI failures are handled gracefully."""
-        mock_main.side_effect = click.Abort()
+    @patch("heisenbux.plot.render_plots")
+    @patch("heisenbux.finance.get_many_tickers_data")
+    @patch("builtins.print")
+    def test_generate_plots_reports_skipped_plots(
+        self, mock_print: Mock, mock_get_many: Mock, mock_render: Mock
+    ) -> None:
+        """Test that plots left up to date are not reported as saved."""
+        mock_render.return_value = [
+            plot.RenderResult("VTI", Path("graphs/VTI_plot.png"), 0.0, skipped=True)
+        ]
 
-        # The function should handle the exception gracefully
-        download_vanguard._run_heisenbux_for_ticker(
-            "VTI", show_plot=False, force_download=False
-        )
+        download_vanguard.generate_plots(["VTI"])
 
-        # The main function should have been called
-        mock_main.assert_called_once_with(standalone_mode=False)
+        mock_print.assert_called_with("Plot up to date: graphs/VTI_plot.png")
@@ -1,12 +1,15 @@
 """Unit tests for finance module."""
 
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from heisenbux import constants, finance
+from heisenbux import adjustments, constants, finance, locks, storage
 from tests import constants as test_constants
 from tests import helpers
 from tests.fixtures import sample_data
@@ -35,7 +38,7 @@ class TestGetTickerData:
         cache_file = (
             tmp_path
             / constants.Directories.CACHE
-            / f"{sample_data.SAMPLE_TICKER}{constants.FileExtensions.CSV}"
+            / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
         )
         assert cache_file.exists()
 
@@ -64,6 +67,29 @@ class TestGetTickerData:
         helpers.assert_valid_dataframe(
             df, constants.ALL_PRICE_COLUMNS, min_rows=len(sample_df)
         )
+        assert (
+            cache_dir / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        ).exists()
+
+    def test_get_ticker_data_logs_instead_of_printing(  # noqa: PLR0913
+        self,
+        mock_yfinance: Mock,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+        capsys: pytest.CaptureFixture[str],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        """Test that per-ticker progress goes to the logger, not stdout."""
+        monkeypatch.chdir(tmp_path)
+
+        with (
+            caplog.at_level("INFO", logger=finance.__name__),
+            patch("yfinance.Ticker", return_value=mock_yfinance),
+        ):
+            finance.get_ticker_data(sample_data.SAMPLE_TICKER)
+
+        assert capsys.readouterr().out == ""
+        assert f"Fetching data for {sample_data.SAMPLE_TICKER}" in caplog.text
 
     def test_get_ticker_data_force_download(
         self, mock_yfinance: Mock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
@@ -119,3 +145,225 @@ class TestGetTickerData:
         with patch("yfinance.Ticker", return_value=mock_ticker):
             with pytest.raises(ValueError, match="No data found for ticker"):
                 finance.get_ticker_data(sample_data.SAMPLE_TICKER)
+
+    def test_get_ticker_data_update_fetches_only_missing_tail(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that update fetches recent bars and merges them into the cache."""
+        monkeypatch.chdir(tmp_path)
+
+        cache_dir = tmp_path / constants.Directories.CACHE
+        cache_dir.mkdir()
+        cache_file = cache_dir / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        sample_df = sample_data.create_sample_dataframe()
+        cached_df = sample_df.iloc[:-3]
+        storage.write_prices(cached_df, cache_file)
+        adjustments.write_raw(cached_df, sample_data.SAMPLE_TICKER)
+
+        # Provider returns an overlapping bar plus the missing tail
+        fresh_df = sample_df.iloc[-4:].copy()
+        mock_ticker = helpers.create_mock_ticker(fresh_df)
+
+        with patch("yfinance.Ticker", return_value=mock_ticker):
+            df = finance.get_ticker_data(sample_data.SAMPLE_TICKER, update=True)
+
+        start = mock_ticker.history.call_args.kwargs["start"]
+        last_cached = cached_df.index.max()
+        assert (
+            start.date()
+            == (
+                last_cached - pd.Timedelta(days=constants.INCREMENTAL_OVERLAP_DAYS)
+            ).date()
+        )
+
+        assert len(df) == len(sample_df)
+        assert not df.index.has_duplicates
+        assert df.index.is_monotonic_increasing
+        pd.testing.assert_series_equal(
+            df[constants.DataFrameColumns.CLOSE].iloc[-4:],
+            fresh_df[constants.DataFrameColumns.CLOSE],
+            check_freq=False,
+        )
+
+        reread = storage.read_prices(cache_file)
+        assert len(reread) == len(sample_df)
+
+    def test_get_ticker_data_update_adjusts_history_without_refetching(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a new dividend re-adjusts cached bars from the raw store."""
+        monkeypatch.chdir(tmp_path)
+
+        cache_dir = tmp_path / constants.Directories.CACHE
+        cache_dir.mkdir()
+        cache_file = cache_dir / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        sample_df = sample_data.create_sample_dataframe()
+        cached_df = sample_df.iloc[:-3]
+        storage.write_prices(cached_df, cache_file)
+        adjustments.write_raw(cached_df, sample_data.SAMPLE_TICKER)
+
+        # The last bar goes ex-dividend
+        fresh_df = sample_df.iloc[-4:].copy()
+        fresh_df[constants.DataFrameColumns.DIVIDENDS] = [0.0, 0.0, 0.0, 1.0]
+        mock_ticker = helpers.create_mock_ticker(fresh_df)
+
+        with patch("yfinance.Ticker", return_value=mock_ticker):
+            df = finance.get_ticker_data(sample_data.SAMPLE_TICKER, update=True)
+
+        mock_ticker.history.assert_called_once()
+        close = sample_df[constants.DataFrameColumns.CLOSE]
+        factor = 1 - 1.0 / close.iloc[-2]
+        np.testing.assert_allclose(
+            df[constants.DataFrameColumns.CLOSE].iloc[:-1], close.iloc[:-1] * factor
+        )
+        assert df[constants.DataFrameColumns.CLOSE].iloc[-1] == close.iloc[-1]
+        assert len(storage.read_prices(cache_file)) == len(sample_df)
+
+    def test_get_ticker_data_update_downloads_legacy_cache_range_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a cache without raw bars seeds the raw store first."""
+        monkeypatch.chdir(tmp_path)
+
+        cache_dir = tmp_path / constants.Directories.CACHE
+        cache_dir.mkdir()
+        cache_file = cache_dir / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        sample_df = sample_data.create_sample_dataframe()
+        storage.write_prices(sample_df.iloc[:-3], cache_file)
+        mock_ticker = helpers.create_mock_ticker(sample_df)
+
+        with patch("yfinance.Ticker", return_value=mock_ticker):
+            df = finance.get_ticker_data(sample_data.SAMPLE_TICKER, update=True)
+
+        start = mock_ticker.history.call_args.kwargs["start"]
+        assert start.date() == sample_df.index.min().date()
+        assert adjustments.has_raw(sample_data.SAMPLE_TICKER)
+        assert len(df) == len(sample_df)
+
+    def test_get_ticker_data_update_without_new_rows_keeps_cache(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an empty incremental fetch returns the cached data as-is."""
+        monkeypatch.chdir(tmp_path)
+
+        cache_dir = tmp_path / constants.Directories.CACHE
+        cache_dir.mkdir()
+        cache_file = cache_dir / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        sample_df = sample_data.create_sample_dataframe()
+        storage.write_prices(sample_df, cache_file)
+        mtime = cache_file.stat().st_mtime_ns
+
+        mock_ticker = helpers.create_mock_ticker(pd.DataFrame())
+
+        with patch("yfinance.Ticker", return_value=mock_ticker):
+            df = finance.get_ticker_data(sample_data.SAMPLE_TICKER, update=True)
+
+        mock_ticker.history.assert_called_once()
+        assert len(df) == len(sample_df)
+        assert cache_file.stat().st_mtime_ns == mtime
+
+    def test_get_ticker_data_reads_result_of_concurrent_download(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a process that waited for the lock does not re-download."""
+        monkeypatch.chdir(tmp_path)
+        cache_dir = tmp_path / constants.Directories.CACHE
+        sample_df = sample_data.create_sample_dataframe()
+
+        @contextmanager
+        def downloaded_elsewhere(*_: object) -> Iterator[bool]:
+            storage.write_prices(
+                sample_df,
+                cache_dir / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}",
+            )
+            yield True
+
+        monkeypatch.setattr(locks, "ticker_lock", downloaded_elsewhere)
+        with patch("yfinance.Ticker") as mock_ticker:
+            df = finance.get_ticker_data(sample_data.SAMPLE_TICKER, force_download=True)
+
+        mock_ticker.assert_not_called()
+        assert len(df) == len(sample_df)
+
+
+class TestGetManyTickersData:
+    """Test cases for get_many_tickers_data function."""
+
+    def test_downloads_cache_misses_in_batches(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that cache misses are grouped into batched provider requests."""
+        monkeypatch.chdir(tmp_path)
+        mock_download = helpers.create_mock_download(
+            {
+                ticker: sample_data.create_sample_dataframe()
+                for ticker in sample_data.VANGUARD_TEST_FUNDS
+            }
+        )
+
+        with patch("yfinance.download", mock_download):
+            frames = finance.get_many_tickers_data(
+                sample_data.VANGUARD_TEST_FUNDS, batch_size=2
+            )
+
+        assert list(frames) == sample_data.VANGUARD_TEST_FUNDS
+        for df in frames.values():
+            helpers.assert_valid_dataframe(df, constants.ALL_PRICE_COLUMNS)
+
+        batches = [call.args[0] for call in mock_download.call_args_list]
+        assert batches == [["VTI", "VXUS"], ["BND"]]
+
+        for ticker in sample_data.VANGUARD_TEST_FUNDS:
+            cache_file = (
+                tmp_path
+                / constants.Directories.CACHE
+                / f"{ticker}{constants.CACHE_FORMAT}"
+            )
+            assert cache_file.exists()
+
+    def test_reads_cached_tickers_without_downloading(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that only tickers missing from the cache are downloaded."""
+        monkeypatch.chdir(tmp_path)
+        cache_dir = tmp_path / constants.Directories.CACHE
+        cache_dir.mkdir()
+        sample_data.create_sample_dataframe().to_csv(
+            cache_dir / f"VTI{constants.FileExtensions.CSV}"
+        )
+        mock_download = helpers.create_mock_download(
+            {
+                ticker: sample_data.create_sample_dataframe()
+                for ticker in sample_data.VANGUARD_TEST_FUNDS
+            }
+        )
+
+        timings: dict[str, float] = {}
+
+        with patch("yfinance.download", mock_download):
+            frames = finance.get_many_tickers_data(
+                sample_data.VANGUARD_TEST_FUNDS, timings=timings
+            )
+
+        assert list(frames) == sample_data.VANGUARD_TEST_FUNDS
+        mock_download.assert_called_once()
+        assert mock_download.call_args.args[0] == ["VXUS", "BND"]
+        assert set(timings) == set(sample_data.VANGUARD_TEST_FUNDS)
+        assert all(seconds > 0 for seconds in timings.values())
+
+    def test_skips_tickers_without_data(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that tickers unknown to the provider are left out of the result."""
+        monkeypatch.chdir(tmp_path)
+        mock_download = helpers.create_mock_download(
+            {"VTI": sample_data.create_sample_dataframe()}
+        )
+
+        with patch("yfinance.download", mock_download):
+            frames = finance.get_many_tickers_data(["VTI", "NOPE"])
+
+        assert list(frames) == ["VTI"]
+        assert not (
+            tmp_path / constants.Directories.CACHE / f"NOPE{constants.CACHE_FORMAT}"
+        ).exists()
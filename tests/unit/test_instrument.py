@@ -0,0 +1,77 @@
+"""Unit tests for instrument module."""
+
+import json
+from collections.abc import Iterator
+
+import pytest
+
+from heisenbux import constants, instrument
+
+_STAGE = constants.Stages.PARSE
+_COUNTER = constants.Counters.DISK_CACHE_HITS
+
+
+@pytest.fixture
+def recorder() -> Iterator[instrument.Recorder]:
+    """Enable the process recorder for one test and reset it afterwards."""
+    instrument.reset()
+    instrument.enable()
+    yield instrument.recorder
+    instrument.disable()
+    instrument.reset()
+
+
+class TestRecorder:
+    """Test cases for stage timers and counters."""
+
+    def test_disabled_recorder_records_nothing(self) -> None:
+        """Test that timers and counters are no-ops until enabled."""
+        disabled = instrument.Recorder()
+        with disabled.timer(_STAGE):
+            pass
+        disabled.count(_COUNTER)
+
+        assert disabled.snapshot() == {"stages": {}, "counters": {}}
+
+    def test_timer_accumulates_calls(self, recorder: instrument.Recorder) -> None:
+        """Test that each timed block adds one call to its stage."""
+        for _ in range(3):
+            with instrument.timer(_STAGE):
+                pass
+        instrument.count(_COUNTER, 2)
+
+        data = instrument.snapshot()
+        stats = data["stages"][_STAGE]
+        assert stats["calls"] == 3  # noqa: PLR2004
+        assert stats["total_seconds"] >= stats["max_seconds"] >= 0
+        assert data["counters"][_COUNTER] == 2  # noqa: PLR2004
+
+    def test_timer_records_failed_calls(self, recorder: instrument.Recorder) -> None:
+        """Test that a block that raises is still timed."""
+        with pytest.raises(ValueError), instrument.timer(_STAGE):
+            raise ValueError("boom")
+
+        assert instrument.snapshot()["stages"][_STAGE]["calls"] == 1
+
+
+class TestExport:
+    """Test cases for rendering recorded values."""
+
+    def test_json_round_trips(self, recorder: instrument.Recorder) -> None:
+        """Test that JSON output holds the snapshot."""
+        with instrument.timer(_STAGE):
+            pass
+
+        assert json.loads(instrument.to_json()) == instrument.snapshot()
+
+    def test_prometheus_text(self, recorder: instrument.Recorder) -> None:
+        """Test that stages are labelled series and counters are counters."""
+        with instrument.timer(_STAGE):
+            pass
+        instrument.count(_COUNTER)
+
+        text = instrument.to_prometheus()
+
+        prefix = constants.METRICS_PREFIX
+        assert f'{prefix}_stage_calls_total{{stage="{_STAGE}"}} 1' in text
+        assert f"{prefix}_{_COUNTER}_total 1" in text
@@ -0,0 +1,189 @@
+"""Unit tests for intraday module."""
+
+from datetime import timedelta
+from itertools import pairwise
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heisenbux import constants, intraday
+from tests import helpers
+
+_TICKER = "TEST"
+_DAYS = ("2024-03-04", "2024-03-05")
+_MINUTES_PER_SESSION = 390
+
+
+def _minute_frame(days: tuple[str, ...] = _DAYS) -> pd.DataFrame:
+    """Create one full session of 1-minute bars per day."""
+    index = pd.DatetimeIndex(
+        np.concatenate(
+            [
+                pd.date_range(
+                    f"{day} 09:30",
+                    periods=_MINUTES_PER_SESSION,
+                    freq="1min",
+                    tz=constants.MARKET_TIMEZONE,
+                )
+                for day in days
+            ]
+        ),
+        name=constants.DataFrameColumns.DATE,
+    ).tz_convert(constants.MARKET_TIMEZONE)
+    close = 100 + np.arange(len(index)) * 0.01
+    return pd.DataFrame(
+        {
+            constants.DataFrameColumns.OPEN: close - 0.005,
+            constants.DataFrameColumns.HIGH: close + 0.02,
+            constants.DataFrameColumns.LOW: close - 0.02,
+            constants.DataFrameColumns.CLOSE: close,
+            constants.DataFrameColumns.VOLUME: np.arange(len(index)) + 100,
+        },
+        index=index,
+    )
+
+
+class TestStore:
+    """Test cases for the day-partitioned bar store."""
+
+    def test_writes_one_compact_partition_per_day(self, tmp_path: Path) -> None:
+        """Test that bars are split by market day with compact dtypes."""
+        paths = intraday.write_bars(
+            intraday.from_frame(_minute_frame()), _TICKER, root=tmp_path
+        )
+
+        assert [path.stem for path in paths] == list(_DAYS)
+        with np.load(paths[0]) as archive:
+            assert archive[constants.DataFrameColumns.CLOSE].dtype == np.float32
+            assert archive["timestamp"].dtype == np.int64
+
+    def test_read_range_opens_only_its_days(self, tmp_path: Path) -> None:
+        """Test that reading one day returns only that day's bars."""
+        intraday.write_bars(
+            intraday.from_frame(_minute_frame()), _TICKER, root=tmp_path
+        )
+
+        bars = intraday.read_bars(_TICKER, start=_DAYS[1], end=_DAYS[1], root=tmp_path)
+
+        assert len(bars) == _MINUTES_PER_SESSION
+        assert str(bars.to_frame().index[0].date()) == _DAYS[1]
+
+    def test_overlapping_write_replaces_stored_bars(self, tmp_path: Path) -> None:
+        """Test that rewriting a day keeps one bar per timestamp, newest wins."""
+        df = _minute_frame(_DAYS[:1])
+        intraday.write_bars(intraday.from_frame(df), _TICKER, root=tmp_path)
+        revised = df.iloc[-10:].copy()
+        revised[constants.DataFrameColumns.CLOSE] = 1.0
+        intraday.write_bars(intraday.from_frame(revised), _TICKER, root=tmp_path)
+
+        bars = intraday.read_bars(_TICKER, root=tmp_path)
+
+        assert len(bars) == _MINUTES_PER_SESSION
+        np.testing.assert_array_equal(bars.close[-10:], 1.0)
+
+
+class TestResample:
+    """Test cases for building coarser bars from finer ones."""
+
+    @pytest.mark.parametrize("interval", ["5m", "30m"])
+    def test_matches_pandas_resample(self, interval: str) -> None:
+        """Test that bars aggregate like pandas OHLC resampling."""
+        df = _minute_frame()
+        result = intraday.resample(intraday.from_frame(df), interval).to_frame()
+
+        expected = (
+            df.resample(interval.replace("m", "min"))
+            .agg(
+                {
+                    constants.DataFrameColumns.OPEN: "first",
+                    constants.DataFrameColumns.HIGH: "max",
+                    constants.DataFrameColumns.LOW: "min",
+                    constants.DataFrameColumns.CLOSE: "last",
+                    constants.DataFrameColumns.VOLUME: "sum",
+                }
+            )
+            .dropna()
+        )
+        pd.testing.assert_frame_equal(
+            result, expected, check_dtype=False, check_freq=False, rtol=1e-5
+        )
+
+    def test_hourly_and_daily_buckets_start_at_the_open(self) -> None:
+        """Test that hours start at 9:30 and a day is one session bar."""
+        bars = intraday.from_frame(_minute_frame())
+
+        hourly = intraday.resample(bars, constants.BarIntervals.HOUR).to_frame()
+        daily = intraday.resample(bars, constants.BarIntervals.DAY).to_frame()
+
+        assert hourly.index[1].strftime("%H:%M") == "10:30"
+        assert len(daily) == len(_DAYS)
+        assert daily[constants.DataFrameColumns.VOLUME].iloc[0] == sum(
+            range(100, 100 + _MINUTES_PER_SESSION)
+        )
+
+    def test_unsupported_interval_raises(self) -> None:
+        """Test that unknown intervals are rejected."""
+        with pytest.raises(ValueError, match="Unsupported"):
+            intraday.interval_nanoseconds("7m")
+
+
+class TestGetIntradayData:
+    """Test cases for fetching intraday data through the store."""
+
+    def test_downloads_base_interval_once(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that coarser intervals reuse the stored base bars."""
+        monkeypatch.chdir(tmp_path)
+        df = _minute_frame()
+        today = pd.Timestamp(_DAYS[-1]).date()
+        mock_ticker = helpers.create_mock_ticker(df)
+
+        with (
+            patch("yfinance.Ticker", return_value=mock_ticker),
+            patch("heisenbux.intraday.date") as mock_date,
+        ):
+            mock_date.today.return_value = today
+            five = intraday.get_intraday_data(
+                _TICKER, constants.BarIntervals.FIVE_MINUTES
+            )
+            calls = mock_ticker.history.call_count
+            hourly = intraday.get_intraday_data(_TICKER, constants.BarIntervals.HOUR)
+
+        assert mock_ticker.history.call_count == calls
+        assert len(five) == len(_DAYS) * _MINUTES_PER_SESSION // 5
+        assert len(hourly) == len(_DAYS) * 7
+
+    def test_minute_requests_stay_within_provider_limit(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that 1 minute downloads are split into 7 day requests."""
+        monkeypatch.chdir(tmp_path)
+        today = pd.Timestamp(_DAYS[-1]).date()
+        mock_ticker = helpers.create_mock_ticker(_minute_frame())
+
+        with (
+            patch("yfinance.Ticker", return_value=mock_ticker),
+            patch("heisenbux.intraday.date") as mock_date,
+        ):
+            mock_date.today.return_value = today
+            intraday.get_intraday_data(_TICKER, constants.BarIntervals.MINUTE)
+
+        spans = [
+            (call.kwargs["start"], call.kwargs["end"])
+            for call in mock_ticker.history.call_args_list
+        ]
+        assert len(spans) > 1
+        assert all(end - start <= timedelta(days=7) for start, end in spans)
+        assert all(a[1] == b[0] for a, b in pairwise(spans))
+        assert spans[-1][1].date() == today + timedelta(days=1)
+
+    def test_interval_finer_than_base_raises(self) -> None:
+        """Test that bars cannot be built from coarser stored bars."""
+        with pytest.raises(ValueError, match="cannot be built"):
+            intraday.get_intraday_data(
+                _TICKER, constants.BarIntervals.MINUTE, base_interval="5m"
+            )
@@ -0,0 +1,141 @@
+"""Unit tests for ledger module."""
+
+from collections.abc import Iterator
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from heisenbux import constants, ledger
+
+Types = constants.TransactionTypes
+
+_ACCOUNT = "Taxable"
+_IRA = "Roth IRA"
+
+
+def _trade(  # noqa: PLR0913
+    day: str,
+    kind: constants.TransactionTypes,
+    shares: float,
+    price: float,
+    ticker: str = "VTI",
+    account: str = _ACCOUNT,
+    fees: float = 0.0,
+) -> ledger.Transaction:
+    """Build a transaction."""
+    return ledger.Transaction(
+        date=date.fromisoformat(day),
+        account=account,
+        ticker=ticker,
+        type=kind,
+        shares=shares,
+        price=price,
+        fees=fees,
+    )
+
+
+_HISTORY = [
+    _trade("2023-01-10", Types.BUY, 10, 100.0, fees=10.0),
+    _trade("2023-03-31", Types.REINVEST, 1, 110.0),
+    _trade("2023-06-01", Types.BUY, 10, 120.0),
+    _trade("2023-09-01", Types.SELL, 15, 130.0),
+    _trade("2023-02-01", Types.BUY, 5, 50.0, ticker="BND", account=_IRA),
+]
+
+
+@pytest.fixture
+def book(tmp_path: Path) -> Iterator[ledger.Ledger]:
+    """Open a ledger holding the sample history."""
+    with ledger.Ledger(tmp_path / constants.LEDGER_FILE) as opened:
+        opened.append(_HISTORY)
+        yield opened
+
+
+class TestLedger:
+    """Test cases for recording transactions and querying lots."""
+
+    def test_sale_consumes_lots_first_in_first_out(self, book: ledger.Ledger) -> None:
+        """Test that a sale closes the oldest lots first."""
+        lots = book.open_lots(account=_ACCOUNT)
+
+        assert list(lots["open_date"]) == ["2023-06-01"]
+        assert lots["remaining"].iloc[0] == pytest.approx(6)
+        assert lots["cost_per_share"].iloc[0] == pytest.approx(120.0)
+
+    def test_positions_as_of_date(self, book: ledger.Ledger) -> None:
+        """Test running positions before and after the sale."""
+        before = book.positions(as_of="2023-08-31", account=_ACCOUNT)
+        after = book.positions(account=_ACCOUNT)
+
+        # Fees are part of the first lot's cost basis
+        assert before["shares"].iloc[0] == pytest.approx(21)
+        assert before["cost_basis"].iloc[0] == pytest.approx(1010 + 110 + 1200)
+        assert after["shares"].iloc[0] == pytest.approx(6)
+        assert after["cost_basis"].iloc[0] == pytest.approx(6 * 120.0)
+        assert set(book.positions(as_of=date(2023, 2, 1))["ticker"]) == {"VTI", "BND"}
+        assert book.positions(as_of="2022-12-31").empty
+
+    def test_open_lots_as_of_date(self, book: ledger.Ledger) -> None:
+        """Test reconstructing the open lots before the sale."""
+        lots = book.open_lots(as_of="2023-08-31", ticker="vti")
+
+        assert list(lots["remaining"]) == pytest.approx([10, 1, 10])
+
+    def test_highest_cost_lots_sold_first(self, tmp_path: Path) -> None:
+        """Test that HIFO relief sells the most expensive lot first."""
+        with ledger.Ledger(
+            tmp_path / constants.LEDGER_FILE, constants.LotMethods.HIFO
+        ) as book:
+            book.append(_HISTORY)
+
+            lots = book.open_lots(account=_ACCOUNT)
+
+        assert list(lots["remaining"]) == pytest.approx([6])
+        assert list(lots["open_date"]) == ["2023-01-10"]
+
+    def test_harvest_candidates(self, book: ledger.Ledger) -> None:
+        """Test finding open lots with unrealized losses."""
+        candidates = book.harvest_candidates({"VTI": 115.0, "BND": 60.0})
+
+        assert list(candidates["open_date"]) == ["2023-06-01"]
+        assert candidates["loss"].iloc[0] == pytest.approx(6 * 5.0)
+        assert book.harvest_candidates({"VTI": 115.0}, min_loss=100.0).empty
+        assert book.harvest_candidates({"VTI": 115.0}, accounts=[_IRA]).empty
+
+    def test_transactions_query(self, book: ledger.Ledger) -> None:
+        """Test filtering recorded transactions."""
+        rows = book.transactions(ticker="VTI", start="2023-03-01", end="2023-06-30")
+
+        assert list(rows["type"]) == ["reinvest", "buy"]
+        assert len(book.transactions()) == len(_HISTORY)
+
+    def test_overselling_rolls_back_batch(self, book: ledger.Ledger) -> None:
+        """Test that a rejected transaction discards its whole batch."""
+        with pytest.raises(ValueError, match="sells more"):
+            book.append(
+                [
+                    _trade("2024-01-02", Types.BUY, 1, 100.0, ticker="BND"),
+                    _trade("2024-01-03", Types.SELL, 100, 100.0),
+                ]
+            )
+
+        assert len(book.transactions()) == len(_HISTORY)
+        assert list(book.positions(account=_ACCOUNT)["ticker"]) == ["VTI"]
+
+    def test_backdated_transaction_raises(self, book: ledger.Ledger) -> None:
+        """Test that trades before the latest recorded one are rejected."""
+        with pytest.raises(ValueError, match="dated before"):
+            book.append([_trade("2023-07-01", Types.BUY, 1, 100.0)])
+
+    def test_ledger_persists(self, tmp_path: Path) -> None:
+        """Test that a reopened ledger keeps its lots and positions."""
+        path = tmp_path / constants.LEDGER_FILE
+        with ledger.Ledger(path) as book:
+            book.append(_HISTORY[:2])
+        with ledger.Ledger(path) as book:
+            book.append(_HISTORY[2:])
+
+            assert book.positions(account=_ACCOUNT)["shares"].iloc[0] == pytest.approx(
+                6
+            )
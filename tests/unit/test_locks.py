@@ -0,0 +1,87 @@
+"""Unit tests for locks module."""
+
+import subprocess
+import sys
+import textwrap
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from heisenbux import constants, locks
+
+_TICKER = "TEST"
+
+
+@pytest.fixture
+def holder(tmp_path: Path) -> Iterator[subprocess.Popen[str]]:
+    """Hold the ticker lock in another process until its stdin is closed.
+
+    The holder rewrites the ticker's cache file before releasing the lock.
+    """
+    script = textwrap.dedent(
+        f"""
+        import sys
+        from pathlib import Path
+        from heisenbux import locks
+
+        with locks.ticker_lock({str(tmp_path)!r}, {_TICKER!r}):
+            print("locked", flush=True)
+            sys.stdin.read()
+            Path({str(tmp_path)!r}, "{_TICKER}{constants.CACHE_FORMAT}").write_bytes(
+                b"data"
+            )
+        """
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    assert process.stdout is not None
+    assert process.stdout.readline().strip() == "locked"
+    yield process
+    process.kill()
+    process.wait()
+
+
+class TestTickerLock:
+    """Test cases for the cross-process ticker lock."""
+
+    def test_uncontended_lock_does_not_report_refresh(self, tmp_path: Path) -> None:
+        """Test that taking a free lock reports no concurrent write."""
+        with locks.ticker_lock(tmp_path, _TICKER) as refreshed:
+            assert not refreshed
+
+        assert (tmp_path / constants.LOCKS_DIRECTORY / f"{_TICKER}.lock").exists()
+
+    def test_waiter_sees_write_of_lock_holder(
+        self,
+        tmp_path: Path,
+        holder: subprocess.Popen[str],
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that a waiting process learns the holder wrote the cache file."""
+        wait_for_lock = locks._wait_for_lock
+
+        def release_then_wait(*args: Any) -> None:
+            assert holder.stdin is not None
+            holder.stdin.close()
+            wait_for_lock(*args)
+
+        monkeypatch.setattr(locks, "_wait_for_lock", release_then_wait)
+
+        with locks.ticker_lock(tmp_path, _TICKER) as refreshed:
+            assert refreshed
+
+    def test_times_out_while_lock_is_held(
+        self, tmp_path: Path, holder: subprocess.Popen[str]
+    ) -> None:
+        """Test that waiting for a held lock gives up after the timeout."""
+        with (
+            pytest.raises(TimeoutError),
+            locks.ticker_lock(tmp_path, _TICKER, timeout=0.1),
+        ):
+            pass
@@ -0,0 +1,157 @@
+"""Unit tests for manifest module."""
+
+import hashlib
+import shutil
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from heisenbux import constants, finance, manifest, storage
+from tests import helpers
+from tests.fixtures import sample_data
+
+# Legacy CSV caches committed with the repository
+_LEGACY_CACHE = Path(__file__).parents[2] / constants.Directories.CACHE
+
+
+def _write(cache_dir: Path, ticker: str) -> Path:
+    """Write a sample cache file for a ticker."""
+    cache_file = cache_dir / f"{ticker}{constants.CACHE_FORMAT}"
+    storage.write_prices(sample_data.create_sample_dataframe(), cache_file)
+    return cache_file
+
+
+class TestManifest:
+    """Test cases for the cache manifest."""
+
+    def test_record_stores_range_rows_and_hash(self, tmp_path: Path) -> None:
+        """Test that recording a write indexes the cache file."""
+        cache_file = _write(tmp_path, "VTI")
+        df = storage.read_prices(cache_file)
+
+        with manifest.Manifest(tmp_path) as index:
+            index.record("vti", df)
+            entries = index.entries()
+
+        entry = entries.loc["VTI"]
+        assert entry["rows"] == len(df)
+        assert entry["first_date"] == df.index.min().date().isoformat()
+        assert entry["last_date"] == df.index.max().date().isoformat()
+        assert entry["schema_version"] == constants.CACHE_SCHEMA_VERSION
+        assert (
+            entry["content_hash"] == hashlib.sha256(cache_file.read_bytes()).hexdigest()
+        )
+
+    def test_stale_lists_tickers_refreshed_before_cutoff(self, tmp_path: Path) -> None:
+        """Test that stale tickers are found from the manifest alone."""
+        for ticker in ("VTI", "BND"):
+            _write(tmp_path, ticker)
+        df = sample_data.create_sample_dataframe()
+
+        with manifest.Manifest(tmp_path) as index:
+            index.record("VTI", df, refreshed_at=datetime(2024, 1, 2, 18))
+            index.record("BND", df)
+            stale = index.stale()
+            stale_before_2024 = index.stale(datetime(2024, 1, 1))
+
+        assert stale == ["VTI"]
+        assert stale_before_2024 == []
+
+    def test_rebuild_indexes_existing_files(self, tmp_path: Path) -> None:
+        """Test that a rebuild re-indexes files and drops missing tickers."""
+        _write(tmp_path, "VTI")
+        gone = _write(tmp_path, "GONE")
+        df = sample_data.create_sample_dataframe()
+
+        with manifest.Manifest(tmp_path) as index:
+            index.record("GONE", df)
+            gone.unlink()
+            count = index.rebuild()
+            tickers = list(index.entries().index)
+
+        assert count == 1
+        assert tickers == ["VTI"]
+
+    def test_refresh_times_share_one_format(self, tmp_path: Path) -> None:
+        """Test that recorded and rebuilt refresh times compare as text."""
+        _write(tmp_path, "VTI")
+        df = sample_data.create_sample_dataframe()
+
+        with manifest.Manifest(tmp_path) as index:
+            index.record("VTI", df, refreshed_at=datetime(2024, 1, 2, 18))
+            recorded = index.entries().loc["VTI", "refreshed_at"]
+            index.rebuild()
+            rebuilt = index.entries().loc["VTI", "refreshed_at"]
+
+        assert len(str(recorded)) == len(str(rebuilt))
+
+    def test_rejects_unknown_schema_version(self, tmp_path: Path) -> None:
+        """Test that a manifest from a newer version is not silently reused."""
+        manifest.Manifest(tmp_path).close()
+        index = manifest.Manifest(tmp_path)
+        index.connection.execute("PRAGMA user_version = 99")
+        index.close()
+
+        with pytest.raises(ValueError, match="schema version"):
+            manifest.Manifest(tmp_path)
+
+
+class TestFinanceWrites:
+    """Test cases for keeping the manifest in step with cache writes."""
+
+    def test_download_records_entry(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that downloading a ticker records it in the manifest."""
+        monkeypatch.chdir(tmp_path)
+
+        with patch("yfinance.Ticker", return_value=helpers.create_mock_ticker()):
+            df = finance.get_ticker_data(sample_data.SAMPLE_TICKER)
+
+        with manifest.Manifest() as index:
+            entries = index.entries()
+        assert entries.loc[sample_data.SAMPLE_TICKER.upper(), "rows"] == len(df)
+
+    def test_migrated_csv_records_entry(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that migrating a legacy CSV cache indexes the new file."""
+        monkeypatch.chdir(tmp_path)
+        cache_dir = tmp_path / constants.Directories.CACHE
+        cache_dir.mkdir()
+        sample_df = sample_data.create_sample_dataframe()
+        sample_df.to_csv(cache_dir / f"VTI{constants.FileExtensions.CSV}")
+
+        finance.get_ticker_data("VTI")
+
+        with manifest.Manifest() as index:
+            assert index.entries().loc["VTI", "rows"] == len(sample_df)
+
+    @pytest.mark.parametrize(
+        "legacy",
+        sorted(_LEGACY_CACHE.glob(f"*{constants.FileExtensions.CSV}")),
+        ids=lambda path: path.stem,
+    )
+    def test_migrated_legacy_cache_records_entry(
+        self, legacy: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test migrating a committed cache whose dates span a DST change."""
+        monkeypatch.chdir(tmp_path)
+        cache_dir = tmp_path / constants.Directories.CACHE
+        cache_dir.mkdir()
+        shutil.copy(legacy, cache_dir)
+        dates = [line.split(",")[0] for line in legacy.read_text().splitlines()[1:]]
+        assert len({date[-6:] for date in dates}) > 1
+
+        with patch("yfinance.Ticker") as mock_ticker:
+            df = finance.get_ticker_data(legacy.stem)
+
+        mock_ticker.assert_not_called()
+        assert (cache_dir / f"{legacy.stem}{constants.CACHE_FORMAT}").exists()
+        with manifest.Manifest() as index:
+            entry = index.entries().loc[legacy.stem]
+        assert entry["rows"] == len(df)
+        assert entry["first_date"] == dates[0][:10]
+        assert entry["last_date"] == dates[-1][:10]
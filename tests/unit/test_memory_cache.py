@@ -0,0 +1,147 @@
+"""Unit tests for memory_cache module."""
+
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+import pytest
+
+from heisenbux import constants, finance, memory_cache, storage
+from tests import helpers
+from tests.fixtures import sample_data
+
+MARKET_TZ = ZoneInfo(constants.MARKET_TIMEZONE)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        """Return the current time in seconds."""
+        return self.now
+
+
+class TestTickerDataCache:
+    """Test cases for TickerDataCache."""
+
+    @pytest.fixture
+    def sample_df(self) -> pd.DataFrame:
+        """Get sample DataFrame for testing."""
+        return sample_data.create_sample_dataframe()
+
+    def test_get_returns_cached_frame_and_counts_hits(
+        self, sample_df: pd.DataFrame
+    ) -> None:
+        """Test that lookups are counted as hits and misses."""
+        cache = memory_cache.TickerDataCache()
+
+        assert cache.get("VTI") is None
+        cache.put("VTI", sample_df, ttl_seconds=60)
+
+        assert cache.get("VTI") is sample_df
+        assert cache.stats == memory_cache.CacheStats(hits=1, misses=1)
+
+    def test_entries_expire_after_ttl(self, sample_df: pd.DataFrame) -> None:
+        """Test that stale entries are dropped on lookup."""
+        clock = FakeClock()
+        cache = memory_cache.TickerDataCache(clock=clock)
+        cache.put("VTI", sample_df, ttl_seconds=60)
+
+        clock.now = 59.0
+        assert cache.get("VTI") is not None
+        clock.now = 60.0
+        assert cache.get("VTI") is None
+
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+        assert cache.size == 0
+
+    def test_evicts_least_recently_used_over_byte_budget(
+        self, sample_df: pd.DataFrame
+    ) -> None:
+        """Test that the least recently used entry is evicted first."""
+        entry_size = int(sample_df.memory_usage(index=True, deep=True).sum())
+        cache = memory_cache.TickerDataCache(max_bytes=2 * entry_size)
+        cache.put("VTI", sample_df, ttl_seconds=60)
+        cache.put("VXUS", sample_df, ttl_seconds=60)
+        cache.get("VTI")
+
+        cache.put("BND", sample_df, ttl_seconds=60)
+
+        assert cache.get("VXUS") is None
+        assert cache.get("VTI") is not None
+        assert cache.get("BND") is not None
+        assert cache.stats.evictions == 1
+        assert cache.size == 2 * entry_size
+
+    def test_skips_frames_larger_than_budget(self, sample_df: pd.DataFrame) -> None:
+        """Test that a frame larger than the whole budget is not cached."""
+        cache = memory_cache.TickerDataCache(max_bytes=1)
+
+        cache.put("VTI", sample_df, ttl_seconds=60)
+
+        assert len(cache) == 0
+
+
+class TestFreshnessTtl:
+    """Test cases for freshness_ttl."""
+
+    def test_short_ttl_during_market_hours(self) -> None:
+        """Test that data fetched while the market is open expires quickly."""
+        now = datetime(2024, 6, 12, 11, 0, tzinfo=MARKET_TZ)  # Wednesday
+
+        assert (
+            memory_cache.freshness_ttl(now) == constants.MEMORY_CACHE_MARKET_TTL_SECONDS
+        )
+
+    def test_ttl_lasts_until_next_open_after_close(self) -> None:
+        """Test that data fetched after the close stays fresh until the open."""
+        now = datetime(2024, 6, 12, 17, 0, tzinfo=MARKET_TZ)  # Wednesday
+
+        assert memory_cache.freshness_ttl(now) == 16.5 * 3600
+
+    def test_ttl_skips_weekend(self) -> None:
+        """Test that data fetched on Friday evening stays fresh until Monday."""
+        now = datetime(2024, 6, 14, 20, 0, tzinfo=MARKET_TZ)  # Friday
+
+        assert memory_cache.freshness_ttl(now) == (2 * 24 + 13.5) * 3600
+
+
+class TestGetTickerDataMemoryCache:
+    """Test cases for the in-memory cache in front of get_ticker_data."""
+
+    def test_repeated_lookups_skip_disk(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a repeated lookup is served from memory."""
+        monkeypatch.chdir(tmp_path)
+
+        with patch("yfinance.Ticker", return_value=helpers.create_mock_ticker()):
+            first = finance.get_ticker_data(sample_data.SAMPLE_TICKER)
+
+        with patch.object(storage, "read_prices") as mock_read:
+            second = finance.get_ticker_data(sample_data.SAMPLE_TICKER)
+
+        mock_read.assert_not_called()
+        assert second is first
+        assert finance.ticker_cache.stats.hits == 1
+
+    def test_force_download_bypasses_memory(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that force_download always goes to the provider."""
+        monkeypatch.chdir(tmp_path)
+        mock_ticker = helpers.create_mock_ticker()
+
+        with patch("yfinance.Ticker", return_value=mock_ticker):
+            finance.get_ticker_data(sample_data.SAMPLE_TICKER)
+            mock_ticker.history.reset_mock()
+            finance.get_ticker_data(sample_data.SAMPLE_TICKER, force_download=True)
+
+        mock_ticker.history.assert_called_once()
@@ -0,0 +1,174 @@
+"""Unit tests for optimize module."""
+
+import numpy as np
+import numpy.typing as npt
+import pytest
+
+from heisenbux import constants, optimize, panel
+from tests.fixtures import sample_data
+
+_PERIODS = 500
+_ASSETS = 6
+_POINTS = 20
+_SLACK = 1e-9
+
+
+def _returns(seed: int = 0) -> npt.NDArray[np.float64]:
+    """Build correlated daily returns with different means."""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, size=(_PERIODS, 1))
+    noise = rng.normal(0, 0.01, size=(_PERIODS, _ASSETS))
+    drift = np.linspace(0.0001, 0.0010, _ASSETS)
+    returns: npt.NDArray[np.float64] = (
+        market + noise * np.arange(1, _ASSETS + 1) + drift
+    )
+    return returns
+
+
+class TestProjection:
+    """Test cases for projecting onto bounded fully-invested weights."""
+
+    @pytest.mark.parametrize(("lower", "upper"), [(0.0, 1.0), (0.05, 0.3), (-1.0, 2.0)])
+    def test_projection_is_closest_feasible_point(
+        self, lower: float, upper: float
+    ) -> None:
+        """Test the projection against a bisection on the shift."""
+        values = np.random.default_rng(1).normal(0, 1, size=_ASSETS)
+        low, high = np.full(_ASSETS, lower), np.full(_ASSETS, upper)
+
+        result = optimize.project_capped_simplex(values, low, high)
+
+        shift_low, shift_high = values.min() - upper, values.max() - lower
+        for _ in range(200):
+            shift = (shift_low + shift_high) / 2
+            if np.clip(values - shift, lower, upper).sum() > 1:
+                shift_low = shift
+            else:
+                shift_high = shift
+        np.testing.assert_allclose(result, np.clip(values - shift, lower, upper))
+        assert result.sum() == pytest.approx(1.0)
+
+    def test_projection_of_feasible_point_is_unchanged(self) -> None:
+        """Test that weights already satisfying the constraints are kept."""
+        weights = np.array([0.2, 0.3, 0.5])
+
+        result = optimize.project_capped_simplex(weights, np.zeros(3), np.ones(3))
+
+        np.testing.assert_allclose(result, weights)
+
+
+class TestFrontierOptimizer:
+    """Test cases for solving and tracing the efficient frontier."""
+
+    @pytest.fixture
+    def optimizer(self) -> optimize.FrontierOptimizer:
+        """Create an optimizer from sample returns."""
+        expected, covariance = optimize.estimate_inputs(_returns())
+        return optimize.FrontierOptimizer(expected, covariance)
+
+    def test_minimum_variance_matches_closed_form(
+        self, optimizer: optimize.FrontierOptimizer
+    ) -> None:
+        """Test the minimum-variance solve when the bounds do not bind."""
+        weights, _ = optimizer.solve(0.0, lower=-10.0, upper=10.0)
+
+        inverse = np.linalg.solve(optimizer.covariance, np.ones(_ASSETS))
+        np.testing.assert_allclose(weights, inverse / inverse.sum(), atol=1e-6)
+
+    def test_frontier_is_monotonic_and_feasible(
+        self, optimizer: optimize.FrontierOptimizer
+    ) -> None:
+        """Test that risk and return rise along a long-only frontier."""
+        frontier = optimizer.frontier(_POINTS)
+
+        assert frontier.weights.shape == (_POINTS, _ASSETS)
+        np.testing.assert_allclose(frontier.weights.sum(axis=1), 1.0)
+        assert (frontier.weights >= 0).all()
+        assert (np.diff(frontier.expected_returns) >= -_SLACK).all()
+        assert (np.diff(frontier.volatilities) >= -_SLACK).all()
+        best = np.argmax(optimizer.expected_returns)
+        assert frontier.weights[-1, best] == pytest.approx(1.0, abs=1e-6)
+
+    def test_frontier_respects_weight_caps(
+        self, optimizer: optimize.FrontierOptimizer
+    ) -> None:
+        """Test that upper bounds cap every weight on the frontier."""
+        cap = 0.25
+
+        frontier = optimizer.frontier(_POINTS, upper=cap)
+
+        assert frontier.weights.max() <= cap + 1e-12
+        np.testing.assert_allclose(frontier.weights.sum(axis=1), 1.0)
+
+    def test_warm_start_reduces_iterations(
+        self, optimizer: optimize.FrontierOptimizer
+    ) -> None:
+        """Test that starting from the solution converges immediately."""
+        weights, cold = optimizer.solve(1.0)
+
+        _, warm = optimizer.solve(1.0, initial=weights)
+
+        assert warm < cold
+
+    def test_infeasible_bounds_raise(
+        self, optimizer: optimize.FrontierOptimizer
+    ) -> None:
+        """Test that bounds excluding every fully invested portfolio fail."""
+        with pytest.raises(ValueError, match="weight bounds"):
+            optimizer.solve(0.0, upper=0.1)
+
+    def test_mismatched_shapes_raise(self) -> None:
+        """Test that the covariance must match the expected returns."""
+        with pytest.raises(ValueError, match="does not match"):
+            optimize.FrontierOptimizer(np.zeros(3), np.eye(2))
+
+
+class TestEstimators:
+    """Test cases for covariance estimation."""
+
+    def test_ledoit_wolf_matches_reference(self) -> None:
+        """Test Ledoit-Wolf against a direct transcription of the estimator."""
+        returns = _returns()
+        centered = returns - returns.mean(axis=0)
+        sample = centered.T @ centered / _PERIODS
+        target = np.trace(sample) / _ASSETS * np.eye(_ASSETS)
+        spread = (
+            sum(np.sum((np.outer(row, row) - sample) ** 2) for row in centered)
+            / _PERIODS**2
+        )
+        distance = np.sum((sample - target) ** 2)
+        expected_shrinkage = min(spread, distance) / distance
+
+        covariance, shrinkage = optimize.ledoit_wolf(returns)
+
+        assert shrinkage == pytest.approx(expected_shrinkage)
+        np.testing.assert_allclose(
+            covariance, shrinkage * target + (1 - shrinkage) * sample
+        )
+
+    def test_ledoit_wolf_estimator_is_annualized(self) -> None:
+        """Test that estimate_inputs annualizes the shrunk covariance."""
+        returns = _returns()
+
+        _, covariance = optimize.estimate_inputs(
+            returns, constants.CovarianceEstimators.LEDOIT_WOLF
+        )
+
+        np.testing.assert_allclose(
+            covariance,
+            optimize.ledoit_wolf(returns)[0] * constants.TRADING_DAYS_PER_YEAR,
+        )
+
+    def test_efficient_frontier_from_panel(self) -> None:
+        """Test tracing a frontier straight from a price panel."""
+        rng = np.random.default_rng(2)
+        frames = {}
+        for ticker in sample_data.VANGUARD_TEST_FUNDS:
+            df = sample_data.create_sample_dataframe()
+            df[constants.DataFrameColumns.CLOSE] *= 1 + rng.normal(0, 0.01, len(df))
+            frames[ticker] = df
+        prices = panel.build_panel(frames)
+
+        frontier = optimize.efficient_frontier(prices, points=_POINTS)
+
+        assert frontier.weights.shape == (_POINTS, len(prices.tickers))
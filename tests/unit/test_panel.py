@@ -0,0 +1,166 @@
+"""Unit tests for panel module."""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heisenbux import constants, finance, panel
+from tests import helpers
+from tests.fixtures import sample_data
+
+
+def _frames() -> dict[str, pd.DataFrame]:
+    """Build sample data for several tickers, with one bar missing from BND."""
+    frames = {
+        ticker: sample_data.create_sample_dataframe()
+        for ticker in sample_data.VANGUARD_TEST_FUNDS
+    }
+    frames["BND"] = frames["BND"].iloc[1:]
+    return frames
+
+
+class TestPricePanel:
+    """Test cases for building, storing and slicing price panels."""
+
+    @pytest.fixture
+    def stored_panel(self, tmp_path: Path) -> panel.PricePanel:
+        """Write a sample panel to disk and memory-map it back."""
+        directory = tmp_path / "panel"
+        panel.write_panel(panel.build_panel(_frames()), directory)
+        return panel.open_panel(directory)
+
+    def test_build_panel_aligns_tickers(self) -> None:
+        """Test that tickers are aligned on the union of trading days."""
+        frames = _frames()
+
+        result = panel.build_panel(frames)
+
+        assert result.tickers == sorted(sample_data.VANGUARD_TEST_FUNDS)
+        close = result[constants.DataFrameColumns.CLOSE]
+        assert close.shape == (len(frames["VTI"]), len(frames))
+        assert np.isnan(close[0, result.tickers.index("BND")])
+        np.testing.assert_array_equal(
+            close[:, result.tickers.index("VTI")],
+            frames["VTI"][constants.DataFrameColumns.CLOSE].to_numpy(),
+        )
+
+    def test_open_panel_memory_maps_arrays(
+        self, stored_panel: panel.PricePanel
+    ) -> None:
+        """Test that stored columns are opened as read-only memory maps."""
+        close = stored_panel[constants.DataFrameColumns.CLOSE]
+        assert type(close).__name__ == "memmap"
+        assert not close.flags.writeable
+
+    def test_select_contiguous_range_is_zero_copy(
+        self, stored_panel: panel.PricePanel
+    ) -> None:
+        """Test that date ranges and adjacent tickers are views, not copies."""
+        dates = stored_panel.dates
+        selection = stored_panel.select(
+            stored_panel.tickers[:2], start=str(dates[5]), end=str(dates[10])
+        )
+
+        close = selection[constants.DataFrameColumns.CLOSE]
+        assert close.shape == (6, 2)
+        assert np.shares_memory(close, stored_panel[constants.DataFrameColumns.CLOSE])
+        np.testing.assert_array_equal(selection.dates, dates[5:11])
+
+    def test_select_reorders_tickers(self, stored_panel: panel.PricePanel) -> None:
+        """Test that tickers can be selected in any order and case."""
+        selection = stored_panel.select(["vxus", "BND"])
+
+        assert selection.tickers == ["VXUS", "BND"]
+        frame = selection.to_frame(constants.DataFrameColumns.CLOSE)
+        assert list(frame.columns) == ["VXUS", "BND"]
+        assert len(frame) == len(stored_panel.dates)
+
+    def test_select_unknown_ticker_raises(self, stored_panel: panel.PricePanel) -> None:
+        """Test that selecting tickers missing from the store fails."""
+        with pytest.raises(KeyError, match="NOPE"):
+            stored_panel.select(["VTI", "NOPE"])
+
+    def test_write_panel_swaps_versions(self, tmp_path: Path) -> None:
+        """Test that rewrites keep the open store readable and prune old ones."""
+        directory = tmp_path / "panel"
+        frames = _frames()
+        panel.write_panel(panel.build_panel(frames), directory)
+        first = panel.open_panel(directory)
+
+        for _ in range(2):
+            panel.write_panel(panel.build_panel({"VTI": frames["VTI"]}), directory)
+
+        versions = [path for path in directory.iterdir() if path.is_dir()]
+        assert len(versions) == 2  # noqa: PLR2004
+        assert panel.open_panel(directory).tickers == ["VTI"]
+        assert np.isfinite(first[constants.DataFrameColumns.CLOSE][-1]).all()
+
+    def test_open_panel_without_store_raises(self, tmp_path: Path) -> None:
+        """Test that opening a missing store fails."""
+        with pytest.raises(FileNotFoundError):
+            panel.open_panel(tmp_path / "panel")
+
+
+class TestLoadPanel:
+    """Test cases for finance.load_panel."""
+
+    def test_load_panel_builds_and_reuses_store(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that the store is built once and then served from disk."""
+        monkeypatch.chdir(tmp_path)
+        mock_download = helpers.create_mock_download(_frames())
+
+        with patch("yfinance.download", mock_download):
+            first = finance.load_panel(sample_data.VANGUARD_TEST_FUNDS)
+
+        assert sorted(first.tickers) == sorted(sample_data.VANGUARD_TEST_FUNDS)
+        assert (tmp_path / constants.Directories.PANEL).is_dir()
+
+        with patch("heisenbux.storage.read_prices") as mock_read:
+            second = finance.load_panel(["VTI"])
+
+        mock_read.assert_not_called()
+        assert second.tickers == ["VTI"]
+
+    def test_load_panel_extends_store_with_new_tickers(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that requesting a ticker missing from the store rebuilds it."""
+        monkeypatch.chdir(tmp_path)
+        mock_download = helpers.create_mock_download(_frames())
+
+        with patch("yfinance.download", mock_download):
+            finance.load_panel(["VTI"])
+            result = finance.load_panel(["BND"])
+
+        assert result.tickers == ["BND"]
+        store = panel.open_panel(Path(constants.Directories.PANEL))
+        assert store.tickers == ["BND", "VTI"]
+
+    def test_load_panel_rebuilds_after_cache_write(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a refreshed ticker cache makes the store stale."""
+        monkeypatch.chdir(tmp_path)
+        frames = _frames()
+        mock_download = helpers.create_mock_download(frames)
+
+        with patch("yfinance.download", mock_download):
+            finance.load_panel(["VTI"])
+
+        refreshed = frames["VTI"].copy()
+        refreshed[constants.DataFrameColumns.CLOSE] += 10.0
+        with patch(
+            "yfinance.Ticker", return_value=helpers.create_mock_ticker(refreshed)
+        ):
+            finance.get_ticker_data("VTI", force_download=True)
+        result = finance.load_panel(["VTI"])
+
+        np.testing.assert_allclose(
+            result[constants.DataFrameColumns.CLOSE][:, 0],
+            refreshed[constants.DataFrameColumns.CLOSE],
+        )
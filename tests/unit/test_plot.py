@@ -1,10 +1,12 @@
 """Unit tests for plot module."""
 
+import logging
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pandas as pd
 import pytest
+from matplotlib import pyplot
 
 from heisenbux import constants, plot
 from tests.fixtures import sample_data
@@ -113,26 +115,159 @@ class TestSavePlot:
         mock_xticks.assert_called_once_with(rotation=constants.X_AXIS_ROTATION)
         mock_tight_layout.assert_called_once()
 
-    @patch("builtins.print")
     @patch("matplotlib.pyplot.savefig")
     @patch("matplotlib.pyplot.show")
-    def test_save_plot_prints_save_message(  # noqa: PLR0913
+    def test_save_plot_logs_save_message(  # noqa: PLR0913
         self,
         mock_show: Mock,
         mock_savefig: Mock,
-        mock_print: Mock,
         sample_df: pd.DataFrame,
         tmp_path: Path,
         monkeypatch: pytest.MonkeyPatch,
+        caplog: pytest.LogCaptureFixture,
     ) -> None:
-        """Test that save_plot prints a message about where the plot was saved."""
+        """Test that save_plot logs where the plot was saved."""
         monkeypatch.chdir(tmp_path)
 
-        plot.save_plot(sample_df, sample_data.SAMPLE_TICKER)
+        with caplog.at_level(logging.INFO, logger="heisenbux.plot"):
+            plot.save_plot(sample_df, sample_data.SAMPLE_TICKER)
 
-        # Check that print was called with the save message
         expected_path = (
             Path(constants.Directories.GRAPHS)
             / f"{sample_data.SAMPLE_TICKER}{constants.PLOT_SUFFIX}"
         )
-        mock_print.assert_called_with(f"Plot saved to {expected_path}")
+        assert f"Plot saved to {expected_path}" in caplog.messages
+
+    @patch("matplotlib.pyplot.savefig")
+    def test_save_plot_closes_figure(
+        self,
+        mock_savefig: Mock,
+        sample_df: pd.DataFrame,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that save_plot does not leave figures open."""
+        monkeypatch.chdir(tmp_path)
+
+        with patch("matplotlib.pyplot.show"):
+            plot.save_plot(sample_df, sample_data.SAMPLE_TICKER)
+
+        assert pyplot.get_fignums() == []
+
+
+class TestPlotCache:
+    """Test cases for skipping plots whose data is unchanged."""
+
+    def test_fingerprint_changes_with_data(self) -> None:
+        """Test that the fingerprint depends on the plotted prices only."""
+        df = sample_data.create_sample_dataframe()
+        changed = df.copy()
+        changed[constants.DataFrameColumns.CLOSE] = (
+            changed[constants.DataFrameColumns.CLOSE] * 2
+        )
+        other_columns = df.copy()
+        other_columns[constants.DataFrameColumns.VOLUME] = (
+            other_columns[constants.DataFrameColumns.VOLUME] * 2
+        )
+
+        fingerprint = plot.plot_fingerprint(df, sample_data.SAMPLE_TICKER)
+
+        assert fingerprint == plot.plot_fingerprint(
+            df.copy(), sample_data.SAMPLE_TICKER
+        )
+        assert fingerprint == plot.plot_fingerprint(
+            other_columns, sample_data.SAMPLE_TICKER
+        )
+        assert fingerprint != plot.plot_fingerprint(changed, sample_data.SAMPLE_TICKER)
+        assert fingerprint != plot.plot_fingerprint(df, "OTHER")
+
+    @patch("matplotlib.pyplot.show")
+    def test_save_plot_skips_unchanged_plot(
+        self, mock_show: Mock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that save_plot renders again only for new data or when forced."""
+        monkeypatch.chdir(tmp_path)
+        df = sample_data.create_sample_dataframe()
+        plot.save_plot(df, sample_data.SAMPLE_TICKER)
+
+        with patch("matplotlib.pyplot.savefig") as mock_savefig:
+            plot.save_plot(df, sample_data.SAMPLE_TICKER)
+            mock_savefig.assert_not_called()
+            assert mock_show.call_count == 2  # noqa: PLR2004
+            assert pyplot.get_fignums() == []
+
+            plot.save_plot(df, sample_data.SAMPLE_TICKER, force=True)
+            mock_savefig.assert_called_once()
+
+            mock_savefig.reset_mock()
+            plot.save_plot(df.iloc[:-1], sample_data.SAMPLE_TICKER)
+            mock_savefig.assert_called_once()
+
+    @patch("matplotlib.pyplot.show")
+    def test_save_plot_renders_missing_file(
+        self, mock_show: Mock, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that a deleted plot is rendered again despite a manifest entry."""
+        monkeypatch.chdir(tmp_path)
+        df = sample_data.create_sample_dataframe()
+        plot.save_plot(df, sample_data.SAMPLE_TICKER)
+        plot_file = Path(constants.Directories.GRAPHS) / (
+            f"{sample_data.SAMPLE_TICKER}{constants.PLOT_SUFFIX}"
+        )
+        plot_file.unlink()
+
+        plot.save_plot(df, sample_data.SAMPLE_TICKER)
+
+        assert plot_file.exists()
+
+    def test_render_plots_skips_unchanged_plots(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that render_plots only renders tickers whose data changed."""
+        monkeypatch.chdir(tmp_path)
+        df = sample_data.create_sample_dataframe()
+        first, second = sample_data.VANGUARD_TEST_FUNDS[:2]
+        plot.render_plots({first: df, second: df}, max_workers=1)
+
+        results = plot.render_plots({first: df, second: df.iloc[:-1]}, max_workers=1)
+
+        assert [result.skipped for result in results] == [True, False]
+        forced = plot.render_plots({first: df}, max_workers=1, force=True)
+        assert not forced[0].skipped
+
+
+class TestRenderPlots:
+    """Test cases for headless batch rendering."""
+
+    def test_render_plot_writes_png_without_pyplot_figures(
+        self, tmp_path: Path
+    ) -> None:
+        """Test that render_plot saves an image and leaves no pyplot state."""
+        df = sample_data.create_sample_dataframe()
+
+        result = plot.render_plot(df, sample_data.SAMPLE_TICKER, tmp_path)
+
+        assert result.ticker == sample_data.SAMPLE_TICKER
+        assert result.path == tmp_path / (
+            f"{sample_data.SAMPLE_TICKER}{constants.PLOT_SUFFIX}"
+        )
+        assert result.path.read_bytes().startswith(b"\x89PNG")
+        assert result.seconds > 0
+        assert pyplot.get_fignums() == []
+
+    @pytest.mark.parametrize("max_workers", [1, 2])
+    def test_render_plots_returns_manifest(
+        self, max_workers: int, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that render_plots renders every ticker, in or out of process."""
+        monkeypatch.chdir(tmp_path)
+        frames = {
+            ticker: sample_data.create_sample_dataframe()
+            for ticker in sample_data.VANGUARD_TEST_FUNDS
+        }
+
+        results = plot.render_plots(frames, max_workers=max_workers)
+
+        assert [result.ticker for result in results] == list(frames)
+        for result in results:
+            assert (tmp_path / result.path).exists()
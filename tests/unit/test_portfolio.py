@@ -0,0 +1,180 @@
+"""Unit tests for portfolio module."""
+
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from heisenbux import constants, panel, portfolio
+
+_CONFIG = """
+portfolio:
+  name: "Test Portfolio"
+  currency: USD
+
+accounts:
+  - name: "Roth IRA"
+    type: roth_ira
+    holdings:
+      - ticker: VTI
+        shares: 10
+        cost_basis: 2000.00
+        purchase_date: 2022-01-15
+      - ticker: bnd
+        shares: 20
+        cost_basis: 1500.00
+        purchase_date: 2022-03-20
+
+  - name: "Taxable"
+    type: taxable
+    holdings:
+      - ticker: VTI
+        shares: 5
+        cost_basis: 1100.00
+        purchase_date: 2023-01-10
+
+transactions:
+  - date: 2023-01-10
+    account: "Taxable"
+    type: buy
+    ticker: VTI
+    shares: 5
+    price: 220.00
+    fees: 0.00
+
+rebalancing_preferences:
+  rebalance_threshold: 0.05
+"""
+
+_VTI_PRICE = 250.0
+_BND_PRICE = 75.0
+_LOTS = 3
+
+
+@pytest.fixture
+def config_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Write the sample configuration and work in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / constants.PORTFOLIO_FILE
+    path.write_text(_CONFIG)
+    return path
+
+
+class TestParsing:
+    """Test cases for parsing the portfolio configuration."""
+
+    def test_parses_lots_into_arrays(self, config_file: Path) -> None:
+        """Test that holdings become parallel arrays with shared lookups."""
+        result = portfolio.load_portfolio(config_file)
+
+        assert result.name == "Test Portfolio"
+        assert result.accounts == ["Roth IRA", "Taxable"]
+        assert result.account_types == ["roth_ira", "taxable"]
+        assert result.tickers == ["VTI", "BND"]
+        np.testing.assert_array_equal(result.lot_ticker, [0, 1, 0])
+        np.testing.assert_array_equal(result.lot_account, [0, 0, 1])
+        np.testing.assert_array_equal(result.shares, [10, 20, 5])
+        assert result.purchase_date[2] == np.datetime64("2023-01-10")
+        np.testing.assert_array_equal(
+            result.account_mask("Taxable"), [False, False, True]
+        )
+        assert result.preferences == {"rebalance_threshold": 0.05}
+
+    def test_parses_transactions(self, config_file: Path) -> None:
+        """Test that transactions are stored as coded arrays."""
+        transactions = portfolio.load_portfolio(config_file).transactions
+
+        np.testing.assert_array_equal(transactions.account, [1])
+        np.testing.assert_array_equal(transactions.ticker, [0])
+        assert list(constants.TransactionTypes)[transactions.kind[0]] == "buy"
+        np.testing.assert_array_equal(transactions.price, [220.0])
+
+    def test_cached_parse_skips_yaml(
+        self, config_file: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that an unchanged configuration is not parsed again."""
+        first = portfolio.load_portfolio(config_file)
+
+        def fail(*args: object, **kwargs: object) -> None:
+            raise AssertionError("YAML parsed again")
+
+        monkeypatch.setattr(yaml, "load", fail)
+        second = portfolio.load_portfolio(config_file)
+
+        assert second.tickers == first.tickers
+        assert second.preferences == first.preferences
+        np.testing.assert_array_equal(second.shares, first.shares)
+        np.testing.assert_array_equal(second.purchase_date, first.purchase_date)
+        np.testing.assert_array_equal(second.transactions.date, first.transactions.date)
+
+    def test_changed_configuration_is_parsed_again(self, config_file: Path) -> None:
+        """Test that editing the configuration invalidates the cache."""
+        portfolio.load_portfolio(config_file)
+        config_file.write_text(_CONFIG.replace("shares: 10\n", "shares: 12\n"))
+        stat = config_file.stat()
+        os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        result = portfolio.load_portfolio(config_file)
+
+        assert result.shares[0] == 12  # noqa: PLR2004
+
+    def test_malformed_configuration_raises(self) -> None:
+        """Test that missing required fields are reported."""
+        with pytest.raises(ValueError, match="Malformed"):
+            portfolio.parse_portfolio(
+                "accounts:\n  - name: A\n    holdings:\n      - ticker: VTI\n"
+            )
+
+    def test_unknown_transaction_account_raises(self) -> None:
+        """Test that transactions must refer to a configured account."""
+        text = (
+            "transactions:\n  - {date: 2024-01-02, account: X, type: buy, "
+            "ticker: VTI, shares: 1, price: 1}\n"
+        )
+        with pytest.raises(ValueError, match="unknown account"):
+            portfolio.parse_portfolio(text)
+
+
+class TestValuation:
+    """Test cases for valuing a portfolio."""
+
+    def test_values_lots_accounts_and_tickers(self, config_file: Path) -> None:
+        """Test valuation totals against hand-computed values."""
+        parsed = portfolio.load_portfolio(config_file)
+
+        valuation = parsed.value(np.array([_VTI_PRICE, _BND_PRICE]))
+
+        np.testing.assert_allclose(
+            valuation.lot_values, [10 * _VTI_PRICE, 20 * _BND_PRICE, 5 * _VTI_PRICE]
+        )
+        np.testing.assert_allclose(
+            valuation.account_values,
+            [10 * _VTI_PRICE + 20 * _BND_PRICE, 5 * _VTI_PRICE],
+        )
+        assert valuation.by_ticker()["VTI"] == pytest.approx(15 * _VTI_PRICE)
+        assert valuation.total == pytest.approx(15 * _VTI_PRICE + 20 * _BND_PRICE)
+        np.testing.assert_allclose(
+            valuation.unrealized_gains,
+            valuation.lot_values - parsed.cost_basis,
+        )
+        assert len(valuation.lot_values) == _LOTS
+
+    def test_latest_closes_skip_missing_days(self) -> None:
+        """Test that the last non-NaN close of each ticker is used."""
+        index = pd.date_range("2024-01-01", periods=3, freq="B")
+        frames = {
+            "VTI": pd.DataFrame(
+                {constants.DataFrameColumns.CLOSE: [1.0, 2.0, _VTI_PRICE]}, index=index
+            ),
+            "BND": pd.DataFrame(
+                {constants.DataFrameColumns.CLOSE: [3.0, _BND_PRICE]},
+                index=index[:2],
+            ),
+        }
+
+        closes = portfolio.latest_closes(panel.build_panel(frames))
+
+        np.testing.assert_allclose(closes, [_BND_PRICE, _VTI_PRICE])
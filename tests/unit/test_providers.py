@@ -0,0 +1,258 @@
+"""Unit tests for providers module."""
+
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from heisenbux import constants, finance, providers
+from tests.fixtures import sample_data
+
+START = datetime(2024, 1, 1)
+END = datetime(2024, 6, 1)
+
+
+class FakeProvider:
+    """Local stand-in for a provider host, counting and timing requests."""
+
+    def __init__(
+        self, failures: int = 0, delay: float = 0.0, error: type = ConnectionError
+    ) -> None:
+        """Create a provider that fails the first ``failures`` requests.
+
+        Args:
+            failures: Number of initial requests that raise ``error``
+            delay: Seconds each request takes
+            error: Exception type raised by failing requests
+        """
+        self.failures = failures
+        self.delay = delay
+        self.error = error
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, ticker: str, start: datetime, end: datetime) -> pd.DataFrame:
+        """Serve one history request."""
+        with self._lock:
+            self.calls.append(ticker)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failing = len(self.calls) <= self.failures
+        try:
+            time.sleep(self.delay)
+            if failing:
+                raise self.error(f"request for {ticker} failed")
+            if ticker == "EMPTY":
+                return pd.DataFrame()
+            return sample_data.create_sample_dataframe()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def _provider(fake: FakeProvider, **kwargs: object) -> providers.AsyncProvider:
+    """Create a provider client that never waits between attempts."""
+
+    async def no_sleep(delay: float) -> None:
+        pass
+
+    kwargs.setdefault(
+        "rate_limiter", providers.TokenBucket(rate=1000.0, capacity=1000.0)
+    )
+    return providers.AsyncProvider(
+        fetch=fake,
+        sleep=no_sleep,
+        rng=random.Random(0),
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+class TestAsyncProvider:
+    """Test cases for AsyncProvider."""
+
+    def test_concurrent_requests_for_same_ticker_are_coalesced(self) -> None:
+        """Test that concurrent callers share one in-flight request."""
+        fake = FakeProvider(delay=0.05)
+
+        async def run() -> list[pd.DataFrame]:
+            provider = _provider(fake)
+            return list(
+                await asyncio.gather(
+                    *(provider.history("VTI", START, END) for _ in range(5))
+                )
+            )
+
+        frames = asyncio.run(run())
+
+        assert fake.calls == ["VTI"]
+        assert all(df is frames[0] for df in frames)
+
+    def test_requests_for_same_days_are_coalesced(self) -> None:
+        """Test that callers computing their own date ranges share a request."""
+        fake = FakeProvider(delay=0.05)
+
+        async def run() -> None:
+            provider = _provider(fake)
+            ranges = []
+            for _ in range(2):
+                end = datetime.now()
+                ranges.append((end - timedelta(days=365), end))
+                await asyncio.sleep(0.001)
+            await asyncio.gather(
+                *(provider.history("VTI", start, end) for start, end in ranges)
+            )
+
+        asyncio.run(run())
+
+        assert fake.calls == ["VTI"]
+
+    def test_concurrency_is_bounded(self) -> None:
+        """Test that no more than max_concurrency requests run at once."""
+        fake = FakeProvider(delay=0.02)
+        tickers = [f"T{i}" for i in range(8)]
+
+        async def run() -> providers.BatchResult:
+            provider = _provider(fake, max_concurrency=2)
+            return await provider.history_many(tickers, START, END)
+
+        result = asyncio.run(run())
+
+        assert list(result.frames) == tickers
+        assert fake.max_in_flight <= 2  # noqa: PLR2004
+
+    def test_transient_failures_are_retried(self) -> None:
+        """Test that retryable errors are retried until the request succeeds."""
+        fake = FakeProvider(failures=2, error=providers.ProviderThrottledError)
+
+        df = asyncio.run(_provider(fake).history("VTI", START, END))
+
+        assert not df.empty
+        assert fake.calls == ["VTI"] * 3
+
+    def test_os_errors_are_retried(self) -> None:
+        """Test that library network errors deriving from OSError are retried."""
+
+        class RequestError(OSError):
+            """Stand-in for a requests or curl_cffi network error."""
+
+        fake = FakeProvider(failures=1, error=RequestError)
+
+        df = asyncio.run(_provider(fake).history("VTI", START, END))
+
+        assert not df.empty
+        assert len(fake.calls) == 2  # noqa: PLR2004
+
+    def test_retries_are_bounded(self) -> None:
+        """Test that the last error is raised once attempts are exhausted."""
+        fake = FakeProvider(failures=10)
+        retry = providers.RetryPolicy(max_attempts=3)
+
+        with pytest.raises(ConnectionError):
+            asyncio.run(_provider(fake, retry=retry).history("VTI", START, END))
+
+        assert len(fake.calls) == retry.max_attempts
+
+    def test_slow_requests_time_out(self) -> None:
+        """Test that an attempt exceeding the timeout fails with TimeoutError."""
+        fake = FakeProvider(delay=0.2)
+        retry = providers.RetryPolicy(max_attempts=1, timeout=0.01)
+
+        with pytest.raises(TimeoutError):
+            asyncio.run(_provider(fake, retry=retry).history("VTI", START, END))
+
+    def test_timed_out_requests_keep_their_slot(self) -> None:
+        """Test that a retry waits for the abandoned worker thread to finish."""
+        fake = FakeProvider(delay=0.1)
+        retry = providers.RetryPolicy(max_attempts=3, timeout=0.02)
+
+        async def run() -> providers.BatchResult:
+            provider = _provider(fake, max_concurrency=1, retry=retry)
+            return await provider.history_many(["VTI", "BND"], START, END)
+
+        result = asyncio.run(run())
+
+        assert set(result.errors) == {"VTI", "BND"}
+        assert len(fake.calls) > 2  # noqa: PLR2004
+        assert fake.max_in_flight == 1
+
+    def test_other_errors_are_not_retried(self) -> None:
+        """Test that non-transient errors fail immediately."""
+        fake = FakeProvider(failures=1, error=KeyError)
+
+        with pytest.raises(KeyError):
+            asyncio.run(_provider(fake).history("VTI", START, END))
+
+        assert len(fake.calls) == 1
+
+    def test_history_many_reports_errors(self) -> None:
+        """Test that failing tickers are reported without failing the batch."""
+        fake = FakeProvider()
+
+        result = asyncio.run(_provider(fake).history_many(["VTI", "EMPTY"], START, END))
+
+        assert list(result.frames) == ["VTI"]
+        assert isinstance(result.errors["EMPTY"], ValueError)
+
+
+class TestRateLimiting:
+    """Test cases for TokenBucket and RetryPolicy."""
+
+    def test_token_bucket_waits_when_empty(self) -> None:
+        """Test that requests beyond the burst wait for tokens to accrue."""
+        now = [0.0]
+        waits: list[float] = []
+
+        async def fake_sleep(delay: float) -> None:
+            waits.append(delay)
+            now[0] += delay
+
+        bucket = providers.TokenBucket(
+            rate=2.0, capacity=2.0, clock=lambda: now[0], sleep=fake_sleep
+        )
+
+        async def run() -> None:
+            for _ in range(4):
+                await bucket.acquire()
+
+        asyncio.run(run())
+
+        assert waits == [0.5, 0.5]
+
+    def test_backoff_is_jittered_and_capped(self) -> None:
+        """Test that backoff stays under an exponentially growing ceiling."""
+        policy = providers.RetryPolicy(base_delay=1.0, max_delay=4.0)
+        rng = random.Random(0)
+
+        for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (10, 4.0)]:
+            delays = {policy.backoff(attempt, rng) for _ in range(20)}
+            assert all(0 <= delay <= ceiling for delay in delays)
+            assert len(delays) > 1
+
+
+class TestGetManyTickersDataAsync:
+    """Test cases for finance.get_many_tickers_data_async."""
+
+    def test_fetches_cache_misses_through_provider(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that misses are fetched via the provider and cached."""
+        monkeypatch.chdir(tmp_path)
+        fake = FakeProvider()
+
+        frames = asyncio.run(
+            finance.get_many_tickers_data_async(
+                ["VTI", "EMPTY", "BND"], provider=_provider(fake)
+            )
+        )
+
+        assert list(frames) == ["VTI", "BND"]
+        assert (
+            tmp_path / constants.Directories.CACHE / f"VTI{constants.CACHE_FORMAT}"
+        ).exists()
@@ -0,0 +1,216 @@
+"""Unit tests for rebalance module."""
+
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from heisenbux import constants, ledger, portfolio, rebalance
+
+_CONFIG = """
+accounts:
+  - name: Taxable
+    type: taxable
+    holdings:
+      - {ticker: VTI, shares: 10, cost_basis: 1000, purchase_date: 2020-01-02}
+      - {ticker: VTI, shares: 10, cost_basis: 3000, purchase_date: 2024-05-01}
+  - name: Roth IRA
+    type: roth_ira
+    holdings:
+      - {ticker: VTI, shares: 5, cost_basis: 500, purchase_date: 2021-03-01}
+      - {ticker: BND, shares: 20, cost_basis: 1600, purchase_date: 2021-03-01}
+"""
+
+_TODAY = "2024-09-01"
+_PRICES = {"VTI": 200.0, "BND": 80.0}
+_TARGETS = {"VTI": 0.5, "BND": 0.5}
+# Holdings are worth 5000 in VTI and 1600 in BND, so 1700 moves across
+_SHIFT = 1700.0
+_LOSS_LOT = 1
+_ASSETS = 5
+_ACCOUNTS = 3
+_LOTS = 400
+
+
+def _no_events() -> rebalance.WashSaleIndex:
+    """Create a wash-sale index without any events."""
+    empty = np.array([], dtype="datetime64[D]")
+    return rebalance.WashSaleIndex(([], empty), ([], empty))
+
+
+class TestRebalancer:
+    """Test cases for tax-aware rebalancing plans."""
+
+    @pytest.fixture
+    def holdings(self) -> portfolio.Portfolio:
+        """Parse the sample portfolio."""
+        return portfolio.parse_portfolio(_CONFIG)
+
+    def test_harvests_losses_before_realizing_gains(
+        self, holdings: portfolio.Portfolio
+    ) -> None:
+        """Test that the loss lot funds the whole rebalance."""
+        plan = rebalance.Rebalancer(holdings, _TARGETS, today=_TODAY).plan(_PRICES)
+
+        expected = np.zeros(len(holdings.shares))
+        expected[_LOSS_LOT] = _SHIFT / _PRICES["VTI"]
+        np.testing.assert_allclose(plan.sell_shares, expected)
+        taxable, bnd = 0, plan.tickers.index("BND")
+        assert plan.buy_value[taxable, bnd] == pytest.approx(_SHIFT)
+        assert plan.turnover == pytest.approx(_SHIFT)
+        loss = expected[_LOSS_LOT] * (_PRICES["VTI"] - 300.0)
+        assert plan.realized_gains.sum() == pytest.approx(loss)
+        assert plan.estimated_tax == pytest.approx(loss * constants.SHORT_TERM_TAX_RATE)
+
+        trades = plan.trades()
+        assert list(trades["action"]) == ["sell", "buy"]
+        assert list(trades["account"]) == ["Taxable", "Taxable"]
+        assert trades["value"].tolist() == pytest.approx([_SHIFT, _SHIFT])
+
+    def test_recent_purchase_disallows_loss(
+        self, holdings: portfolio.Portfolio
+    ) -> None:
+        """Test that a loss within the wash-sale window brings no tax saving."""
+        empty = np.array([], dtype="datetime64[D]")
+        wash_sales = rebalance.WashSaleIndex(
+            (["VTI"], np.array(["2024-08-20"], dtype="datetime64[D]")),
+            ([], empty),
+        )
+
+        plan = rebalance.Rebalancer(
+            holdings, _TARGETS, wash_sales=wash_sales, today=_TODAY
+        ).plan(_PRICES)
+
+        assert plan.disallowed[_LOSS_LOT]
+        assert plan.estimated_tax == pytest.approx(0.0)
+
+    def test_own_purchase_does_not_disallow_loss(
+        self, holdings: portfolio.Portfolio
+    ) -> None:
+        """Test that only other recent lots of a ticker wash a lot's loss."""
+        holdings.purchase_date[_LOSS_LOT] = np.datetime64("2024-08-20")
+        alone = rebalance.Rebalancer(holdings, _TARGETS, today=_TODAY)
+        holdings.purchase_date[0] = np.datetime64("2024-08-10")
+        paired = rebalance.Rebalancer(holdings, _TARGETS, today=_TODAY)
+
+        # Older VTI lots are washed by the recent one, but not the lot itself
+        assert not alone.disallow_loss[_LOSS_LOT]
+        np.testing.assert_array_equal(alone.disallow_loss, [True, False, True, False])
+        np.testing.assert_array_equal(paired.disallow_loss, [True, True, True, False])
+
+    def test_recent_loss_sale_defers_buys(self, holdings: portfolio.Portfolio) -> None:
+        """Test that a ticker sold at a loss recently is not bought back."""
+        empty = np.array([], dtype="datetime64[D]")
+        wash_sales = rebalance.WashSaleIndex(
+            ([], empty), (["BND"], np.array(["2024-08-25"], dtype="datetime64[D]"))
+        )
+
+        plan = rebalance.Rebalancer(
+            holdings, _TARGETS, wash_sales=wash_sales, today=_TODAY
+        ).plan(_PRICES)
+
+        bnd = plan.tickers.index("BND")
+        assert plan.buy_value[:, bnd].sum() == pytest.approx(0.0)
+        assert plan.deferred[bnd] == pytest.approx(_SHIFT)
+
+    def test_threshold_skips_small_drift(self, holdings: portfolio.Portfolio) -> None:
+        """Test that weights within the threshold are left alone."""
+        plan = rebalance.Rebalancer(
+            holdings, {"VTI": 0.75, "BND": 0.25}, today=_TODAY, threshold=0.05
+        ).plan(_PRICES)
+
+        assert plan.turnover == 0.0
+        assert not plan.sell_shares.any()
+
+    def test_invalid_inputs_raise(self, holdings: portfolio.Portfolio) -> None:
+        """Test that bad weights and missing prices are rejected."""
+        with pytest.raises(ValueError, match="sum to"):
+            rebalance.Rebalancer(holdings, {"VTI": 0.5})
+        with pytest.raises(ValueError, match="No valid price for BND"):
+            rebalance.Rebalancer(holdings, _TARGETS).plan({"VTI": 1.0})
+
+    def test_random_portfolio_invariants(self) -> None:
+        """Test that plans for many lots hit the targets in tax-cost order."""
+        rng = np.random.default_rng(0)
+        tickers = [f"T{i}" for i in range(_ASSETS)]
+        lot_ticker = rng.integers(0, _ASSETS, _LOTS).astype(np.int32)
+        shares = rng.uniform(1, 100, _LOTS)
+        holdings = portfolio.Portfolio(
+            name="",
+            currency=constants.DEFAULT_CURRENCY,
+            accounts=[f"A{i}" for i in range(_ACCOUNTS)],
+            account_types=["taxable", "roth_ira", "taxable"],
+            tickers=tickers,
+            lot_ticker=lot_ticker,
+            lot_account=rng.integers(0, _ACCOUNTS, _LOTS).astype(np.int32),
+            shares=shares,
+            cost_basis=shares * rng.uniform(50, 150, _LOTS),
+            purchase_date=np.datetime64("2022-01-01")
+            + rng.integers(0, 900, _LOTS).astype("timedelta64[D]"),
+            transactions=portfolio.parse_portfolio("{}").transactions,
+        )
+        weights = rng.dirichlet(np.ones(_ASSETS))
+        prices = rng.uniform(80, 120, _ASSETS)
+        engine = rebalance.Rebalancer(
+            holdings,
+            dict(zip(tickers, weights, strict=True)),
+            wash_sales=_no_events(),
+            today=_TODAY,
+        )
+
+        plan = engine.plan(prices)
+
+        values = shares * prices[lot_ticker]
+        before = np.bincount(lot_ticker, weights=values, minlength=_ASSETS)
+        sold = np.bincount(
+            lot_ticker, weights=plan.sell_shares * prices[lot_ticker], minlength=_ASSETS
+        )
+        after = before - sold + plan.buy_value.sum(axis=0)
+        np.testing.assert_allclose(after, weights * before.sum())
+        # Every account spends exactly the cash its sales freed
+        freed = np.bincount(
+            holdings.lot_account,
+            weights=plan.sell_shares * prices[lot_ticker],
+            minlength=_ACCOUNTS,
+        )
+        np.testing.assert_allclose(plan.buy_value.sum(axis=1), freed)
+        # No lot is sold while a cheaper one to sell is left open
+        gain = prices[lot_ticker] - holdings.cost_basis / shares
+        cost = engine.tax_rates * gain / prices[lot_ticker]
+        for ticker in range(_ASSETS):
+            lots = lot_ticker == ticker
+            touched = plan.sell_shares[lots] > 0
+            untouched = plan.sell_shares[lots] < shares[lots] - 1e-9
+            if touched.any() and untouched.any():
+                assert cost[lots][touched].max() <= cost[lots][untouched].min()
+
+
+class TestWashSaleIndex:
+    """Test cases for the wash-sale window index."""
+
+    def test_windows_from_ledger(self, tmp_path: Path) -> None:
+        """Test finding recent purchases and loss sales recorded in a ledger."""
+        trade = ledger.Transaction
+        types = constants.TransactionTypes
+        with ledger.Ledger(tmp_path / constants.LEDGER_FILE) as book:
+            book.append(
+                [
+                    trade(date(2024, 1, 2), "A", "VTI", types.BUY, 10, 100.0),
+                    trade(date(2024, 3, 1), "A", "VTI", types.SELL, 5, 90.0),
+                    trade(date(2024, 3, 1), "A", "BND", types.BUY, 5, 70.0),
+                ]
+            )
+            index = rebalance.WashSaleIndex.from_ledger(book)
+
+        day = np.datetime64("2024-03-15")
+        window = constants.WASH_SALE_DAYS
+        tickers = ["VTI", "BND", "VXUS"]
+        np.testing.assert_array_equal(
+            index.recent_purchases(tickers, day, window), [False, True, False]
+        )
+        np.testing.assert_array_equal(
+            index.recent_losses(tickers, day, window), [True, False, False]
+        )
+        later = np.datetime64("2024-04-15")
+        assert not index.recent_losses(tickers, later, window).any()
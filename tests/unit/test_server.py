@@ -0,0 +1,210 @@
+"""Unit tests for server module."""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections.abc import Iterator
+from http import HTTPStatus
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+
+from heisenbux import analytics, constants, finance, panel, server
+from tests.fixtures import sample_data
+
+_CONFIG = """
+accounts:
+  - name: Taxable
+    type: taxable
+    holdings:
+      - {ticker: VTI, shares: 10, cost_basis: 1000, purchase_date: 2020-01-02}
+      - {ticker: BND, shares: 10, cost_basis: 1000, purchase_date: 2020-01-02}
+rebalancing_preferences:
+  target_allocation: {US_stocks: 0.5, bonds: 0.5}
+"""
+
+_TICKERS = ["VTI", "BND"]
+
+
+@pytest.fixture
+def load_panel(monkeypatch: pytest.MonkeyPatch) -> Mock:
+    """Serve a sample price panel instead of the on-disk store."""
+    df = sample_data.create_sample_dataframe()
+    prices = panel.build_panel({ticker: df for ticker in _TICKERS})
+    mock = Mock(return_value=prices)
+    monkeypatch.setattr(finance, "load_panel", mock)
+    monkeypatch.setattr(finance, "update_panel", Mock(return_value=prices))
+    return mock
+
+
+@pytest.fixture
+def service(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, load_panel: Mock
+) -> server.QueryService:
+    """Create a service over a sample portfolio in a temporary directory."""
+    monkeypatch.chdir(tmp_path)
+    config_file = tmp_path / constants.PORTFOLIO_FILE
+    config_file.write_text(_CONFIG)
+    return server.QueryService(config_file)
+
+
+class TestQueryService:
+    """Test cases for answering queries from resident state."""
+
+    def test_prices_returns_series_per_ticker(
+        self, service: server.QueryService
+    ) -> None:
+        """Test that price queries return the requested column."""
+        result = service.prices(_TICKERS)
+        close = result[constants.DataFrameColumns.CLOSE]
+
+        assert list(close) == _TICKERS
+        assert len(close["VTI"]) == len(result["dates"])
+
+    def test_panel_stays_resident(
+        self, service: server.QueryService, load_panel: Mock
+    ) -> None:
+        """Test that repeated queries do not reload the price store."""
+        service.prices(["VTI"])
+        service.prices(["BND"])
+        service.portfolio_value()
+
+        load_panel.assert_called_once()
+
+    def test_metrics_are_memoized_until_reload(
+        self, service: server.QueryService, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that metrics are computed once per parameter set."""
+        summarize = Mock(wraps=analytics.summarize)
+        monkeypatch.setattr(analytics, "summarize", summarize)
+
+        first = service.metrics(_TICKERS, benchmark="VTI")
+        second = service.metrics(_TICKERS, benchmark="VTI")
+        service.reload()
+        service.metrics(_TICKERS, benchmark="VTI")
+
+        assert first is second
+        assert constants.Metrics.BETA in first["BND"]
+        assert summarize.call_count == 2  # noqa: PLR2004
+
+    def test_rebalance_uses_given_targets(self, service: server.QueryService) -> None:
+        """Test that rebalance plans trades toward the given weights."""
+        result = service.rebalance({"VTI": 0.5, "BND": 0.5}, today="2024-09-01")
+
+        assert result["turnover"] >= 0
+        assert set(result["deferred"]) == set(_TICKERS)
+
+    def test_rebalance_requires_targets(self, service: server.QueryService) -> None:
+        """Test that asset-class preferences are not used as ticker targets."""
+        with pytest.raises(ValueError, match="No target weights"):
+            service.rebalance({})
+
+    def test_batch_reports_errors_per_query(self, service: server.QueryService) -> None:
+        """Test that one failing query does not fail the batch."""
+        results = service.handle_batch(
+            [
+                {"method": constants.QueryMethods.PRICES, "params": {"tickers": []}},
+                {"method": "nope"},
+                {"method": constants.QueryMethods.PRICES, "params": {"bogus": 1}},
+            ]
+        )
+
+        assert not server.is_error(results[0])
+        assert "Unknown method" in results[1]["error"]
+        assert server.is_error(results[2])
+
+    def test_batch_reports_unexpected_errors(
+        self, service: server.QueryService, load_panel: Mock
+    ) -> None:
+        """Test that any exception is returned as the query's error."""
+        load_panel.side_effect = TimeoutError("lock busy")
+
+        results = service.handle_batch(
+            [{"method": constants.QueryMethods.PRICES, "params": {"tickers": ["VTI"]}}]
+        )
+
+        assert results == [{"error": "TimeoutError: lock busy"}]
+
+    def test_reload_rebuilds_price_store(self, service: server.QueryService) -> None:
+        """Test that reload rebuilds the store from the per-ticker caches."""
+        service.prices(_TICKERS)
+
+        service.reload()
+
+        update_panel = finance.update_panel
+        assert isinstance(update_panel, Mock)
+        update_panel.assert_called_once_with(sorted(_TICKERS))
+
+    def test_panel_load_does_not_block_other_queries(
+        self, service: server.QueryService, load_panel: Mock
+    ) -> None:
+        """Test that the service lock is free while the panel loads."""
+        prices: panel.PricePanel = load_panel.return_value
+        acquired = []
+
+        def try_lock() -> None:
+            acquired.append(service._lock.acquire(timeout=1))
+            if acquired[-1]:
+                service._lock.release()
+
+        def load(tickers: list[str]) -> panel.PricePanel:
+            thread = threading.Thread(target=try_lock)
+            thread.start()
+            thread.join()
+            return prices
+
+        load_panel.side_effect = load
+        service.prices(["VTI"])
+
+        assert acquired == [True]
+
+
+class TestServer:
+    """Test cases for the HTTP server and client."""
+
+    @pytest.fixture
+    def address(self, service: server.QueryService) -> Iterator[tuple[str, int]]:
+        """Run a server on a free port for the duration of a test."""
+        httpd = server.make_server(service, constants.SERVER_HOST, 0)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        yield constants.SERVER_HOST, httpd.server_address[1]
+        httpd.shutdown()
+        httpd.server_close()
+
+    def test_client_round_trip(self, address: tuple[str, int]) -> None:
+        """Test that a batch sent by the client is answered in order."""
+        host, port = address
+        results = server.query(
+            [
+                {"method": constants.QueryMethods.PORTFOLIO_VALUE},
+                {
+                    "method": constants.QueryMethods.METRICS,
+                    "params": {"tickers": ["VTI"], "benchmark": "VTI"},
+                },
+            ],
+            host,
+            port,
+        )
+
+        assert results[0]["result"]["total"] > 0
+        assert "VTI" in results[1]["result"]
+
+    @pytest.mark.parametrize("requests", ["prices", [1], [{"method": "prices"}, []]])
+    def test_malformed_batch_is_rejected(
+        self, address: tuple[str, int], requests: object
+    ) -> None:
+        """Test that a batch that is not a list of objects is a bad request."""
+        host, port = address
+        request = urllib.request.Request(
+            f"http://{host}:{port}{constants.SERVER_QUERY_PATH}",
+            data=json.dumps({"requests": requests}).encode(),
+            method="POST",
+        )
+
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(request)
+
+        assert excinfo.value.code == HTTPStatus.BAD_REQUEST
@@ -0,0 +1,104 @@
+"""Unit tests for simulation module."""
+
+import numpy as np
+import pytest
+
+from heisenbux import constants, simulation
+
+_PATHS = 20_000
+_PERIODS = 12
+_SEED = 7
+
+
+class TestSimulate:
+    """Test cases for chunked Monte Carlo simulation."""
+
+    @pytest.mark.parametrize("rebalance", [True, False])
+    def test_constant_history_gives_exact_growth(self, rebalance: bool) -> None:
+        """Test rebalanced and buy-and-hold growth on a constant history."""
+        weights = np.array([0.5, 0.5])
+        history = np.tile([0.01, 0.05], (10, 1))
+
+        result = simulation.simulate(
+            weights,
+            history,
+            _PERIODS,
+            paths=1_000,
+            model=constants.SimulationModels.BOOTSTRAP,
+            rebalance=rebalance,
+            initial_value=100.0,
+            seed=_SEED,
+        )
+
+        steps = np.arange(_PERIODS + 1)
+        if rebalance:
+            expected = 100 * 1.03**steps
+        else:
+            expected = 100 * (0.5 * 1.01**steps + 0.5 * 1.05**steps)
+        np.testing.assert_allclose(result.mean, expected)
+        for row in result.percentiles:
+            np.testing.assert_allclose(row, expected, rtol=1e-3)
+
+    def test_cholesky_matches_log_normal_distribution(self) -> None:
+        """Test simulated percentiles against the log-normal closed form."""
+        rng = np.random.default_rng(0)
+        history = np.expm1(rng.normal(0.01, 0.04, size=(5_000, 1)))
+        log_history = np.log1p(history)
+        mean, std = log_history.mean(), log_history.std(ddof=1)
+
+        result = simulation.simulate(
+            np.ones(1),
+            history,
+            _PERIODS,
+            paths=_PATHS,
+            quantiles=(50.0,),
+            seed=_SEED,
+            chunk_size=_PATHS // 4,
+        )
+
+        assert result.percentiles[0, -1] == pytest.approx(
+            np.exp(_PERIODS * mean), rel=0.01
+        )
+        assert result.mean[-1] == pytest.approx(
+            np.exp(_PERIODS * (mean + std**2 / 2)), rel=0.01
+        )
+
+    def test_results_do_not_depend_on_worker_count(self) -> None:
+        """Test that per-chunk seeds make results reproducible across pools."""
+        rng = np.random.default_rng(1)
+        history = rng.normal(0.005, 0.03, size=(120, 3))
+        weights = np.array([0.2, 0.3, 0.5])
+
+        results = [
+            simulation.simulate(
+                weights,
+                history,
+                _PERIODS,
+                paths=4_000,
+                seed=_SEED,
+                chunk_size=1_000,
+                max_workers=workers,
+            )
+            for workers in (1, 2)
+        ]
+
+        np.testing.assert_array_equal(results[0].percentiles, results[1].percentiles)
+        np.testing.assert_allclose(results[0].mean, results[1].mean)
+        assert (np.diff(results[0].percentiles, axis=0) >= 0).all()
+
+    def test_mismatched_weights_raise(self) -> None:
+        """Test that the weights must match the assets of the history."""
+        with pytest.raises(ValueError, match="do not match"):
+            simulation.simulate(np.ones(2), np.zeros((5, 3)), _PERIODS, paths=10)
+
+
+class TestCompoundReturns:
+    """Test cases for compounding returns into longer periods."""
+
+    def test_compound_returns_keeps_most_recent_blocks(self) -> None:
+        """Test that leftover rows at the start are dropped."""
+        returns = np.array([[0.5], [0.1], [0.1], [0.2], [-0.5]])
+
+        result = simulation.compound_returns(returns, 2)
+
+        np.testing.assert_allclose(result, [[0.21], [-0.4]])
@@ -0,0 +1,118 @@
+"""Unit tests for storage module."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heisenbux import constants, storage
+from tests.fixtures import sample_data
+
+
+class TestPriceStorage:
+    """Test cases for reading and writing cached price data."""
+
+    @pytest.fixture
+    def sample_df(self) -> pd.DataFrame:
+        """Get sample DataFrame with exchange-local dates spanning a DST change."""
+        df = sample_data.create_sample_dataframe()
+        df.index = pd.date_range(
+            "2024-10-20", periods=len(df), freq="D", tz="America/New_York"
+        )
+        df.index.name = constants.DataFrameColumns.DATE
+        df[constants.DataFrameColumns.DIVIDENDS] = 0.0
+        return df
+
+    def test_npz_round_trip_preserves_values_and_timezone(
+        self, sample_df: pd.DataFrame, tmp_path: Path
+    ) -> None:
+        """Test that the binary format restores dates, dtypes and values."""
+        cache_file = tmp_path / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+
+        storage.write_prices(sample_df, cache_file)
+        df = storage.read_prices(cache_file)
+
+        assert isinstance(df.index, pd.DatetimeIndex)
+        assert df.index.equals(sample_df.index)
+        assert str(df.index.tz) == "America/New_York"
+        assert df.index.name == constants.DataFrameColumns.DATE
+        for column in sample_df.columns:
+            assert df[column].dtype == storage.SCHEMA[column]
+        pd.testing.assert_frame_equal(
+            df, sample_df, check_dtype=False, check_freq=False
+        )
+
+    def test_npz_drops_columns_outside_schema(
+        self, sample_df: pd.DataFrame, tmp_path: Path
+    ) -> None:
+        """Test that only the typed schema columns are stored."""
+        cache_file = tmp_path / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        sample_df["Extra"] = "text"
+
+        storage.write_prices(sample_df, cache_file)
+
+        assert "Extra" not in storage.read_prices(cache_file).columns
+
+    def test_npz_keeps_missing_prices_as_nan(
+        self, sample_df: pd.DataFrame, tmp_path: Path
+    ) -> None:
+        """Test that missing prices are not stored as zero."""
+        cache_file = tmp_path / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        missing_day = sample_df.index[3]
+        sample_df.loc[missing_day, constants.DataFrameColumns.CLOSE] = np.nan
+        sample_df.loc[missing_day, constants.DataFrameColumns.DIVIDENDS] = np.nan
+
+        storage.write_prices(sample_df, cache_file)
+        df = storage.read_prices(cache_file)
+
+        assert np.isnan(df[constants.DataFrameColumns.CLOSE].iloc[3])
+        assert df[constants.DataFrameColumns.DIVIDENDS].iloc[3] == 0.0
+
+    def test_find_cache_file_migrates_legacy_csv(
+        self, sample_df: pd.DataFrame, tmp_path: Path
+    ) -> None:
+        """Test that an existing CSV cache is converted to the binary format."""
+        csv_file = (
+            tmp_path / f"{sample_data.SAMPLE_TICKER}{constants.FileExtensions.CSV}"
+        )
+        sample_df.to_csv(csv_file)
+
+        cache_file = storage.find_cache_file(tmp_path, sample_data.SAMPLE_TICKER)
+
+        assert cache_file == (
+            tmp_path / f"{sample_data.SAMPLE_TICKER}{constants.CACHE_FORMAT}"
+        )
+        assert cache_file.exists()
+        df = storage.read_prices(cache_file)
+        assert isinstance(df.index, pd.DatetimeIndex)
+        assert df.index.tz is not None
+        np.testing.assert_array_equal(
+            df.index.tz_convert(None),
+            pd.DatetimeIndex(sample_df.index).tz_convert(None),
+        )
+        np.testing.assert_allclose(
+            df[constants.DataFrameColumns.CLOSE],
+            sample_df[constants.DataFrameColumns.CLOSE],
+        )
+
+    def test_find_cache_file_returns_none_when_not_cached(self, tmp_path: Path) -> None:
+        """Test that missing tickers have no cache file."""
+        assert storage.find_cache_file(tmp_path, sample_data.SAMPLE_TICKER) is None
+
+    def test_export_csv(
+        self,
+        sample_df: pd.DataFrame,
+        tmp_path: Path,
+        monkeypatch: pytest.MonkeyPatch,
+    ) -> None:
+        """Test that price data can be exported to CSV in the cache directory."""
+        monkeypatch.chdir(tmp_path)
+
+        csv_file = storage.export_csv(sample_df, sample_data.SAMPLE_TICKER)
+
+        assert csv_file == (
+            Path(constants.Directories.CACHE)
+            / f"{sample_data.SAMPLE_TICKER}{constants.FileExtensions.CSV}"
+        )
+        assert len(pd.read_csv(csv_file)) == len(sample_df)
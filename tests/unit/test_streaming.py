@@ -0,0 +1,173 @@
+"""Unit tests for streaming module."""
+
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from heisenbux import analytics, constants, streaming
+from tests.fixtures import sample_data
+
+_BARS = 200
+_WINDOW = 10
+_SPAN = 5
+
+
+def _prices() -> pd.DataFrame:
+    """Build a random walk of closing prices on business days."""
+    rng = np.random.default_rng(0)
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.02, size=_BARS))
+    index = pd.date_range("2024-01-01", periods=_BARS, freq="B", tz="UTC")
+    return pd.DataFrame({constants.DataFrameColumns.CLOSE: closes}, index=index)
+
+
+def _metrics() -> streaming.StreamingMetrics:
+    """Create metrics with short windows."""
+    return streaming.StreamingMetrics(
+        moving_average_window=_WINDOW, volatility_window=_WINDOW, ewma_span=_SPAN
+    )
+
+
+class TestStreamingMetrics:
+    """Test cases for incremental metrics."""
+
+    def test_matches_batch_computation(self) -> None:
+        """Test that incremental metrics match pandas over the full history."""
+        df = _prices()
+        close = df[constants.DataFrameColumns.CLOSE]
+        returns = close.pct_change()
+        metrics = _metrics()
+
+        # Feed the history in uneven chunks, overlapping like a refresh does
+        metrics.update_frame(df.iloc[:37])
+        metrics.update_frame(df.iloc[30:150])
+        metrics.update_frame(df)
+
+        annual = math.sqrt(constants.TRADING_DAYS_PER_YEAR)
+        assert metrics.moving_average == pytest.approx(close.iloc[-_WINDOW:].mean())
+        assert metrics.volatility == pytest.approx(
+            returns.iloc[-_WINDOW:].std() * annual
+        )
+        assert metrics.total_volatility == pytest.approx(returns.std() * annual)
+        assert metrics.ewma.value == pytest.approx(
+            close.ewm(span=_SPAN, adjust=False).mean().iloc[-1]
+        )
+        depths = analytics.drawdowns(close.to_numpy())
+        assert metrics.drawdown.current == pytest.approx(depths[-1])
+        assert metrics.drawdown.maximum == pytest.approx(depths.min())
+
+    def test_update_skips_seen_bars(self) -> None:
+        """Test that bars at or before the last one seen are ignored."""
+        df = _prices()
+        metrics = _metrics()
+
+        assert metrics.update_frame(df) == _BARS
+        assert metrics.update_frame(df) == 0
+        assert not metrics.update(df.index[-1], 1.0)
+        assert metrics.update(df.index[-1] + pd.Timedelta(days=1), 1.0)
+        assert metrics.last_close == 1.0
+
+    def test_update_skips_missing_closes(self) -> None:
+        """Test that a bar without a close leaves the metrics untouched."""
+        df = _prices()
+        metrics = _metrics()
+        metrics.update_frame(df)
+        before = metrics.to_dict()
+
+        assert not metrics.update(df.index[-1] + pd.Timedelta(days=1), math.nan)
+        assert metrics.to_dict() == before
+        assert not math.isnan(metrics.moving_average)
+        assert not math.isnan(metrics.drawdown.current)
+
+    def test_windows_are_nan_until_full(self) -> None:
+        """Test that rolling metrics are undefined before the window fills."""
+        metrics = _metrics()
+
+        metrics.update_frame(_prices().iloc[: _WINDOW - 1])
+
+        assert math.isnan(metrics.moving_average)
+        assert math.isnan(metrics.volatility)
+
+    def test_state_round_trips(self) -> None:
+        """Test that restored state continues exactly where it left off."""
+        df = _prices()
+        metrics = _metrics()
+        metrics.update_frame(df.iloc[:120])
+
+        restored = streaming.StreamingMetrics.from_dict(metrics.to_dict())
+        metrics.update_frame(df)
+        restored.update_frame(df)
+
+        assert restored.to_dict() == metrics.to_dict()
+
+    def test_from_dict_rejects_other_versions(self) -> None:
+        """Test that state from an incompatible version is rejected."""
+        state = _metrics().to_dict()
+        state["version"] = constants.STREAMING_STATE_VERSION + 1
+
+        with pytest.raises(ValueError, match="Unsupported"):
+            streaming.StreamingMetrics.from_dict(state)
+
+
+class TestUpdateMetrics:
+    """Test cases for metrics state saved next to the cache."""
+
+    def test_update_metrics_saves_state_next_to_cache(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that saved state is picked up by the next refresh."""
+        monkeypatch.chdir(tmp_path)
+        df = _prices()
+
+        streaming.update_metrics(sample_data.SAMPLE_TICKER, df.iloc[:100])
+        state_file = (
+            Path(constants.Directories.CACHE)
+            / f"{sample_data.SAMPLE_TICKER}{constants.METRICS_STATE_SUFFIX}"
+        )
+        assert state_file.exists()
+
+        result = streaming.update_metrics(sample_data.SAMPLE_TICKER, df)
+
+        expected = streaming.StreamingMetrics()
+        expected.update_frame(df)
+        assert result.last_date == expected.last_date
+        assert result.volatility == pytest.approx(expected.volatility)
+        assert result.moving_average == pytest.approx(expected.moving_average)
+        assert streaming.load_metrics(state_file) is not None
+
+    def test_update_metrics_rebuilds_after_history_changes(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that re-adjusted history replaces the saved state."""
+        monkeypatch.chdir(tmp_path)
+        df = _prices()
+        streaming.update_metrics(sample_data.SAMPLE_TICKER, df.iloc[:100])
+        adjusted = df.copy()
+        adjusted[constants.DataFrameColumns.CLOSE] *= 0.5
+
+        result = streaming.update_metrics(sample_data.SAMPLE_TICKER, adjusted)
+
+        expected = streaming.StreamingMetrics()
+        expected.update_frame(adjusted)
+        assert result.moving_average == pytest.approx(expected.moving_average)
+        assert result.drawdown.peak == pytest.approx(expected.drawdown.peak)
+
+    def test_matches_checks_first_and_last_bar(self) -> None:
+        """Test that the fingerprint covers both ends of the seen history."""
+        df = _prices()
+        metrics = _metrics()
+        metrics.update_frame(df.iloc[:100])
+
+        assert metrics.matches(df)
+        assert not metrics.matches(df.iloc[1:])
+        assert not metrics.matches(df.iloc[:50])
+
+    def test_load_metrics_ignores_corrupt_state(self, tmp_path: Path) -> None:
+        """Test that unreadable state is treated as missing."""
+        state_file = tmp_path / "state.json"
+        state_file.write_text("{not json")
+
+        assert streaming.load_metrics(state_file) is None
+        assert streaming.load_metrics(tmp_path / "missing.json") is None